@@ -3,14 +3,60 @@ AI Models API Endpoints
 واجهات برمجة نماذج الذكاء الاصطناعي
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Dict, List, Optional
+from datetime import datetime
 
 from backend.kinetic.ml_models.risk_assessor import risk_assessor
+from backend.kinetic.ml_models.model_registry import model_registry, ModelNotFoundError
+from backend.kinetic.ml_models.micro_batcher import inference_service
+from backend.kinetic.ml_models.portfolio_simulator import SimulationConfig, portfolio_simulator
 
 router = APIRouter()
 
+MARKET_TREND_MODEL = "market_trend"
+RECOMMENDER_MODEL = "investment_recommender"
+
+PREDICTION_HORIZONS = {
+    "next_month": 1,
+    "next_quarter": 3
+}
+
+# Upper bound on simulated paths per request, to cap CPU time per call
+MAX_SIMULATION_PATHS = 1_000_000
+
+# Expected return (%) when the model is certain; scaled by its conviction
+EXPECTED_RETURN_SCALE = 10.0
+
+RISK_LEVEL_INDEX = {
+    "low": 0,
+    "medium": 1,
+    "high": 2
+}
+
+CANDIDATE_INVESTMENTS = [
+    {
+        "investment_id": "INV-001",
+        "name": "Halal Tech Fund",
+        "sector": "Technology",
+        "expected_return": 8.5,
+        "risk_level": "medium",
+        "sharia_compliant": True,
+        "confidence": 0.85
+    },
+    {
+        "investment_id": "INV-002",
+        "name": "Islamic Healthcare REIT",
+        "sector": "Healthcare",
+        "expected_return": 6.2,
+        "risk_level": "low",
+        "sharia_compliant": True,
+        "confidence": 0.90
+    }
+]
+
 
 class RiskAssessmentRequest(BaseModel):
     """طلب تقييم المخاطر"""
@@ -36,6 +82,30 @@ class RiskAssessmentResponse(BaseModel):
     assessed_at: str
 
 
+class RiskAssessmentBatchRequest(BaseModel):
+    """طلب تقييم مخاطر مجموعة استثمارات"""
+    investments: List[RiskAssessmentRequest]
+
+
+class RiskAssessmentBatchResponse(BaseModel):
+    """استجابة تقييم مخاطر مجموعة استثمارات"""
+    results: List[RiskAssessmentResponse]
+    count: int
+
+
+class PortfolioSimulationRequest(BaseModel):
+    """طلب محاكاة مخاطر المحفظة"""
+    investments: List[RiskAssessmentRequest]
+    n_paths: int = Field(default=100_000, ge=1, le=MAX_SIMULATION_PATHS)
+    confidence: float = Field(default=0.99, gt=0, lt=1)
+    seed: Optional[int] = None
+
+
+class MarketPredictionRequest(BaseModel):
+    """طلب تنبؤات السوق"""
+    features: Dict[str, float] = {}
+
+
 @router.post("/risk-assessment", response_model=RiskAssessmentResponse)
 async def assess_risk(request: RiskAssessmentRequest):
     """
@@ -55,31 +125,106 @@ async def assess_risk(request: RiskAssessmentRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/risk-assessment/batch", response_model=RiskAssessmentBatchResponse)
+async def assess_risk_batch(request: RiskAssessmentBatchRequest):
+    """
+    تقييم مخاطر مجموعة استثمارات
+    Assess a batch of investments in one vectorized pass
+    """
+    try:
+        investments = [item.model_dump() for item in request.investments]
+        
+        results = await risk_assessor.assess_batch(investments)
+        
+        return RiskAssessmentBatchResponse(
+            results=[RiskAssessmentResponse(**result) for result in results],
+            count=len(results)
+        )
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/portfolio/simulate")
+async def simulate_portfolio(request: PortfolioSimulationRequest):
+    """
+    محاكاة مخاطر المحفظة
+    Monte Carlo tail risk (VaR, CVaR) of a portfolio, with per-sector contribution
+    """
+    investments = [item.model_dump() for item in request.investments]
+    config = SimulationConfig(
+        n_paths=request.n_paths, confidence=request.confidence, seed=request.seed
+    )
+    try:
+        # CPU-bound: keep the event loop free while the worker pool runs
+        return await asyncio.to_thread(portfolio_simulator.simulate, investments, config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/predict")
-async def predict_market():
+async def predict_market(request: Optional[MarketPredictionRequest] = None):
     """
     تنبؤات السوق
     Market predictions using ML
     """
-    # Simplified - in production, use actual ML model
-    return {
-        "predictions": {
-            "next_month": {
-                "trend": "bullish",
-                "confidence": 0.75,
-                "expected_return": 5.2
+    if not inference_service.has_model(MARKET_TREND_MODEL):
+        # No trained model deployed yet - static outlook
+        return {
+            "predictions": {
+                "next_month": {
+                    "trend": "bullish",
+                    "confidence": 0.75,
+                    "expected_return": 5.2
+                },
+                "next_quarter": {
+                    "trend": "neutral",
+                    "confidence": 0.65,
+                    "expected_return": 3.8
+                }
             },
-            "next_quarter": {
-                "trend": "neutral",
-                "confidence": 0.65,
-                "expected_return": 3.8
-            }
-        },
-        "factors": [
-            "Market sentiment positive",
-            "Economic indicators stable",
-            "Sector performance strong"
-        ]
+            "factors": [
+                "Market sentiment positive",
+                "Economic indicators stable",
+                "Sector performance strong"
+            ]
+        }
+
+    features = request.features if request else {}
+    try:
+        scored = await inference_service.predict_many(
+            MARKET_TREND_MODEL,
+            [dict(features, horizon_months=months) for months in PREDICTION_HORIZONS.values()]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    predictions = {}
+    factors = []
+    for horizon, result in zip(PREDICTION_HORIZONS, scored):
+        score = result["score"]
+        if score > 0.55:
+            trend = "bullish"
+        elif score < 0.45:
+            trend = "bearish"
+        else:
+            trend = "neutral"
+        predictions[horizon] = {
+            "trend": trend,
+            "confidence": round(max(score, 1 - score), 4),
+            "expected_return": round((2 * score - 1) * EXPECTED_RETURN_SCALE, 2),
+            "bullish_probability": round(score, 4)
+        }
+        factors.append(
+            f"{horizon.replace('_', ' ').capitalize()} outlook {trend} "
+            f"({score:.0%} bullish probability)"
+        )
+
+    return {
+        "predictions": predictions,
+        "factors": factors,
+        "model": MARKET_TREND_MODEL,
+        "model_version": scored[0]["version"]
     }
 
 
@@ -92,31 +237,64 @@ async def get_recommendations(
     توصيات استثمارية
     Investment recommendations
     """
-    # Simplified - in production, use ML recommendation engine
-    recommendations = [
-        {
-            "investment_id": "INV-001",
-            "name": "Halal Tech Fund",
-            "sector": "Technology",
-            "expected_return": 8.5,
-            "risk_level": "medium",
-            "sharia_compliant": True,
-            "confidence": 0.85
-        },
-        {
-            "investment_id": "INV-002",
-            "name": "Islamic Healthcare REIT",
-            "sector": "Healthcare",
-            "expected_return": 6.2,
-            "risk_level": "low",
-            "sharia_compliant": True,
-            "confidence": 0.90
-        }
-    ]
-    
+    recommendations = [dict(candidate) for candidate in CANDIDATE_INVESTMENTS]
+    model_version = None
+
+    if inference_service.has_model(RECOMMENDER_MODEL):
+        tolerance = RISK_LEVEL_INDEX.get(risk_tolerance, 1)
+        try:
+            scored = await inference_service.predict_many(
+                RECOMMENDER_MODEL,
+                [
+                    {
+                        "expected_return": candidate["expected_return"],
+                        "risk_level": RISK_LEVEL_INDEX.get(candidate["risk_level"], 1),
+                        "risk_tolerance": tolerance,
+                        "sharia_compliant": float(candidate["sharia_compliant"])
+                    }
+                    for candidate in recommendations
+                ]
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+        for candidate, result in zip(recommendations, scored):
+            candidate["confidence"] = round(result["score"], 4)
+        recommendations.sort(key=lambda candidate: candidate["confidence"], reverse=True)
+        model_version = scored[0]["version"] if scored else None
+
     return {
         "user_id": user_id,
         "risk_tolerance": risk_tolerance,
         "recommendations": recommendations,
-        "generated_at": "2024-12-19T10:00:00Z"
+        "model_version": model_version,
+        "generated_at": datetime.now().isoformat()
+    }
+
+
+@router.get("/models")
+async def list_models():
+    """
+    النماذج المتاحة
+    List deployed models, their versions and batching metrics
+    """
+    return {
+        "models": model_registry.list_models(),
+        "batching": inference_service.get_metrics()
     }
+
+
+@router.post("/models/{name}/activate")
+async def activate_model(name: str, version: Optional[str] = None):
+    """
+    تفعيل نسخة نموذج
+    Hot-swap the served version of a model (latest if not given)
+    """
+    try:
+        model = model_registry.activate(name, version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return {"model": name, "active_version": model.version}
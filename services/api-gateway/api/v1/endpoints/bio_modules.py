@@ -7,7 +7,7 @@ from fastapi import APIRouter
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
-from backend.bio_module_factory.core.factory import factory
+from backend.bio_module_factory.core.factory import get_factory
 from backend.bio_module_factory.models.types import ModuleStep, ModuleState
 from backend.core.error_handler import handle_endpoint_errors, ValidationException, ResourceNotFoundException
 
@@ -101,7 +101,7 @@ async def submit_deliverable(request: DeliverableSubmitRequest):
     تقديم تسليم
     Submit a deliverable
     """
-    success = await factory.submit_deliverable(
+    success = await get_factory().submit_deliverable(
         request.module_id,
         request.step,
         request.deliverable_id,
@@ -147,7 +147,7 @@ async def get_module_status(module_id: str):
     if not module_id or not module_id.strip():
         raise ValidationException("module_id is required")
 
-    state = await factory.get_module_state(module_id)
+    state = await get_factory().get_module_state(module_id)
 
     if state:
         return state.model_dump()
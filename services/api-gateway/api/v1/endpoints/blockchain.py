@@ -2,11 +2,45 @@
 Blockchain API Endpoints
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List
+from web3 import AsyncWeb3
+
+from backend.ledger.blockchain_service import blockchain_service
 
 router = APIRouter()
 
 
+def _require_addresses(*addresses: str) -> None:
+    """Reject malformed wallet addresses with 400 instead of failing in checksumming"""
+    invalid = [address for address in addresses if not AsyncWeb3.is_address(address)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid address: {invalid[0]}")
+
+
+class InvestorRegistration(BaseModel):
+    """تسجيل مستثمر"""
+    investor_address: str
+    kyc_verified: bool
+    accredited: bool
+    max_investment: float
+    country: str
+    sharia_compliant: bool
+
+
+class BulkInvestorRegistrationRequest(BaseModel):
+    """طلب تسجيل مجموعة مستثمرين"""
+    investors: List[InvestorRegistration]
+    network: str = "polygon"
+
+
+class BalancesRequest(BaseModel):
+    """طلب أرصدة عدة محافظ"""
+    addresses: List[str]
+    network: str = "polygon"
+
+
 @router.post("/mint")
 async def mint_tokens():
     """Mint new tokens"""
@@ -20,12 +54,76 @@ async def transfer_tokens():
 
 
 @router.get("/balance")
-async def get_balance():
-    """Get token balance"""
-    return {"message": "Get balance endpoint - to be implemented"}
+async def get_balance(address: str, network: str = "polygon"):
+    """
+    Get token balance
+    Served from the local event index when synced, RPC otherwise
+    """
+    _require_addresses(address)
+    balance = await blockchain_service.get_balance(address, network)
+    if balance is None:
+        raise HTTPException(status_code=503, detail="Balance unavailable")
+    return {"address": address, "network": network, "balance": balance}
+
+
+@router.post("/balances")
+async def get_balances(request: BalancesRequest):
+    """
+    Get token balances of many addresses
+    Reads are packed into multicall batches and cached per block
+    """
+    _require_addresses(*request.addresses)
+    balances = await blockchain_service.get_balances(request.addresses, request.network)
+    if balances is None:
+        raise HTTPException(status_code=503, detail="Balances unavailable")
+    return {"network": request.network, "balances": balances}
 
 
 @router.get("/tx/{tx_hash}")
-async def get_transaction(tx_hash: str):
+async def get_transaction(tx_hash: str, network: str = "polygon"):
     """Get transaction status"""
-    return {"message": f"Get transaction {tx_hash} - to be implemented"}
+    status = blockchain_service.get_submission_status(tx_hash, network)
+    if status is not None and status["status"] == "pending":
+        return status
+
+    receipt = await blockchain_service.get_transaction_status(tx_hash, network)
+    if receipt is None:
+        if status is not None:
+            return status
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return receipt
+
+
+@router.get("/transfers")
+async def get_transfers(address: str, network: str = "polygon", limit: int = 50):
+    """Get transfer history of an address from the local event index"""
+    _require_addresses(address)
+    transfers = blockchain_service.get_transfer_history(address, network, limit)
+    if transfers is None:
+        raise HTTPException(status_code=503, detail=f"Event index not running on {network}")
+    return {"address": address, "network": network, "transfers": transfers}
+
+
+@router.post("/investors/register-batch")
+async def register_investors(request: BulkInvestorRegistrationRequest):
+    """
+    تسجيل مجموعة مستثمرين
+    Submit investor registrations back-to-back; confirmations are tracked
+    in the background and exposed through /batches/{batch_id}
+    """
+    try:
+        return await blockchain_service.register_investors(
+            [investor.model_dump() for investor in request.investors],
+            network=request.network
+        )
+    except (ValueError, RuntimeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/batches/{batch_id}")
+async def get_batch(batch_id: str, network: str = "polygon"):
+    """Get confirmation status of a submitted batch"""
+    batch = blockchain_service.get_batch_status(batch_id, network)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
@@ -6,39 +6,31 @@ Shopify, Shipping, and Notifications
 
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Request, BackgroundTasks
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Request, BackgroundTasks
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Literal, Optional, List
 from datetime import datetime
-from backend.core.database import get_db
-from backend.core.models.order import Order, OrderStatus
+import structlog
 from integrations.shopify.client import get_shopify_client
+from integrations.shopify.webhooks import get_webhook_pipeline
+from integrations.http_pool import get_http_pool
+from integrations.ecommerce.inventory_push import get_inventory_push_service
 from integrations.shipping.aramex import get_aramex_client
 from integrations.shipping.smsa import get_smsa_client
+from integrations.shipping.rate_shopping import get_rate_shopper
+from integrations.shipping.bulk import summarize
+from integrations.shipping.tracking import get_tracking_service
 from integrations.notifications.sms import send_order_sms
 from integrations.notifications.email import send_order_email
 
 router = APIRouter()
+logger = structlog.get_logger(__name__)
 
 
-# Pydantic Models
-class ShopifyWebhookPayload(BaseModel):
-    id: int
-    email: str
-    created_at: str
-    updated_at: str
-    total_price: str
-    subtotal_price: str
-    total_tax: str
-    currency: str
-    financial_status: str
-    fulfillment_status: Optional[str]
-    line_items: List[dict]
-    shipping_address: Optional[dict]
-    billing_address: Optional[dict]
+MAX_RATE_DEADLINE = 10.0  # Seconds a checkout may wait for carrier quotes
 
 
+# Pydantic Models
 class ShippingRateRequest(BaseModel):
     origin_country: str
     origin_city: str
@@ -46,6 +38,23 @@ class ShippingRateRequest(BaseModel):
     destination_city: str
     weight: float
     dimensions: Optional[dict] = None
+    # Seconds; defaults to the rate shopper's deadline
+    deadline: Optional[float] = Field(default=None, gt=0, le=MAX_RATE_DEADLINE)
+    sort_by: Literal["cost", "eta"] = "cost"
+
+
+MAX_BULK_SHIPMENTS = 500
+
+
+class BulkShipmentItem(BaseModel):
+    """One shipment of a bulk booking; carrier-specific fields pass through"""
+    model_config = ConfigDict(extra="allow")
+
+    # Aramex: unique per batch
+    reference1: Optional[str] = Field(None, min_length=1, max_length=100)
+    reference: Optional[str] = Field(None, max_length=100)  # SMSA refNo
+    weight: float = Field(1.0, gt=0, le=1000)
+    pieces: int = Field(1, ge=1, le=999)
 
 
 class ShippingRateResponse(BaseModel):
@@ -66,50 +75,28 @@ class NotificationRequest(BaseModel):
 
 # Shopify Integration Endpoints
 @router.post("/shopify/webhook/order-created")
-async def shopify_order_webhook(
-    payload: ShopifyWebhookPayload,
-    request: Request,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
-    """Handle Shopify order creation webhook"""
-    try:
-        # Verify webhook (implement HMAC verification)
-        # For now, assume valid
-
-        # Create order in our system
-        order_data = {
-            'shopify_order_id': str(payload.id),
-            'customer_email': payload.email,
-            'total_amount': float(payload.total_price),
-            'currency': payload.currency,
-            'status': OrderStatus.PENDING,
-            'items': payload.line_items,
-            'shipping_address': payload.shipping_address,
-            'billing_address': payload.billing_address
-        }
-
-        # Save to database (implement order creation logic)
-        # order = create_order_from_shopify(db, order_data)
+@router.post("/shopify/webhook")
+async def shopify_order_webhook(request: Request):
+    """
+    Receive Shopify order webhooks (orders/create, orders/updated, ...)
 
-        # Send notifications
-        background_tasks.add_task(
-            send_order_sms,
-            payload.id,
-            "تم استلام طلبك بنجاح! رقم الطلب: " + str(payload.id)
-        )
+    Only verifies the HMAC, drops duplicates and queues the event; orders
+    are stored and customers notified in batches by the pipeline workers.
+    """
+    pipeline = get_webhook_pipeline()
+    if not pipeline.secret:
+        raise HTTPException(status_code=503, detail="Shopify webhook secret not configured")
 
-        background_tasks.add_task(
-            send_order_email,
-            payload.email,
-            "تأكيد الطلب",
-            f"تم استلام طلبك رقم {payload.id} بنجاح"
-        )
+    status_code, detail = pipeline.ingest(await request.body(), request.headers)
+    if status_code != 200:
+        raise HTTPException(status_code=status_code, detail=detail)
+    return {"status": detail}
 
-        return {"status": "success", "order_id": payload.id}
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@router.get("/shopify/webhook/status")
+async def shopify_webhook_status():
+    """Webhook pipeline queue depth and counters"""
+    return get_webhook_pipeline().get_status()
 
 
 @router.get("/shopify/orders/{order_id}")
@@ -117,7 +104,7 @@ async def get_shopify_order(order_id: str):
     """Get order details from Shopify"""
     try:
         client = get_shopify_client()
-        order = client.get_order(order_id)
+        order = await client.get_order(order_id)
         return order
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -128,57 +115,60 @@ async def fulfill_shopify_order(order_id: str, tracking_info: dict):
     """Fulfill order in Shopify"""
     try:
         client = get_shopify_client()
-        result = client.fulfill_order(order_id, tracking_info)
+        result = await client.fulfill_order(order_id, tracking_info)
         return {"status": "fulfilled", "result": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/ecommerce/inventory/status")
+async def get_inventory_push_status():
+    """Coalescing inventory push: lag, coalescing ratio, retries and backlog"""
+    return get_inventory_push_service().get_status()
+
+
 # Shipping Integration Endpoints
 @router.post("/shipping/rates")
 async def get_shipping_rates(request: ShippingRateRequest):
-    """Get shipping rates from multiple providers with circuit breaker"""
-    try:
-        rates = []
+    """
+    Get shipping rates from all carriers concurrently
+
+    Returns the rates that arrived before the deadline, ranked by cost (or
+    ETA), with the outcome per carrier. Slow carriers are hedged.
+    """
+    shopper = get_rate_shopper()
+    quote = await shopper.quote(
+        request.origin_country,
+        request.origin_city,
+        request.destination_country,
+        request.destination_city,
+        request.weight,
+        deadline=request.deadline,
+        sort_by=request.sort_by
+    )
+
+    if not quote["rates"]:
+        raise HTTPException(
+            status_code=503,
+            detail={"message": "All shipping providers unavailable", "carriers": quote["carriers"]}
+        )
 
-        # Aramex rates with circuit breaker
-        aramex_client = get_aramex_client()
-        if aramex_client:
-            try:
-                aramex_rates = await aramex_client.get_rates(
-                    request.origin_country,
-                    request.origin_city,
-                    request.destination_country,
-                    request.destination_city,
-                    request.weight
-                )
-                rates.extend(aramex_rates)
-            except Exception as e:
-                # Log error but continue with other providers
-                print(f"Aramex rates failed: {e}")
+    return quote
 
-        # SMSA rates (synchronous for now)
-        smsa_client = get_smsa_client()
-        if smsa_client:
-            try:
-                smsa_rates = smsa_client.get_rates(
-                    request.origin_country,
-                    request.origin_city,
-                    request.destination_country,
-                    request.destination_city,
-                    request.weight
-                )
-                rates.extend(smsa_rates)
-            except Exception as e:
-                print(f"SMSA rates failed: {e}")
 
-        if not rates:
-            raise HTTPException(status_code=503, detail="All shipping providers unavailable")
+@router.get("/shipping/rates/status")
+async def get_shipping_rates_status():
+    """Latency percentiles, timeouts and hedging per carrier, and rate cache counters"""
+    return get_rate_shopper().get_status()
 
-        return {"rates": rates}
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@router.post("/shipping/rates/prewarm")
+async def prewarm_shipping_rates(origin_country: str, origin_city: str):
+    """Quote every zone of the zone table so the first checkouts hit the cache"""
+    shopper = get_rate_shopper()
+    if not shopper.carriers:
+        raise HTTPException(status_code=503, detail="No shipping providers configured")
+    return {"lanes_loaded": await shopper.prewarm(origin_country, origin_city)}
 
 
 @router.post("/shipping/aramex/create-shipment")
@@ -190,6 +180,7 @@ async def create_aramex_shipment(shipment_data: dict):
             raise HTTPException(status_code=503, detail="Aramex service not configured")
 
         result = await client.create_shipment(shipment_data)
+        await _track_created("aramex", [shipment_data], [result])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -200,32 +191,100 @@ async def create_smsa_shipment(shipment_data: dict):
     """Create shipment with SMSA"""
     try:
         client = get_smsa_client()
-        result = client.create_shipment(shipment_data)
+        result = await client.create_shipment(shipment_data)
+        await _track_created("smsa", [shipment_data], [result])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/shipping/{carrier}/create-shipments")
+async def create_shipments(carrier: str, items: List[BulkShipmentItem]):
+    """
+    Book a batch of shipments with one carrier
+
+    Shipments are packed into as few requests as the carrier allows and
+    booked concurrently. Returns one result per shipment, in input order.
+    """
+    if carrier == "aramex":
+        client = get_aramex_client()
+    elif carrier == "smsa":
+        client = get_smsa_client()
+    else:
+        raise HTTPException(status_code=400, detail="Invalid provider")
+    if not client:
+        raise HTTPException(status_code=503, detail=f"{carrier.upper()} service not configured")
+    if not items:
+        raise HTTPException(status_code=400, detail="No shipments given")
+    if len(items) > MAX_BULK_SHIPMENTS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BULK_SHIPMENTS} shipments per request"
+        )
+
+    shipments = [item.model_dump(exclude_none=True) for item in items]
+    try:
+        results = await client.create_shipments(shipments)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await _track_created(carrier, shipments, results)
+    return summarize(carrier, results)
+
+
+async def _track_created(carrier: str, shipments: List[dict], results: List[dict]) -> None:
+    """
+    Hand newly booked waybills to the tracking poller
+
+    The shipments are already booked, so a tracking store error is logged
+    and never reported to the caller as a failed booking.
+    """
+    tracking = get_tracking_service()
+    if carrier not in tracking.carriers:
+        return
+    for shipment, result in zip(shipments, results):
+        booked = result.get('success', not result.get('has_errors'))
+        if booked and result.get('tracking_number'):
+            try:
+                await tracking.track(
+                    result['tracking_number'], carrier,
+                    reference=shipment.get('reference') or shipment.get('reference1')
+                )
+            except Exception as e:
+                logger.error("Could not track booked shipment", carrier=carrier,
+                             tracking_number=result['tracking_number'], error=str(e))
+
+
 @router.get("/shipping/track/{tracking_number}")
 async def track_shipment(tracking_number: str, provider: str = "aramex"):
-    """Track shipment with circuit breaker protection"""
+    """
+    Shipment status from the local tracking store
+
+    The tracking poller keeps this current. A waybill not tracked yet is
+    looked up at the carrier once, and tracked from then on only if the
+    carrier knows it.
+    """
+    tracking = get_tracking_service()
+    state = await tracking.get(tracking_number)
+    if state is not None:
+        return state
+
+    if provider not in ("aramex", "smsa"):
+        raise HTTPException(status_code=400, detail="Invalid provider")
+    if provider not in tracking.carriers:
+        raise HTTPException(status_code=503, detail=f"{provider.upper()} service not configured")
+
     try:
-        if provider == "aramex":
-            client = get_aramex_client()
-            if not client:
-                raise HTTPException(status_code=503, detail="Aramex service not configured")
-            tracking_info = await client.track_shipment(tracking_number)
-        elif provider == "smsa":
-            client = get_smsa_client()
-            if not client:
-                raise HTTPException(status_code=503, detail="SMSA service not configured")
-            tracking_info = client.track_shipment(tracking_number)
-        else:
-            raise HTTPException(status_code=400, detail="Invalid provider")
-
-        return tracking_info
+        state = await tracking.lookup(tracking_number, provider)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=502, detail=str(e))
+    if state is None:
+        raise HTTPException(status_code=404, detail="Shipment not found")
+    return state
+
+
+@router.get("/shipping/tracking/status")
+async def get_shipment_tracking_status():
+    """Tracking poller metrics and active waybills by status"""
+    return get_tracking_service().get_status()
 
 
 # Notifications Endpoints
@@ -262,10 +321,10 @@ async def test_notifications():
     """Test notification services"""
     try:
         # Test SMS
-        sms_result = send_order_sms("TEST123", "رسالة اختبار من HaderOS")
+        sms_result = await send_order_sms("TEST123", "رسالة اختبار من HaderOS")
 
         # Test Email
-        email_result = send_order_email(
+        email_result = await send_order_email(
             "test@example.com",
             "اختبار HaderOS",
             "هذه رسالة اختبار من نظام HaderOS"
@@ -331,4 +390,13 @@ async def get_circuit_breaker_status():
         }
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/monitoring/http-pool")
+async def get_http_pool_status():
+    """Connection pool usage per outbound provider"""
+    return {
+        **get_http_pool().get_metrics(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
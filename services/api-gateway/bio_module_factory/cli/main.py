@@ -1,19 +1,26 @@
 """
 BioModuleFactory - Command Line Interface
 CLI commands for module development workflow
+
+Only click is imported at startup. rich, the pydantic models and the
+factory are imported inside the commands that use them, and the factory
+is built on first use, so `--help` and `list` stay fast.
 """
 
 import click
-import asyncio
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from typing import Optional
 
-from backend.bio_module_factory.core.factory import factory
-from backend.bio_module_factory.models.types import ModuleStep
 
-console = Console()
+def _console():
+    from rich.console import Console
+    return Console()
+
+
+def _open_factory(read_only: bool = False):
+    """Build the factory only for commands that touch module state"""
+    from backend.bio_module_factory.core.factory import BioModuleFactory, get_factory
+    if read_only:
+        return BioModuleFactory(read_only=True)
+    return get_factory()
 
 
 @click.group()
@@ -29,6 +36,8 @@ def cli():
 @cli.command()
 def list():
     """📚 List all available bio-modules"""
+    from rich.table import Table
+    
     # Simplified - in production, load from database
     modules = [
         ("mycelium", "Mycelium Module", "Resource Distribution", "E-commerce"),
@@ -50,13 +59,16 @@ def list():
     for i, (id, name, problem, phase) in enumerate(modules, 1):
         table.add_row(str(i), id, name, problem, phase)
     
-    console.print(table)
+    _console().print(table)
 
 
 @cli.command()
 @click.argument('module_id')
 def init(module_id: str):
     """🚀 Initialize a new bio-module"""
+    from rich.panel import Panel
+    
+    console = _console()
     console.print(f"\n[bold green]Initializing module: {module_id}[/bold green]\n")
     
     # In production, load module definition and initialize
@@ -74,6 +86,9 @@ def init(module_id: str):
 @click.argument('step_number', type=int)
 def step(module_id: str, step_number: int):
     """📋 View current step requirements"""
+    from rich.table import Table
+    
+    console = _console()
     steps = [
         "Biological Study",
         "Architecture Design",
@@ -112,6 +127,9 @@ def step(module_id: str, step_number: int):
 @click.option('--file', required=True, help='Path to deliverable file')
 def submit(module_id: str, step_number: int, file: str):
     """📤 Submit a deliverable"""
+    from rich.panel import Panel
+    
+    console = _console()
     console.print(f"\n[bold green]Submitting deliverable...[/bold green]\n")
     
     # In production, call factory.submit_deliverable()
@@ -128,6 +146,7 @@ def submit(module_id: str, step_number: int, file: str):
 @click.argument('module_id')
 def validate(module_id: str):
     """🔍 Validate current step and advance"""
+    console = _console()
     console.print(f"\n[bold cyan]🔍 Validating module: {module_id}...[/bold cyan]\n")
     
     # In production, call factory.validate_step()
@@ -140,24 +159,32 @@ def validate(module_id: str):
 @click.argument('module_id')
 def status(module_id: str):
     """📊 Check module status"""
+    import asyncio
+    from datetime import datetime
+    from rich.panel import Panel
+    
+    console = _console()
     console.print(f"\n[bold cyan]📊 Module Status: {module_id}[/bold cyan]\n")
     
-    # In production, call factory.get_module_state()
+    # Status only reads - open the state store without touching it
+    state = asyncio.run(_open_factory(read_only=True).get_module_state(module_id))
+    if state is None:
+        console.print(f"[red]Module not found: {module_id}[/red]")
+        return
+    
+    deliverables = "\n".join(
+        f"   {'⏳' if d.status.value == 'pending' else '✅'} {d.id}"
+        + (f"\n      📁 {d.file_path}" if d.file_path else "")
+        for d in state.deliverables
+    )
     info = f"""
-🔄 Current Step: 2 (Architecture Design)
-✅ Completed Steps: 1
-📅 Started: 2024-12-19
-⏱️  Days in Progress: 3
+🔄 Current Step: {state.current_step.value}
+✅ Completed Steps: {len(state.completed_steps)}
+📅 Started: {state.started_at.date()}
+⏱️  Days in Progress: {(datetime.now() - state.started_at).days}
 
 📦 Deliverables:
-   ✅ bio_study_report
-      📁 docs/bio-study.md
-   ✅ business_mapping
-      📁 docs/business-mapping.md
-   ⏳ architecture_document
-
-🎯 Next Action:
-   haderos module step {module_id} 2
+{deliverables}
     """
     
     console.print(Panel(info, border_style="cyan"))
@@ -166,6 +193,8 @@ def status(module_id: str):
 @cli.command()
 def academy():
     """🎓 List training academy lessons"""
+    from rich.table import Table
+    
     lessons = [
         ("lesson_01", "From Mechanics to Life", "30 min", "Beginner"),
         ("lesson_02", "Mycelium: The Wood Wide Web", "45 min", "Intermediate"),
@@ -181,6 +210,7 @@ def academy():
     for id, title, duration, level in lessons:
         table.add_row(id, title, duration, level)
     
+    console = _console()
     console.print(table)
     console.print("\n💡 Start a lesson: haderos academy start <lesson_id>\n")
 
@@ -0,0 +1,123 @@
+"""
+BioModuleFactory - CLI Startup Benchmark
+Measures CLI startup with `python -X importtime`
+
+Runs the CLI in a fresh interpreter, parses the import-time report from
+stderr and fails if startup exceeds a time budget or pulls in modules the
+command does not need.
+
+    python -m backend.bio_module_factory.cli.startup_benchmark list --max-ms 150
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+# Sibling module, also when this file runs with -m (where __name__ is "__main__")
+CLI_MODULE = (__spec__.name if __spec__ else __name__).rsplit(".", 1)[0] + ".main"
+
+# Heavy modules no CLI command should import unless it needs module state
+DEFAULT_FORBIDDEN = (
+    "pydantic",
+    "backend.bio_module_factory.core.factory",
+    "backend.bio_module_factory.models.types",
+)
+
+
+def measure_startup(args: Sequence[str] = ("--help",), module: str = CLI_MODULE) -> Dict:
+    """
+    قياس زمن بدء التشغيل
+    Run the CLI once under -X importtime
+
+    Returns:
+        wall_ms: Wall-clock time of the whole run
+        import_ms: Cumulative import time of top-level imports
+        modules: Cumulative import time in ms per imported module
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", module, *args], capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"CLI exited with {result.returncode}: {result.stderr[-2000:]}")
+
+    modules: Dict[str, float] = {}
+    import_ms = 0.0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        cumulative_ms = int(cumulative) / 1000
+        modules[name.strip()] = cumulative_ms
+        if not name.startswith("  "):  # Top-level import
+            import_ms += cumulative_ms
+
+    return {"wall_ms": wall_ms, "import_ms": import_ms, "modules": modules}
+
+
+def _matches(name: str, prefix: str) -> bool:
+    # The package is imported as backend.* in the app and under other roots in tests
+    if name == prefix or name.startswith(prefix + "."):
+        return True
+    if prefix.startswith("backend."):
+        suffix = prefix[len("backend") :]
+        return name.endswith(suffix) or (suffix + ".") in name
+    return False
+
+
+def check_startup(
+    args: Sequence[str] = ("--help",),
+    max_import_ms: Optional[float] = None,
+    forbidden: Sequence[str] = DEFAULT_FORBIDDEN,
+    runs: int = 3,
+) -> List[str]:
+    """Return a list of regressions for one CLI invocation (empty if none)"""
+    report = min((measure_startup(args) for _ in range(runs)), key=lambda r: r["import_ms"])
+    return find_regressions(report, args, max_import_ms, forbidden)
+
+
+def find_regressions(
+    report: Dict,
+    args: Sequence[str],
+    max_import_ms: Optional[float] = None,
+    forbidden: Sequence[str] = DEFAULT_FORBIDDEN,
+) -> List[str]:
+    problems = [
+        f"{' '.join(args)} imports {name}"
+        for name in report["modules"]
+        if any(_matches(name, prefix) for prefix in forbidden)
+    ]
+
+    if max_import_ms is not None and report["import_ms"] > max_import_ms:
+        slowest = sorted(report["modules"].items(), key=lambda item: -item[1])[:5]
+        problems.append(
+            f"{' '.join(args)} spent {report['import_ms']:.1f} ms importing "
+            f"(budget {max_import_ms:.1f} ms); slowest: "
+            + ", ".join(f"{name} {ms:.1f} ms" for name, ms in slowest)
+        )
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="BioModuleFactory CLI startup benchmark")
+    parser.add_argument("cli_args", nargs="*", default=["--help"])
+    parser.add_argument("--max-ms", type=float, default=None, help="Import time budget")
+    parser.add_argument("--runs", type=int, default=5)
+    options = parser.parse_args()
+
+    reports = [measure_startup(options.cli_args) for _ in range(options.runs)]
+    best = min(reports, key=lambda r: r["import_ms"])
+    print(f"cli {' '.join(options.cli_args)}: best of {options.runs}")
+    print(f"  import time: {best['import_ms']:.1f} ms")
+    print(f"  wall time:   {min(r['wall_ms'] for r in reports):.1f} ms")
+    for name, ms in sorted(best["modules"].items(), key=lambda item: -item[1])[:10]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    problems = find_regressions(best, options.cli_args, options.max_ms)
+    for problem in problems:
+        print(f"REGRESSION: {problem}")
+    sys.exit(1 if problems else 0)
@@ -9,6 +9,8 @@ import logging
 import json
 from pathlib import Path
 
+from backend.bio_module_factory.core.gates import QualityGateExecutor
+from backend.bio_module_factory.core.journal import StateJournal
 from backend.bio_module_factory.models.types import (
     BioModule,
     ModuleState,
@@ -29,38 +31,127 @@ class BioModuleFactory:
     Bio-Module Factory - State Machine for Module Development
     """
     
-    def __init__(self, storage_path: str = "modules"):
+    def __init__(
+        self,
+        storage_path: str = "modules",
+        fsync_every: int = 64,
+        fsync_interval: float = 1.0,
+        compact_every: int = 1000,
+        gate_timeout: float = 60.0,
+        gate_workers: Optional[int] = None,
+        read_only: bool = False
+    ):
+        """
+        Args:
+            storage_path: Directory holding module folders and the state journal
+            read_only: Load states without creating, migrating or repairing
+                anything on disk; mutations raise RuntimeError
+        """
         self.storage_path = Path(storage_path)
-        self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.read_only = read_only
+        if not read_only:
+            self.storage_path.mkdir(parents=True, exist_ok=True)
         self.states: Dict[str, ModuleState] = {}
+        self.journal = StateJournal(
+            self.storage_path,
+            fsync_every=fsync_every,
+            fsync_interval=fsync_interval,
+            compact_every=compact_every,
+            read_only=read_only
+        )
+        self.gate_executor = QualityGateExecutor(timeout=gate_timeout, max_workers=gate_workers)
         self._load_states()
     
     def _load_states(self) -> None:
-        """تحميل الحالات المحفوظة - Load saved states"""
-        state_file = self.storage_path / "states.json"
-        if state_file.exists():
+        """تحميل الحالات المحفوظة - Load snapshot and replay the journal tail"""
+        try:
+            snapshot, records = self.journal.load()
+            
+            # Migrate the whole-file states.json written by older versions
+            legacy_file = self.storage_path / "states.json"
+            migrate = snapshot is None and legacy_file.exists()
+            if migrate:
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                migrate = not self.read_only
+            
+            for module_id, state_data in (snapshot or {}).items():
+                self.states[module_id] = ModuleState(**state_data)
+            for record in records:
+                self._apply(record)
+            
+            if migrate:
+                self._compact()
+            logger.info(
+                f"Loaded {len(self.states)} module states "
+                f"({len(records)} journal records replayed)"
+            )
+        except Exception as e:
+            logger.error(f"Error loading states: {e}")
+    
+    def _next_state(self, record: Dict) -> ModuleState:
+        """الحالة التالية - Module state after one journal record; self.states is not touched"""
+        op = record["op"]
+        if op == "initialize":
+            return ModuleState(**record["state"])
+        
+        state = self.states[record["module_id"]].model_copy(deep=True)
+        at = datetime.fromisoformat(record["at"])
+        
+        if op == "submit_deliverable":
+            deliverable = next(
+                d for d in state.deliverables if d.id == record["deliverable_id"]
+            )
+            deliverable.status = DeliverableStatus.SUBMITTED
+            deliverable.file_path = record["file_path"]
+            deliverable.submitted_at = at
+        elif op == "advance_step":
+            if state.current_step not in state.completed_steps:
+                state.completed_steps.append(state.current_step)
+            state.current_step = ModuleStep(record["step"])
+        else:
+            raise ValueError(f"Unknown journal record: {op}")
+        
+        state.last_updated = at
+        return state
+    
+    def _apply(self, record: Dict) -> None:
+        """تطبيق سجل - Apply one journal record to the in-memory states"""
+        self.states[record["module_id"]] = self._next_state(record)
+    
+    def _commit(self, record: Dict) -> None:
+        """
+        تسجيل تغيير - Append a mutation to the journal, then apply it.
+        
+        A failed journal write raises and leaves the in-memory state as it
+        was, so memory never runs ahead of what a restart would replay.
+        """
+        self._check_writable()
+        state = self._next_state(record)
+        self.journal.append(record)
+        self.states[record["module_id"]] = state
+        if self.journal.needs_compaction:
             try:
-                with open(state_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for module_id, state_data in data.items():
-                        self.states[module_id] = ModuleState(**state_data)
-                logger.info(f"Loaded {len(self.states)} module states")
+                self._compact()
             except Exception as e:
-                logger.error(f"Error loading states: {e}")
+                # The record is already durable in the journal; compaction is retried next time
+                logger.error(f"Error compacting states: {e}")
     
-    def _save_states(self) -> None:
-        """حفظ الحالات - Save states"""
-        state_file = self.storage_path / "states.json"
-        try:
-            data = {
-                module_id: state.model_dump(mode='json')
-                for module_id, state in self.states.items()
-            }
-            with open(state_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, default=str)
-            logger.info(f"Saved {len(self.states)} module states")
-        except Exception as e:
-            logger.error(f"Error saving states: {e}")
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError(f"Module state store opened read-only: {self.storage_path}")
+    
+    def _compact(self) -> None:
+        """ضغط السجل - Snapshot all states and truncate the journal"""
+        self.journal.compact({
+            module_id: state.model_dump(mode='json')
+            for module_id, state in self.states.items()
+        })
+    
+    def close(self) -> None:
+        """Flush pending journal records to disk and stop gate workers"""
+        self.journal.close()
+        self.gate_executor.close()
     
     async def initialize_module(
         self,
@@ -78,6 +169,8 @@ class BioModuleFactory:
         Returns:
             ModuleState: Initial module state
         """
+        self._check_writable()
+        
         # Create module directory
         module_dir = self.storage_path / module_definition.id
         module_dir.mkdir(parents=True, exist_ok=True)
@@ -87,10 +180,10 @@ class BioModuleFactory:
         (module_dir / "src").mkdir(exist_ok=True)
         (module_dir / "tests").mkdir(exist_ok=True)
         
-        # Initialize deliverables from all steps
+        # Initialize deliverables from all steps (copied - step configs are shared)
         all_deliverables = []
         for step_config in step_configs:
-            all_deliverables.extend(step_config.deliverables)
+            all_deliverables.extend(d.model_dump() for d in step_config.deliverables)
         
         # Create initial state
         state = ModuleState(
@@ -107,11 +200,14 @@ class BioModuleFactory:
         )
         
         # Save state
-        self.states[module_definition.id] = state
-        self._save_states()
+        self._commit({
+            "op": "initialize",
+            "module_id": module_definition.id,
+            "state": state.model_dump(mode='json')
+        })
         
         logger.info(f"Initialized module: {module_definition.name}")
-        return state
+        return self.states[module_definition.id]
     
     async def submit_deliverable(
         self,
@@ -149,14 +245,14 @@ class BioModuleFactory:
             logger.error(f"Deliverable not found: {deliverable_id}")
             return False
         
-        # Update deliverable
-        deliverable.status = DeliverableStatus.SUBMITTED
-        deliverable.file_path = file_path
-        deliverable.submitted_at = datetime.now()
-        
-        # Update state
-        state.last_updated = datetime.now()
-        self._save_states()
+        # Update deliverable and state
+        self._commit({
+            "op": "submit_deliverable",
+            "module_id": module_id,
+            "deliverable_id": deliverable_id,
+            "file_path": file_path,
+            "at": datetime.now().isoformat()
+        })
         
         logger.info(f"Deliverable submitted: {deliverable.name}")
         return True
@@ -188,11 +284,11 @@ class BioModuleFactory:
         blocking_failures = []
         warnings = []
         
-        # Run all quality gates
-        for gate in quality_gates:
-            # Execute check function (simplified - in production, use dynamic imports)
-            passed = await self._execute_quality_gate(state, gate)
+        # Run all quality gates concurrently (cached per deliverable fingerprint)
+        outcomes = await self.gate_executor.run(state, self.storage_path, quality_gates)
+        for gate, (passed, details) in zip(quality_gates, outcomes):
             gate.passed = passed
+            gate.details = details
             
             if not passed:
                 if gate.gate_type == QualityGateType.BLOCKING:
@@ -222,39 +318,6 @@ class BioModuleFactory:
             message=message
         )
     
-    async def _execute_quality_gate(
-        self,
-        state: ModuleState,
-        gate: QualityGate
-    ) -> bool:
-        """
-        تنفيذ بوابة الجودة
-        Execute a quality gate check
-        """
-        # Simplified implementation - in production, dynamically import check functions
-        check_name = gate.check_function
-        
-        if check_name == "check_deliverable_exists":
-            # Check if required deliverables are submitted
-            required_deliverables = [
-                d for d in state.deliverables
-                if d.required and d.status == DeliverableStatus.PENDING
-            ]
-            return len(required_deliverables) == 0
-        
-        elif check_name == "check_file_exists":
-            # Check if file exists
-            module_dir = self.storage_path / state.module_id
-            return module_dir.exists()
-        
-        elif check_name == "check_test_coverage":
-            # Simplified - in production, run actual coverage tool
-            return True  # Placeholder
-        
-        else:
-            logger.warning(f"Unknown quality gate check: {check_name}")
-            return True
-    
     async def advance_step(self, module_id: str) -> bool:
         """
         التقدم إلى الخطوة التالية
@@ -280,17 +343,15 @@ class BioModuleFactory:
             logger.info(f"Module already at final step: {state.module_name}")
             return False
         
-        # Mark current step as completed
-        if state.current_step not in state.completed_steps:
-            state.completed_steps.append(state.current_step)
-        
-        # Advance to next step
-        state.current_step = step_order[current_index + 1]
-        state.last_updated = datetime.now()
+        # Mark current step as completed and advance to next step
+        self._commit({
+            "op": "advance_step",
+            "module_id": module_id,
+            "step": step_order[current_index + 1].value,
+            "at": datetime.now().isoformat()
+        })
         
-        self._save_states()
-        
-        logger.info(f"Advanced to step: {state.current_step.value}")
+        logger.info(f"Advanced to step: {self.states[module_id].current_step.value}")
         return True
     
     async def get_module_state(self, module_id: str) -> Optional[ModuleState]:
@@ -308,5 +369,20 @@ class BioModuleFactory:
         return list(self.states.values())
 
 
-# Global instance
-factory = BioModuleFactory()
+# Global instance - created on first use so importing this module stays cheap
+_factory: Optional[BioModuleFactory] = None
+
+
+def get_factory() -> BioModuleFactory:
+    """Return the shared factory, creating it on first use"""
+    global _factory
+    if _factory is None:
+        _factory = BioModuleFactory()
+    return _factory
+
+
+def __getattr__(name: str):
+    # Keeps `from ...core.factory import factory` working
+    if name == "factory":
+        return get_factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
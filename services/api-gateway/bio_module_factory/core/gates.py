@@ -0,0 +1,253 @@
+"""
+BioModuleFactory - Quality Gate Executor
+Runs quality gate checks concurrently with per-gate timeouts
+
+Each check is registered with the kind of work it does:
+- "inline": cheap checks on the module state, run on the event loop
+- "io": filesystem checks, run in a worker thread
+- "cpu": heavy checks (coverage, linting), run in a process pool
+
+Results are cached by a fingerprint of the module's deliverables, including
+a digest of every submitted file, so re-validating an unchanged module does
+not run any check again.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.bio_module_factory.models.types import DeliverableStatus, ModuleState, QualityGate
+
+logger = logging.getLogger(__name__)
+
+GateOutcome = Tuple[bool, Optional[Dict]]
+
+
+@dataclass
+class GateContext:
+    """
+    Picklable snapshot of what a check may look at.
+    Deliverables are plain dicts so the context can cross process boundaries.
+    """
+
+    module_id: str
+    module_dir: str
+    deliverables: List[Dict] = field(default_factory=list)
+
+    def deliverable_paths(self) -> List[Path]:
+        """Absolute paths of submitted deliverable files"""
+        return [
+            Path(self.module_dir) / d["file_path"] for d in self.deliverables if d.get("file_path")
+        ]
+
+
+@dataclass
+class GateCheck:
+    """A registered check function and where it runs"""
+
+    function: Callable[[GateContext], object]
+    kind: str = "inline"  # inline | io | cpu
+
+
+CHECKS: Dict[str, GateCheck] = {}
+
+
+def register_check(name: str, kind: str = "inline"):
+    """
+    تسجيل فحص
+    Register a quality gate check under the name used in QualityGate.check_function.
+
+    A check returns a bool or a (bool, details) tuple. "cpu" checks must be
+    module-level functions so they can run in the process pool.
+    """
+    if kind not in ("inline", "io", "cpu"):
+        raise ValueError(f"Unknown check kind: {kind}")
+
+    def decorator(function):
+        CHECKS[name] = GateCheck(function=function, kind=kind)
+        return function
+
+    return decorator
+
+
+@register_check("check_deliverable_exists")
+def check_deliverable_exists(context: GateContext) -> bool:
+    """Check if required deliverables are submitted"""
+    return not any(
+        d["required"] and d["status"] == DeliverableStatus.PENDING.value
+        for d in context.deliverables
+    )
+
+
+@register_check("check_file_exists", kind="io")
+def check_file_exists(context: GateContext) -> GateOutcome:
+    """Check that the module directory and every submitted file exist"""
+    if not Path(context.module_dir).exists():
+        return False, {"missing": [context.module_dir]}
+    missing = [str(p) for p in context.deliverable_paths() if not p.exists()]
+    return not missing, {"missing": missing} if missing else None
+
+
+@register_check("check_test_coverage")
+def check_test_coverage(context: GateContext) -> bool:
+    """Simplified - in production, run actual coverage tool"""
+    return True  # Placeholder
+
+
+@register_check("check_python_syntax", kind="cpu")
+def check_python_syntax(context: GateContext) -> GateOutcome:
+    """Compile every submitted Python deliverable and report syntax errors"""
+    errors = []
+    for path in context.deliverable_paths():
+        if path.suffix != ".py" or not path.is_file():
+            continue
+        try:
+            compile(path.read_bytes(), str(path), "exec")
+        except SyntaxError as e:
+            errors.append(f"{path}:{e.lineno}: {e.msg}")
+    return not errors, {"errors": errors} if errors else None
+
+
+def _run_check(function: Callable[[GateContext], object], context: GateContext) -> GateOutcome:
+    """Process pool entry point - the check is pickled by reference"""
+    return _normalize(function(context))
+
+
+def _normalize(result) -> GateOutcome:
+    if isinstance(result, tuple):
+        return bool(result[0]), result[1]
+    return bool(result), None
+
+
+class QualityGateExecutor:
+    """
+    منفذ بوابات الجودة
+    Concurrent quality gate execution with a fingerprint-keyed result cache
+    """
+
+    def __init__(
+        self, timeout: float = 60.0, max_workers: Optional[int] = None, cache_size: int = 4096
+    ):
+        self.timeout = timeout
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._results: "OrderedDict[Tuple[str, str], GateOutcome]" = OrderedDict()
+        # (path, size, mtime_ns) -> content digest, so unchanged files are not re-read
+        self._file_digests: Dict[Tuple[str, int, int], str] = {}
+        self.metrics = {"executed": 0, "cache_hits": 0, "timeouts": 0}
+
+    def build_context(self, state: ModuleState, storage_path: Path) -> GateContext:
+        return GateContext(
+            module_id=state.module_id,
+            module_dir=str(Path(storage_path) / state.module_id),
+            deliverables=[d.model_dump(mode="json") for d in state.deliverables],
+        )
+
+    def fingerprint(self, context: GateContext) -> str:
+        """Hash of the module's deliverables and the content of their files"""
+        digest = hashlib.sha256()
+        digest.update(context.module_id.encode())
+        digest.update(b"1" if Path(context.module_dir).exists() else b"0")
+        for deliverable in sorted(context.deliverables, key=lambda d: d["id"]):
+            fields = (deliverable["id"], deliverable["status"], deliverable.get("file_path"))
+            digest.update("".join(f"\0{field}" for field in fields).encode())
+            if deliverable.get("file_path"):
+                digest.update(
+                    self._file_digest(Path(context.module_dir) / deliverable["file_path"]).encode()
+                )
+        return digest.hexdigest()
+
+    def _file_digest(self, path: Path) -> str:
+        try:
+            stat = path.stat()
+        except OSError:
+            return "missing"
+        if path.is_dir():
+            return "dir"
+
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        digest = self._file_digests.get(key)
+        if digest is None:
+            file_hash = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    file_hash.update(chunk)
+            if len(self._file_digests) >= self.cache_size:
+                self._file_digests.clear()
+            digest = self._file_digests[key] = file_hash.hexdigest()
+        return digest
+
+    async def run(
+        self, state: ModuleState, storage_path: Path, quality_gates: List[QualityGate]
+    ) -> List[GateOutcome]:
+        """
+        تشغيل بوابات الجودة
+        Run all gates concurrently and return (passed, details) per gate, in order
+        """
+        context = self.build_context(state, storage_path)
+        fingerprint = await asyncio.to_thread(self.fingerprint, context)
+        return list(
+            await asyncio.gather(
+                *(self._run_gate(gate, context, fingerprint) for gate in quality_gates)
+            )
+        )
+
+    async def _run_gate(
+        self, gate: QualityGate, context: GateContext, fingerprint: str
+    ) -> GateOutcome:
+        check = CHECKS.get(gate.check_function)
+        if check is None:
+            logger.warning(f"Unknown quality gate check: {gate.check_function}")
+            return True, None
+
+        key = (fingerprint, gate.check_function)
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            self.metrics["cache_hits"] += 1
+            return cached
+
+        try:
+            outcome = await asyncio.wait_for(self._execute(check, context), self.timeout)
+        except asyncio.TimeoutError:
+            # Timeouts are not cached - the next validation retries the check
+            self.metrics["timeouts"] += 1
+            logger.warning(f"Quality gate {gate.id} timed out after {self.timeout}s")
+            return False, {"error": f"Timed out after {self.timeout}s"}
+        except Exception as e:
+            logger.error(f"Quality gate {gate.id} failed to run: {e}")
+            return False, {"error": str(e)}
+
+        self.metrics["executed"] += 1
+        self._results[key] = outcome
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+        return outcome
+
+    async def _execute(self, check: GateCheck, context: GateContext) -> GateOutcome:
+        if check.kind == "inline":
+            return _normalize(check.function(context))
+        if check.kind == "io":
+            return _normalize(await asyncio.to_thread(check.function, context))
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _run_check, check.function, context)
+
+    def clear_cache(self) -> None:
+        self._results.clear()
+        self._file_digests.clear()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,225 @@
+"""
+BioModuleFactory - State Journal
+Append-only event journal with snapshot compaction
+
+Every mutation is appended as one compact JSON line to `journal.log`, so a
+write costs the same no matter how many modules exist. fsync is batched:
+the journal is synced every `fsync_every` records or `fsync_interval`
+seconds after the first unsynced record, whichever comes first, and on
+close. A timer covers the interval, so an idle journal is synced too.
+
+Every `compact_every` records the owner writes a full snapshot to
+`snapshot.json` (temp file + atomic rename) and the journal is truncated.
+Startup loads the snapshot and replays only the journal tail.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StateJournal:
+    """
+    سجل الحالات
+    Append-only journal of state mutations plus a compacted snapshot
+    """
+
+    SNAPSHOT_FILE = "snapshot.json"
+    JOURNAL_FILE = "journal.log"
+
+    def __init__(
+        self,
+        storage_path: Path,
+        fsync_every: int = 64,
+        fsync_interval: float = 1.0,
+        compact_every: int = 1000,
+        read_only: bool = False,
+    ):
+        self.storage_path = Path(storage_path)
+        self.snapshot_file = self.storage_path / self.SNAPSHOT_FILE
+        self.journal_file = self.storage_path / self.JOURNAL_FILE
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.read_only = read_only
+
+        self.seq = 0  # Sequence number of the last record written
+        self.snapshot_seq = 0  # Last sequence number covered by the snapshot
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._file = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()  # The sync timer runs on its own thread
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self.seq - self.snapshot_seq >= self.compact_every
+
+    def load(self) -> Tuple[Optional[Dict], List[Dict]]:
+        """
+        Read the snapshot and the journal records written after it.
+
+        A torn last line (crash mid-append: no trailing newline, or not
+        valid JSON) is dropped and, unless the journal is read-only,
+        truncated away so the next append starts on a fresh line.
+
+        Returns:
+            (snapshot states or None, journal records in order)
+        """
+        snapshot = None
+        if self.snapshot_file.exists():
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.snapshot_seq = self.seq = data["seq"]
+            snapshot = data["states"]
+
+        records = []
+        if self.journal_file.exists():
+            valid_bytes = 0
+            with open(self.journal_file, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("no trailing newline")
+                        record = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Dropping torn journal record at byte {valid_bytes}")
+                        break
+                    valid_bytes += len(line)
+                    # Records already folded into the snapshot survive a crash
+                    # between snapshot rename and journal truncation
+                    if record["seq"] > self.snapshot_seq:
+                        records.append(record)
+                        self.seq = record["seq"]
+
+            if valid_bytes < self.journal_file.stat().st_size and not self.read_only:
+                with open(self.journal_file, "r+b") as f:
+                    f.truncate(valid_bytes)
+
+        return snapshot, records
+
+    def _open(self) -> None:
+        """Open the journal for appending, first cutting any torn tail back to the last newline"""
+        if self.journal_file.exists():
+            with open(self.journal_file, "r+b") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        self._file = open(self.journal_file, "a", encoding="utf-8")
+
+    def append(self, record: Dict) -> int:
+        """
+        Append one mutation record and return its sequence number.
+
+        Raises whatever the write raised (OSError, TypeError); nothing is
+        counted as written in that case.
+        """
+        if self.read_only:
+            raise RuntimeError("Journal opened read-only")
+        with self._lock:
+            if self._file is None:
+                self._open()
+
+            line = json.dumps(
+                {"seq": self.seq + 1, **record},
+                ensure_ascii=False,
+                separators=(",", ":"),
+                default=str,
+            )
+            try:
+                self._file.write(line + "\n")
+                self._file.flush()
+            except BaseException:
+                # Reopen next time, which cuts the partial line back off
+                file, self._file = self._file, None
+                try:
+                    file.close()
+                except OSError:
+                    pass
+                raise
+            self.seq += 1
+
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.fsync_interval, self._sync_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+            return self.seq
+
+    def sync(self) -> None:
+        """fsync pending journal records"""
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _sync_on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            try:
+                self._sync()
+            except OSError as e:
+                logger.error(f"Journal fsync failed: {e}")
+
+    def compact(self, states: Dict) -> None:
+        """
+        Write a snapshot of all states and truncate the journal.
+
+        Args:
+            states: JSON-serializable state of every module as of self.seq
+        """
+        if self.read_only:
+            raise RuntimeError("Journal opened read-only")
+        with self._lock:
+            self._compact(states)
+
+    def _compact(self, states: Dict) -> None:
+        tmp_file = self.snapshot_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {"seq": self.seq, "states": states},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+                default=str,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+        self.snapshot_seq = self.seq
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        with open(self.journal_file, "w", encoding="utf-8"):
+            pass
+        self._unsynced = 0
+        logger.info(f"Compacted {len(states)} module states at seq {self.seq}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
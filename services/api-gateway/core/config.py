@@ -53,9 +53,49 @@ class Settings(BaseSettings):
         "POLYGON_RPC_URL",
         "https://polygon-mainnet.infura.io/v3/YOUR-PROJECT-ID"
     )
+    BLOCKCHAIN_POOL_SIZE: int = 20  # Pooled HTTP connections per network
+    BLOCKCHAIN_REQUEST_TIMEOUT: float = 30.0
+    BLOCKCHAIN_RECEIPT_TIMEOUT: float = 120.0
+    BLOCKCHAIN_RECEIPT_POLL_INTERVAL: float = 1.0
+    TOKEN_ADDRESS_ETH: str = os.getenv("TOKEN_ADDRESS_ETH", "")
+    TOKEN_ADDRESS_POLYGON: str = os.getenv("TOKEN_ADDRESS_POLYGON", "")
+    LEDGER_INDEX_ENABLED: bool = os.getenv("LEDGER_INDEX_ENABLED", "false").lower() == "true"
+    LEDGER_INDEX_DB_PATH: str = os.getenv("LEDGER_INDEX_DB_PATH", "data/ledger_index.sqlite3")
+    LEDGER_INDEX_CONFIRMATIONS: int = 12  # Blocks deep before an event is indexed
+    LEDGER_INDEX_POLL_INTERVAL: float = 5.0
+    # Token deployment blocks: the first run backfills from here, not from genesis
+    LEDGER_INDEX_START_BLOCK_ETH: int = int(os.getenv("LEDGER_INDEX_START_BLOCK_ETH", "0"))
+    LEDGER_INDEX_START_BLOCK_POLYGON: int = int(os.getenv("LEDGER_INDEX_START_BLOCK_POLYGON", "0"))
+    # Multicall3 is deployed at the same address on Ethereum and Polygon
+    MULTICALL_ADDRESS: str = os.getenv(
+        "MULTICALL_ADDRESS",
+        "0xcA11bde05977b3631167028862bE2a173976CA11"
+    )
+    BALANCE_BATCH_SIZE: int = 500  # balanceOf calls per multicall round trip
     CONTRACT_OWNER_ADDRESS: str = os.getenv("CONTRACT_OWNER_ADDRESS", "")
     CONTRACT_OWNER_PRIVATE_KEY: str = os.getenv("CONTRACT_OWNER_PRIVATE_KEY", "")
     
+    # E-commerce
+    SHOPIFY_SHOP_URL: str = os.getenv("SHOPIFY_SHOP_URL", "")
+    SHOPIFY_API_KEY: str = os.getenv("SHOPIFY_API_KEY", "")
+    SHOPIFY_ACCESS_TOKEN: str = os.getenv("SHOPIFY_ACCESS_TOKEN", "")
+    SHOPIFY_WEBHOOK_SECRET: str = os.getenv("SHOPIFY_WEBHOOK_SECRET", "")
+    SHOPIFY_WEBHOOK_QUEUE_PATH: str = os.getenv(
+        "SHOPIFY_WEBHOOK_QUEUE_PATH",
+        "data/shopify_webhooks.sqlite3"
+    )
+    SHOPIFY_WEBHOOK_BATCH_SIZE: int = 100  # Events per worker batch
+    ECOMMERCE_SYNC_ENABLED: bool = os.getenv("ECOMMERCE_SYNC_ENABLED", "false").lower() == "true"
+    ECOMMERCE_SYNC_INTERVAL: float = 300.0  # Seconds between delta sync runs
+    ECOMMERCE_SYNC_BATCH_SIZE: int = 500  # Records per upsert transaction
+    SHIPPING_ORIGIN_COUNTRY: str = os.getenv("SHIPPING_ORIGIN_COUNTRY", "SA")
+    # Set to pre-warm rate quotes at startup
+    SHIPPING_ORIGIN_CITY: str = os.getenv("SHIPPING_ORIGIN_CITY", "")
+    SHIPMENT_TRACKING_DB_PATH: str = os.getenv(
+        "SHIPMENT_TRACKING_DB_PATH",
+        "data/shipment_tracking.sqlite3"
+    )
+    
     # ERC-3643 Configuration
     ERC3643_REGISTRY_ADDRESS: str = os.getenv("ERC3643_REGISTRY_ADDRESS", "")
     ERC3643_COMPLIANCE_ADDRESS: str = os.getenv("ERC3643_COMPLIANCE_ADDRESS", "")
@@ -63,6 +103,11 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     
+    # ML Models
+    MODEL_DIR: str = os.getenv("MODEL_DIR", "models")
+    MODEL_BATCH_MAX_SIZE: int = 64
+    MODEL_BATCH_MAX_WAIT_MS: float = 5.0
+    
     # KAIA Theology Engine
     KAIA_SERVICE_URL: str = os.getenv("KAIA_SERVICE_URL", "http://localhost:8080")
     KAIA_API_KEY: str = os.getenv("KAIA_API_KEY", "")
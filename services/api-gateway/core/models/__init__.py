@@ -2,5 +2,7 @@
 
 from backend.core.models.user import User
 from backend.core.models.product import Product
+from backend.core.models.order import Order
+from backend.core.models.sync_state import SyncState, SyncRecord
 
-__all__ = ["User", "Product"]
\ No newline at end of file
+__all__ = ["User", "Product", "Order", "SyncState", "SyncRecord"]
@@ -0,0 +1,44 @@
+"""
+Order Models - E-commerce Platform Orders
+"""
+
+from datetime import datetime
+
+from backend.core.database import Base
+from sqlalchemy import DECIMAL, Column, DateTime, Integer, String, Text, UniqueConstraint
+
+
+class Order(Base):
+    """Order synced from an e-commerce platform (Shopify, ...)"""
+
+    __tablename__ = "orders"
+    __table_args__ = (
+        UniqueConstraint("platform", "external_id", name="uq_orders_platform_external_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # 🔗 المنصة ورقم الطلب فيها / Platform and its order ID
+    platform = Column(String(50), nullable=False, index=True)
+    external_id = Column(String(100), nullable=False)
+    order_number = Column(String(50))
+
+    # 👤 العميل / Customer
+    customer_email = Column(String(255), index=True)
+    customer_name = Column(String(255))
+
+    # 💰 المبلغ / Amount
+    total_amount = Column(DECIMAL(12, 2), nullable=False, default=0)
+    currency = Column(String(3), default="USD")
+
+    # ✅ حالة الطلب / Order Status
+    status = Column(String(50), index=True)
+
+    # 📦 المنتجات والعناوين / Items and addresses (JSON)
+    items = Column(Text)
+    shipping_address = Column(Text)
+
+    # 📅 التواريخ / Dates
+    created_at = Column(DateTime)  # On the platform
+    updated_at = Column(DateTime, index=True)  # On the platform
+    synced_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
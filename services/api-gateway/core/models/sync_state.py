@@ -0,0 +1,45 @@
+"""
+Sync State Models - E-commerce Delta Sync Bookkeeping
+"""
+
+from datetime import datetime
+
+from backend.core.database import Base
+from sqlalchemy import Column, DateTime, Integer, String, UniqueConstraint
+
+
+class SyncState(Base):
+    """Per-platform, per-resource sync watermark"""
+
+    __tablename__ = "sync_states"
+    __table_args__ = (
+        UniqueConstraint("platform", "resource", name="uq_sync_states_platform_resource"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    platform = Column(String(50), nullable=False)
+    resource = Column(String(50), nullable=False)  # products | orders
+
+    # ⏱️ آخر updated_at تمت مزامنته / Highest platform updated_at synced (ISO 8601)
+    watermark = Column(String(40))
+
+    # 📊 آخر تشغيل / Last run
+    last_run_at = Column(DateTime)
+    last_fetched = Column(Integer, default=0)
+    last_changed = Column(Integer, default=0)
+
+
+class SyncRecord(Base):
+    """Content hash of the last synced version of each platform record"""
+
+    __tablename__ = "sync_records"
+    __table_args__ = (
+        UniqueConstraint("platform", "resource", "external_id", name="uq_sync_records_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    platform = Column(String(50), nullable=False)
+    resource = Column(String(50), nullable=False)
+    external_id = Column(String(100), nullable=False)
+    content_hash = Column(String(32), nullable=False)
+    synced_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
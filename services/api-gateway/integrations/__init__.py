@@ -8,9 +8,13 @@ including shipping, notifications, and e-commerce platforms.
 """
 
 from .ecommerce import AdapterManager
+from .http_pool import HTTPClientPool, ProviderConfig, get_http_pool
 
 __version__ = "1.0.0"
 
 __all__ = [
-    'AdapterManager'
+    'AdapterManager',
+    'HTTPClientPool',
+    'ProviderConfig',
+    'get_http_pool'
 ]
\ No newline at end of file
@@ -8,16 +8,51 @@ with Circuit Breaker pattern for resilient e-commerce integrations.
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional, Union
+import time
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Union
 from datetime import datetime
 import structlog
 
 from .adapters import AdapterFactory, EcommerceAdapter, OrderData, ProductData, FulfillmentData
-from services.api_gateway.integrations.shipping.circuit_breaker import CircuitBreaker, CircuitBreakerConfig
+from .read_cache import CachedRead, ReadCache, ReadCacheConfig
+from services.api_gateway.integrations.shipping.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitBreakerOpenException
+)
 
 
 logger = structlog.get_logger(__name__)
 
+DEFAULT_FAN_OUT_DEADLINE = 10.0  # Seconds for a whole multi-platform call
+DEFAULT_PLATFORM_CONCURRENCY = 4  # In-flight calls per platform
+
+
+class FanOutResult(dict):
+    """
+    Per-platform results of a multi-platform call.
+
+    Platforms that failed or missed the deadline map to an empty list and are
+    listed in `errors`, so callers can tell "no data" from "no answer".
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.errors: Dict[str, str] = {}
+        self.latencies_ms: Dict[str, float] = {}
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'results': dict(self),
+            'errors': self.errors,
+            'latencies_ms': self.latencies_ms,
+            'complete': self.complete
+        }
+
 
 class AdapterManager:
     """Manager for e-commerce adapters with circuit breaker protection"""
@@ -26,6 +61,9 @@ class AdapterManager:
         self.config = config
         self.adapters: Dict[str, EcommerceAdapter] = {}
         self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.read_caches: Dict[str, ReadCache] = {}
+        self.fan_out_deadline = config.get('fan_out', {}).get('deadline', DEFAULT_FAN_OUT_DEADLINE)
 
         # Initialize adapters from config
         self._initialize_adapters()
@@ -52,6 +90,16 @@ class AdapterManager:
 
                 self.circuit_breakers[platform] = circuit_breaker
 
+                # Cap in-flight calls so fan-outs cannot flood one platform
+                self.semaphores[platform] = asyncio.Semaphore(
+                    platform_config.get('max_concurrency', DEFAULT_PLATFORM_CONCURRENCY)
+                )
+
+                # Single-record reads are served from cache while fresh
+                self.read_caches[platform] = ReadCache(
+                    ReadCacheConfig(**platform_config.get('read_cache', {}))
+                )
+
                 logger.info(f"Initialized {platform} adapter with circuit breaker",
                           platform=platform)
 
@@ -64,20 +112,49 @@ class AdapterManager:
         if platform not in self.adapters:
             raise ValueError(f"Adapter for platform '{platform}' not found")
 
-        if platform not in self.circuit_breakers:
-            # Fallback without circuit breaker
-            return await func(*args, **kwargs)
+        semaphore = self.semaphores.get(platform)
+        if semaphore is None:
+            semaphore = self.semaphores[platform] = asyncio.Semaphore(DEFAULT_PLATFORM_CONCURRENCY)
 
-        circuit_breaker = self.circuit_breakers[platform]
+        async with semaphore:
+            if platform not in self.circuit_breakers:
+                # Fallback without circuit breaker
+                return await func(*args, **kwargs)
 
-        try:
-            result = await circuit_breaker.call(func, *args, **kwargs)
-            logger.info(f"Successfully executed {operation} on {platform}")
-            return result
-        except Exception as e:
-            logger.error(f"Failed to execute {operation} on {platform}",
-                        error=str(e), platform=platform)
-            raise
+            circuit_breaker = self.circuit_breakers[platform]
+
+            try:
+                result = await circuit_breaker.call(func, *args, **kwargs)
+                logger.info(f"Successfully executed {operation} on {platform}")
+                return result
+            except Exception as e:
+                logger.error(f"Failed to execute {operation} on {platform}",
+                            error=str(e), platform=platform)
+                raise
+
+    # Read cache
+    def _read_cache(self, platform: str) -> ReadCache:
+        cache = self.read_caches.get(platform)
+        if cache is None:
+            cache = self.read_caches[platform] = ReadCache()
+        return cache
+
+    async def _cached_read(self, platform: str, key: tuple, fetch) -> CachedRead:
+        result = await self._read_cache(platform).get(
+            key, fetch, unavailable=(CircuitBreakerOpenException,)
+        )
+        if result.stale:
+            logger.info("Served stale read", platform=platform, key=str(key),
+                        age=round(result.age, 1))
+        return result
+
+    def _cache_write(self, platform: str, key: tuple, value: Any) -> None:
+        """Keep the cache in step with our own writes; None drops the entry"""
+        cache = self._read_cache(platform)
+        if value is None:
+            cache.invalidate(key)
+        else:
+            cache.put(key, value)
 
     # Order operations
     async def get_orders(self, platform: str, **filters) -> List[OrderData]:
@@ -87,33 +164,49 @@ class AdapterManager:
             platform, "get_orders", adapter.get_orders, **filters
         )
 
-    async def get_order(self, platform: str, order_id: str) -> Optional[OrderData]:
-        """Get single order from specified platform"""
-        adapter = self.adapters[platform]
-        return await self._execute_with_circuit_breaker(
-            platform, "get_order", adapter.get_order, order_id
+    async def read_order(self, platform: str, order_id: str) -> CachedRead:
+        """Get single order through the read cache, with its staleness"""
+        adapter = self.adapters.get(platform)
+        if adapter is None:
+            raise ValueError(f"Adapter for platform '{platform}' not found")
+        return await self._cached_read(
+            platform, ('order', order_id),
+            lambda: self._execute_with_circuit_breaker(
+                platform, "get_order", adapter.get_order, order_id
+            )
         )
 
+    async def get_order(self, platform: str, order_id: str) -> Optional[OrderData]:
+        """Get single order from specified platform (cached; see read_order)"""
+        return (await self.read_order(platform, order_id)).value
+
     async def create_order(self, platform: str, order_data: OrderData) -> OrderData:
         """Create order on specified platform"""
         adapter = self.adapters[platform]
-        return await self._execute_with_circuit_breaker(
+        order = await self._execute_with_circuit_breaker(
             platform, "create_order", adapter.create_order, order_data
         )
+        self._cache_write(platform, ('order', order.order_id), order)
+        return order
 
     async def update_order(self, platform: str, order_id: str, updates: Dict[str, Any]) -> OrderData:
         """Update order on specified platform"""
         adapter = self.adapters[platform]
-        return await self._execute_with_circuit_breaker(
+        order = await self._execute_with_circuit_breaker(
             platform, "update_order", adapter.update_order, order_id, updates
         )
+        self._cache_write(platform, ('order', order_id), order)
+        return order
 
     async def cancel_order(self, platform: str, order_id: str) -> bool:
         """Cancel order on specified platform"""
         adapter = self.adapters[platform]
-        return await self._execute_with_circuit_breaker(
-            platform, "cancel_order", adapter.cancel_order, order_id
-        )
+        try:
+            return await self._execute_with_circuit_breaker(
+                platform, "cancel_order", adapter.cancel_order, order_id
+            )
+        finally:
+            self._cache_write(platform, ('order', order_id), None)
 
     # Product operations
     async def get_products(self, platform: str, **filters) -> List[ProductData]:
@@ -123,19 +216,46 @@ class AdapterManager:
             platform, "get_products", adapter.get_products, **filters
         )
 
-    async def get_product(self, platform: str, product_id: str) -> Optional[ProductData]:
-        """Get single product from specified platform"""
-        adapter = self.adapters[platform]
-        return await self._execute_with_circuit_breaker(
-            platform, "get_product", adapter.get_product, product_id
+    async def read_product(self, platform: str, product_id: str) -> CachedRead:
+        """Get single product through the read cache, with its staleness"""
+        adapter = self.adapters.get(platform)
+        if adapter is None:
+            raise ValueError(f"Adapter for platform '{platform}' not found")
+        return await self._cached_read(
+            platform, ('product', product_id),
+            lambda: self._execute_with_circuit_breaker(
+                platform, "get_product", adapter.get_product, product_id
+            )
         )
 
+    async def get_product(self, platform: str, product_id: str) -> Optional[ProductData]:
+        """Get single product from specified platform (cached; see read_product)"""
+        return (await self.read_product(platform, product_id)).value
+
     async def update_inventory(self, platform: str, product_id: str, quantity: int) -> bool:
         """Update inventory on specified platform"""
         adapter = self.adapters[platform]
-        return await self._execute_with_circuit_breaker(
-            platform, "update_inventory", adapter.update_inventory, product_id, quantity
-        )
+        try:
+            return await self._execute_with_circuit_breaker(
+                platform, "update_inventory", adapter.update_inventory, product_id, quantity
+            )
+        finally:
+            self._cache_write(platform, ('product', product_id), None)
+
+    async def update_inventory_bulk(
+        self, platform: str, updates: Dict[str, int]
+    ) -> Dict[str, bool]:
+        """Set several quantities in one platform call; returns product_id -> success"""
+        adapter = self.adapters.get(platform)
+        if adapter is None:
+            raise ValueError(f"Adapter for platform '{platform}' not found")
+        try:
+            return await self._execute_with_circuit_breaker(
+                platform, "update_inventory_bulk", adapter.update_inventory_bulk, updates
+            )
+        finally:
+            for product_id in updates:
+                self._cache_write(platform, ('product', product_id), None)
 
     # Fulfillment operations
     async def create_fulfillment(self, platform: str, fulfillment_data: FulfillmentData) -> FulfillmentData:
@@ -153,50 +273,100 @@ class AdapterManager:
         )
 
     # Multi-platform operations
-    async def get_all_orders(self, platforms: Optional[List[str]] = None, **filters) -> Dict[str, List[OrderData]]:
-        """Get orders from multiple platforms"""
+    async def _fan_out(
+        self,
+        operation: str,
+        platforms: Optional[List[str]],
+        call: Callable[[str], Awaitable[Any]],
+        deadline: Optional[float] = None
+    ) -> FanOutResult:
+        """
+        Run one call per platform concurrently.
+
+        Latency is that of the slowest platform, capped by the deadline.
+        Platforms still running at the deadline are cancelled and reported
+        as timed out; failures are reported per platform.
+        """
         if platforms is None:
             platforms = list(self.adapters.keys())
+        deadline = self.fan_out_deadline if deadline is None else deadline
 
-        results = {}
-        tasks = []
+        results = FanOutResult()
+        started = time.perf_counter()
 
-        for platform in platforms:
-            if platform in self.adapters:
-                task = self.get_orders(platform, **filters)
-                tasks.append((platform, task))
-
-        # Execute all tasks concurrently
-        for platform, task in tasks:
+        async def timed(platform: str):
             try:
-                results[platform] = await task
-            except Exception as e:
-                logger.error(f"Failed to get orders from {platform}", error=str(e))
-                results[platform] = []
+                return await call(platform)
+            finally:
+                results.latencies_ms[platform] = round((time.perf_counter() - started) * 1000, 1)
+
+        tasks = {
+            asyncio.create_task(timed(platform)): platform
+            for platform in dict.fromkeys(platforms)
+            if platform in self.adapters
+        }
+        if not tasks:
+            return results
+
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+        # Cancel stragglers so they stop holding connections and semaphore slots
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        for task, platform in tasks.items():
+            results[platform] = []
+            if task in pending:
+                results.errors[platform] = f"Timed out after {deadline}s"
+                logger.warning(f"{operation} on {platform} missed the deadline",
+                               platform=platform, deadline=deadline)
+            elif task.exception() is not None:
+                error = task.exception()
+                results.errors[platform] = f"{type(error).__name__}: {error}"
+                logger.error(f"Failed to {operation} from {platform}",
+                             platform=platform, error=str(error))
+            else:
+                results[platform] = task.result()
 
         return results
 
-    async def get_all_products(self, platforms: Optional[List[str]] = None, **filters) -> Dict[str, List[ProductData]]:
-        """Get products from multiple platforms"""
-        if platforms is None:
-            platforms = list(self.adapters.keys())
-
-        results = {}
-        tasks = []
-
-        for platform in platforms:
-            if platform in self.adapters:
-                task = self.get_products(platform, **filters)
-                tasks.append((platform, task))
-
-        for platform, task in tasks:
-            try:
-                results[platform] = await task
-            except Exception as e:
-                logger.error(f"Failed to get products from {platform}", error=str(e))
-                results[platform] = []
+    async def get_all_orders(
+        self,
+        platforms: Optional[List[str]] = None,
+        deadline: Optional[float] = None,
+        **filters
+    ) -> FanOutResult:
+        """
+        Get orders from multiple platforms concurrently.
+
+        Returns a dict of platform -> orders; failed or timed-out platforms
+        map to [] and are listed in `.errors`.
+        """
+        return await self._fan_out(
+            "get orders", platforms,
+            lambda platform: self.get_orders(platform, **filters),
+            deadline
+        )
 
-        return results
+    async def get_all_products(
+        self,
+        platforms: Optional[List[str]] = None,
+        deadline: Optional[float] = None,
+        **filters
+    ) -> FanOutResult:
+        """
+        Get products from multiple platforms concurrently.
+
+        Returns a dict of platform -> products; failed or timed-out platforms
+        map to [] and are listed in `.errors`.
+        """
+        return await self._fan_out(
+            "get products", platforms,
+            lambda platform: self.get_products(platform, **filters),
+            deadline
+        )
 
     # Status and monitoring
     def get_status(self) -> Dict[str, Any]:
@@ -217,6 +387,10 @@ class AdapterManager:
                 'last_failure_time': cb.last_failure_time
             }
 
+        status['read_caches'] = {
+            platform: cache.get_status() for platform, cache in self.read_caches.items()
+        }
+
         return status
 
     def get_available_platforms(self) -> List[str]:
@@ -237,8 +411,25 @@ class AdapterManager:
 
     async def close(self):
         """Close all adapters and cleanup resources"""
+        for cache in self.read_caches.values():
+            await cache.close()
+
         for adapter in self.adapters.values():
             if hasattr(adapter, '__aexit__'):
                 await adapter.__aexit__(None, None, None)
 
-        logger.info("Closed all e-commerce adapters")
\ No newline at end of file
+        logger.info("Closed all e-commerce adapters")
+
+
+def create_adapter_manager() -> AdapterManager:
+    """AdapterManager over the platforms configured in settings"""
+    from backend.core.config import settings
+
+    ecommerce = {}
+    if settings.SHOPIFY_SHOP_URL:
+        ecommerce['shopify'] = {
+            'api_key': settings.SHOPIFY_API_KEY,
+            'password': settings.SHOPIFY_ACCESS_TOKEN,
+            'store_url': settings.SHOPIFY_SHOP_URL
+        }
+    return AdapterManager({'ecommerce': ecommerce})
@@ -7,8 +7,15 @@ providing a unified interface through the Adapter Pattern.
 
 """
 
-from .base_adapter import EcommerceAdapter, AdapterFactory, OrderData, ProductData, FulfillmentData
-from .shopify_adapter import ShopifyAdapter
+from .base_adapter import (
+    EcommerceAdapter,
+    AdapterFactory,
+    OrderData,
+    ProductData,
+    FulfillmentData,
+    parse_datetime
+)
+from .shopify_adapter import ShopifyAdapter, transform_order as transform_shopify_order
 from .mock_adapter import MockAdapter
 
 __all__ = [
@@ -17,6 +24,8 @@ __all__ = [
     'OrderData',
     'ProductData',
     'FulfillmentData',
+    'parse_datetime',
     'ShopifyAdapter',
+    'transform_shopify_order',
     'MockAdapter'
 ]
\ No newline at end of file
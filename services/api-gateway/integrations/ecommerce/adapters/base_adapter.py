@@ -8,12 +8,42 @@ providing a unified interface for different platforms (Shopify, WooCommerce, etc
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
-
-@dataclass
+# Platform status -> standardized status
+ORDER_STATUS_MAP = {
+    # Shopify statuses
+    'pending': 'pending',
+    'paid': 'paid',
+    'fulfilled': 'fulfilled',
+    'cancelled': 'cancelled',
+    'refunded': 'refunded',
+    # WooCommerce statuses
+    'on-hold': 'pending',
+    'processing': 'processing',
+    'completed': 'fulfilled',
+    # Add more mappings as needed
+}
+
+
+def parse_datetime(value: str) -> datetime:
+    """
+    Parse an ISO-8601 timestamp in a single pass.
+
+    Accepts `Z` or numeric offsets, fractional seconds and a space in place
+    of `T`; offsets are kept, naive input stays naive. Raises ValueError
+    instead of guessing.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid ISO-8601 datetime: {value!r}") from None
+
+
+# Slotted: no per-instance __dict__, so bulk syncs hold and build records cheaply
+@dataclass(slots=True)
 class OrderData:
     """Standardized order data structure"""
     order_id: str
@@ -30,7 +60,7 @@ class OrderData:
     metadata: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductData:
     """Standardized product data structure"""
     product_id: str
@@ -46,7 +76,7 @@ class ProductData:
     updated_at: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class FulfillmentData:
     """Standardized fulfillment data structure"""
     fulfillment_id: str
@@ -121,41 +151,39 @@ class EcommerceAdapter(ABC):
         """Get adapter status and health"""
         pass
 
+    # Bulk writes; platforms with a batch endpoint override these
+    max_inventory_batch: int = 50  # Updates per update_inventory_bulk call
+
+    async def update_inventory_bulk(self, updates: Dict[str, int]) -> Dict[str, bool]:
+        """Set several product quantities; returns product_id -> success"""
+        results = {}
+        for product_id, quantity in updates.items():
+            results[product_id] = await self.update_inventory(product_id, quantity)
+        return results
+
+    # Streaming reads; platforms with cursor pagination override these.
+    # Raw records that fail to transform are skipped and, when a `failures`
+    # list is passed, appended to it as {kind, id, updated_at, error}.
+    async def iter_orders(self, failures: Optional[List[Dict[str, Any]]] = None,
+                          **filters) -> AsyncIterator[OrderData]:
+        """Iterate over all orders matching the filters"""
+        for order in await self.get_orders(**filters):
+            yield order
+
+    async def iter_products(self, failures: Optional[List[Dict[str, Any]]] = None,
+                            **filters) -> AsyncIterator[ProductData]:
+        """Iterate over all products matching the filters"""
+        for product in await self.get_products(**filters):
+            yield product
+
     # Helper methods for data transformation
     def _standardize_order_status(self, platform_status: str) -> str:
         """Convert platform-specific status to standardized status"""
-        status_mapping = {
-            # Shopify statuses
-            'pending': 'pending',
-            'paid': 'paid',
-            'fulfilled': 'fulfilled',
-            'cancelled': 'cancelled',
-            'refunded': 'refunded',
-            # WooCommerce statuses
-            'on-hold': 'pending',
-            'processing': 'processing',
-            'completed': 'fulfilled',
-            # Add more mappings as needed
-        }
-        return status_mapping.get(platform_status.lower(), platform_status)
-
-    def _standardize_datetime(self, dt_string: str) -> datetime:
-        """Convert platform datetime string to datetime object"""
-        # Handle different datetime formats from various platforms
-        formats = [
-            '%Y-%m-%dT%H:%M:%S%z',  # ISO 8601 with timezone
-            '%Y-%m-%d %H:%M:%S',    # MySQL format
-            '%Y-%m-%dT%H:%M:%S',    # ISO without timezone
-        ]
-
-        for fmt in formats:
-            try:
-                return datetime.strptime(dt_string, fmt)
-            except ValueError:
-                continue
-
-        # If no format matches, return current time as fallback
-        return datetime.utcnow()
+        return ORDER_STATUS_MAP.get(platform_status.lower(), platform_status)
+
+    def _standardize_datetime(self, dt_string: Optional[str]) -> Optional[datetime]:
+        """Convert platform datetime string to datetime object (None if absent)"""
+        return parse_datetime(dt_string) if dt_string else None
 
     def _validate_config(self) -> bool:
         """Validate adapter configuration"""
@@ -5,12 +5,53 @@ Mock Adapter for Testing
 This module implements a MockAdapter for testing purposes that simulates
 e-commerce platform behavior without making actual API calls.
 
+With a `load` section in its config the adapter switches to load-testing
+mode: millions of orders and products generated deterministically from a
+seed, each one computed only when it is read, behind simulated latency,
+5xx/429 injection and paginated reads. Writes are kept in `mock_data` as an
+overlay on top of the generated records.
+
+    MockAdapter({'load': {'orders': 5_000_000, 'latency': 'lognormal',
+                          'latency_ms': 80, 'rate_limit_rate': 0.01}})
+
 """
 
+import asyncio
+import math
 import random
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-from .base_adapter import EcommerceAdapter, OrderData, ProductData, FulfillmentData
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterator
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from .base_adapter import EcommerceAdapter, OrderData, ProductData, FulfillmentData, parse_datetime
+
+ORDER_STATUSES = ['pending', 'paid', 'fulfilled', 'cancelled']
+VARIANT_SIZES = ["S", "M", "L", "XL"]
+LATENCY_DISTRIBUTIONS = ('none', 'constant', 'uniform', 'exponential', 'lognormal')
+LOAD_EPOCH = datetime(2024, 1, 1)  # Generated records are timestamped from here, not from now()
+
+
+@dataclass
+class LoadProfile:
+    """Scale and failure behavior of a load-testing MockAdapter"""
+    orders: int = 1_000_000
+    products: int = 100_000
+    seed: int = 0
+    page_size: int = 250  # Records per page of get_*/iter_*
+    span_days: float = 365.0  # updated_at of generated records spreads over this window
+    latency: str = 'none'  # One of LATENCY_DISTRIBUTIONS
+    latency_ms: float = 0.0  # Constant value, mean (uniform/exponential) or median (lognormal)
+    latency_jitter_ms: float = 0.0  # Half-width of the uniform distribution
+    latency_sigma: float = 0.5  # Shape of the lognormal distribution
+    error_rate: float = 0.0  # Share of calls failing with HTTP 503
+    rate_limit_rate: float = 0.0  # Share of calls rejected with HTTP 429
+    retry_after: float = 1.0  # Retry-After sent with injected 429s
+
+    def __post_init__(self):
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.latency}")
 
 
 class MockAdapter(EcommerceAdapter):
@@ -18,82 +59,256 @@ class MockAdapter(EcommerceAdapter):
 
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
-        self.mock_data = {
-            'orders': self._generate_mock_orders(10),
-            'products': self._generate_mock_products(5),
-            'fulfillments': {}
-        }
+        load = config.get('load')
+        self.profile: Optional[LoadProfile] = (
+            LoadProfile(**load) if isinstance(load, dict) else load
+        )
+        self.metrics = {'calls': 0, 'pages': 0, 'errors': 0, 'rate_limited': 0, 'latency_ms': 0.0}
+
+        if self.profile is None:
+            self.mock_data = {
+                'orders': self._generate_mock_orders(10),
+                'products': self._generate_mock_products(5),
+                'fulfillments': {}
+            }
+            return
+
+        # Load mode: generated records are never stored; mock_data only holds writes
+        self.mock_data = {'orders': {}, 'products': {}, 'fulfillments': {}}
+        self._order_count = self.profile.orders
+        self._faults = random.Random(self.profile.seed)
+        self._interval = timedelta(days=self.profile.span_days) / max(1, self.profile.orders)
 
     def _generate_mock_orders(self, count: int) -> Dict[str, OrderData]:
         """Generate mock orders for testing"""
         orders = {}
-        statuses = ['pending', 'paid', 'fulfilled', 'cancelled']
-
         for i in range(1, count + 1):
-            order_id = f"mock_order_{i}"
-            orders[order_id] = OrderData(
-                order_id=order_id,
-                customer_email=f"customer{i}@example.com",
-                customer_name=f"Customer {i}",
-                total_amount=round(random.uniform(50, 500), 2),
-                currency="USD",
-                status=random.choice(statuses),
-                items=[
-                    {
-                        'id': f'item_{j}',
-                        'product_id': f'mock_product_{random.randint(1, 5)}',
-                        'title': f'Mock Product {random.randint(1, 5)}',
-                        'quantity': random.randint(1, 3),
-                        'price': round(random.uniform(20, 100), 2)
-                    } for j in range(random.randint(1, 3))
-                ],
-                shipping_address={
-                    'first_name': f'Customer {i}',
-                    'last_name': 'Test',
-                    'address1': f'{random.randint(100, 999)} Mock Street',
-                    'city': 'Mock City',
-                    'country': 'US',
-                    'zip': f'{random.randint(10000, 99999)}'
-                },
-                created_at=datetime.utcnow() - timedelta(days=random.randint(0, 30)),
-                updated_at=datetime.utcnow() - timedelta(hours=random.randint(0, 24))
-            )
+            order = self._build_order(i, random, product_count=5)
+            order.created_at = datetime.utcnow() - timedelta(days=random.randint(0, 30))
+            order.updated_at = datetime.utcnow() - timedelta(hours=random.randint(0, 24))
+            orders[order.order_id] = order
         return orders
 
     def _generate_mock_products(self, count: int) -> Dict[str, ProductData]:
         """Generate mock products for testing"""
         products = {}
-
         for i in range(1, count + 1):
-            product_id = f"mock_product_{i}"
-            products[product_id] = ProductData(
-                product_id=product_id,
-                title=f"Mock Product {i}",
-                description=f"This is a mock product {i} for testing purposes.",
-                price=round(random.uniform(20, 200), 2),
-                currency="USD",
-                inventory_quantity=random.randint(0, 100),
-                variants=[
-                    {
-                        'id': f'variant_{i}_1',
-                        'title': f'Size {random.choice(["S", "M", "L", "XL"])}',
-                        'price': round(random.uniform(20, 200), 2),
-                        'inventory_quantity': random.randint(0, 50)
-                    }
-                ],
-                images=[f'https://example.com/mock-image-{i}.jpg'],
-                status='active',
-                created_at=datetime.utcnow() - timedelta(days=random.randint(0, 365)),
-                updated_at=datetime.utcnow() - timedelta(hours=random.randint(0, 24))
-            )
+            product = self._build_product(i, random)
+            product.created_at = datetime.utcnow() - timedelta(days=random.randint(0, 365))
+            product.updated_at = datetime.utcnow() - timedelta(hours=random.randint(0, 24))
+            products[product.product_id] = product
         return products
 
+    def _build_order(self, i: int, rng, product_count: int) -> OrderData:
+        return OrderData(
+            order_id=f"mock_order_{i}",
+            customer_email=f"customer{i}@example.com",
+            customer_name=f"Customer {i}",
+            total_amount=round(rng.uniform(50, 500), 2),
+            currency="USD",
+            status=rng.choice(ORDER_STATUSES),
+            items=[
+                {
+                    'id': f'item_{j}',
+                    'product_id': f'mock_product_{rng.randint(1, product_count)}',
+                    'title': f'Mock Product {rng.randint(1, product_count)}',
+                    'quantity': rng.randint(1, 3),
+                    'price': round(rng.uniform(20, 100), 2)
+                } for j in range(rng.randint(1, 3))
+            ],
+            shipping_address={
+                'first_name': f'Customer {i}',
+                'last_name': 'Test',
+                'address1': f'{rng.randint(100, 999)} Mock Street',
+                'city': 'Mock City',
+                'country': 'US',
+                'zip': f'{rng.randint(10000, 99999)}'
+            }
+        )
+
+    def _build_product(self, i: int, rng) -> ProductData:
+        return ProductData(
+            product_id=f"mock_product_{i}",
+            title=f"Mock Product {i}",
+            description=f"This is a mock product {i} for testing purposes.",
+            price=round(rng.uniform(20, 200), 2),
+            currency="USD",
+            inventory_quantity=rng.randint(0, 100),
+            variants=[
+                {
+                    'id': f'variant_{i}_1',
+                    'title': f'Size {rng.choice(VARIANT_SIZES)}',
+                    'price': round(rng.uniform(20, 200), 2),
+                    'inventory_quantity': rng.randint(0, 50)
+                }
+            ],
+            images=[f'https://example.com/mock-image-{i}.jpg'],
+            status='active'
+        )
+
+    # Load mode: records computed on access
+
+    def _record_rng(self, index: int, kind: int) -> random.Random:
+        # One independent stream per record, so any record can be built without its predecessors
+        return random.Random((self.profile.seed << 40) ^ (index << 1) ^ kind)
+
+    def _updated_at(self, index: int) -> datetime:
+        """Generated records are ordered by index, oldest first"""
+        return LOAD_EPOCH + self._interval * (index - 1)
+
+    def _generated_order(self, index: int) -> OrderData:
+        rng = self._record_rng(index, 0)
+        order = self._build_order(index, rng, product_count=max(1, self.profile.products))
+        order.updated_at = self._updated_at(index)
+        order.created_at = order.updated_at - timedelta(hours=rng.randint(0, 72))
+        return order
+
+    def _generated_product(self, index: int) -> ProductData:
+        rng = self._record_rng(index, 1)
+        product = self._build_product(index, rng)
+        product.updated_at = self._updated_at(index)
+        product.created_at = product.updated_at - timedelta(days=rng.randint(0, 365))
+        return product
+
+    def _index(self, record_id: str, prefix: str, count: int) -> Optional[int]:
+        if not record_id.startswith(prefix):
+            return None
+        try:
+            index = int(record_id[len(prefix):])
+        except ValueError:
+            return None
+        return index if 1 <= index <= count else None
+
+    def _lookup_order(self, order_id: str) -> Optional[OrderData]:
+        order = self.mock_data['orders'].get(order_id)
+        if order is None and self.profile is not None:
+            index = self._index(order_id, 'mock_order_', self.profile.orders)
+            if index is not None:
+                order = self._generated_order(index)
+        return order
+
+    def _lookup_product(self, product_id: str) -> Optional[ProductData]:
+        product = self.mock_data['products'].get(product_id)
+        if product is None and self.profile is not None:
+            index = self._index(product_id, 'mock_product_', self.profile.products)
+            if index is not None:
+                product = self._generated_product(index)
+        return product
+
+    def _first_index(self, updated_at_min: Optional[str]) -> int:
+        """Index of the first generated record at or after the watermark"""
+        if not updated_at_min:
+            return 1
+        since = parse_datetime(updated_at_min)
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        if since <= LOAD_EPOCH:
+            return 1
+        return math.ceil((since - LOAD_EPOCH) / self._interval) + 1
+
+    def _scan(self, kind: str, count: int, filters: Dict[str, Any]) -> Iterator[Any]:
+        """Generated records from the watermark on, with writes laid over them"""
+        overlay = self.mock_data[kind]
+        prefix = 'mock_order_' if kind == 'orders' else 'mock_product_'
+        generate = self._generated_order if kind == 'orders' else self._generated_product
+        start = self._first_index(filters.get('updated_at_min'))
+        status = filters.get('status', 'any')
+
+        def matches(record) -> bool:
+            return kind != 'orders' or status == 'any' or record.status == status
+
+        for index in range(start, count + 1):
+            record_id = f"{prefix}{index}"
+            record = overlay.get(record_id) or generate(index)
+            if matches(record):
+                yield record
+
+        # Writes to records older than the watermark, and records created at runtime
+        since = parse_datetime(filters['updated_at_min']) if filters.get('updated_at_min') else None
+        if since is not None and since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        for record_id, record in overlay.items():
+            index = self._index(record_id, prefix, count)
+            if index is not None and index >= start:
+                continue
+            if (since is None or record.updated_at >= since) and matches(record):
+                yield record
+
+    async def _simulate(self) -> None:
+        """Latency and injected failures for one call to the simulated platform"""
+        if self.profile is None:
+            return
+        profile = self.profile
+        self.metrics['calls'] += 1
+
+        delay_ms = self._sample_latency()
+        if delay_ms > 0:
+            self.metrics['latency_ms'] += delay_ms
+            await asyncio.sleep(delay_ms / 1000)
+
+        roll = self._faults.random()
+        if roll < profile.rate_limit_rate:
+            self.metrics['rate_limited'] += 1
+            self._raise_status(429, {'Retry-After': str(profile.retry_after)})
+        if roll < profile.rate_limit_rate + profile.error_rate:
+            self.metrics['errors'] += 1
+            self._raise_status(503)
+
+    def _sample_latency(self) -> float:
+        profile = self.profile
+        if profile.latency == 'constant':
+            return profile.latency_ms
+        if profile.latency == 'uniform':
+            return max(0.0, self._faults.uniform(profile.latency_ms - profile.latency_jitter_ms,
+                                                 profile.latency_ms + profile.latency_jitter_ms))
+        if profile.latency == 'exponential':
+            if profile.latency_ms <= 0:
+                return 0.0
+            return self._faults.expovariate(1 / profile.latency_ms)
+        if profile.latency == 'lognormal':
+            return self._faults.lognormvariate(
+                math.log(max(profile.latency_ms, 1e-3)), profile.latency_sigma
+            )
+        return 0.0
+
+    def _raise_status(self, status_code: int, headers: Optional[Dict[str, str]] = None) -> None:
+        # The same error a real platform client raises, so breakers and retries
+        # react as in production
+        request = httpx.Request('GET', 'https://mock.invalid/')
+        httpx.Response(status_code, headers=headers, request=request).raise_for_status()
+
+    async def _page(self, records: Iterator[Any], size: int) -> List[Any]:
+        await self._simulate()
+        self.metrics['pages'] += 1
+        page = []
+        for record in records:
+            page.append(record)
+            if len(page) >= size:
+                break
+        return page
+
+    async def _iter_pages(self, kind: str, count: int, page_size: Optional[int],
+                          filters: Dict[str, Any]) -> AsyncIterator[Any]:
+        records = self._scan(kind, count, filters)
+        size = page_size or self.profile.page_size
+        while True:
+            page = await self._page(records, size)
+            for record in page:
+                yield record
+            if len(page) < size:
+                return
+
     async def get_orders(self, **filters) -> List[OrderData]:
         """Get mock orders with optional filters"""
+        if self.profile is not None:
+            # One page, as a real platform would return
+            size = min(filters.get('limit', self.profile.page_size), self.profile.page_size)
+            return await self._page(self._scan('orders', self._order_count, filters), size)
+
         orders = list(self.mock_data['orders'].values())
 
         # Apply filters
-        if 'status' in filters:
+        if filters.get('status', 'any') != 'any':
             orders = [o for o in orders if o.status == filters['status']]
 
         if 'limit' in filters:
@@ -101,14 +316,31 @@ class MockAdapter(EcommerceAdapter):
 
         return orders
 
+    async def iter_orders(self, page_size: Optional[int] = None,
+                          failures: Optional[List[Dict[str, Any]]] = None,
+                          **filters) -> AsyncIterator[OrderData]:
+        """Stream orders page by page (load mode) or from memory"""
+        if self.profile is None:
+            async for order in super().iter_orders(**filters):
+                yield order
+            return
+        async for order in self._iter_pages('orders', self._order_count, page_size, filters):
+            yield order
+
     async def get_order(self, order_id: str) -> Optional[OrderData]:
         """Get single mock order by ID"""
-        return self.mock_data['orders'].get(order_id)
+        await self._simulate()
+        return self._lookup_order(order_id)
 
     async def create_order(self, order_data: OrderData) -> OrderData:
         """Create new mock order"""
+        await self._simulate()
         # Simulate order creation with new ID
-        new_id = f"mock_order_{len(self.mock_data['orders']) + 1}"
+        if self.profile is not None:
+            self._order_count += 1
+            new_id = f"mock_order_{self._order_count}"
+        else:
+            new_id = f"mock_order_{len(self.mock_data['orders']) + 1}"
         new_order = OrderData(
             order_id=new_id,
             customer_email=order_data.customer_email,
@@ -128,29 +360,37 @@ class MockAdapter(EcommerceAdapter):
 
     async def update_order(self, order_id: str, updates: Dict[str, Any]) -> OrderData:
         """Update existing mock order"""
-        if order_id not in self.mock_data['orders']:
+        await self._simulate()
+        order = self._lookup_order(order_id)
+        if order is None:
             raise ValueError(f"Order {order_id} not found")
 
-        order = self.mock_data['orders'][order_id]
-
         # Apply updates
         for key, value in updates.items():
             if hasattr(order, key):
                 setattr(order, key, value)
 
         order.updated_at = datetime.utcnow()
+        self.mock_data['orders'][order_id] = order
         return order
 
     async def cancel_order(self, order_id: str) -> bool:
         """Cancel mock order"""
-        if order_id in self.mock_data['orders']:
-            self.mock_data['orders'][order_id].status = 'cancelled'
-            self.mock_data['orders'][order_id].updated_at = datetime.utcnow()
-            return True
-        return False
+        await self._simulate()
+        order = self._lookup_order(order_id)
+        if order is None:
+            return False
+        order.status = 'cancelled'
+        order.updated_at = datetime.utcnow()
+        self.mock_data['orders'][order_id] = order
+        return True
 
     async def get_products(self, **filters) -> List[ProductData]:
         """Get mock products with optional filters"""
+        if self.profile is not None:
+            size = min(filters.get('limit', self.profile.page_size), self.profile.page_size)
+            return await self._page(self._scan('products', self.profile.products, filters), size)
+
         products = list(self.mock_data['products'].values())
 
         if 'limit' in filters:
@@ -158,19 +398,38 @@ class MockAdapter(EcommerceAdapter):
 
         return products
 
+    async def iter_products(self, page_size: Optional[int] = None,
+                            failures: Optional[List[Dict[str, Any]]] = None,
+                            **filters) -> AsyncIterator[ProductData]:
+        """Stream products page by page (load mode) or from memory"""
+        if self.profile is None:
+            async for product in super().iter_products(**filters):
+                yield product
+            return
+        products = self._iter_pages('products', self.profile.products, page_size, filters)
+        async for product in products:
+            yield product
+
     async def get_product(self, product_id: str) -> Optional[ProductData]:
         """Get single mock product by ID"""
-        return self.mock_data['products'].get(product_id)
+        await self._simulate()
+        return self._lookup_product(product_id)
 
     async def update_inventory(self, product_id: str, quantity: int) -> bool:
         """Update mock product inventory"""
-        if product_id in self.mock_data['products']:
-            self.mock_data['products'][product_id].inventory_quantity = quantity
-            return True
-        return False
+        await self._simulate()
+        product = self._lookup_product(product_id)
+        if product is None:
+            return False
+        product.inventory_quantity = quantity
+        if self.profile is not None:
+            product.updated_at = datetime.utcnow()
+        self.mock_data['products'][product_id] = product
+        return True
 
     async def create_fulfillment(self, fulfillment_data: FulfillmentData) -> FulfillmentData:
         """Create mock order fulfillment"""
+        await self._simulate()
         fulfillment_id = f"mock_fulfillment_{len(self.mock_data['fulfillments']) + 1}"
 
         fulfillment = FulfillmentData(
@@ -192,14 +451,26 @@ class MockAdapter(EcommerceAdapter):
 
     async def get_fulfillments(self, order_id: str) -> List[FulfillmentData]:
         """Get mock fulfillments for order"""
+        await self._simulate()
         return self.mock_data['fulfillments'].get(order_id, [])
 
     def get_status(self) -> Dict[str, Any]:
         """Get mock adapter status"""
-        return {
+        status = {
             'platform': 'mock',
             'healthy': True,
             'orders_count': len(self.mock_data['orders']),
             'products_count': len(self.mock_data['products']),
             'fulfillments_count': sum(len(f) for f in self.mock_data['fulfillments'].values())
-        }
\ No newline at end of file
+        }
+        if self.profile is not None:
+            calls = self.metrics['calls']
+            status.update({
+                'mode': 'load',
+                'orders_count': self._order_count,
+                'products_count': self.profile.products,
+                'overrides': len(self.mock_data['orders']) + len(self.mock_data['products']),
+                **{k: v for k, v in self.metrics.items() if k != 'latency_ms'},
+                'avg_latency_ms': round(self.metrics['latency_ms'] / calls, 2) if calls else 0.0
+            })
+        return status
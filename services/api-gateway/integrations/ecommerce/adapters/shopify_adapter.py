@@ -8,15 +8,146 @@ to the standardized EcommerceAdapter interface.
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional
+import json
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime
+from urllib.parse import parse_qs, urlparse
 import httpx
-from .base_adapter import EcommerceAdapter, OrderData, ProductData, FulfillmentData
+import structlog
+from .base_adapter import (
+    ORDER_STATUS_MAP,
+    EcommerceAdapter,
+    OrderData,
+    ProductData,
+    FulfillmentData,
+    parse_datetime
+)
+from ..rate_limiter import RateLimitConfig, ShopifyRateLimiter, get_rate_limiter
+from ...http_pool import HTTPClientPool, get_http_pool
+
+logger = structlog.get_logger(__name__)
+
+MAX_PAGE_SIZE = 250  # Shopify REST limit per page
+
+# Bulk export queries; nested connections come back as separate JSONL lines
+# carrying `__parentId`, written right after their parent
+BULK_QUERIES = {
+    'products': """
+    {
+      products {
+        edges { node {
+          id title descriptionHtml status createdAt updatedAt
+          images { edges { node { url } } }
+          variants { edges { node { id sku price inventoryQuantity inventoryItem { id } } } }
+        } }
+      }
+    }
+    """,
+    'orders': """
+    {
+      orders {
+        edges { node {
+          id name email displayFinancialStatus tags note createdAt updatedAt
+          totalPriceSet { shopMoney { amount currencyCode } }
+          customer { firstName lastName }
+          shippingAddress { address1 address2 city province country zip phone }
+          lineItems { edges { node { id title sku quantity } } }
+        } }
+      }
+    }
+    """
+}
+
+BULK_RUN_MUTATION = """
+mutation($query: String!) {
+  bulkOperationRunQuery(query: $query) {
+    bulkOperation { id status }
+    userErrors { field message }
+  }
+}
+"""
+
+BULK_STATUS_QUERY = """
+{ currentBulkOperation { id status errorCode objectCount url partialDataUrl } }
+"""
+
+# Inventory item and location behind a product's first variant, for many products at once
+INVENTORY_TARGETS_QUERY = """
+query($ids: [ID!]!) {
+  nodes(ids: $ids) {
+    ... on Product {
+      id
+      variants(first: 1) { edges { node { inventoryItem {
+        id
+        inventoryLevels(first: 1) { edges { node { location { id } } } }
+      } } } }
+    }
+  }
+}
+"""
+
+# Sets up to MAX_PAGE_SIZE quantities in one call
+INVENTORY_SET_MUTATION = """
+mutation($input: InventorySetOnHandQuantitiesInput!) {
+  inventorySetOnHandQuantities(input: $input) {
+    userErrors { field message }
+  }
+}
+"""
+
+
+class BulkOperationError(Exception):
+    """Bulk operation was rejected or did not complete"""
+    pass
+
+
+def _gid(gid: str) -> str:
+    """gid://shopify/Product/123 -> 123"""
+    return gid.rsplit('/', 1)[-1]
+
+
+def _bulk_dates(node: Dict[str, Any]) -> Dict[str, str]:
+    """REST-style timestamp keys, only for the timestamps present"""
+    return {
+        key: node[field]
+        for key, field in (('created_at', 'createdAt'), ('updated_at', 'updatedAt'))
+        if node.get(field)
+    }
+
+
+def transform_order(shopify_order: Dict[str, Any]) -> OrderData:
+    """Transform a Shopify REST/webhook order payload to standardized OrderData"""
+    get = shopify_order.get
+    customer = get('customer') or {}
+    created_at, updated_at = get('created_at'), get('updated_at')
+    financial_status = get('financial_status') or 'pending'
+    return OrderData(
+        order_id=str(shopify_order['id']),
+        customer_email=get('email', ''),
+        customer_name=(
+            f"{customer.get('first_name') or ''} {customer.get('last_name') or ''}".strip()
+        ),
+        total_amount=float(shopify_order['total_price']),
+        currency=get('currency', 'USD'),
+        status=ORDER_STATUS_MAP.get(financial_status.lower(), financial_status),
+        items=get('line_items', []),
+        shipping_address=get('shipping_address'),
+        billing_address=get('billing_address'),
+        created_at=parse_datetime(created_at) if created_at else None,
+        updated_at=parse_datetime(updated_at) if updated_at else None,
+        metadata={
+            'shopify_order_number': get('order_number'),
+            'tags': get('tags', []),
+            'note': get('note')
+        }
+    )
 
 
 class ShopifyAdapter(EcommerceAdapter):
     """Shopify e-commerce platform adapter"""
 
+    max_inventory_batch = MAX_PAGE_SIZE
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.api_key = config['api_key']
@@ -25,66 +156,114 @@ class ShopifyAdapter(EcommerceAdapter):
         self.api_version = config.get('api_version', '2023-10')
         self.base_url = f"{self.store_url}/admin/api/{self.api_version}"
 
-        # HTTP client setup
-        self.client = httpx.AsyncClient(
-            auth=(self.api_key, self.password),
-            headers={
-                'Content-Type': 'application/json',
-                'Accept': 'application/json'
-            },
-            timeout=30.0
-        )
+        # Pooled keep-alive connections shared with every other Shopify client
+        self.http: HTTPClientPool = config.get('http_pool') or get_http_pool()
+        self.auth = (self.api_key, self.password)
+        self.headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
 
-        # Rate limiting
-        self.rate_limit_delay = 0.5  # 2 requests per second
+        # Rate limiting: one bucket per store, shared by all adapter instances
+        limit_config = config.get('rate_limit', {})
+        self.rate_limiter: ShopifyRateLimiter = config.get('rate_limiter') or get_rate_limiter(
+            self.store_url,
+            RateLimitConfig(**limit_config) if isinstance(limit_config, dict) else limit_config
+        )
         self.last_request_time = 0
 
+        # product_id -> (inventory item gid, location gid); stable, so resolved once
+        self._inventory_targets: Dict[str, Tuple[str, str]] = {}
+
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        pass  # Connections belong to the shared pool
 
     async def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make authenticated request to Shopify API with rate limiting"""
-        # Rate limiting
-        current_time = asyncio.get_event_loop().time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = asyncio.get_event_loop().time()
+        response = await self._send(method, endpoint, **kwargs)
+        return response.json()
 
+    async def _send(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """Send a rate-limited request and return the raw response"""
         url = f"{self.base_url}{endpoint}"
-        response = await self.client.request(method, url, **kwargs)
-
-        if response.status_code == 429:  # Rate limited
-            retry_after = int(response.headers.get('Retry-After', 1))
-            await asyncio.sleep(retry_after)
-            return await self._make_request(method, endpoint, **kwargs)
+        for _ in range(self.rate_limiter.config.max_retries + 1):
+            await self.rate_limiter.acquire()
+            self.last_request_time = asyncio.get_event_loop().time()
+            response = await self.http.request(
+                'shopify', method, url, auth=self.auth, headers=self.headers, **kwargs
+            )
+            await self.rate_limiter.update(response.headers)
+
+            if response.status_code != 429:
+                break
+            # Rate limited: the limiter blocks every caller until Retry-After
+            await self.rate_limiter.throttled(float(response.headers.get('Retry-After', 1)))
 
         response.raise_for_status()
-        return response.json()
-
-    async def get_orders(self, **filters) -> List[OrderData]:
-        """Get orders with optional filters"""
+        return response
+
+    async def _fetch_page(self, endpoint: str, key: str,
+                          params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one page and the `page_info` cursor of the next one (None on the last page)"""
+        response = await self._send('GET', endpoint, params=params)
+        next_url = response.links.get('next', {}).get('url')
+        page_info = None
+        if next_url:
+            page_info = parse_qs(urlparse(next_url).query).get('page_info', [None])[0]
+        return response.json().get(key, []), page_info
+
+    async def _iter_pages(self, endpoint: str, key: str,
+                          params: Dict[str, Any]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Follow `Link: rel="next"` cursors lazily, yielding one page at a time.
+
+        While the caller consumes one page the next one is already being
+        fetched, and never more than that, so memory stays at two pages.
+        """
+        pending = asyncio.ensure_future(self._fetch_page(endpoint, key, params))
+        try:
+            while pending is not None:
+                items, page_info = await pending
+                pending = None
+                if page_info:
+                    # Shopify rejects filters alongside page_info; they are baked into the cursor
+                    next_params = {'limit': params['limit'], 'page_info': page_info}
+                    pending = asyncio.ensure_future(self._fetch_page(endpoint, key, next_params))
+                yield items
+        finally:
+            if pending is not None:
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+
+    def _order_params(self, filters: Dict[str, Any], default_limit: int) -> Dict[str, Any]:
         params = {}
+        for key in ('status', 'created_at_min', 'created_at_max',
+                    'updated_at_min', 'updated_at_max'):
+            if key in filters:
+                params[key] = filters[key]
+        params['limit'] = min(filters.get('limit', default_limit), MAX_PAGE_SIZE)
+        return params
 
-        # Apply filters
-        if 'status' in filters:
-            params['status'] = filters['status']
-        if 'created_at_min' in filters:
-            params['created_at_min'] = filters['created_at_min']
-        if 'created_at_max' in filters:
-            params['created_at_max'] = filters['created_at_max']
-        if 'limit' in filters:
-            params['limit'] = min(filters['limit'], 250)  # Shopify max is 250
-        else:
-            params['limit'] = 50
+    async def get_orders(self, **filters) -> List[OrderData]:
+        """Get orders with optional filters (a single page; use iter_orders for all)"""
+        params = self._order_params(filters, default_limit=50)
 
         response = await self._make_request('GET', '/orders.json', params=params)
         orders = response.get('orders', [])
 
-        return [self._transform_order(order) for order in orders]
+        return self.transform_orders(orders)
+
+    async def iter_orders(self, page_size: int = MAX_PAGE_SIZE,
+                          failures: Optional[List[Dict[str, Any]]] = None,
+                          **filters) -> AsyncIterator[OrderData]:
+        """Stream every order matching the filters, page by page"""
+        params = self._order_params({**filters, 'limit': page_size}, default_limit=page_size)
+        async for page in self._iter_pages('/orders.json', 'orders', params):
+            for order in self.transform_orders(page, failures):
+                yield order
 
     async def get_order(self, order_id: str) -> Optional[OrderData]:
         """Get single order by ID"""
@@ -117,18 +296,25 @@ class ShopifyAdapter(EcommerceAdapter):
             return False
 
     async def get_products(self, **filters) -> List[ProductData]:
-        """Get products with optional filters"""
-        params = {}
-
-        if 'limit' in filters:
-            params['limit'] = min(filters['limit'], 250)
-        else:
-            params['limit'] = 50
+        """Get products with optional filters (a single page; use iter_products for all)"""
+        params = {'limit': min(filters.get('limit', 50), MAX_PAGE_SIZE)}
 
         response = await self._make_request('GET', '/products.json', params=params)
         products = response.get('products', [])
 
-        return [self._transform_product(product) for product in products]
+        return self.transform_products(products)
+
+    async def iter_products(self, page_size: int = MAX_PAGE_SIZE,
+                            failures: Optional[List[Dict[str, Any]]] = None,
+                            **filters) -> AsyncIterator[ProductData]:
+        """Stream every product matching the filters, page by page"""
+        params = {'limit': min(page_size, MAX_PAGE_SIZE)}
+        for key in ('status', 'updated_at_min', 'updated_at_max'):
+            if key in filters:
+                params[key] = filters[key]
+        async for page in self._iter_pages('/products.json', 'products', params):
+            for product in self.transform_products(page, failures):
+                yield product
 
     async def get_product(self, product_id: str) -> Optional[ProductData]:
         """Get single product by ID"""
@@ -172,6 +358,59 @@ class ShopifyAdapter(EcommerceAdapter):
         except Exception:
             return False
 
+    async def _resolve_inventory_targets(
+            self, product_ids: List[str]) -> Dict[str, Tuple[str, str]]:
+        """Inventory item and location for each product, one GraphQL call for the unknown ones"""
+        missing = [
+            product_id for product_id in product_ids if product_id not in self._inventory_targets
+        ]
+        if missing:
+            data = await self._graphql(INVENTORY_TARGETS_QUERY, {
+                'ids': [f"gid://shopify/Product/{product_id}" for product_id in missing]
+            })
+            for node in data['nodes']:
+                variants = (node or {}).get('variants', {}).get('edges', [])
+                if not variants:
+                    continue
+                item = variants[0]['node']['inventoryItem']
+                levels = item['inventoryLevels']['edges']
+                if levels:
+                    location_id = levels[0]['node']['location']['id']
+                    self._inventory_targets[_gid(node['id'])] = (item['id'], location_id)
+
+        return {
+            product_id: self._inventory_targets[product_id]
+            for product_id in product_ids if product_id in self._inventory_targets
+        }
+
+    async def update_inventory_bulk(self, updates: Dict[str, int]) -> Dict[str, bool]:
+        """Set up to max_inventory_batch quantities in one mutation"""
+        results = {product_id: False for product_id in updates}
+        targets = list((await self._resolve_inventory_targets(list(updates))).items())
+        if not targets:
+            return results
+
+        data = await self._graphql(INVENTORY_SET_MUTATION, {'input': {
+            'reason': 'correction',
+            'setQuantities': [
+                {'inventoryItemId': item_id, 'locationId': location_id,
+                 'quantity': updates[product_id]}
+                for product_id, (item_id, location_id) in targets
+            ]
+        }})
+
+        # Errors point at an entry by index: ['input', 'setQuantities', '3', 'quantity']
+        failed = set()
+        for error in data['inventorySetOnHandQuantities']['userErrors']:
+            indexes = [int(part) for part in error.get('field') or [] if str(part).isdigit()]
+            failed.update(indexes or range(len(targets)))
+            logger.warning("Shopify inventory update rejected", field=error.get('field'),
+                           error=error.get('message'))
+
+        for index, (product_id, _) in enumerate(targets):
+            results[product_id] = index not in failed
+        return results
+
     async def create_fulfillment(self, fulfillment_data: FulfillmentData) -> FulfillmentData:
         """Create order fulfillment"""
         fulfillment = {
@@ -194,6 +433,153 @@ class ShopifyAdapter(EcommerceAdapter):
         fulfillments = response.get('fulfillments', [])
         return [self._transform_fulfillment(f) for f in fulfillments]
 
+    # Bulk operations
+    async def _graphql(self, query: str,
+                       variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        response = await self._make_request('POST', '/graphql.json',
+                                            json={'query': query, 'variables': variables or {}})
+        if response.get('errors'):
+            raise BulkOperationError(str(response['errors']))
+        return response['data']
+
+    async def run_bulk_operation(self, query: str, poll_interval: float = 2.0,
+                                 timeout: float = 3600.0) -> Optional[str]:
+        """
+        Submit a bulk query and wait for it to finish.
+
+        Returns:
+            URL of the JSONL result file, or None if the query matched nothing
+        """
+        data = await self._graphql(BULK_RUN_MUTATION, {'query': query})
+        result = data['bulkOperationRunQuery']
+        if result['userErrors']:
+            raise BulkOperationError(str(result['userErrors']))
+        operation_id = result['bulkOperation']['id']
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        while True:
+            operation = (await self._graphql(BULK_STATUS_QUERY))['currentBulkOperation']
+            if operation is None or operation['id'] != operation_id:
+                raise BulkOperationError(f"Bulk operation {operation_id} is no longer current")
+            if operation['status'] == 'COMPLETED':
+                return operation['url']
+            if operation['status'] in ('FAILED', 'CANCELED', 'EXPIRED'):
+                raise BulkOperationError(
+                    f"Bulk operation {operation_id} {operation['status']}: "
+                    f"{operation.get('errorCode')}"
+                )
+            if loop.time() >= deadline:
+                raise BulkOperationError(
+                    f"Bulk operation {operation_id} timed out after {timeout}s"
+                )
+            await asyncio.sleep(poll_interval)
+
+    async def _iter_jsonl(self, url: str) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a JSONL file line by line"""
+        # Signed storage URL: no shop credentials
+        async with self.http.stream('shopify_files', 'GET', url) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    yield json.loads(line)
+
+    async def _iter_bulk_objects(self, url: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Reassemble parent objects from the flat JSONL stream.
+
+        Children follow their parent, so a parent is complete as soon as the
+        next parent line arrives; only one object is held at a time.
+        """
+        parent = None
+        async for line in self._iter_jsonl(url):
+            if '__parentId' not in line:
+                if parent is not None:
+                    yield parent
+                parent = line
+                parent['_children'] = []
+            elif parent is not None and line['__parentId'] == parent['id']:
+                parent['_children'].append(line)
+        if parent is not None:
+            yield parent
+
+    async def bulk_export(self, resource: str, poll_interval: float = 2.0,
+                          timeout: float = 3600.0) -> AsyncIterator[Any]:
+        """
+        Export every product or order through a bulk operation.
+
+        Args:
+            resource: 'products' or 'orders'
+
+        Yields:
+            ProductData or OrderData, streamed from the result file
+        """
+        if resource not in BULK_QUERIES:
+            raise ValueError(f"Unsupported bulk resource: {resource}")
+        url = await self.run_bulk_operation(BULK_QUERIES[resource], poll_interval, timeout)
+        if url is None:
+            return
+
+        transform = (
+            self._transform_bulk_product if resource == 'products'
+            else self._transform_bulk_order
+        )
+        async for node in self._iter_bulk_objects(url):
+            yield transform(node)
+
+    def _transform_bulk_product(self, node: Dict[str, Any]) -> ProductData:
+        """Map a bulk (GraphQL) product onto the REST shape and transform it"""
+        variants, images = [], []
+        for child in node['_children']:
+            if 'sku' in child:
+                variants.append({
+                    'id': _gid(child['id']),
+                    'sku': child.get('sku'),
+                    'price': child.get('price', 0),
+                    'inventory_quantity': child.get('inventoryQuantity') or 0,
+                    'inventory_item_id': (
+                        _gid(child['inventoryItem']['id']) if child.get('inventoryItem') else None
+                    )
+                })
+            elif 'url' in child:
+                images.append({'src': child['url']})
+
+        return self._transform_product({
+            'id': _gid(node['id']),
+            'title': node['title'],
+            'body_html': node.get('descriptionHtml', ''),
+            'status': (node.get('status') or 'active').lower(),
+            'variants': variants or [{}],
+            'images': images,
+            **_bulk_dates(node)
+        })
+
+    def _transform_bulk_order(self, node: Dict[str, Any]) -> OrderData:
+        """Map a bulk (GraphQL) order onto the REST shape and transform it"""
+        money = (node.get('totalPriceSet') or {}).get('shopMoney') or {}
+        customer = node.get('customer') or {}
+        return self._transform_order({
+            'id': _gid(node['id']),
+            'email': node.get('email') or '',
+            'customer': {
+                'first_name': customer.get('firstName') or '',
+                'last_name': customer.get('lastName') or ''
+            },
+            'total_price': money.get('amount', 0),
+            'currency': money.get('currencyCode', 'USD'),
+            'financial_status': (node.get('displayFinancialStatus') or 'pending').lower(),
+            'line_items': [
+                {'id': _gid(c['id']), 'title': c.get('title'), 'sku': c.get('sku'),
+                 'quantity': c.get('quantity')}
+                for c in node['_children']
+            ],
+            'shipping_address': node.get('shippingAddress'),
+            'order_number': node.get('name'),
+            'tags': node.get('tags', []),
+            'note': node.get('note'),
+            **_bulk_dates(node)
+        })
+
     def get_status(self) -> Dict[str, Any]:
         """Get adapter status and health"""
         return {
@@ -201,57 +587,71 @@ class ShopifyAdapter(EcommerceAdapter):
             'store_url': self.store_url,
             'api_version': self.api_version,
             'healthy': True,  # Could add actual health check
-            'last_request_time': self.last_request_time
+            'last_request_time': self.last_request_time,
+            'rate_limit': dict(self.rate_limiter.metrics)
         }
 
+    def transform_orders(self, records: List[Dict[str, Any]],
+                         failures: Optional[List[Dict[str, Any]]] = None) -> List[OrderData]:
+        """Transform a page of raw orders; malformed ones are skipped and reported in `failures`"""
+        return self._transform_all(records, self._transform_order, 'order', failures)
+
+    def transform_products(self, records: List[Dict[str, Any]],
+                           failures: Optional[List[Dict[str, Any]]] = None) -> List[ProductData]:
+        """Transform a page of raw products; malformed ones are skipped, reported in `failures`"""
+        return self._transform_all(records, self._transform_product, 'product', failures)
+
+    def _transform_all(self, records: List[Dict[str, Any]], transform: Callable, kind: str,
+                       failures: Optional[List[Dict[str, Any]]]) -> List[Any]:
+        results = []
+        append = results.append
+        for record in records:
+            try:
+                append(transform(record))
+            except (KeyError, TypeError, ValueError) as e:
+                error = f"{type(e).__name__}: {e}"
+                logger.error("Skipping malformed record", platform=self.name, kind=kind,
+                             record_id=record.get('id'), error=error)
+                if failures is not None:
+                    failures.append({'kind': kind, 'id': record.get('id'),
+                                     'updated_at': record.get('updated_at'), 'error': error})
+        return results
+
     def _transform_order(self, shopify_order: Dict[str, Any]) -> OrderData:
         """Transform Shopify order to standardized OrderData"""
-        return OrderData(
-            order_id=str(shopify_order['id']),
-            customer_email=shopify_order.get('email', ''),
-            customer_name=f"{shopify_order.get('customer', {}).get('first_name', '')} {shopify_order.get('customer', {}).get('last_name', '')}".strip(),
-            total_amount=float(shopify_order['total_price']),
-            currency=shopify_order.get('currency', 'USD'),
-            status=self._standardize_order_status(shopify_order.get('financial_status', 'pending')),
-            items=shopify_order.get('line_items', []),
-            shipping_address=shopify_order.get('shipping_address'),
-            billing_address=shopify_order.get('billing_address'),
-            created_at=self._standardize_datetime(shopify_order['created_at']) if 'created_at' in shopify_order else None,
-            updated_at=self._standardize_datetime(shopify_order['updated_at']) if 'updated_at' in shopify_order else None,
-            metadata={
-                'shopify_order_number': shopify_order.get('order_number'),
-                'tags': shopify_order.get('tags', []),
-                'note': shopify_order.get('note')
-            }
-        )
+        return transform_order(shopify_order)
 
     def _transform_product(self, shopify_product: Dict[str, Any]) -> ProductData:
         """Transform Shopify product to standardized ProductData"""
+        get = shopify_product.get
+        variants = get('variants') or []
+        created_at, updated_at = get('created_at'), get('updated_at')
         return ProductData(
             product_id=str(shopify_product['id']),
             title=shopify_product['title'],
-            description=shopify_product.get('body_html', ''),
-            price=float(shopify_product.get('variants', [{}])[0].get('price', 0)),
+            description=get('body_html', ''),
+            price=float((variants[0] if variants else {}).get('price', 0)),
             currency='USD',  # Shopify default
-            inventory_quantity=sum(v.get('inventory_quantity', 0) for v in shopify_product.get('variants', [])),
-            variants=shopify_product.get('variants', []),
-            images=[img['src'] for img in shopify_product.get('images', [])],
-            status=shopify_product.get('status', 'active'),
-            created_at=self._standardize_datetime(shopify_product['created_at']) if 'created_at' in shopify_product else None,
-            updated_at=self._standardize_datetime(shopify_product['updated_at']) if 'updated_at' in shopify_product else None
+            inventory_quantity=sum(v.get('inventory_quantity', 0) for v in variants),
+            variants=variants,
+            images=[img['src'] for img in get('images', [])],
+            status=get('status', 'active'),
+            created_at=parse_datetime(created_at) if created_at else None,
+            updated_at=parse_datetime(updated_at) if updated_at else None
         )
 
     def _transform_fulfillment(self, shopify_fulfillment: Dict[str, Any]) -> FulfillmentData:
         """Transform Shopify fulfillment to standardized FulfillmentData"""
+        get = shopify_fulfillment.get
         return FulfillmentData(
             fulfillment_id=str(shopify_fulfillment['id']),
             order_id=str(shopify_fulfillment['order_id']),
-            tracking_number=shopify_fulfillment.get('tracking_number', ''),
-            carrier=shopify_fulfillment.get('tracking_company', ''),
-            tracking_url=shopify_fulfillment.get('tracking_url'),
-            line_items=shopify_fulfillment.get('line_items', []),
-            status=shopify_fulfillment.get('status', 'success'),
-            shipped_at=self._standardize_datetime(shopify_fulfillment['created_at']) if 'created_at' in shopify_fulfillment else None
+            tracking_number=get('tracking_number', ''),
+            carrier=get('tracking_company', ''),
+            tracking_url=get('tracking_url'),
+            line_items=get('line_items', []),
+            status=get('status', 'success'),
+            shipped_at=self._standardize_datetime(get('created_at'))
         )
 
     def _transform_to_shopify_order(self, order_data: OrderData) -> Dict[str, Any]:
@@ -0,0 +1,249 @@
+"""
+
+Inventory Push Service
+
+Coalesces inventory updates before they reach the platforms. During a sale
+the same SKU changes many times a second; only the latest quantity matters,
+so updates are held for a short window, collapsed per product
+(last write wins) and sent in as few calls as the platform allows through
+`update_inventory_bulk`. Every call goes through the AdapterManager, so the
+circuit breaker, the per-platform concurrency cap and the shared Shopify
+rate limiter all apply. A failed batch is retried with exponential backoff
+rather than on the next window, so an unreachable platform is not hammered.
+
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from .adapter_manager import AdapterManager, create_adapter_manager
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class PendingUpdate:
+    """Latest quantity for one product and everyone waiting on it"""
+
+    quantity: int
+    first_submitted: float  # Lag is measured from the oldest unsent change
+    attempts: int = 0
+    not_before: float = 0.0  # Backoff after a failed push (monotonic seconds)
+    waiters: List[asyncio.Future] = field(default_factory=list)
+
+
+class InventoryPushService:
+    """
+    دفع المخزون المجمّع
+    Per-product last-write-wins buffer flushed to bulk endpoints
+    """
+
+    def __init__(
+        self,
+        manager: AdapterManager,
+        window: float = 0.5,
+        max_attempts: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.manager = manager
+        self.window = window
+        self.max_attempts = max_attempts
+        self.backoff = backoff  # Delay before the first retry; doubles per attempt
+        self.max_backoff = max_backoff
+        self._pending: Dict[str, Dict[str, PendingUpdate]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.metrics = {
+            "submitted": 0,
+            "pushed": 0,
+            "failed": 0,
+            "batches": 0,
+            "retries": 0,
+            "max_lag_ms": 0.0,
+            "total_lag_ms": 0.0,
+        }
+
+    def submit(self, platform: str, product_id: str, quantity: int) -> asyncio.Future:
+        """
+        Queue a quantity; a newer one for the same product replaces it.
+
+        Returns a future resolving to True once the quantity that superseded
+        (or is) this one has been written.
+        """
+        if platform not in self.manager.adapters:
+            raise ValueError(f"Adapter for platform '{platform}' not found")
+
+        waiter = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(platform, {})
+        update = pending.get(product_id)
+        if update is None:
+            pending[product_id] = PendingUpdate(quantity, time.monotonic(), waiters=[waiter])
+        else:
+            update.quantity = quantity
+            update.attempts = 0
+            update.waiters.append(waiter)
+
+        self.metrics["submitted"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return waiter
+
+    async def flush(self, force: bool = False) -> int:
+        """
+        Push everything that is due; returns the number of products written.
+
+        Updates still backing off after a failure stay queued unless `force`.
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            now = time.monotonic()
+            taken = {}
+            for platform, pending in self._pending.items():
+                due = {
+                    product_id: update
+                    for product_id, update in pending.items()
+                    if force or update.not_before <= now
+                }
+                for product_id in due:
+                    del pending[product_id]
+                if due:
+                    taken[platform] = due
+            if not taken:
+                return 0
+            counts = await asyncio.gather(
+                *(self._push_platform(platform, pending) for platform, pending in taken.items())
+            )
+            return sum(counts)
+
+    async def _push_platform(self, platform: str, pending: Dict[str, PendingUpdate]) -> int:
+        batch_size = max(1, self.manager.adapters[platform].max_inventory_batch)
+        items = list(pending.items())
+        written = 0
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            self.metrics["batches"] += 1
+            try:
+                results = await self.manager.update_inventory_bulk(
+                    platform, {product_id: update.quantity for product_id, update in batch}
+                )
+            except Exception as e:
+                logger.error(
+                    "Inventory push failed", platform=platform, products=len(batch), error=str(e)
+                )
+                self._retry(platform, batch, f"{type(e).__name__}: {e}")
+                continue
+
+            for product_id, update in batch:
+                if results.get(product_id):
+                    written += 1
+                    self._done(update, True)
+                else:
+                    self.metrics["failed"] += 1
+                    self._done(update, False)
+        return written
+
+    def _done(self, update: PendingUpdate, ok: bool) -> None:
+        lag_ms = (time.monotonic() - update.first_submitted) * 1000
+        if ok:
+            self.metrics["pushed"] += 1
+            self.metrics["total_lag_ms"] += lag_ms
+            self.metrics["max_lag_ms"] = max(self.metrics["max_lag_ms"], lag_ms)
+        for waiter in update.waiters:
+            if not waiter.done():
+                waiter.set_result(ok)
+
+    def _retry(self, platform: str, batch: List[Tuple[str, PendingUpdate]], error: str) -> None:
+        """Put failed updates back, backing off, unless a newer quantity arrived meanwhile"""
+        pending = self._pending.setdefault(platform, {})
+        for product_id, update in batch:
+            delay = min(self.max_backoff, self.backoff * 2**update.attempts)
+            newer = pending.get(product_id)
+            if newer is not None:
+                newer.first_submitted = update.first_submitted
+                newer.not_before = max(newer.not_before, time.monotonic() + delay)
+                newer.waiters[:0] = update.waiters
+                continue
+            update.attempts += 1
+            update.not_before = time.monotonic() + delay
+            if update.attempts >= self.max_attempts:
+                self.metrics["failed"] += 1
+                for waiter in update.waiters:
+                    if not waiter.done():
+                        waiter.set_exception(RuntimeError(error))
+                continue
+            self.metrics["retries"] += 1
+            pending[product_id] = update
+        if self._wakeup is not None and pending:
+            self._wakeup.set()
+
+    def _next_due_in(self) -> Optional[float]:
+        """Seconds until the earliest pending update may be pushed (None if nothing is pending)"""
+        due = [
+            update.not_before for updates in self._pending.values() for update in updates.values()
+        ]
+        return max(0.0, min(due) - time.monotonic()) if due else None
+
+    async def _worker(self) -> None:
+        while True:
+            # Sleep until new work arrives or a backed-off retry comes due
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._next_due_in())
+            except asyncio.TimeoutError:
+                pass
+            # Hold the window open so a burst collapses into one write per product
+            await asyncio.sleep(self.window)
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        if any(self._pending.values()):
+            self._wakeup.set()
+        self._task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        """Stop the worker and push what is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._wakeup = None
+        await self.flush(force=True)
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        pending = [update for updates in self._pending.values() for update in updates.values()]
+        pushed = self.metrics["pushed"]
+        return {
+            **{k: v for k, v in self.metrics.items() if k not in ("total_lag_ms", "max_lag_ms")},
+            "pending": len(pending),
+            "max_lag_ms": round(self.metrics["max_lag_ms"], 1),
+            "current_lag_ms": round(
+                max((now - u.first_submitted for u in pending), default=0.0) * 1000, 1
+            ),
+            "avg_lag_ms": round(self.metrics["total_lag_ms"] / pushed, 1) if pushed else 0.0,
+            # Submitted updates per upstream write; 1.0 means nothing was coalesced
+            "coalescing_ratio": round(self.metrics["submitted"] / pushed, 2) if pushed else 0.0,
+            "backing_off": sum(1 for u in pending if u.not_before > now),
+            "running": self._task is not None,
+        }
+
+
+_inventory_push_service: Optional[InventoryPushService] = None
+
+
+def get_inventory_push_service() -> InventoryPushService:
+    """Inventory push over the platforms configured in settings"""
+    global _inventory_push_service
+    if _inventory_push_service is None:
+        _inventory_push_service = InventoryPushService(create_adapter_manager())
+    return _inventory_push_service
@@ -0,0 +1,296 @@
+"""
+
+Shopify Rate Limiter
+
+Leaky-bucket limiter that mirrors Shopify's REST call limit. Every response
+carries `X-Shopify-Shop-Api-Call-Limit: used/capacity`; the limiter keeps a
+local estimate of the bucket, corrects it from that header and only makes a
+caller wait when the bucket is actually full.
+
+- One limiter per store, shared by every adapter instance in the process
+  (get_rate_limiter); with a Redis backend the bucket is shared by every
+  worker process.
+- Callers queue in arrival order (FIFO) instead of sleeping independently.
+- The leak rate adapts: halved on 429, recovered step by step on successful
+  responses, and rescaled when the header reveals a bigger bucket (Plus).
+
+"""
+
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+CALL_LIMIT_HEADER = "X-Shopify-Shop-Api-Call-Limit"
+
+
+@dataclass
+class RateLimitConfig:
+    """Configuration for the Shopify rate limiter"""
+
+    bucket_size: int = 40  # Standard plan; Plus stores report 80 in the header
+    leak_rate: float = 2.0  # Requests per second leaked at bucket_size
+    headroom: int = 2  # Slots left free for other clients of the same app
+    min_leak_rate: float = 0.25  # Floor when backing off after 429s
+    recovery_step: float = 0.1  # Leak rate regained per successful response
+    max_retries: int = 5  # 429 retries per request before giving up
+    redis_url: Optional[str] = None  # Share the bucket across processes
+
+
+def parse_call_limit(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """'32/40' -> (32, 40); None if missing or malformed"""
+    if not value:
+        return None
+    try:
+        used, capacity = value.split("/")
+        return int(used), int(capacity)
+    except ValueError:
+        return None
+
+
+class LocalBucket:
+    """In-process bucket state"""
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self.capacity = config.bucket_size
+        self.leak_rate = config.leak_rate
+        self.used = 0.0
+        self.blocked_until = 0.0
+        self.updated_at = time.monotonic()
+
+    @property
+    def _per_slot(self) -> float:
+        return self.config.leak_rate / self.config.bucket_size
+
+    def _leak(self) -> float:
+        now = time.monotonic()
+        self.used = max(0.0, self.used - (now - self.updated_at) * self.leak_rate)
+        self.updated_at = now
+        return now
+
+    async def reserve(self) -> float:
+        """Take one slot; returns 0, or the seconds to wait before asking again"""
+        now = self._leak()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        limit = self.capacity - self.config.headroom
+        if self.used + 1 <= limit:
+            self.used += 1
+            return 0.0
+        return (self.used + 1 - limit) / self.leak_rate
+
+    async def observe(self, used: int, capacity: int) -> None:
+        """Correct the estimate from a call-limit header"""
+        self._leak()
+        if capacity != self.capacity:
+            self.leak_rate *= capacity / self.capacity
+            self.capacity = capacity
+        # Other clients may have spent slots we did not see; never lower the estimate
+        self.used = max(self.used, float(used))
+        self.leak_rate = min(capacity * self._per_slot, self.leak_rate + self.config.recovery_step)
+
+    async def throttle(self, retry_after: float) -> None:
+        """Shopify answered 429: the bucket is full and we were too fast"""
+        now = self._leak()
+        self.used = float(self.capacity)
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        self.leak_rate = max(self.config.min_leak_rate, self.leak_rate / 2)
+
+    async def state(self) -> Dict[str, Any]:
+        self._leak()
+        return {
+            "used": round(self.used, 2),
+            "capacity": self.capacity,
+            "leak_rate": round(self.leak_rate, 3),
+            "backend": "local",
+        }
+
+
+# Same arithmetic as LocalBucket, executed atomically inside Redis
+_REDIS_SCRIPT = """
+local op = ARGV[1]
+local now = tonumber(ARGV[2])
+local headroom = tonumber(ARGV[3])
+local per_slot = tonumber(ARGV[4])
+local min_rate = tonumber(ARGV[5])
+local step = tonumber(ARGV[6])
+local a = tonumber(ARGV[8])
+local b = tonumber(ARGV[9])
+local s = redis.call('HMGET', KEYS[1], 'used', 'ts', 'capacity', 'rate', 'blocked')
+local capacity = tonumber(s[3]) or tonumber(ARGV[7])
+local rate = tonumber(s[4]) or capacity * per_slot
+local used = math.max(0, (tonumber(s[1]) or 0) - (now - (tonumber(s[2]) or now)) * rate)
+local blocked = tonumber(s[5]) or 0
+local wait = 0
+if op == 'reserve' then
+  if now < blocked then
+    wait = blocked - now
+  elseif used + 1 <= capacity - headroom then
+    used = used + 1
+  else
+    wait = (used + 1 - (capacity - headroom)) / rate
+  end
+elseif op == 'observe' then
+  if b ~= capacity then
+    rate = rate * b / capacity
+    capacity = b
+  end
+  used = math.max(used, a)
+  rate = math.min(capacity * per_slot, rate + step)
+elseif op == 'throttle' then
+  used = capacity
+  blocked = math.max(blocked, now + a)
+  rate = math.max(min_rate, rate / 2)
+end
+redis.call('HSET', KEYS[1], 'used', used, 'ts', now,
+           'capacity', capacity, 'rate', rate, 'blocked', blocked)
+redis.call('EXPIRE', KEYS[1], 3600)
+return {tostring(wait), tostring(used), tostring(capacity), tostring(rate)}
+"""
+
+
+class RedisBucket:
+    """Bucket state in a Redis hash, shared by every process using the same key"""
+
+    def __init__(self, config: RateLimitConfig, key: str, redis_client=None):
+        self.config = config
+        self.key = f"shopify:rate_limit:{key}"
+        if redis_client is None:
+            import redis.asyncio as redis
+
+            redis_client = redis.from_url(config.redis_url, decode_responses=True)
+        self.redis = redis_client
+        self._script = self.redis.register_script(_REDIS_SCRIPT)
+
+    async def _run(self, op: str, a: float = 0, b: float = 0) -> Tuple[float, ...]:
+        result = await self._script(
+            keys=[self.key],
+            args=[
+                op,
+                time.time(),
+                self.config.headroom,
+                self.config.leak_rate / self.config.bucket_size,
+                self.config.min_leak_rate,
+                self.config.recovery_step,
+                self.config.bucket_size,
+                a,
+                b,
+            ],
+        )
+        return tuple(float(v) for v in result)
+
+    async def reserve(self) -> float:
+        return (await self._run("reserve"))[0]
+
+    async def observe(self, used: int, capacity: int) -> None:
+        await self._run("observe", used, capacity)
+
+    async def throttle(self, retry_after: float) -> None:
+        await self._run("throttle", retry_after)
+
+    async def state(self) -> Dict[str, Any]:
+        _, used, capacity, rate = await self._run("state")
+        return {
+            "used": round(used, 2),
+            "capacity": int(capacity),
+            "leak_rate": round(rate, 3),
+            "backend": "redis",
+        }
+
+
+class ShopifyRateLimiter:
+    """
+    Fair front-end to a bucket.
+
+    Waiting callers hold a FIFO lock in turn, so the caller that has waited
+    longest gets the next free slot. Across processes (Redis backend) slots
+    are granted first come, first served.
+    """
+
+    def __init__(self, config: RateLimitConfig = None, key: str = "default", redis_client=None):
+        self.config = config or RateLimitConfig()
+        if self.config.redis_url or redis_client is not None:
+            self.bucket = RedisBucket(self.config, key, redis_client)
+        else:
+            self.bucket = LocalBucket(self.config)
+        self._locks = weakref.WeakKeyDictionary()
+        self.metrics = {
+            "acquired": 0,
+            "waited": 0,
+            "wait_seconds": 0.0,
+            "throttled": 0,
+            "queued": 0,
+        }
+
+    def _lock(self) -> asyncio.Lock:
+        # asyncio.Lock binds to one event loop; keep one per loop
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = self._locks[loop] = asyncio.Lock()
+        return lock
+
+    async def acquire(self) -> None:
+        """Wait for a slot in the bucket"""
+        # Fast path only when nobody is queued, so newcomers cannot jump the line
+        if not self.metrics["queued"] and await self.bucket.reserve() <= 0:
+            self.metrics["acquired"] += 1
+            return
+
+        self.metrics["queued"] += 1
+        started = time.monotonic()
+        try:
+            async with self._lock():
+                while (wait := await self.bucket.reserve()) > 0:
+                    await asyncio.sleep(wait)
+        finally:
+            self.metrics["queued"] -= 1
+        self.metrics["acquired"] += 1
+        self.metrics["waited"] += 1
+        self.metrics["wait_seconds"] += time.monotonic() - started
+
+    async def update(self, headers) -> None:
+        """Feed the call-limit header of a response back into the bucket"""
+        call_limit = parse_call_limit(headers.get(CALL_LIMIT_HEADER))
+        if call_limit:
+            await self.bucket.observe(*call_limit)
+
+    async def throttled(self, retry_after: float) -> None:
+        """Record a 429 so every caller backs off, not just the one that got it"""
+        self.metrics["throttled"] += 1
+        await self.bucket.throttle(retry_after)
+        logger.warning("Shopify rate limit hit", retry_after=retry_after)
+
+    async def get_status(self) -> Dict[str, Any]:
+        return {**await self.bucket.state(), **self.metrics}
+
+
+_limiters: Dict[str, ShopifyRateLimiter] = {}
+
+
+def get_rate_limiter(
+    key: str, config: RateLimitConfig = None, redis_client=None
+) -> ShopifyRateLimiter:
+    """
+    Limiter shared by every adapter talking to the same store.
+
+    The first caller creates it; a later call with a different config or
+    Redis client raises ValueError rather than silently getting a limiter
+    that was set up otherwise.
+    """
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = _limiters[key] = ShopifyRateLimiter(config, key, redis_client)
+    elif config is not None and config != limiter.config:
+        raise ValueError(
+            f"Rate limiter for '{key}' already exists with a different config: {limiter.config}"
+        )
+    elif redis_client is not None and getattr(limiter.bucket, "redis", None) is not redis_client:
+        raise ValueError(f"Rate limiter for '{key}' already exists with a different backend")
+    return limiter
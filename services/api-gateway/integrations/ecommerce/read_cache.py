@@ -0,0 +1,181 @@
+"""
+
+Adapter Read Cache
+
+Per-platform cache for single-record reads (get_product / get_order) with
+HTTP-style freshness rules:
+
+- fresh for `ttl` seconds: served from memory, no upstream call
+- stale for another `stale_while_revalidate` seconds: served immediately
+  while one background call refreshes the entry
+- while the platform's circuit breaker is open, entries up to
+  `stale_if_error` seconds past freshness are served, flagged as stale
+
+Concurrent misses for the same key are coalesced into a single upstream
+call (single-flight).
+
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class ReadCacheConfig:
+    """Configuration for a platform read cache"""
+
+    ttl: float = 30.0  # Seconds an entry is fresh
+    stale_while_revalidate: float = 300.0  # Seconds a stale entry is served while refreshing
+    stale_if_error: float = 3600.0  # Seconds a stale entry may stand in while the breaker is open
+    max_entries: int = 10_000
+
+
+@dataclass
+class CachedRead:
+    """A read result and where it came from"""
+
+    value: Any
+    stale: bool = False
+    age: float = 0.0  # Seconds since the value was fetched upstream
+    source: str = "upstream"  # 'upstream' or 'cache'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"stale": self.stale, "age": round(self.age, 3), "source": self.source}
+
+
+class ReadCache:
+    """LRU cache with stale-while-revalidate and single-flight loads"""
+
+    def __init__(self, config: ReadCacheConfig = None):
+        self.config = config or ReadCacheConfig()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.metrics = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "revalidations": 0,
+            "stale_on_error": 0,
+            "evictions": 0,
+        }
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop an entry; a load already in flight will not store its result"""
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    async def get(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]], unavailable: Tuple[type, ...] = ()
+    ) -> CachedRead:
+        """
+        Read through the cache.
+
+        Args:
+            fetch: Upstream call; None results are returned but not cached
+            unavailable: Exceptions meaning the upstream is known to be down
+                (an open circuit breaker), for which stale entries are served
+        """
+        entry = self._entries.get(key)
+        age = 0.0
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.config.ttl:
+                self.metrics["hits"] += 1
+                self._entries.move_to_end(key)
+                return CachedRead(value, stale=False, age=age, source="cache")
+            if age < self.config.ttl + self.config.stale_while_revalidate:
+                self.metrics["stale_hits"] += 1
+                self._entries.move_to_end(key)
+                self._revalidate(key, fetch)
+                return CachedRead(value, stale=True, age=age, source="cache")
+
+        try:
+            return CachedRead(await self._load(key, fetch))
+        except unavailable:
+            if entry is None or age >= self.config.ttl + self.config.stale_if_error:
+                raise
+            self.metrics["stale_on_error"] += 1
+            logger.warning(
+                "Upstream unavailable, serving stale read", key=str(key), age=round(age, 1)
+            )
+            return CachedRead(entry[0], stale=True, age=age, source="cache")
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """Seconds since the entry was loaded, None if it is not cached"""
+        entry = self._entries.get(key)
+        return None if entry is None else time.monotonic() - entry[1]
+
+    async def refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Reload an entry ahead of expiry, joining a load already in flight"""
+        return await self._load(key, fetch)
+
+    def _start(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]]
+    ) -> Tuple[asyncio.Task, bool]:
+        """The in-flight load for `key`, starting one if needed; True if started"""
+        task = self._inflight.get(key)
+        if task is not None:
+            return task, False
+
+        async def load():
+            value = await fetch()
+            # Skip the store if the key was invalidated while we were loading
+            if value is not None and self._inflight.get(key) is task:
+                self.put(key, value)
+            return value
+
+        task = asyncio.ensure_future(load())
+        self._inflight[key] = task
+        task.add_done_callback(
+            lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None
+        )
+        return task, True
+
+    async def _load(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        task, started = self._start(key, fetch)
+        self.metrics["misses" if started else "coalesced"] += 1
+        # Shielded: one caller giving up must not cancel the load for the others
+        return await asyncio.shield(task)
+
+    def _revalidate(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> None:
+        task, started = self._start(key, fetch)
+        if not started:
+            return
+        self.metrics["revalidations"] += 1
+        self._background.add(task)
+
+        def done(t: asyncio.Task) -> None:
+            self._background.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning(
+                    "Background revalidation failed", key=str(key), error=str(t.exception())
+                )
+
+        task.add_done_callback(done)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {**self.metrics, "entries": len(self._entries), "inflight": len(self._inflight)}
+
+    async def close(self) -> None:
+        """Cancel background refreshes"""
+        for task in list(self._background):
+            task.cancel()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
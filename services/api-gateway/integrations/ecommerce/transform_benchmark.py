@@ -0,0 +1,193 @@
+"""
+E-commerce Transform Benchmark
+Records/second of the Shopify order transform, before and after
+
+The "before" side is a frozen copy of the original transform: a plain
+dataclass, a status table rebuilt per call and up to three strptime
+attempts per timestamp. The "after" side is ShopifyAdapter.transform_orders
+with slotted records and the single-pass ISO-8601 parser.
+
+    python -m backend.integrations.ecommerce.transform_benchmark --count 20000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from .adapters import ShopifyAdapter
+
+
+@dataclass
+class _LegacyOrderData:
+    order_id: str
+    customer_email: str
+    customer_name: str
+    total_amount: float
+    currency: str
+    status: str
+    items: List[Dict[str, Any]]
+    shipping_address: Optional[Dict[str, Any]] = None
+    billing_address: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+def _legacy_status(platform_status: str) -> str:
+    status_mapping = {
+        "pending": "pending",
+        "paid": "paid",
+        "fulfilled": "fulfilled",
+        "cancelled": "cancelled",
+        "refunded": "refunded",
+        "on-hold": "pending",
+        "processing": "processing",
+        "completed": "fulfilled",
+    }
+    return status_mapping.get(platform_status.lower(), platform_status)
+
+
+def _legacy_datetime(dt_string: str) -> datetime:
+    for fmt in ("%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.strptime(dt_string, fmt)
+        except ValueError:
+            continue
+    return datetime.utcnow()
+
+
+def _legacy_transform_orders(orders: List[Dict[str, Any]]) -> List[_LegacyOrderData]:
+    return [
+        _LegacyOrderData(
+            order_id=str(o["id"]),
+            customer_email=o.get("email", ""),
+            customer_name=(
+                f"{o.get('customer', {}).get('first_name', '')} "
+                f"{o.get('customer', {}).get('last_name', '')}"
+            ).strip(),
+            total_amount=float(o["total_price"]),
+            currency=o.get("currency", "USD"),
+            status=_legacy_status(o.get("financial_status", "pending")),
+            items=o.get("line_items", []),
+            shipping_address=o.get("shipping_address"),
+            billing_address=o.get("billing_address"),
+            created_at=_legacy_datetime(o["created_at"]) if "created_at" in o else None,
+            updated_at=_legacy_datetime(o["updated_at"]) if "updated_at" in o else None,
+            metadata={
+                "shopify_order_number": o.get("order_number"),
+                "tags": o.get("tags", []),
+                "note": o.get("note"),
+            },
+        )
+        for o in orders
+    ]
+
+
+def sample_orders(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Shopify REST order payloads with realistic timestamps and offsets"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=3)))
+    address = {"city": "Riyadh", "country_code": "SA", "address1": "King Fahd Rd"}
+    orders = []
+    for i in range(count):
+        created = start + timedelta(minutes=rng.randint(0, 500_000))
+        orders.append(
+            {
+                "id": 5_000_000 + i,
+                "order_number": 1000 + i,
+                "email": f"customer{i}@example.com",
+                "customer": {"first_name": "Amal", "last_name": f"Customer {i}"},
+                "total_price": f"{rng.uniform(20, 900):.2f}",
+                "currency": "SAR",
+                "financial_status": rng.choice(("paid", "pending", "refunded")),
+                "line_items": [
+                    {"id": i * 10 + n, "sku": f"SKU-{n}", "quantity": 1, "price": "99.00"}
+                    for n in range(3)
+                ],
+                "shipping_address": address,
+                "billing_address": address,
+                "created_at": created.isoformat(),
+                "updated_at": (created + timedelta(hours=2)).isoformat(),
+                "tags": [],
+                "note": None,
+            }
+        )
+    return orders
+
+
+def _records_per_second(
+    transform: Callable[[List[Dict[str, Any]]], List[Any]],
+    payloads: List[Dict[str, Any]],
+    repeat: int,
+) -> float:
+    best = min(_timed(transform, payloads) for _ in range(repeat))
+    return len(payloads) / best
+
+
+def _timed(transform, payloads) -> float:
+    started = time.perf_counter()
+    transform(payloads)
+    return time.perf_counter() - started
+
+
+def _bytes_per_record(transform, payloads) -> float:
+    tracemalloc.start()
+    try:
+        records = transform(payloads)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size / max(1, len(records))
+
+
+def run_benchmark(count: int = 20_000, repeat: int = 5) -> Dict[str, float]:
+    """
+    قياس أداء التحويل
+    Transform `count` orders with both implementations
+
+    Returns:
+        before_rps / after_rps: Records per second, best of `repeat` runs
+        before_bytes / after_bytes: Memory allocated per transformed record
+    """
+    payloads = sample_orders(count)
+    adapter = ShopifyAdapter(
+        {"api_key": "k", "password": "p", "store_url": "https://benchmark.invalid"}
+    )
+
+    before = _records_per_second(_legacy_transform_orders, payloads, repeat)
+    after = _records_per_second(adapter.transform_orders, payloads, repeat)
+    return {
+        "records": count,
+        "before_rps": before,
+        "after_rps": after,
+        "speedup": after / before,
+        "before_bytes": _bytes_per_record(_legacy_transform_orders, payloads),
+        "after_bytes": _bytes_per_record(adapter.transform_orders, payloads),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="E-commerce order transform benchmark")
+    parser.add_argument("--count", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    options = parser.parse_args()
+
+    report = run_benchmark(options.count, options.repeat)
+    print(f"orders: {report['records']}, best of {options.repeat}")
+    print(
+        f"  before: {report['before_rps']:>10,.0f} records/s  "
+        f"{report['before_bytes']:6.0f} B/record"
+    )
+    print(
+        f"  after:  {report['after_rps']:>10,.0f} records/s  {report['after_bytes']:6.0f} B/record"
+    )
+    print(f"  speedup: {report['speedup']:.2f}x")
+    if (
+        report["after_rps"] <= report["before_rps"]
+        or report["after_bytes"] >= report["before_bytes"]
+    ):
+        raise SystemExit("regression: the transform is no faster or no leaner than the legacy one")
@@ -0,0 +1,200 @@
+"""
+
+Shared HTTP Client Pool
+
+One managed async HTTP layer for every outbound integration (Shopify,
+Aramex, SMSA, Unifonic, Twilio, SendGrid). Each provider gets its own
+`httpx.AsyncClient`, so connections to its hosts are pooled, kept alive and
+reused across requests instead of re-handshaking TLS on every call, and a
+slow provider cannot exhaust another provider's connections.
+
+- Per-provider timeouts and pool limits (ProviderConfig)
+- HTTP/2 when the `h2` package is installed (`httpx[http2]`), HTTP/1.1
+  keep-alive otherwise
+- Pool-saturation metrics: in-flight requests, peak, requests that found
+  the pool full, pool timeouts, errors and latency per provider
+
+"""
+
+import asyncio
+import importlib.util
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class ProviderConfig:
+    """Connection pool and timeout settings for one provider"""
+
+    timeout: float = 30.0  # Default for read, write and pool waits
+    connect_timeout: float = 5.0
+    read_timeout: Optional[float] = None  # Overrides `timeout` for reads
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0  # Seconds an idle connection stays open
+    http2: bool = True  # Only used when h2 is installed
+
+    def httpx_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            self.timeout,
+            connect=self.connect_timeout,
+            read=self.read_timeout if self.read_timeout is not None else self.timeout,
+        )
+
+    def httpx_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+DEFAULT_PROVIDERS: Dict[str, ProviderConfig] = {
+    "shopify": ProviderConfig(timeout=30.0),
+    "shopify_files": ProviderConfig(
+        timeout=30.0, read_timeout=300.0, max_connections=4
+    ),  # Bulk JSONL downloads
+    "aramex": ProviderConfig(timeout=30.0),
+    "smsa": ProviderConfig(timeout=30.0),
+    "unifonic": ProviderConfig(timeout=15.0, max_connections=10),
+    "twilio": ProviderConfig(timeout=15.0, max_connections=10),
+    "sendgrid": ProviderConfig(timeout=15.0, max_connections=10),
+}
+
+
+class HTTPClientPool:
+    """
+    مجمع اتصالات HTTP المشترك
+    One pooled async client per provider, shared by every integration client
+    """
+
+    def __init__(
+        self,
+        providers: Optional[Dict[str, ProviderConfig]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.providers: Dict[str, ProviderConfig] = {**DEFAULT_PROVIDERS, **(providers or {})}
+        self.transport = transport  # Tests route every provider through one transport
+        # httpx clients are bound to the event loop that opened their connections
+        self._clients = weakref.WeakKeyDictionary()
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    def configure(self, provider: str, **overrides) -> ProviderConfig:
+        """Change a provider's settings; applies to clients created afterwards"""
+        config = replace(self.providers.get(provider, ProviderConfig()), **overrides)
+        self.providers[provider] = config
+        return config
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        """The pooled client for a provider in the running event loop"""
+        loop = asyncio.get_running_loop()
+        clients = self._clients.get(loop)
+        if clients is None:
+            clients = self._clients[loop] = {}
+
+        client = clients.get(provider)
+        if client is None or client.is_closed:
+            config = self.providers.get(provider) or self.configure(provider)
+            client = clients[provider] = httpx.AsyncClient(
+                timeout=config.httpx_timeout(),
+                limits=config.httpx_limits(),
+                http2=config.http2 and HTTP2_AVAILABLE,
+                transport=self.transport,
+            )
+        return client
+
+    def _metrics(self, provider: str) -> Dict[str, Any]:
+        metrics = self.metrics.get(provider)
+        if metrics is None:
+            metrics = self.metrics[provider] = {
+                "requests": 0,
+                "errors": 0,
+                "in_flight": 0,
+                "peak_in_flight": 0,
+                "saturated": 0,
+                "pool_timeouts": 0,
+                "total_ms": 0.0,
+            }
+        return metrics
+
+    @asynccontextmanager
+    async def _track(self, provider: str) -> AsyncIterator[None]:
+        metrics = self._metrics(provider)
+        config = self.providers.get(provider) or ProviderConfig()
+        if metrics["in_flight"] >= config.max_connections:
+            metrics["saturated"] += 1  # This request queues for a connection
+        metrics["requests"] += 1
+        metrics["in_flight"] += 1
+        metrics["peak_in_flight"] = max(metrics["peak_in_flight"], metrics["in_flight"])
+        started = time.perf_counter()
+        try:
+            yield
+        except httpx.PoolTimeout:
+            metrics["pool_timeouts"] += 1
+            metrics["errors"] += 1
+            logger.warning(
+                "HTTP pool exhausted", provider=provider, max_connections=config.max_connections
+            )
+            raise
+        except (httpx.HTTPError, asyncio.TimeoutError):
+            metrics["errors"] += 1
+            raise
+        finally:
+            metrics["in_flight"] -= 1
+            metrics["total_ms"] += (time.perf_counter() - started) * 1000
+
+    async def request(self, provider: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the provider's pool"""
+        async with self._track(provider):
+            return await self.client(provider).request(method, url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(
+        self, provider: str, method: str, url: str, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """Streaming request; the connection returns to the pool on exit"""
+        async with self._track(provider):
+            async with self.client(provider).stream(method, url, **kwargs) as response:
+                yield response
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-provider pool usage"""
+        status = {}
+        for provider, metrics in self.metrics.items():
+            max_connections = (self.providers.get(provider) or ProviderConfig()).max_connections
+            status[provider] = {
+                **{k: v for k, v in metrics.items() if k != "total_ms"},
+                "max_connections": max_connections,
+                "utilization": round(metrics["in_flight"] / max_connections, 3),
+                "avg_ms": round(metrics["total_ms"] / metrics["requests"], 1)
+                if metrics["requests"]
+                else 0.0,
+            }
+        return {"http2": HTTP2_AVAILABLE, "providers": status}
+
+    async def aclose(self) -> None:
+        """Close the clients opened in the running event loop"""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+
+_http_pool: Optional[HTTPClientPool] = None
+
+
+def get_http_pool() -> HTTPClientPool:
+    """Get the process-wide HTTP client pool"""
+    global _http_pool
+    if _http_pool is None:
+        _http_pool = HTTPClientPool()
+    return _http_pool
@@ -7,18 +7,22 @@ Supports SendGrid and SMTP for email delivery
 """
 
 import os
+import asyncio
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Optional, Dict, Any
-import requests
+import httpx
+
+from ..http_pool import HTTPClientPool, get_http_pool
 
 
 class EmailService:
     """Unified email service supporting multiple providers"""
 
-    def __init__(self, provider: str = 'sendgrid'):
+    def __init__(self, provider: str = 'sendgrid', http_pool: Optional[HTTPClientPool] = None):
         self.provider = provider
+        self.http = http_pool or get_http_pool()
 
         if provider == 'sendgrid':
             self.api_key = os.getenv('SENDGRID_API_KEY')
@@ -34,16 +38,21 @@ class EmailService:
         else:
             raise ValueError(f"Unsupported email provider: {provider}")
 
-    def send_email(self, to: str, subject: str, html_content: str, text_content: Optional[str] = None) -> Dict[str, Any]:
+    async def send_email(self, to: str, subject: str, html_content: str,
+                         text_content: Optional[str] = None) -> Dict[str, Any]:
         """Send email message"""
         if self.provider == 'sendgrid':
-            return self._send_sendgrid_email(to, subject, html_content, text_content)
+            return await self._send_sendgrid_email(to, subject, html_content, text_content)
         elif self.provider == 'smtp':
-            return self._send_smtp_email(to, subject, html_content, text_content)
+            # smtplib is blocking; keep it off the event loop
+            return await asyncio.to_thread(
+                self._send_smtp_email, to, subject, html_content, text_content
+            )
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def _send_sendgrid_email(self, to: str, subject: str, html_content: str, text_content: Optional[str] = None) -> Dict[str, Any]:
+    async def _send_sendgrid_email(self, to: str, subject: str, html_content: str,
+                                   text_content: Optional[str] = None) -> Dict[str, Any]:
         """Send email via SendGrid"""
         if not self.api_key:
             raise Exception("SendGrid API key not configured")
@@ -81,7 +90,7 @@ class EmailService:
             })
 
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = await self.http.request('sendgrid', 'POST', url, json=data, headers=headers)
             response.raise_for_status()
 
             return {
@@ -91,7 +100,7 @@ class EmailService:
                 'provider': 'sendgrid'
             }
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {
                 'success': False,
                 'error': str(e),
@@ -153,7 +162,7 @@ def get_email_service() -> Optional[EmailService]:
     return None
 
 
-def send_order_email(to: str, subject: str, message: str) -> bool:
+async def send_order_email(to: str, subject: str, message: str) -> bool:
     """Send order-related email notification"""
     service = get_email_service()
     if not service:
@@ -225,7 +234,7 @@ def send_order_email(to: str, subject: str, message: str) -> bool:
         </html>
         """
 
-        result = service.send_email(to, subject, html_content, message)
+        result = await service.send_email(to, subject, html_content, message)
         return result.get('success', False)
 
     except Exception as e:
@@ -7,15 +7,18 @@ Supports Unifonic and Twilio for SMS delivery
 """
 
 import os
-import requests
+import httpx
 from typing import Optional, Dict, Any
 
+from ..http_pool import HTTPClientPool, get_http_pool
+
 
 class SMSService:
     """Unified SMS service supporting multiple providers"""
 
-    def __init__(self, provider: str = 'unifonic'):
+    def __init__(self, provider: str = 'unifonic', http_pool: Optional[HTTPClientPool] = None):
         self.provider = provider
+        self.http = http_pool or get_http_pool()
 
         if provider == 'unifonic':
             self.app_sid = os.getenv('UNIFONIC_APP_SID')
@@ -28,16 +31,16 @@ class SMSService:
         else:
             raise ValueError(f"Unsupported SMS provider: {provider}")
 
-    def send_sms(self, to: str, message: str) -> Dict[str, Any]:
+    async def send_sms(self, to: str, message: str) -> Dict[str, Any]:
         """Send SMS message"""
         if self.provider == 'unifonic':
-            return self._send_unifonic_sms(to, message)
+            return await self._send_unifonic_sms(to, message)
         elif self.provider == 'twilio':
-            return self._send_twilio_sms(to, message)
+            return await self._send_twilio_sms(to, message)
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def _send_unifonic_sms(self, to: str, message: str) -> Dict[str, Any]:
+    async def _send_unifonic_sms(self, to: str, message: str) -> Dict[str, Any]:
         """Send SMS via Unifonic"""
         if not all([self.app_sid, self.auth_token]):
             raise Exception("Unifonic credentials not configured")
@@ -56,7 +59,7 @@ class SMSService:
         }
 
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = await self.http.request('unifonic', 'POST', url, json=data, headers=headers)
             response.raise_for_status()
             result = response.json()
 
@@ -67,14 +70,14 @@ class SMSService:
                 'provider': 'unifonic'
             }
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {
                 'success': False,
                 'error': str(e),
                 'provider': 'unifonic'
             }
 
-    def _send_twilio_sms(self, to: str, message: str) -> Dict[str, Any]:
+    async def _send_twilio_sms(self, to: str, message: str) -> Dict[str, Any]:
         """Send SMS via Twilio"""
         if not all([self.account_sid, self.auth_token, self.phone_number]):
             raise Exception("Twilio credentials not configured")
@@ -89,7 +92,7 @@ class SMSService:
         }
 
         try:
-            response = requests.post(url, data=data, auth=auth, timeout=30)
+            response = await self.http.request('twilio', 'POST', url, data=data, auth=auth)
             response.raise_for_status()
             result = response.json()
 
@@ -100,7 +103,7 @@ class SMSService:
                 'provider': 'twilio'
             }
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {
                 'success': False,
                 'error': str(e),
@@ -120,7 +123,7 @@ def get_sms_service() -> Optional[SMSService]:
     return None
 
 
-def send_order_sms(order_id: str, message: str) -> bool:
+async def send_order_sms(order_id: str, message: str) -> bool:
     """Send order-related SMS notification"""
     service = get_sms_service()
     if not service:
@@ -136,7 +139,7 @@ def send_order_sms(order_id: str, message: str) -> bool:
         # In production, this would query the database for customer phone
         phone_number = "+966500000000"  # Placeholder
 
-        result = service.send_sms(phone_number, message)
+        result = await service.send_sms(phone_number, message)
         return result.get('success', False)
 
     except Exception as e:
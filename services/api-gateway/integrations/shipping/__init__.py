@@ -8,10 +8,23 @@ Supports multiple shipping providers
 
 from .aramex import AramexClient, get_aramex_client
 from .smsa import SMSAClient, get_smsa_client
+from .rate_cache import CARRIER_ZONES, RateCacheConfig, RateQuoteCache, get_rate_cache
+from .rate_shopping import RateShopper, RateShoppingConfig, get_rate_shopper
+from .tracking import TrackingService, TrackingStore, get_tracking_service
 
 __all__ = [
     "AramexClient",
     "get_aramex_client",
     "SMSAClient",
     "get_smsa_client",
+    "CARRIER_ZONES",
+    "RateCacheConfig",
+    "RateQuoteCache",
+    "get_rate_cache",
+    "RateShopper",
+    "RateShoppingConfig",
+    "get_rate_shopper",
+    "TrackingService",
+    "TrackingStore",
+    "get_tracking_service",
 ]
\ No newline at end of file
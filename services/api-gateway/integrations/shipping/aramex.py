@@ -7,19 +7,22 @@ Handles shipment creation, tracking, and rate calculation with built-in fault to
 """
 
 import os
-import requests
-from typing import Dict, List, Optional, Any
+import httpx
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 
 # Import circuit breaker
+from .bulk import book_in_chunks
 from .circuit_breaker import ResilientAramexClient, get_circuit_monitor
+from ..http_pool import HTTPClientPool, get_http_pool
 
 
 class AramexClient:
     """Aramex API client for shipping operations"""
 
     def __init__(self, username: str, password: str, account_number: str,
-                 account_pin: str, account_entity: str, account_country_code: str):
+                 account_pin: str, account_entity: str, account_country_code: str,
+                 http_pool: Optional[HTTPClientPool] = None):
         self.username = username
         self.password = password
         self.account_number = account_number
@@ -30,6 +33,7 @@ class AramexClient:
         # Aramex API endpoints
         self.base_url = "https://ws.aramex.net/ShippingAPI.V2/Shipping/Service_1_0.svc/json"
         self.tracking_url = "https://ws.aramex.net/ShippingAPI.V2/Tracking/Service_1_0.svc/json"
+        self.http = http_pool or get_http_pool()
 
     def _get_auth_header(self) -> Dict[str, str]:
         """Get authentication header for API requests"""
@@ -42,8 +46,13 @@ class AramexClient:
             "AccountCountryCode": self.account_country_code
         }
 
-    def _make_request(self, endpoint: str, data: Dict) -> Dict:
-        """Make API request to Aramex"""
+    async def _make_request(self, endpoint: str, data: Dict, raise_on_errors: bool = True) -> Dict:
+        """
+        Make API request to Aramex
+
+        With raise_on_errors=False the response is returned even if it has
+        errors; bulk calls use this to read the errors per shipment.
+        """
         url = f"{self.base_url}/{endpoint}"
 
         payload = {
@@ -52,22 +61,22 @@ class AramexClient:
         }
 
         try:
-            response = requests.post(url, json=payload, timeout=30)
+            response = await self.http.request('aramex', 'POST', url, json=payload)
             response.raise_for_status()
             result = response.json()
 
             # Check for API errors
-            if result.get('HasErrors', False):
+            if raise_on_errors and result.get('HasErrors', False):
                 errors = result.get('Notifications', [])
                 error_messages = [err.get('Message', 'Unknown error') for err in errors]
                 raise Exception(f"Aramex API errors: {', '.join(error_messages)}")
 
             return result
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"Aramex API request failed: {str(e)}")
 
-    def get_rates(self, origin_country: str, origin_city: str,
+    async def get_rates(self, origin_country: str, origin_city: str,
                   destination_country: str, destination_city: str,
                   weight: float) -> List[Dict]:
         """Get shipping rates"""
@@ -86,7 +95,7 @@ class AramexClient:
             }
         }
 
-        result = self._make_request("CalculateRate", data)
+        result = await self._make_request("CalculateRate", data)
 
         if result.get('RateDetails', []):
             rates = []
@@ -102,10 +111,9 @@ class AramexClient:
 
         return []
 
-    def create_shipment(self, shipment_data: Dict) -> Dict:
-        """Create new shipment"""
-        # Prepare shipment details
-        shipment = {
+    def _build_shipment(self, shipment_data: Dict) -> Dict:
+        """Aramex shipment payload"""
+        return {
             "Shipper": {
                 "AccountNumber": self.account_number,
                 "PartyAddress": shipment_data.get('shipper_address', {}),
@@ -132,20 +140,81 @@ class AramexClient:
             "Reference3": shipment_data.get('reference3', '')
         }
 
-        result = self._make_request("CreateShipments", {"Shipments": [shipment]})
+    @staticmethod
+    def _shipment_result(shipment_result: Dict) -> Dict:
+        return {
+            'tracking_number': shipment_result.get('ID', ''),
+            'label_url': (shipment_result.get('ShipmentLabel') or {}).get('LabelURL', ''),
+            'has_errors': shipment_result.get('HasErrors', False),
+            'notifications': shipment_result.get('Notifications', [])
+        }
+
+    async def create_shipment(self, shipment_data: Dict) -> Dict:
+        """Create new shipment"""
+        shipment = self._build_shipment(shipment_data)
+        result = await self._make_request("CreateShipments", {"Shipments": [shipment]})
 
         if result.get('Shipments', []):
-            shipment_result = result['Shipments'][0]
-            return {
-                'tracking_number': shipment_result.get('ID', ''),
-                'label_url': shipment_result.get('ShipmentLabel', {}).get('LabelURL', ''),
-                'has_errors': shipment_result.get('HasErrors', False),
-                'notifications': shipment_result.get('Notifications', [])
-            }
+            return self._shipment_result(result['Shipments'][0])
 
         return {}
 
-    def track_shipment(self, tracking_number: str) -> Dict:
+    # CreateShipments takes an array; bigger batches are split into chunks of this size
+    max_shipments_per_request = 50
+    max_concurrent_requests = 4
+
+    @staticmethod
+    def check_bulk_references(batch: List[Dict]) -> None:
+        """Bulk results are matched back by reference1, so each shipment needs a unique one"""
+        references = [str(s.get('reference1') or '') for s in batch]
+        if not all(references):
+            raise ValueError("Every shipment in a bulk booking needs a reference1")
+        if len(set(references)) != len(references):
+            raise ValueError("reference1 must be unique within a bulk booking")
+
+    async def create_shipment_chunk(self, batch: List[Dict]) -> List[Dict]:
+        """Book up to max_shipments_per_request shipments in one CreateShipments call"""
+        self.check_bulk_references(batch)
+        result = await self._make_request(
+            "CreateShipments",
+            {"Shipments": [self._build_shipment(s) for s in batch]},
+            raise_on_errors=False
+        )
+        processed = result.get('Shipments') or []
+        if not processed and result.get('HasErrors', False):
+            messages = [n.get('Message', 'Unknown error') for n in result.get('Notifications', [])]
+            raise Exception(f"Aramex API errors: {', '.join(messages)}")
+
+        # Matched by reference, not position: the reply order is not guaranteed
+        by_reference = {str(r.get('Reference1') or ''): r for r in processed}
+        sent_references = {str(s['reference1']) for s in batch}
+        if len(processed) != len(batch) or set(by_reference) != sent_references:
+            raise Exception(
+                f"Aramex returned {len(processed)} shipments for {len(batch)} sent, "
+                "or unknown references; "
+                "check the carrier by reference before retrying"
+            )
+
+        booked = []
+        for shipment in batch:
+            details = self._shipment_result(by_reference[str(shipment['reference1'])])
+            if details['has_errors'] or not details['tracking_number']:
+                messages = [n.get('Message', 'Unknown error') for n in details['notifications']]
+                error = '; '.join(messages) or 'Shipment not created'
+                booked.append({'success': False, 'error': error, **details})
+            else:
+                booked.append({'success': True, **details})
+        return booked
+
+    async def create_shipments(self, batch: List[Dict]) -> List[Dict]:
+        """Book a dispatch batch; returns one result per shipment, in order"""
+        self.check_bulk_references(batch)
+        return await book_in_chunks(
+            batch, self.create_shipment_chunk,
+            self.max_shipments_per_request, self.max_concurrent_requests
+        )
+
+    async def track_shipment(self, tracking_number: str) -> Dict:
         """Track shipment by tracking number"""
         url = f"{self.tracking_url}/TrackShipments"
 
@@ -155,7 +224,7 @@ class AramexClient:
         }
 
         try:
-            response = requests.post(url, json=payload, timeout=30)
+            response = await self.http.request('aramex', 'POST', url, json=payload)
             response.raise_for_status()
             result = response.json()
 
@@ -176,9 +245,61 @@ class AramexClient:
 
             return {'tracking_number': tracking_number, 'status': 'Not found'}
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"Aramex tracking request failed: {str(e)}")
 
+    # TrackShipments takes an array of waybills
+    max_tracking_per_request = 50
+
+    @staticmethod
+    def _latest_update(tracking_result: Dict) -> Tuple[str, Dict, List[Dict]]:
+        """(waybill, newest update, all updates) of one TrackingResults entry"""
+        if 'Key' in tracking_result:
+            # {Key: waybill, Value: [updates, newest first]}
+            updates = tracking_result.get('Value') or []
+            return tracking_result['Key'], (updates[0] if updates else {}), updates
+        events = tracking_result.get('TrackingEvents', [])
+        return tracking_result.get('WaybillNumber', ''), tracking_result, events
+
+    async def track_shipment_chunk(self, batch: List[Dict]) -> List[Dict]:
+        """Track up to max_tracking_per_request waybills in one TrackShipments call"""
+        numbers = [item['tracking_number'] for item in batch]
+        try:
+            response = await self.http.request(
+                'aramex', 'POST', f"{self.tracking_url}/TrackShipments",
+                json={**self._get_auth_header(), "Shipments": numbers}
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise Exception(f"Aramex tracking request failed: {str(e)}")
+        result = response.json()
+
+        found = {}
+        for tracking_result in result.get('TrackingResults') or []:
+            number, latest, updates = self._latest_update(tracking_result)
+            found[str(number)] = {
+                'success': True,
+                'tracking_number': str(number),
+                'status': latest.get('UpdateDescription', 'Unknown'),
+                'location': latest.get('UpdateLocation', ''),
+                'timestamp': latest.get('UpdateDateTime', ''),
+                'events': updates
+            }
+        if not found and result.get('HasErrors', False):
+            messages = [n.get('Message', 'Unknown error') for n in result.get('Notifications', [])]
+            raise Exception(f"Aramex tracking errors: {', '.join(messages)}")
+        return [
+            found.get(number) or {'success': True, 'tracking_number': number, 'status': 'Not found'}
+            for number in numbers
+        ]
+
+    async def track_shipments(self, tracking_numbers: List[str]) -> List[Dict]:
+        """Track many waybills; returns one result per number, in order"""
+        return await book_in_chunks(
+            [{'tracking_number': number} for number in tracking_numbers],
+            self.track_shipment_chunk, self.max_tracking_per_request, self.max_concurrent_requests
+        )
+
 
 def get_aramex_client() -> Optional[ResilientAramexClient]:
     """Get configured resilient Aramex client with circuit breaker"""
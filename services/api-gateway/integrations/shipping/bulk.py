@@ -0,0 +1,75 @@
+"""
+
+Bulk Shipment Booking
+
+Shared by the carrier clients' bulk calls (create_shipments,
+track_shipments): splits a batch into chunks the carrier accepts per
+request, sends the chunks concurrently up to the carrier's limit and
+returns one result per item, in input order.
+
+A chunk whose request fails marks each of its shipments as failed with
+the error; the rest of the batch is unaffected. A failed request may have
+been partly booked by the carrier, so callers should check the carrier
+(by reference) before retrying those shipments.
+
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+ChunkBooker = Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]
+
+
+async def book_in_chunks(
+    shipments: List[Dict[str, Any]], book_chunk: ChunkBooker, chunk_size: int, concurrency: int
+) -> List[Dict[str, Any]]:
+    """
+    Book `shipments` with at most `concurrency` chunk requests in flight.
+
+    Args:
+        book_chunk: Books up to `chunk_size` shipments in one request and
+            returns one result per shipment, each with a 'success' flag
+
+    Returns:
+        One result per shipment: {'index', 'success', ...} with the carrier's
+        fields on success and 'error' on failure
+    """
+    chunk_size = max(1, chunk_size)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results: List[Dict[str, Any]] = [None] * len(shipments)
+
+    async def book(start: int) -> None:
+        chunk = shipments[start : start + chunk_size]
+        async with semaphore:
+            try:
+                booked = await book_chunk(chunk)
+                if len(booked) != len(chunk):
+                    raise ValueError(
+                        f"Carrier returned {len(booked)} results for {len(chunk)} shipments"
+                    )
+            except Exception as e:
+                logger.error(
+                    "Shipment chunk failed", start=start, shipments=len(chunk), error=str(e)
+                )
+                booked = [{"success": False, "error": str(e)} for _ in chunk]
+        for offset, result in enumerate(booked):
+            results[start + offset] = {"index": start + offset, **result}
+
+    await asyncio.gather(*(book(start) for start in range(0, len(shipments), chunk_size)))
+    return results
+
+
+def summarize(carrier: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totals for a bulk booking response"""
+    created = sum(1 for result in results if result.get("success"))
+    return {
+        "carrier": carrier,
+        "total": len(results),
+        "created": created,
+        "failed": len(results) - created,
+        "results": results,
+    }
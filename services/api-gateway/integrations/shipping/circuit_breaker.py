@@ -19,6 +19,8 @@ from typing import Callable, Any, Optional
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 
+from .bulk import book_in_chunks
+
 
 class CircuitBreakerState(Enum):
     CLOSED = "closed"
@@ -127,34 +129,39 @@ class AramexCircuitBreaker:
         )
         self.circuit_breaker = CircuitBreaker(config)
 
+    async def _call(self, method: Callable, *args) -> Any:
+        """Await async client methods directly; run blocking ones off the event loop"""
+        if asyncio.iscoroutinefunction(method):
+            return await self.circuit_breaker.call(method, *args)
+
+        async def _blocking():
+            return await asyncio.get_running_loop().run_in_executor(None, method, *args)
+
+        return await self.circuit_breaker.call(_blocking)
+
     async def create_shipment(self, aramex_client, shipment_data: dict) -> dict:
         """Create shipment with circuit breaker protection"""
-        async def _create_shipment():
-            return await asyncio.get_event_loop().run_in_executor(
-                None, aramex_client.create_shipment, shipment_data
-            )
+        return await self._call(aramex_client.create_shipment, shipment_data)
 
-        return await self.circuit_breaker.call(_create_shipment)
+    async def create_shipment_chunk(self, aramex_client, batch: list) -> list:
+        """Book one chunk of shipments with circuit breaker protection"""
+        return await self._call(aramex_client.create_shipment_chunk, batch)
 
     async def track_shipment(self, aramex_client, tracking_number: str) -> dict:
         """Track shipment with circuit breaker protection"""
-        async def _track_shipment():
-            return await asyncio.get_event_loop().run_in_executor(
-                None, aramex_client.track_shipment, tracking_number
-            )
+        return await self._call(aramex_client.track_shipment, tracking_number)
 
-        return await self.circuit_breaker.call(_track_shipment)
+    async def track_shipment_chunk(self, aramex_client, batch: list) -> list:
+        """Track one chunk of waybills with circuit breaker protection"""
+        return await self._call(aramex_client.track_shipment_chunk, batch)
 
     async def get_rates(self, aramex_client, origin_country: str, origin_city: str,
                        destination_country: str, destination_city: str, weight: float) -> list:
         """Get rates with circuit breaker protection"""
-        async def _get_rates():
-            return await asyncio.get_event_loop().run_in_executor(
-                None, aramex_client.get_rates,
-                origin_country, origin_city, destination_country, destination_city, weight
-            )
-
-        return await self.circuit_breaker.call(_get_rates)
+        return await self._call(
+            aramex_client.get_rates,
+            origin_country, origin_city, destination_country, destination_city, weight
+        )
 
     def get_status(self) -> dict:
         """Get circuit breaker status"""
@@ -195,6 +202,24 @@ class ResilientAramexClient:
                 "Circuit breaker is OPEN. Consider using SMSA as alternative."
             )
 
+    async def create_shipments(self, batch: list) -> list:
+        """
+        Book a dispatch batch; each chunk request goes through the breaker
+
+        Once the breaker opens, the remaining chunks fail fast and their
+        shipments are reported as failed instead of being sent.
+        """
+        self.aramex_client.check_bulk_references(batch)
+
+        async def book_chunk(chunk: list) -> list:
+            return await self.circuit_breaker.create_shipment_chunk(self.aramex_client, chunk)
+
+        return await book_in_chunks(
+            batch, book_chunk,
+            self.aramex_client.max_shipments_per_request,
+            self.aramex_client.max_concurrent_requests
+        )
+
     async def track_shipment(self, tracking_number: str) -> dict:
         """Track shipment with resilience"""
         try:
@@ -207,6 +232,17 @@ class ResilientAramexClient:
                 "Please try again later."
             )
 
+    async def track_shipments(self, tracking_numbers: list) -> list:
+        """Track many waybills; each chunk request goes through the breaker"""
+        async def track_chunk(chunk: list) -> list:
+            return await self.circuit_breaker.track_shipment_chunk(self.aramex_client, chunk)
+
+        return await book_in_chunks(
+            [{'tracking_number': number} for number in tracking_numbers], track_chunk,
+            self.aramex_client.max_tracking_per_request,
+            self.aramex_client.max_concurrent_requests
+        )
+
     async def get_rates(self, origin_country: str, origin_city: str,
                        destination_country: str, destination_city: str, weight: float) -> list:
         """Get rates with resilience"""
@@ -216,11 +252,11 @@ class ResilientAramexClient:
                 destination_country, destination_city, weight
             )
         except CircuitBreakerOpenException:
-            # Return cached/estimated rates or raise error
-            raise Exception(
+            # Kept as the breaker exception so the rate cache can answer with a stale quote
+            raise CircuitBreakerOpenException(
                 "Aramex rate calculation temporarily unavailable. "
-                "Using estimated rates."
-            )
+                "Circuit breaker is OPEN."
+            ) from None
 
     def get_circuit_status(self) -> dict:
         """Get circuit breaker status"""
@@ -0,0 +1,296 @@
+"""
+
+Shipping Rate Quote Cache
+
+Carrier rates for a lane barely move during the day, so quotes are cached
+per (carrier, origin, destination zone, weight bucket):
+
+- destinations are grouped into the carriers' pricing zones (CARRIER_ZONES);
+  an unknown city is its own zone
+- weights are rounded up to the next bucket and the carrier is quoted for
+  the bucket's upper bound, so a cached price is never below the real one
+- entries follow the ReadCache rules: fresh for `ttl`, served stale while
+  one background call refreshes them, and served stale while the
+  carrier's circuit breaker is open
+- lanes hit often enough are re-quoted in the background shortly before
+  their entry expires (`refresh_ahead`), and the whole zone table can be
+  pre-warmed at startup
+
+"""
+
+import asyncio
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+from ..ecommerce.read_cache import CachedRead, ReadCache, ReadCacheConfig
+from .circuit_breaker import CircuitBreakerOpenException
+
+logger = structlog.get_logger(__name__)
+
+# Carrier pricing zones; the first city of each zone stands in for it when pre-warming
+CARRIER_ZONES: Dict[str, Dict[str, str]] = {
+    "SA": {
+        "riyadh": "central",
+        "buraydah": "central",
+        "unaizah": "central",
+        "al kharj": "central",
+        "jeddah": "western",
+        "makkah": "western",
+        "mecca": "western",
+        "madinah": "western",
+        "medina": "western",
+        "taif": "western",
+        "yanbu": "western",
+        "rabigh": "western",
+        "dammam": "eastern",
+        "khobar": "eastern",
+        "al khobar": "eastern",
+        "dhahran": "eastern",
+        "jubail": "eastern",
+        "qatif": "eastern",
+        "hofuf": "eastern",
+        "al ahsa": "eastern",
+        "abha": "southern",
+        "khamis mushait": "southern",
+        "jazan": "southern",
+        "najran": "southern",
+        "al baha": "southern",
+        "bisha": "southern",
+        "tabuk": "northern",
+        "hail": "northern",
+        "sakaka": "northern",
+        "al jouf": "northern",
+        "arar": "northern",
+        "hafar al batin": "northern",
+    },
+    "AE": {
+        "dubai": "dubai",
+        "sharjah": "dubai",
+        "ajman": "dubai",
+        "abu dhabi": "abu dhabi",
+        "al ain": "abu dhabi",
+        "ras al khaimah": "northern emirates",
+        "fujairah": "northern emirates",
+    },
+    "KW": {"kuwait city": "kuwait"},
+    "BH": {"manama": "bahrain"},
+    "QA": {"doha": "qatar"},
+    "OM": {"muscat": "oman"},
+}
+
+RateKey = Tuple[str, str, str, float]  # carrier, origin, destination zone, weight bucket
+
+
+@dataclass
+class RateCacheConfig:
+    """Configuration for the shipping rate cache"""
+
+    ttl: float = 3600.0  # Seconds a quote is fresh
+    stale_while_revalidate: float = 3600.0  # Seconds a stale quote is served while refreshing
+    stale_if_error: float = 86400.0  # Seconds a stale quote stands in while the breaker is open
+    max_entries: int = 20_000
+    weight_step: float = 0.5  # Kg per weight bucket
+    hot_lane_hits: int = 5  # Hits during an entry's lifetime that make its lane hot
+    refresh_ahead: float = 300.0  # Seconds before expiry a hot lane is re-quoted
+    refresh_interval: float = 60.0  # Seconds between checks for lanes nearing expiry
+
+
+def _normalize(city: str) -> str:
+    return " ".join(city.lower().split())
+
+
+def destination_zone(
+    country: str, city: str, zones: Dict[str, Dict[str, str]] = CARRIER_ZONES
+) -> str:
+    """'SA', 'Jeddah' -> 'SA:western'; unknown cities are a zone of their own"""
+    country = country.upper()
+    city = _normalize(city)
+    return f"{country}:{zones.get(country, {}).get(city, city)}"
+
+
+def weight_bucket(weight: float, step: float) -> float:
+    """Upper bound of the bucket holding `weight`"""
+    return max(1, math.ceil(round(weight / step, 6))) * step
+
+
+class RateQuoteCache:
+    """
+    ذاكرة أسعار الشحن
+    Zone and weight-bucketed rate cache shared by all carriers
+    """
+
+    def __init__(
+        self, config: RateCacheConfig = None, zones: Dict[str, Dict[str, str]] = CARRIER_ZONES
+    ):
+        self.config = config or RateCacheConfig()
+        self.zones = zones
+        self.cache = ReadCache(
+            ReadCacheConfig(
+                ttl=self.config.ttl,
+                stale_while_revalidate=self.config.stale_while_revalidate,
+                stale_if_error=self.config.stale_if_error,
+                max_entries=self.config.max_entries,
+            )
+        )
+        # Lanes read since their entry was loaded: key -> [hits, carrier client, request args]
+        self._lanes: Dict[RateKey, List[Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {"hot_refreshes": 0, "refresh_failures": 0, "prewarmed": 0}
+
+    def key(
+        self,
+        carrier: str,
+        origin_country: str,
+        origin_city: str,
+        destination_country: str,
+        destination_city: str,
+        weight: float,
+    ) -> RateKey:
+        return (
+            carrier,
+            f"{origin_country.upper()}:{_normalize(origin_city)}",
+            destination_zone(destination_country, destination_city, self.zones),
+            weight_bucket(weight, self.config.weight_step),
+        )
+
+    @staticmethod
+    def _fetcher(client: Any, args: Tuple[str, str, str, str, float]):
+        async def fetch():
+            return await client.get_rates(*args)
+
+        return fetch
+
+    async def get_rates(
+        self,
+        carrier: str,
+        client: Any,
+        origin_country: str,
+        origin_city: str,
+        destination_country: str,
+        destination_city: str,
+        weight: float,
+    ) -> CachedRead:
+        """Rates for the lane, quoted upstream only when the cache cannot answer"""
+        key = self.key(
+            carrier, origin_country, origin_city, destination_country, destination_city, weight
+        )
+        args = (origin_country, origin_city, destination_country, destination_city, key[3])
+
+        lane = self._lanes.get(key)
+        if lane is not None:
+            lane[0] += 1
+        elif len(self._lanes) < self.config.max_entries:
+            self._lanes[key] = [1, client, args]
+        return await self.cache.get(
+            key, self._fetcher(client, args), unavailable=(CircuitBreakerOpenException,)
+        )
+
+    async def refresh_hot_lanes(self) -> int:
+        """
+        Re-quote hot lanes whose entry is within `refresh_ahead` of expiry.
+
+        Every lane whose entry is that close (or gone) leaves tracking, so
+        its hit count restarts; lanes further from expiry keep counting.
+        """
+        due = self.config.ttl - self.config.refresh_ahead
+        hot = []
+        for key, (hits, client, args) in list(self._lanes.items()):
+            age = self.cache.age(key)
+            if age is not None and age < due:
+                continue
+            del self._lanes[key]
+            if hits >= self.config.hot_lane_hits:
+                hot.append((key, client, args))
+
+        async def refresh(key, client, args):
+            try:
+                await self.cache.refresh(key, self._fetcher(client, args))
+                return True
+            except Exception as e:
+                self.metrics["refresh_failures"] += 1
+                logger.warning("Hot lane refresh failed", lane=str(key), error=str(e))
+                return False
+
+        refreshed = sum(await asyncio.gather(*(refresh(*lane) for lane in hot)))
+        self.metrics["hot_refreshes"] += refreshed
+        return refreshed
+
+    async def prewarm(
+        self,
+        carriers: Dict[str, Any],
+        origin_country: str,
+        origin_city: str,
+        weights: Iterable[float] = (0.5, 1.0, 2.0, 5.0),
+        countries: Optional[Iterable[str]] = None,
+        concurrency: int = 4,
+    ) -> int:
+        """
+        Quote every zone of the zone table once per carrier and weight.
+
+        Returns the number of lanes loaded; failures are logged and skipped.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        lanes = []
+        for country in countries or self.zones:
+            representatives: Dict[str, str] = {}
+            for city, zone in self.zones.get(country, {}).items():
+                representatives.setdefault(zone, city)
+            for carrier, client in carriers.items():
+                for city in representatives.values():
+                    for weight in weights:
+                        lanes.append(
+                            (carrier, client, (origin_country, origin_city, country, city, weight))
+                        )
+
+        async def load(carrier, client, args):
+            key = self.key(carrier, *args)
+            async with semaphore:
+                try:
+                    await self.cache.refresh(key, self._fetcher(client, args[:4] + (key[3],)))
+                    return True
+                except Exception as e:
+                    logger.warning("Rate pre-warm failed", lane=str(key), error=str(e))
+                    return False
+
+        loaded = sum(await asyncio.gather(*(load(*lane) for lane in lanes)))
+        self.metrics["prewarmed"] += loaded
+        return loaded
+
+    async def _worker(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.refresh_interval)
+            await self.refresh_hot_lanes()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.cache.close()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            **self.cache.get_status(),
+            **self.metrics,
+            "tracked_lanes": len(self._lanes),
+            "running": self._task is not None,
+        }
+
+
+# Global instance
+_rate_cache: Optional[RateQuoteCache] = None
+
+
+def get_rate_cache() -> RateQuoteCache:
+    """Get the process-wide rate quote cache"""
+    global _rate_cache
+    if _rate_cache is None:
+        _rate_cache = RateQuoteCache()
+    return _rate_cache
@@ -0,0 +1,286 @@
+"""
+
+Multi-Carrier Rate Shopping
+
+Queries every configured carrier for rates at the same time and returns
+what arrived before a global deadline, ranked by cost or delivery time.
+Checkout latency becomes that of the slowest carrier within the deadline
+rather than the sum of all carriers.
+
+A carrier that is still silent after its own p95 latency gets a second,
+hedged request; whichever answer comes first is used and the other is
+cancelled. Rate requests are read-only, so duplicates are harmless.
+
+With a RateQuoteCache in front, only cache misses reach the carriers. A
+miss cut off by the deadline keeps loading in the background, so the next
+checkout on that lane is answered from the cache.
+
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import structlog
+
+from .aramex import get_aramex_client
+from .rate_cache import RateQuoteCache, get_rate_cache
+from .smsa import get_smsa_client
+
+logger = structlog.get_logger(__name__)
+
+RateArgs = Tuple[str, str, str, str, float]
+
+
+@dataclass
+class RateShoppingConfig:
+    """Configuration for concurrent rate quoting"""
+
+    deadline: float = 2.5  # Seconds before the quote returns with whatever arrived
+    hedge: bool = True
+    hedge_percentile: float = 0.95  # Latency percentile after which a carrier is hedged
+    hedge_min_samples: int = 20  # No hedging until the percentile is meaningful
+    min_hedge_delay: float = 0.05  # Seconds; keeps a fast carrier from being hedged on noise
+    latency_window: int = 200  # Recent successful calls kept per carrier
+    sort_by: str = "cost"  # 'cost' or 'eta'
+
+
+class LatencyTracker:
+    """Rolling window of one carrier's successful response times"""
+
+    def __init__(self, window: int):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, math.ceil(p * len(ordered)) - 1)]
+
+
+def rank_rates(rates: List[Dict[str, Any]], sort_by: str = "cost") -> List[Dict[str, Any]]:
+    """Cheapest first (ties by ETA), or fastest first with sort_by='eta'"""
+
+    def cost(rate):
+        return float(rate.get("cost", math.inf))
+
+    def eta(rate):
+        return float(rate.get("estimated_days", math.inf))
+
+    if sort_by == "eta":
+        return sorted(rates, key=lambda r: (eta(r), cost(r)))
+    return sorted(rates, key=lambda r: (cost(r), eta(r)))
+
+
+class _HedgedCarrier:
+    """One carrier as seen by the rate cache: get_rates with hedging"""
+
+    def __init__(self, shopper: "RateShopper", carrier: str):
+        self.shopper = shopper
+        self.carrier = carrier
+
+    async def get_rates(self, *args) -> List[Dict[str, Any]]:
+        return await self.shopper._quote_carrier(self.carrier, args)
+
+
+class RateShopper:
+    """
+    مقارنة أسعار الشحن
+    Concurrent rate quotes across carriers with a deadline and hedging
+    """
+
+    def __init__(
+        self,
+        carriers: Dict[str, Any],
+        config: RateShoppingConfig = None,
+        cache: Optional[RateQuoteCache] = None,
+    ):
+        """
+        Args:
+            carriers: Carrier name -> client exposing async get_rates(origin_country,
+                origin_city, destination_country, destination_city, weight)
+            cache: Optional rate cache consulted before any carrier is called
+        """
+        self.carriers = carriers
+        self.config = config or RateShoppingConfig()
+        self.cache = cache
+        self._hedged = {name: _HedgedCarrier(self, name) for name in carriers}
+        self.latency = {name: LatencyTracker(self.config.latency_window) for name in carriers}
+        self.metrics = {
+            name: {"requests": 0, "errors": 0, "timeouts": 0, "hedges": 0, "hedge_wins": 0}
+            for name in carriers
+        }
+
+    def _hedge_delay(self, carrier: str) -> Optional[float]:
+        tracker = self.latency[carrier]
+        if not self.config.hedge or len(tracker.samples) < self.config.hedge_min_samples:
+            return None
+        return max(self.config.min_hedge_delay, tracker.percentile(self.config.hedge_percentile))
+
+    async def _attempt(self, carrier: str, args: RateArgs) -> List[Dict[str, Any]]:
+        self.metrics[carrier]["requests"] += 1
+        started = time.perf_counter()
+        rates = await self.carriers[carrier].get_rates(*args)
+        self.latency[carrier].record(time.perf_counter() - started)
+        return rates
+
+    async def _quote_carrier(self, carrier: str, args: RateArgs) -> List[Dict[str, Any]]:
+        """First successful answer from the primary request or its hedge"""
+        delay = self._hedge_delay(carrier)
+        primary = asyncio.ensure_future(self._attempt(carrier, args))
+        attempts = [primary]
+        hedged = False
+        try:
+            while True:
+                done, _ = await asyncio.wait(
+                    attempts, timeout=None if hedged else delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Slower than this carrier usually is: race a second request
+                    hedged = True
+                    self.metrics[carrier]["hedges"] += 1
+                    attempts.append(asyncio.ensure_future(self._attempt(carrier, args)))
+                    continue
+
+                error = None
+                for task in done:
+                    attempts.remove(task)
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.metrics[carrier]["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+                if not attempts:
+                    raise error
+                # One attempt failed; the other may still answer, so stop hedging
+                hedged = True
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    async def _quote_lane(self, carrier: str, args: RateArgs) -> List[Dict[str, Any]]:
+        if self.cache is None:
+            return await self._quote_carrier(carrier, args)
+        read = await self.cache.get_rates(carrier, self._hedged[carrier], *args)
+        # Copies, so annotating a response never touches the cached quote
+        return [
+            {**rate, "cached": read.source == "cache", "stale": read.stale}
+            for rate in read.value or []
+        ]
+
+    async def prewarm(self, origin_country: str, origin_city: str, **kwargs) -> int:
+        """Load the cache for every zone of its zone table; see RateQuoteCache.prewarm"""
+        if self.cache is None:
+            return 0
+        return await self.cache.prewarm(self._hedged, origin_country, origin_city, **kwargs)
+
+    async def quote(
+        self,
+        origin_country: str,
+        origin_city: str,
+        destination_country: str,
+        destination_city: str,
+        weight: float,
+        deadline: Optional[float] = None,
+        sort_by: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Quote all carriers concurrently.
+
+        Returns:
+            rates: Ranked rates from every carrier that answered in time
+            carriers: Per carrier 'ok', 'error' or 'timeout', with latency
+        """
+        args = (origin_country, origin_city, destination_country, destination_city, weight)
+        deadline = self.config.deadline if deadline is None else deadline
+        started = time.perf_counter()
+
+        tasks = {
+            asyncio.ensure_future(self._quote_lane(carrier, args)): carrier
+            for carrier in self.carriers
+        }
+        finished: Dict[str, float] = {}
+        for task in tasks:
+            task.add_done_callback(lambda t: finished.setdefault(tasks[t], time.perf_counter()))
+
+        pending = set()
+        try:
+            if tasks:
+                _, pending = await asyncio.wait(tasks, timeout=deadline)
+        finally:
+            # Late carriers are dropped, also when the caller itself gives up
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        rates: List[Dict[str, Any]] = []
+        carriers: Dict[str, Dict[str, Any]] = {}
+        for task, carrier in tasks.items():
+            if task in pending:
+                self.metrics[carrier]["timeouts"] += 1
+                carriers[carrier] = {"status": "timeout"}
+                continue
+            latency_ms = round((finished[carrier] - started) * 1000, 1)
+            if task.exception() is not None:
+                self.metrics[carrier]["errors"] += 1
+                logger.warning(
+                    "Carrier rate quote failed", carrier=carrier, error=str(task.exception())
+                )
+                carriers[carrier] = {
+                    "status": "error",
+                    "error": str(task.exception()),
+                    "latency_ms": latency_ms,
+                }
+                continue
+            carrier_rates = task.result() or []
+            rates.extend(carrier_rates)
+            carriers[carrier] = {
+                "status": "ok",
+                "rates": len(carrier_rates),
+                "latency_ms": latency_ms,
+            }
+
+        return {
+            "rates": rank_rates(rates, sort_by or self.config.sort_by),
+            "carriers": carriers,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        status = {}
+        for carrier, tracker in self.latency.items():
+            p50 = tracker.percentile(0.5)
+            p95 = tracker.percentile(self.config.hedge_percentile)
+            hedge_delay = self._hedge_delay(carrier)
+            status[carrier] = {
+                **self.metrics[carrier],
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "hedge_delay_ms": round(hedge_delay * 1000, 1) if hedge_delay is not None else None,
+            }
+        return {
+            "deadline": self.config.deadline,
+            "carriers": status,
+            "cache": self.cache.get_status() if self.cache is not None else None,
+        }
+
+
+# Global instance
+_rate_shopper: Optional[RateShopper] = None
+
+
+def get_rate_shopper() -> RateShopper:
+    """Cached rate shopper over every configured carrier; keeps latency history per process"""
+    global _rate_shopper
+    if _rate_shopper is None:
+        carriers = {"aramex": get_aramex_client(), "smsa": get_smsa_client()}
+        _rate_shopper = RateShopper(
+            {name: client for name, client in carriers.items() if client}, cache=get_rate_cache()
+        )
+    return _rate_shopper
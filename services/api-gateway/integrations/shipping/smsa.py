@@ -7,15 +7,19 @@ Handles shipment creation, tracking, and rate calculation via SOAP API
 """
 
 import os
-import requests
+import httpx
 from typing import Dict, List, Optional, Any
 from xml.etree import ElementTree as ET
 
+from ..http_pool import HTTPClientPool, get_http_pool
+from .bulk import book_in_chunks
+
 
 class SMSAClient:
     """SMSA API client for shipping operations"""
 
-    def __init__(self, username: str, password: str, account_number: str, passkey: str):
+    def __init__(self, username: str, password: str, account_number: str, passkey: str,
+                 http_pool: Optional[HTTPClientPool] = None):
         self.username = username
         self.password = password
         self.account_number = account_number
@@ -23,8 +27,9 @@ class SMSAClient:
 
         # SMSA API endpoints
         self.base_url = "http://track.smsaexpress.com/SeCom/SMSAwebService.asmx"
+        self.http = http_pool or get_http_pool()
 
-    def _make_soap_request(self, action: str, soap_body: str) -> str:
+    async def _make_soap_request(self, action: str, soap_body: str) -> str:
         """Make SOAP request to SMSA"""
         headers = {
             'Content-Type': 'text/xml; charset=utf-8',
@@ -41,10 +46,13 @@ class SMSAClient:
 </soap:Envelope>"""
 
         try:
-            response = requests.post(self.base_url, data=soap_envelope, headers=headers, timeout=30)
+            response = await self.http.request(
+                'smsa', 'POST', self.base_url,
+                content=soap_envelope.encode('utf-8'), headers=headers
+            )
             response.raise_for_status()
             return response.text
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"SMSA API request failed: {str(e)}")
 
     def _parse_soap_response(self, response_xml: str, result_tag: str) -> Optional[str]:
@@ -57,7 +65,7 @@ class SMSAClient:
         except ET.ParseError:
             return None
 
-    def get_rates(self, origin_country: str, origin_city: str,
+    async def get_rates(self, origin_country: str, origin_city: str,
                   destination_country: str, destination_city: str,
                   weight: float) -> List[Dict]:
         """Get shipping rates - SMSA doesn't have public rate API, return estimated rates"""
@@ -73,7 +81,7 @@ class SMSAClient:
             'estimated_days': 2 if origin_country == destination_country else 5
         }]
 
-    def create_shipment(self, shipment_data: Dict) -> Dict:
+    async def create_shipment(self, shipment_data: Dict) -> Dict:
         """Create new shipment via SMSA SOAP API"""
         soap_body = f"""
 <addShipment>
@@ -114,7 +122,7 @@ class SMSAClient:
   <gpsPoints>{shipment_data.get('gps_points', '')}</gpsPoints>
 </addShipment>"""
 
-        response_xml = self._make_soap_request('addShipment', soap_body)
+        response_xml = await self._make_soap_request('addShipment', soap_body)
         awb_no = self._parse_soap_response(response_xml, 'awbNo')
 
         if awb_no:
@@ -127,7 +135,17 @@ class SMSAClient:
             error_msg = self._parse_soap_response(response_xml, 'error')
             raise Exception(f"SMSA shipment creation failed: {error_msg or 'Unknown error'}")
 
-    def track_shipment(self, tracking_number: str) -> Dict:
+    # addShipment books one parcel per call, so a batch is sent as concurrent single calls
+    max_concurrent_requests = 8
+
+    async def create_shipments(self, batch: List[Dict]) -> List[Dict]:
+        """Book a dispatch batch; returns one result per shipment, in order"""
+        async def book_one(chunk: List[Dict]) -> List[Dict]:
+            return [{'success': True, **await self.create_shipment(chunk[0])}]
+
+        return await book_in_chunks(batch, book_one, 1, self.max_concurrent_requests)
+
+    async def track_shipment(self, tracking_number: str) -> Dict:
         """Track shipment by AWB number"""
         soap_body = f"""
 <getTracking>
@@ -135,7 +153,7 @@ class SMSAClient:
   <awbNo>{tracking_number}</awbNo>
 </getTracking>"""
 
-        response_xml = self._make_soap_request('getTracking', soap_body)
+        response_xml = await self._make_soap_request('getTracking', soap_body)
 
         # Parse tracking response
         try:
@@ -170,6 +188,21 @@ class SMSAClient:
                 'provider': 'smsa'
             }
 
+    async def track_shipments(self, tracking_numbers: List[str]) -> List[Dict]:
+        """Track many AWBs as concurrent getTracking calls; one result per number, in order"""
+        async def track_one(chunk: List[Dict]) -> List[Dict]:
+            result = await self.track_shipment(chunk[0]['tracking_number'])
+            if result['status'] == 'Parse error':
+                # A garbled reply says nothing about the parcel: report a failed poll, not a status
+                error = 'SMSA tracking response could not be parsed'
+                return [{'success': False, 'error': error, **result}]
+            return [{'success': True, **result}]
+
+        return await book_in_chunks(
+            [{'tracking_number': number} for number in tracking_numbers],
+            track_one, 1, self.max_concurrent_requests
+        )
+
 
 def get_smsa_client() -> Optional[SMSAClient]:
     """Get configured SMSA client"""
@@ -0,0 +1,636 @@
+"""
+
+Shipment Tracking Service
+
+Keeps the set of active waybills in a local SQLite store and polls the
+carriers in the background, so tracking reads never wait on a carrier.
+
+- Due waybills are polled per carrier in batched requests
+  (track_shipments packs as many numbers per call as the carrier allows).
+- The schedule adapts to where a parcel is: rare while it is in transit,
+  frequent once it is out for delivery or its expected delivery is near.
+  Delivered and returned parcels leave the active set, as do waybills the
+  carrier still does not know after a grace period.
+- Every status change is stored as a transition and handed to the change
+  listeners in one list per poll.
+
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+from .aramex import get_aramex_client
+from .smsa import get_smsa_client
+
+logger = structlog.get_logger(__name__)
+
+TERMINAL_STATUSES = ("delivered", "returned")
+
+# Checked in order; the first keyword found in the carrier's description wins
+STATUS_KEYWORDS = (
+    ("returned", ("returned to shipper", "return to origin", "returned")),
+    (
+        "exception",
+        ("not delivered", "undelivered", "failed", "exception", "on hold", "refused", "damaged"),
+    ),
+    ("delivered", ("delivered", "proof of delivery")),
+    ("out_for_delivery", ("out for delivery", "with delivery courier", "out with courier")),
+    (
+        "in_transit",
+        (
+            "transit",
+            "picked up",
+            "collected",
+            "departed",
+            "arrived",
+            "received at",
+            "processed",
+            "forwarded",
+            "shipment received",
+        ),
+    ),
+    ("created", ("created", "record created", "data received")),
+)
+
+
+def is_not_found(result: Dict[str, Any]) -> bool:
+    """The carrier answered but does not know the waybill"""
+    return str(result.get("status") or "").strip().lower() == "not found"
+
+
+def normalize_status(description: Optional[str]) -> str:
+    """Carrier wording -> created/in_transit/out_for_delivery/delivered/exception/returned"""
+    text = (description or "").lower()
+    for status, keywords in STATUS_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return status
+    return "in_transit" if text and text != "unknown" else "created"
+
+
+@dataclass
+class TrackingScheduleConfig:
+    """Seconds between polls of one waybill, by situation"""
+
+    created: float = 4 * 3600  # Waiting for pickup
+    in_transit: float = 6 * 3600
+    near_delivery: float = 3600  # Within near_delivery_window of the expected delivery
+    near_delivery_window: float = 24 * 3600
+    out_for_delivery: float = 900
+    exception: float = 3600
+    error_retry: float = 1800  # After a failed carrier request
+    default_transit_days: float = 3.0  # Expected delivery when none is given
+    max_age_days: float = 30.0  # Waybills still open after this stop being polled
+    not_found_grace: float = (
+        2 * 86400
+    )  # A booked waybill the carrier still does not know is dropped after this
+
+
+@dataclass
+class TrackingChange:
+    """A waybill moved to a new status"""
+
+    tracking_number: str
+    carrier: str
+    old_status: Optional[str]
+    new_status: str
+    description: str
+    location: str
+    carrier_time: str
+    recorded_at: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class TrackingStore:
+    """
+    Active waybills and their status history in a local SQLite file.
+
+    Same setup as the webhook queue: WAL with synchronous=NORMAL, one
+    connection guarded by a lock and called from worker threads.
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS shipments (
+                tracking_number TEXT PRIMARY KEY,
+                carrier TEXT NOT NULL,
+                reference TEXT,
+                status TEXT NOT NULL DEFAULT 'created',
+                description TEXT NOT NULL DEFAULT '',
+                location TEXT NOT NULL DEFAULT '',
+                carrier_time TEXT NOT NULL DEFAULT '',
+                registered_at REAL NOT NULL,
+                expected_delivery REAL NOT NULL,
+                last_polled_at REAL,
+                next_poll_at REAL NOT NULL,
+                active INTEGER NOT NULL DEFAULT 1,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS shipments_due ON shipments (active, next_poll_at);
+            CREATE TABLE IF NOT EXISTS shipment_transitions (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                tracking_number TEXT NOT NULL,
+                old_status TEXT,
+                new_status TEXT NOT NULL,
+                description TEXT NOT NULL,
+                location TEXT NOT NULL,
+                carrier_time TEXT NOT NULL,
+                recorded_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS transitions_by_number
+                ON shipment_transitions (tracking_number, seq);
+        """
+        )
+        self._db.commit()
+
+    def register(
+        self,
+        tracking_number: str,
+        carrier: str,
+        expected_delivery: float,
+        reference: Optional[str] = None,
+    ) -> bool:
+        """Start tracking a waybill; returns False if it is already known"""
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO shipments (tracking_number, carrier, reference, "
+                "registered_at, expected_delivery, next_poll_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (tracking_number, carrier, reference, now, expected_delivery, now),
+            )
+            self._db.commit()
+            return cursor.rowcount == 1
+
+    def due(self, now: float, limit: int) -> List[Dict[str, Any]]:
+        """Active waybills whose next poll is due, most overdue first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT tracking_number, carrier, status, registered_at, expected_delivery "
+                "FROM shipments WHERE active = 1 AND next_poll_at <= ? "
+                "ORDER BY next_poll_at LIMIT ?",
+                (now, limit),
+            ).fetchall()
+        return [
+            {
+                "tracking_number": r[0],
+                "carrier": r[1],
+                "status": r[2],
+                "registered_at": r[3],
+                "expected_delivery": r[4],
+            }
+            for r in rows
+        ]
+
+    def next_due_at(self) -> Optional[float]:
+        with self._lock:
+            (next_at,) = self._db.execute(
+                "SELECT MIN(next_poll_at) FROM shipments WHERE active = 1"
+            ).fetchone()
+        return next_at
+
+    def record_polls(
+        self,
+        updates: List[Dict[str, Any]],
+        failures: List[Dict[str, Any]],
+        changes: List[TrackingChange],
+    ) -> None:
+        """Store poll outcomes and the transitions they caused in one transaction"""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE shipments SET status = ?, description = ?, location = ?, carrier_time = ?, "
+                "last_polled_at = ?, next_poll_at = ?, active = ?, last_error = NULL "
+                "WHERE tracking_number = ?",
+                [
+                    (
+                        u["status"],
+                        u["description"],
+                        u["location"],
+                        u["carrier_time"],
+                        now,
+                        u["next_poll_at"],
+                        int(u["active"]),
+                        u["tracking_number"],
+                    )
+                    for u in updates
+                ],
+            )
+            # Failed polls keep the last known state and are retried later
+            self._db.executemany(
+                "UPDATE shipments SET last_polled_at = ?, next_poll_at = ?, last_error = ?, "
+                "active = ? WHERE tracking_number = ?",
+                [
+                    (
+                        now,
+                        f["next_poll_at"],
+                        f["error"],
+                        int(f.get("active", True)),
+                        f["tracking_number"],
+                    )
+                    for f in failures
+                ],
+            )
+            self._db.executemany(
+                "INSERT INTO shipment_transitions (tracking_number, old_status, new_status, "
+                "description, location, carrier_time, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        c.tracking_number,
+                        c.old_status,
+                        c.new_status,
+                        c.description,
+                        c.location,
+                        c.carrier_time,
+                        c.recorded_at,
+                    )
+                    for c in changes
+                ],
+            )
+            self._db.commit()
+
+    def get(self, tracking_number: str) -> Optional[Dict[str, Any]]:
+        """Current state and status history of one waybill"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT tracking_number, carrier, reference, status, description, location, "
+                "carrier_time, registered_at, expected_delivery, last_polled_at, next_poll_at, "
+                "active, last_error FROM shipments WHERE tracking_number = ?",
+                (tracking_number,),
+            ).fetchone()
+            if row is None:
+                return None
+            history = self._db.execute(
+                "SELECT old_status, new_status, description, location, carrier_time, recorded_at "
+                "FROM shipment_transitions WHERE tracking_number = ? ORDER BY seq",
+                (tracking_number,),
+            ).fetchall()
+        keys = (
+            "tracking_number",
+            "carrier",
+            "reference",
+            "status",
+            "description",
+            "location",
+            "carrier_time",
+            "registered_at",
+            "expected_delivery",
+            "last_polled_at",
+            "next_poll_at",
+            "active",
+            "last_error",
+        )
+        shipment = dict(zip(keys, row))
+        shipment["active"] = bool(shipment["active"])
+        shipment["history"] = [
+            dict(
+                zip(
+                    (
+                        "old_status",
+                        "new_status",
+                        "description",
+                        "location",
+                        "carrier_time",
+                        "recorded_at",
+                    ),
+                    h,
+                )
+            )
+            for h in history
+        ]
+        return shipment
+
+    def counts(self) -> Dict[str, int]:
+        """Active waybills per status"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) FROM shipments WHERE active = 1 GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+ChangeListener = Callable[[List[TrackingChange]], Awaitable[None]]
+
+
+class TrackingService:
+    """
+    تتبع الشحنات
+    Batched, adaptively scheduled carrier polling into local state
+    """
+
+    def __init__(
+        self,
+        carriers: Dict[str, Any],
+        store: TrackingStore,
+        config: TrackingScheduleConfig = None,
+        batch_size: int = 500,
+        max_idle: float = 60.0,
+    ):
+        """
+        Args:
+            carriers: Carrier name -> client exposing async track_shipments(numbers)
+            batch_size: Waybills claimed per poll across all carriers
+            max_idle: Longest sleep between checks for due waybills
+        """
+        self.carriers = carriers
+        self.store = store
+        self.config = config or TrackingScheduleConfig()
+        self.batch_size = batch_size
+        self.max_idle = max_idle
+        self.listeners: List[ChangeListener] = []
+        self.metrics = {"polls": 0, "polled": 0, "requests": 0, "changes": 0, "errors": 0}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._poll_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Call `listener` with the status changes found by each poll"""
+        self.listeners.append(listener)
+
+    def next_poll_delay(self, status: str, expected_delivery: float, now: float) -> Optional[float]:
+        """Seconds until the next poll, or None when the waybill needs no more polling"""
+        schedule = self.config
+        if status in TERMINAL_STATUSES:
+            return None
+        if status == "out_for_delivery":
+            return schedule.out_for_delivery
+        if status == "exception":
+            return schedule.exception
+        if expected_delivery - now <= schedule.near_delivery_window:
+            return schedule.near_delivery
+        if status == "created":
+            return schedule.created
+        return schedule.in_transit
+
+    async def track(
+        self,
+        tracking_number: str,
+        carrier: str,
+        expected_delivery: Optional[float] = None,
+        reference: Optional[str] = None,
+    ) -> bool:
+        """Add a waybill to the active set; it is polled on the next pass"""
+        if carrier not in self.carriers:
+            raise ValueError(f"Carrier '{carrier}' not configured for tracking")
+        if expected_delivery is None:
+            expected_delivery = time.time() + self.config.default_transit_days * 86400
+        added = await asyncio.to_thread(
+            self.store.register, tracking_number, carrier, expected_delivery, reference
+        )
+        if added and self._wakeup is not None:
+            self._wakeup.set()
+        return added
+
+    async def get(self, tracking_number: str) -> Optional[Dict[str, Any]]:
+        """Local state of a waybill, without calling the carrier"""
+        return await asyncio.to_thread(self.store.get, tracking_number)
+
+    async def poll_due(self) -> int:
+        """Poll every due waybill (up to batch_size); returns how many were polled"""
+        if self._poll_lock is None:
+            self._poll_lock = asyncio.Lock()
+        async with self._poll_lock:
+            now = time.time()
+            due = await asyncio.to_thread(self.store.due, now, self.batch_size)
+            if not due:
+                return 0
+
+            by_carrier: Dict[str, List[Dict[str, Any]]] = {}
+            for shipment in due:
+                by_carrier.setdefault(shipment["carrier"], []).append(shipment)
+            outcomes = await asyncio.gather(
+                *(
+                    self._poll_carrier(carrier, shipments, now)
+                    for carrier, shipments in by_carrier.items()
+                )
+            )
+
+            updates = [u for carrier_updates, _, _ in outcomes for u in carrier_updates]
+            failures = [f for _, carrier_failures, _ in outcomes for f in carrier_failures]
+            changes = [c for _, _, carrier_changes in outcomes for c in carrier_changes]
+            await asyncio.to_thread(self.store.record_polls, updates, failures, changes)
+
+        self.metrics["polls"] += 1
+        self.metrics["polled"] += len(due)
+        self.metrics["changes"] += len(changes)
+        if changes:
+            await self._emit(changes)
+        return len(due)
+
+    async def _poll_carrier(self, carrier: str, shipments: List[Dict[str, Any]], now: float):
+        client = self.carriers.get(carrier)
+        numbers = [s["tracking_number"] for s in shipments]
+        if client is None:
+            results = [
+                {"success": False, "error": f"Carrier '{carrier}' not configured"} for _ in numbers
+            ]
+        else:
+            self.metrics["requests"] += 1
+            try:
+                results = await client.track_shipments(numbers)
+            except Exception as e:
+                results = [{"success": False, "error": str(e)} for _ in numbers]
+
+        updates, failures, changes = [], [], []
+        for shipment, result in zip(shipments, results):
+            self._apply_result(carrier, shipment, result, now, updates, failures, changes)
+        return updates, failures, changes
+
+    def _apply_result(
+        self,
+        carrier: str,
+        shipment: Dict[str, Any],
+        result: Dict[str, Any],
+        now: float,
+        updates: List[Dict[str, Any]],
+        failures: List[Dict[str, Any]],
+        changes: List[TrackingChange],
+    ) -> None:
+        """Turn one carrier result into a state update, a failure or a drop"""
+        number = shipment["tracking_number"]
+        if not result.get("success") or is_not_found(result):
+            error = result.get("error") or (
+                "Not found" if is_not_found(result) else "Tracking failed"
+            )
+            if (
+                is_not_found(result)
+                and now - shipment["registered_at"] > self.config.not_found_grace
+            ):
+                # Never appeared at the carrier: stop polling it
+                logger.warning(
+                    "Dropping waybill unknown to carrier", carrier=carrier, tracking_number=number
+                )
+                failures.append(
+                    {
+                        "tracking_number": number,
+                        "next_poll_at": now,
+                        "error": error,
+                        "active": False,
+                    }
+                )
+                return
+            self.metrics["errors"] += 1
+            logger.warning(
+                "Tracking poll failed", carrier=carrier, tracking_number=number, error=error
+            )
+            failures.append(
+                {
+                    "tracking_number": number,
+                    "next_poll_at": now + self.config.error_retry,
+                    "error": error,
+                    "active": True,
+                }
+            )
+            return
+
+        description = str(result.get("status") or "")
+        status = normalize_status(description)
+        delay = self.next_poll_delay(status, shipment["expected_delivery"], now)
+        expired = now - shipment["registered_at"] > self.config.max_age_days * 86400
+        update = {
+            "tracking_number": number,
+            "status": status,
+            "description": description,
+            "location": str(result.get("location") or ""),
+            "carrier_time": str(result.get("timestamp") or result.get("date") or ""),
+            "next_poll_at": now + (delay or 0),
+            "active": delay is not None and not expired,
+        }
+        updates.append(update)
+        if status != shipment["status"]:
+            changes.append(
+                TrackingChange(
+                    number,
+                    carrier,
+                    shipment["status"],
+                    status,
+                    update["description"],
+                    update["location"],
+                    update["carrier_time"],
+                    now,
+                )
+            )
+
+    async def lookup(self, tracking_number: str, carrier: str) -> Optional[Dict[str, Any]]:
+        """
+        Poll one waybill that is not tracked yet.
+
+        It joins the active set only if the carrier knows it.
+
+        Returns:
+            The local state, or None if the carrier does not know the waybill
+        """
+        client = self.carriers.get(carrier)
+        if client is None:
+            raise ValueError(f"Carrier '{carrier}' not configured for tracking")
+        self.metrics["requests"] += 1
+        (result,) = await client.track_shipments([tracking_number])
+        if not result.get("success"):
+            raise RuntimeError(result.get("error") or "Carrier tracking request failed")
+        if is_not_found(result):
+            return None
+
+        now = time.time()
+        expected_delivery = now + self.config.default_transit_days * 86400
+        await asyncio.to_thread(self.store.register, tracking_number, carrier, expected_delivery)
+        shipment = {
+            "tracking_number": tracking_number,
+            "status": "created",
+            "registered_at": now,
+            "expected_delivery": expected_delivery,
+        }
+        updates, failures, changes = [], [], []
+        self._apply_result(carrier, shipment, result, now, updates, failures, changes)
+        await asyncio.to_thread(self.store.record_polls, updates, failures, changes)
+        if changes:
+            await self._emit(changes)
+        return await self.get(tracking_number)
+
+    async def _emit(self, changes: List[TrackingChange]) -> None:
+        for listener in self.listeners:
+            try:
+                await listener(changes)
+            except Exception as e:
+                logger.error("Tracking change listener failed", changes=len(changes), error=str(e))
+
+    async def _worker(self) -> None:
+        while True:
+            if await self.poll_due() >= self.batch_size:
+                continue  # Backlog: keep polling
+            self._wakeup.clear()
+            next_at = await asyncio.to_thread(self.store.next_due_at)
+            idle = (
+                self.max_idle
+                if next_at is None
+                else min(self.max_idle, max(0.0, next_at - time.time()))
+            )
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=idle)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._poll_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._wakeup = None
+
+    def get_status(self) -> Dict[str, Any]:
+        counts = self.store.counts()
+        return {
+            **self.metrics,
+            "active": sum(counts.values()),
+            "by_status": counts,
+            "carriers": list(self.carriers),
+            "running": self._task is not None,
+        }
+
+
+async def log_tracking_changes(changes: List[TrackingChange]) -> None:
+    """Default listener: one log line per status change"""
+    for change in changes:
+        logger.info("Shipment status changed", **change.to_dict())
+
+
+_tracking_service: Optional[TrackingService] = None
+
+
+def get_tracking_service() -> TrackingService:
+    """Tracking service over every configured carrier"""
+    global _tracking_service
+    if _tracking_service is None:
+        from backend.core.config import settings
+
+        carriers = {"aramex": get_aramex_client(), "smsa": get_smsa_client()}
+        _tracking_service = TrackingService(
+            {name: client for name, client in carriers.items() if client},
+            TrackingStore(settings.SHIPMENT_TRACKING_DB_PATH),
+        )
+        _tracking_service.add_listener(log_tracking_changes)
+    return _tracking_service
@@ -7,93 +7,100 @@ Handles Shopify API interactions for orders, products, and webhooks
 """
 
 import os
+import base64
 import hmac
 import hashlib
-import requests
+import httpx
 from typing import Dict, List, Optional, Any
 from urllib.parse import urljoin
 
+from ..http_pool import HTTPClientPool, get_http_pool
+
 
 class ShopifyClient:
     """Shopify API client for order management"""
 
-    def __init__(self, shop_url: str, access_token: str):
+    def __init__(self, shop_url: str, access_token: str,
+                 http_pool: Optional[HTTPClientPool] = None):
         self.shop_url = shop_url.rstrip('/')
         self.access_token = access_token
         self.base_url = f"https://{shop_url}/admin/api/2023-10"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.http = http_pool or get_http_pool()
+        self.headers = {
             'X-Shopify-Access-Token': access_token,
             'Content-Type': 'application/json'
-        })
+        }
 
-    def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
+    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
         """Make authenticated request to Shopify API"""
         url = urljoin(self.base_url + '/', endpoint.lstrip('/'))
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
 
         try:
-            if method.upper() == 'GET':
-                response = self.session.get(url, params=data)
-            elif method.upper() == 'POST':
-                response = self.session.post(url, json=data)
-            elif method.upper() == 'PUT':
-                response = self.session.put(url, json=data)
-            elif method.upper() == 'DELETE':
-                response = self.session.delete(url)
+            if method == 'GET':
+                kwargs = {'params': data}
+            elif method == 'DELETE':
+                kwargs = {}
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+                kwargs = {'json': data}
+            response = await self.http.request(
+                'shopify', method, url, headers=self.headers, **kwargs
+            )
 
             response.raise_for_status()
             return response.json() if response.content else {}
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"Shopify API error: {str(e)}")
 
-    def get_orders(self, **filters) -> List[Dict]:
+    async def get_orders(self, **filters) -> List[Dict]:
         """Get orders with optional filters"""
-        response = self._make_request('GET', 'orders.json', filters)
+        response = await self._make_request('GET', 'orders.json', filters)
         return response.get('orders', [])
 
-    def get_order(self, order_id: str) -> Dict:
+    async def get_order(self, order_id: str) -> Dict:
         """Get single order by ID"""
-        response = self._make_request('GET', f'orders/{order_id}.json')
+        response = await self._make_request('GET', f'orders/{order_id}.json')
         return response.get('order', {})
 
-    def create_order(self, order_data: Dict) -> Dict:
+    async def create_order(self, order_data: Dict) -> Dict:
         """Create new order"""
-        response = self._make_request('POST', 'orders.json', {'order': order_data})
+        response = await self._make_request('POST', 'orders.json', {'order': order_data})
         return response.get('order', {})
 
-    def update_order(self, order_id: str, order_data: Dict) -> Dict:
+    async def update_order(self, order_id: str, order_data: Dict) -> Dict:
         """Update existing order"""
-        response = self._make_request('PUT', f'orders/{order_id}.json', {'order': order_data})
+        response = await self._make_request('PUT', f'orders/{order_id}.json', {'order': order_data})
         return response.get('order', {})
 
-    def fulfill_order(self, order_id: str, fulfillment_data: Dict) -> Dict:
+    async def fulfill_order(self, order_id: str, fulfillment_data: Dict) -> Dict:
         """Create fulfillment for order"""
-        response = self._make_request('POST', f'orders/{order_id}/fulfillments.json',
-                                    {'fulfillment': fulfillment_data})
+        response = await self._make_request('POST', f'orders/{order_id}/fulfillments.json',
+                                            {'fulfillment': fulfillment_data})
         return response.get('fulfillment', {})
 
-    def get_products(self, **filters) -> List[Dict]:
+    async def get_products(self, **filters) -> List[Dict]:
         """Get products with optional filters"""
-        response = self._make_request('GET', 'products.json', filters)
+        response = await self._make_request('GET', 'products.json', filters)
         return response.get('products', [])
 
-    def get_inventory_levels(self, inventory_item_ids: List[str]) -> List[Dict]:
+    async def get_inventory_levels(self, inventory_item_ids: List[str]) -> List[Dict]:
         """Get inventory levels for items"""
         params = {'inventory_item_ids': ','.join(inventory_item_ids)}
-        response = self._make_request('GET', 'inventory_levels.json', params)
+        response = await self._make_request('GET', 'inventory_levels.json', params)
         return response.get('inventory_levels', [])
 
-    def update_inventory(self, inventory_item_id: str, location_id: str, quantity: int) -> Dict:
+    async def update_inventory(self, inventory_item_id: str, location_id: str,
+                               quantity: int) -> Dict:
         """Update inventory level"""
         data = {
             'inventory_item_id': inventory_item_id,
             'location_id': location_id,
             'available': quantity
         }
-        response = self._make_request('POST', 'inventory_levels/set.json', data)
+        response = await self._make_request('POST', 'inventory_levels/set.json', data)
         return response.get('inventory_level', {})
 
 
@@ -109,11 +116,14 @@ def get_shopify_client() -> Optional[ShopifyClient]:
 
 
 def verify_webhook_signature(request_body: bytes, signature: str, secret: str) -> bool:
-    """Verify Shopify webhook signature"""
-    expected_signature = hmac.new(
+    """Verify Shopify webhook signature (X-Shopify-Hmac-Sha256, base64 of the raw body's HMAC)"""
+    if not signature or not secret:
+        return False
+
+    expected_signature = base64.b64encode(hmac.new(
         secret.encode('utf-8'),
         request_body,
         hashlib.sha256
-    ).hexdigest()
+    ).digest()).decode()
 
-    return hmac.compare_digest(expected_signature, signature)
\ No newline at end of file
+    return hmac.compare_digest(expected_signature, signature)
@@ -0,0 +1,427 @@
+"""
+
+Shopify Webhook Ingestion
+
+Fast-ack pipeline for Shopify webhooks. The HTTP handler only verifies the
+HMAC over the raw body, drops duplicates and appends the event to a durable
+local queue, so Shopify gets its 200 within a few milliseconds. Worker
+tasks drain the queue in batches: orders are upserted in bulk and customer
+notifications are grouped per batch.
+
+Shopify delivers at least once and retries under load, so events are
+deduplicated by `X-Shopify-Webhook-Id`, first in a bounded in-memory TTL
+set and then by a unique index in the queue itself. Processed events stay
+in the queue as tombstones for `retention` seconds, so a redelivery after a
+restart is still recognised. Shopify also delivers out of order; an order
+is only overwritten by an event with a newer `updated_at`.
+
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+from .client import verify_webhook_signature
+
+logger = structlog.get_logger(__name__)
+
+ORDER_TOPICS = (
+    "orders/create",
+    "orders/updated",
+    "orders/paid",
+    "orders/cancelled",
+    "orders/fulfilled",
+)
+
+
+class TTLDedupeSet:
+    """Bounded set of recently seen IDs; entries expire after `ttl` seconds"""
+
+    def __init__(self, max_size: int = 100_000, ttl: float = 48 * 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+
+    def _expire(self, now: float) -> None:
+        # Entries are in insertion order, so expired ones are at the front
+        while self._entries and next(iter(self._entries.values())) <= now:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        self._expire(time.monotonic())
+        return key in self._entries
+
+    def add(self, key: str) -> bool:
+        """Remember `key`; returns False if it was already seen"""
+        now = time.monotonic()
+        self._expire(now)
+        if key in self._entries:
+            return False
+        self._entries[key] = now + self.ttl
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class WebhookQueue:
+    """
+    Durable FIFO of webhook events in a local SQLite file.
+
+    WAL mode with synchronous=NORMAL keeps an append well under a
+    millisecond while surviving process crashes. Acked events are marked
+    processed rather than deleted and pruned after `retention` seconds.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 5, retention: float = 7 * 86400):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS webhook_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                webhook_id TEXT NOT NULL UNIQUE,
+                topic TEXT NOT NULL,
+                shop TEXT,
+                payload TEXT NOT NULL,
+                received_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                dead INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                processed_at REAL
+            )
+        """
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(webhook_events)")}
+        if "processed_at" not in columns:  # Queue files created before tombstones
+            self._db.execute("ALTER TABLE webhook_events ADD COLUMN processed_at REAL")
+        self._db.commit()
+
+    def append(self, webhook_id: str, topic: str, shop: Optional[str], payload: bytes) -> bool:
+        """Store one event; returns False if the webhook ID is already queued"""
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO webhook_events "
+                "(webhook_id, topic, shop, payload, received_at) VALUES (?, ?, ?, ?, ?)",
+                (webhook_id, topic, shop, payload.decode("utf-8"), time.time()),
+            )
+            self._db.commit()
+            return cursor.rowcount == 1
+
+    def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """Oldest live events, in order"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, webhook_id, topic, shop, payload, attempts FROM webhook_events "
+                "WHERE dead = 0 AND processed_at IS NULL ORDER BY seq LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            {
+                "seq": r[0],
+                "webhook_id": r[1],
+                "topic": r[2],
+                "shop": r[3],
+                "payload": r[4],
+                "attempts": r[5],
+            }
+            for r in rows
+        ]
+
+    def ack(self, seqs: List[int]) -> None:
+        """Mark events processed; their IDs keep deduplicating redeliveries until pruned"""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE webhook_events SET processed_at = ?, payload = '' WHERE seq = ?",
+                [(now, s) for s in seqs],
+            )
+            self._db.execute(
+                "DELETE FROM webhook_events WHERE processed_at IS NOT NULL AND processed_at < ?",
+                (now - self.retention,),
+            )
+            self._db.commit()
+
+    def fail(self, seqs: List[int], error: str) -> None:
+        """Count a failed attempt; events out of attempts are parked as dead letters"""
+        with self._lock:
+            self._db.executemany(
+                "UPDATE webhook_events SET attempts = attempts + 1, last_error = ?, "
+                "dead = (attempts + 1 >= ?) WHERE seq = ?",
+                [(error, self.max_attempts, s) for s in seqs],
+            )
+            self._db.commit()
+
+    def depth(self) -> Tuple[int, int]:
+        """(live events, dead letters)"""
+        with self._lock:
+            live, dead = self._db.execute(
+                "SELECT COALESCE(SUM(dead = 0), 0), COALESCE(SUM(dead), 0) FROM webhook_events "
+                "WHERE processed_at IS NULL"
+            ).fetchone()
+        return live, dead
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+async def notify_new_orders(orders: List[Any]) -> None:
+    """
+    One SMS and one email per customer for all their new orders in a batch
+
+    Orders are grouped by customer email; an order without one is notified
+    on its own, since it cannot be told apart from other customers' orders.
+    """
+    from ..notifications.email import send_order_email
+    from ..notifications.sms import send_order_sms
+
+    by_customer: Dict[str, List[Any]] = defaultdict(list)
+    groups: List[Tuple[Optional[str], List[Any]]] = []
+    for order in orders:
+        if order.customer_email:
+            by_customer[order.customer_email].append(order)
+        else:
+            groups.append((None, [order]))
+    groups.extend(by_customer.items())
+
+    sends = []
+    for email, customer_orders in groups:
+        numbers = "، ".join(o.order_id for o in customer_orders)
+        sends.append(
+            send_order_sms(
+                customer_orders[0].order_id, f"تم استلام طلبك بنجاح! رقم الطلب: {numbers}"
+            )
+        )
+        if email:
+            sends.append(
+                send_order_email(email, "تأكيد الطلب", f"تم استلام طلبك رقم {numbers} بنجاح")
+            )
+    # Pooled connections: the whole batch goes out concurrently
+    await asyncio.gather(*sends)
+
+
+def _older(order: Any, than: Any) -> bool:
+    """True if `order` is an older state than `than` by the platform's updated_at"""
+    if order.updated_at is None or than.updated_at is None:
+        return False
+    return _utc(order.updated_at) < _utc(than.updated_at)
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class WebhookPipeline:
+    """
+    مسار استقبال Webhooks
+    Verify, dedupe and enqueue on the request path; process in batches off it
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        queue: WebhookQueue,
+        transform_order: Callable[[Dict[str, Any]], Any],
+        store=None,
+        notify: Callable[[List[Any]], Awaitable[None]] = notify_new_orders,
+        dedupe: Optional[TTLDedupeSet] = None,
+        batch_size: int = 100,
+        flush_interval: float = 0.2,
+    ):
+        self.secret = secret
+        self.queue = queue
+        self.transform_order = transform_order
+        self.store = store
+        self.notify = notify
+        self.dedupe = dedupe or TTLDedupeSet()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.metrics = {
+            "received": 0,
+            "rejected": 0,
+            "duplicates": 0,
+            "processed": 0,
+            "batches": 0,
+            "failed": 0,
+        }
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def ingest(self, body: bytes, headers) -> Tuple[int, str]:
+        """
+        Request-path work only: verify, dedupe, append.
+
+        Returns:
+            (HTTP status, detail)
+        """
+        if not verify_webhook_signature(
+            body, headers.get("X-Shopify-Hmac-Sha256", ""), self.secret
+        ):
+            self.metrics["rejected"] += 1
+            return 401, "invalid signature"
+
+        webhook_id = headers.get("X-Shopify-Webhook-Id")
+        if not webhook_id:
+            self.metrics["rejected"] += 1
+            return 400, "missing webhook id"
+
+        if webhook_id in self.dedupe:
+            self.metrics["duplicates"] += 1
+            return 200, "duplicate"
+        # Remembered only once stored: if the append raises, Shopify's retry must get through
+        appended = self.queue.append(
+            webhook_id,
+            headers.get("X-Shopify-Topic", "orders/create"),
+            headers.get("X-Shopify-Shop-Domain"),
+            body,
+        )
+        self.dedupe.add(webhook_id)
+        if not appended:
+            self.metrics["duplicates"] += 1
+            return 200, "duplicate"
+
+        self.metrics["received"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return 200, "queued"
+
+    async def process_batch(self) -> int:
+        """Drain up to batch_size events; returns how many were handled"""
+        if self._worker_lock is None:
+            self._worker_lock = asyncio.Lock()
+        async with self._worker_lock:  # Callers must not claim the same events
+            events = await asyncio.to_thread(self.queue.claim, self.batch_size)
+            if not events:
+                return 0
+            try:
+                await self._handle(events)
+                done = [e["seq"] for e in events]
+            except Exception as e:
+                logger.error(
+                    "Webhook batch failed, retrying events one by one",
+                    events=len(events),
+                    error=str(e),
+                )
+                done = await self._handle_individually(events)
+            await asyncio.to_thread(self.queue.ack, done)
+
+        self.metrics["processed"] += len(done)
+        self.metrics["batches"] += 1
+        return len(events)
+
+    async def _handle_individually(self, events: List[Dict[str, Any]]) -> List[int]:
+        """Isolate poison events so one bad payload does not block the batch"""
+        done = []
+        for event in events:
+            try:
+                await self._handle([event])
+                done.append(event["seq"])
+            except Exception as e:
+                self.metrics["failed"] += 1
+                await asyncio.to_thread(self.queue.fail, [event["seq"]], f"{type(e).__name__}: {e}")
+                logger.error(
+                    "Webhook event failed",
+                    webhook_id=event["webhook_id"],
+                    topic=event["topic"],
+                    error=str(e),
+                )
+        return done
+
+    async def _handle(self, events: List[Dict[str, Any]]) -> None:
+        latest: Dict[str, Any] = {}
+        created = []
+        for event in events:
+            if event["topic"] not in ORDER_TOPICS:
+                logger.info("Ignoring webhook topic", topic=event["topic"])
+                continue
+            order = self.transform_order(json.loads(event["payload"]))
+            current = latest.get(order.order_id)
+            # Deliveries arrive out of order: keep the newest state of each order
+            if current is None or not _older(order, current):
+                latest[order.order_id] = order
+            if event["topic"] == "orders/create":
+                created.append(order)
+
+        if latest and self.store is not None:
+            await asyncio.to_thread(
+                self.store.apply_changes, "orders", list(latest.values()), "shopify"
+            )
+        if created and self.notify is not None:
+            await self.notify(created)
+
+    async def _worker(self) -> None:
+        while True:
+            if await self.process_batch() >= self.batch_size:
+                continue  # Backlog: keep draining
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                pass  # Periodic retry of failed events
+            # Let a burst accumulate into one batch
+            await asyncio.sleep(self.flush_interval)
+
+    def start(self) -> None:
+        """Start the consumer; one worker keeps per-order events in order"""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._worker_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._worker())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._wakeup = None
+
+    def get_status(self) -> Dict[str, Any]:
+        live, dead = self.queue.depth()
+        return {
+            **self.metrics,
+            "queue_depth": live,
+            "dead_letters": dead,
+            "dedupe_size": len(self.dedupe),
+            "running": self._task is not None,
+        }
+
+
+_webhook_pipeline: Optional[WebhookPipeline] = None
+
+
+def get_webhook_pipeline() -> WebhookPipeline:
+    """Webhook pipeline configured from settings"""
+    global _webhook_pipeline
+    if _webhook_pipeline is None:
+        from backend.core.config import settings
+
+        from ..ecommerce.adapters import transform_shopify_order
+        from ..ecommerce.sync import EcommerceStore
+
+        _webhook_pipeline = WebhookPipeline(
+            secret=settings.SHOPIFY_WEBHOOK_SECRET,
+            queue=WebhookQueue(settings.SHOPIFY_WEBHOOK_QUEUE_PATH),
+            transform_order=transform_shopify_order,
+            store=EcommerceStore(),
+            batch_size=settings.SHOPIFY_WEBHOOK_BATCH_SIZE,
+        )
+    return _webhook_pipeline
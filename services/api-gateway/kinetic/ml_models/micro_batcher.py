@@ -0,0 +1,175 @@
+"""
+Micro-Batched Inference
+تجميع طلبات التنبؤ في دفعات صغيرة
+
+Concurrent prediction requests are queued and coalesced: the batcher waits
+for up to max_batch_size requests or max_wait_ms, whichever comes first,
+then runs a single vectorized predict for the whole batch. The active model
+is resolved per batch, so a registry hot swap applies to the next batch.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ...core.config import settings
+from .model_registry import ModelRegistry, ServedModel, model_registry
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    مجمّع الدفعات
+    Coalesces concurrent predict calls for one model
+    """
+
+    def __init__(
+        self,
+        resolve_model: Callable[[], ServedModel],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+    ):
+        self.resolve_model = resolve_model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Metrics
+        self.requests_served = 0
+        self.batches_run = 0
+        self.largest_batch = 0
+
+    async def predict(self, features: Dict[str, float]) -> Tuple[float, ServedModel]:
+        """Queue one feature dict and wait for its score"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future))
+        return await future
+
+    async def close(self):
+        """Stop the worker task"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            self._queue = None
+
+    def get_metrics(self) -> Dict:
+        return {
+            "requests_served": self.requests_served,
+            "batches_run": self.batches_run,
+            "largest_batch": self.largest_batch,
+            "average_batch_size": (
+                round(self.requests_served / self.batches_run, 2) if self.batches_run else 0.0
+            ),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+        }
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _collect(self) -> List[tuple]:
+        """Wait for the first request, then fill the batch until size or deadline"""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        # Drain anything already queued without waiting
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            pending = [(features, future) for features, future in batch if not future.cancelled()]
+            if not pending:
+                continue
+
+            try:
+                model = self.resolve_model()
+                scores = model.predict(model.to_matrix([features for features, _ in pending]))
+            except Exception as e:
+                logger.error(f"Batch predict failed: {e}")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), score in zip(pending, scores.tolist()):
+                if not future.done():
+                    future.set_result((score, model))
+
+            self.requests_served += len(pending)
+            self.batches_run += 1
+            self.largest_batch = max(self.largest_batch, len(pending))
+
+
+class InferenceService:
+    """
+    خدمة الاستدلال
+    One micro-batcher per registered model
+    """
+
+    def __init__(self, registry: ModelRegistry, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._batchers: Dict[str, MicroBatcher] = {}
+
+    def has_model(self, name: str) -> bool:
+        return self.registry.has_model(name)
+
+    async def predict(self, name: str, features: Dict[str, float]) -> Dict:
+        """Score one feature dict with the active version of a model"""
+        batcher = self._batchers.get(name)
+        if batcher is None:
+            batcher = MicroBatcher(
+                lambda: self.registry.get(name),
+                max_batch_size=self.max_batch_size,
+                max_wait_ms=self.max_wait_ms,
+            )
+            self._batchers[name] = batcher
+
+        score, model = await batcher.predict(features)
+        return {"model": name, "version": model.version, "score": score}
+
+    async def predict_many(self, name: str, rows: List[Dict[str, float]]) -> List[Dict]:
+        """Score several feature dicts; they share batches with other callers"""
+        return await asyncio.gather(*(self.predict(name, row) for row in rows))
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        return {name: batcher.get_metrics() for name, batcher in self._batchers.items()}
+
+    async def close(self):
+        for batcher in self._batchers.values():
+            await batcher.close()
+        self._batchers.clear()
+
+
+# Global instance
+inference_service = InferenceService(
+    model_registry,
+    max_batch_size=settings.MODEL_BATCH_MAX_SIZE,
+    max_wait_ms=settings.MODEL_BATCH_MAX_WAIT_MS,
+)
@@ -0,0 +1,262 @@
+"""
+Model Registry
+سجل النماذج المدربة
+
+Loads trained model artifacts once, memory-maps their weights and serves
+the active version of each model. Versions can be swapped at runtime.
+
+Artifact layout::
+
+    {MODEL_DIR}/{name}/{version}/metadata.json
+    {MODEL_DIR}/{name}/{version}/{array}.npy
+
+metadata.json holds the model "type", the ordered "features" list and any
+type-specific scalars. Each array is stored as its own .npy file so it can
+be opened with mmap_mode="r".
+"""
+
+import json
+import logging
+import re
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelNotFoundError(Exception):
+    """Raised when a model or model version is not available"""
+
+    pass
+
+
+class ServedModel(ABC):
+    """Base class for vectorized models"""
+
+    arrays: tuple = ()
+
+    def __init__(self, name: str, version: str, metadata: Dict, arrays: Dict[str, np.ndarray]):
+        self.name = name
+        self.version = version
+        self.metadata = metadata
+        self.features: List[str] = metadata.get("features", [])
+        for key in self.arrays:
+            setattr(self, key, arrays[key])
+
+    def to_matrix(self, rows: List[Dict[str, float]]) -> np.ndarray:
+        """Build the feature matrix for a batch of feature dicts"""
+        return np.array(
+            [[float(row.get(feature, 0.0)) for feature in self.features] for row in rows],
+            dtype=float,
+        ).reshape(len(rows), len(self.features))
+
+    @abstractmethod
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Score a feature matrix, one output per row"""
+
+
+class LogisticModel(ServedModel):
+    """Logistic regression: sigmoid(X @ weights + bias)"""
+
+    arrays = ("weights",)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        logits = X @ self.weights + self.metadata.get("bias", 0.0)
+        return 1.0 / (1.0 + np.exp(-logits))
+
+
+class TreeEnsembleModel(ServedModel):
+    """
+    Gradient-boosted trees stored as flat node arrays.
+
+    Arrays are shaped (n_trees, max_nodes). Leaf nodes have feature -1.
+    """
+
+    arrays = ("feature", "threshold", "left", "right", "value")
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        n_trees = self.feature.shape[0]
+        trees = np.arange(n_trees)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.zeros((X.shape[0], n_trees), dtype=np.int64)
+
+        for _ in range(int(self.metadata.get("max_depth", self.feature.shape[1]))):
+            feature = self.feature[trees, node]
+            leaf = feature < 0
+            if leaf.all():
+                break
+            go_left = X[rows, np.where(leaf, 0, feature)] <= self.threshold[trees, node]
+            node = np.where(
+                leaf, node, np.where(go_left, self.left[trees, node], self.right[trees, node])
+            )
+
+        raw = self.metadata.get("base_score", 0.0) + (
+            self.metadata.get("learning_rate", 1.0) * self.value[trees, node].sum(axis=1)
+        )
+        if self.metadata.get("objective", "binary") == "binary":
+            return 1.0 / (1.0 + np.exp(-raw))
+        return raw
+
+
+# Model names and versions become path components under MODEL_DIR
+_PATH_PART = re.compile(r"^[A-Za-z0-9._-]+$")
+
+
+def _check_path_part(value: str, kind: str) -> str:
+    """Reject names that could escape the registry root"""
+    if not _PATH_PART.match(value or "") or ".." in value:
+        raise ValueError(f"Invalid model {kind}: {value!r}")
+    return value
+
+
+def _version_key(version: str) -> list:
+    """Natural sort key so that v10 sorts after v9"""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", version)]
+
+
+MODEL_TYPES = {"logistic": LogisticModel, "gbm": TreeEnsembleModel}
+
+
+def save_model(
+    root: str,
+    name: str,
+    version: str,
+    model_type: str,
+    features: List[str],
+    arrays: Dict[str, np.ndarray],
+    **metadata,
+) -> Path:
+    """
+    حفظ نموذج مدرب - Write a trained model artifact to the registry layout
+    """
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"Unsupported model type: {model_type}")
+
+    path = Path(root) / _check_path_part(name, "name") / _check_path_part(version, "version")
+    path.mkdir(parents=True, exist_ok=True)
+    for key in MODEL_TYPES[model_type].arrays:
+        np.save(path / f"{key}.npy", np.asarray(arrays[key]))
+
+    metadata.update(
+        {"type": model_type, "features": features, "created_at": datetime.now().isoformat()}
+    )
+    (path / "metadata.json").write_text(json.dumps(metadata, indent=2))
+    return path
+
+
+class ModelRegistry:
+    """
+    سجل النماذج
+    Versioned, memory-mapped model registry
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._loaded: Dict[tuple, ServedModel] = {}
+        self._active: Dict[str, ServedModel] = {}
+        self._lock = threading.Lock()
+
+    def versions(self, name: str) -> List[str]:
+        """List versions available on disk, oldest first"""
+        model_dir = self.root / _check_path_part(name, "name")
+        if not model_dir.is_dir():
+            return []
+        return sorted(
+            (path.name for path in model_dir.iterdir() if (path / "metadata.json").is_file()),
+            key=_version_key,
+        )
+
+    def list_models(self) -> List[Dict]:
+        """List models on disk with their active version"""
+        if not self.root.is_dir():
+            return []
+        models = []
+        for path in sorted(self.root.iterdir()):
+            if not path.is_dir():
+                continue
+            active = self._active.get(path.name)
+            models.append(
+                {
+                    "name": path.name,
+                    "versions": self.versions(path.name),
+                    "active_version": active.version if active else None,
+                }
+            )
+        return models
+
+    def load(self, name: str, version: Optional[str] = None) -> ServedModel:
+        """
+        Load a model version (latest by default).
+
+        Each version is read from disk once; arrays are memory-mapped.
+
+        Raises:
+            ValueError: If the name or version is not a plain path component
+            ModelNotFoundError: If the version is not on disk
+        """
+        _check_path_part(name, "name")
+        version = _check_path_part(version, "version") if version else self._latest_version(name)
+        key = (name, version)
+        with self._lock:
+            model = self._loaded.get(key)
+            if model is None:
+                model = self._read(name, version)
+                self._loaded[key] = model
+                logger.info(f"Loaded model {name}@{version}")
+        return model
+
+    def activate(self, name: str, version: Optional[str] = None) -> ServedModel:
+        """Make a version the one served for name (hot swap)"""
+        model = self.load(name, version)
+        self._active[name] = model
+        logger.info(f"Activated model {name}@{model.version}")
+        return model
+
+    def get(self, name: str) -> ServedModel:
+        """Return the active model, activating the latest version on first use"""
+        model = self._active.get(name)
+        if model is None:
+            model = self.activate(name)
+        return model
+
+    def has_model(self, name: str) -> bool:
+        return name in self._active or bool(self.versions(name))
+
+    def unload(self, name: str, version: str):
+        """Drop a loaded version that is no longer active"""
+        active = self._active.get(name)
+        if active is not None and active.version == version:
+            raise ValueError(f"Cannot unload active version {name}@{version}")
+        with self._lock:
+            self._loaded.pop((name, version), None)
+
+    def _latest_version(self, name: str) -> str:
+        versions = self.versions(name)
+        if not versions:
+            raise ModelNotFoundError(f"No versions found for model '{name}'")
+        return versions[-1]
+
+    def _read(self, name: str, version: str) -> ServedModel:
+        path = self.root / name / version
+        metadata_file = path / "metadata.json"
+        if not metadata_file.is_file():
+            raise ModelNotFoundError(f"Model {name}@{version} not found")
+
+        metadata = json.loads(metadata_file.read_text())
+        model_cls = MODEL_TYPES.get(metadata.get("type"))
+        if model_cls is None:
+            raise ValueError(f"Unsupported model type: {metadata.get('type')}")
+
+        arrays = {key: np.load(path / f"{key}.npy", mmap_mode="r") for key in model_cls.arrays}
+        return model_cls(name, version, metadata, arrays)
+
+
+# Global instance
+model_registry = ModelRegistry(settings.MODEL_DIR)
@@ -10,6 +10,62 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Sector risk mapping - خريطة مخاطر القطاعات
+SECTOR_RISKS = {
+    "technology": 0.6,
+    "healthcare": 0.4,
+    "finance": 0.7,
+    "real_estate": 0.5,
+    "manufacturing": 0.5,
+    "retail": 0.6,
+    "energy": 0.7
+}
+
+# Prohibited sectors - القطاعات المحرمة
+PROHIBITED_SECTORS = ["alcohol", "gambling", "pork", "weapons"]
+
+# (score, threshold, recommendation) - emitted when score > threshold
+RISK_RECOMMENDATIONS = [
+    ("overall_risk", 0.7, {
+        "type": "warning",
+        "title_ar": "مخاطر عالية جداً",
+        "title_en": "Very High Risk",
+        "message_ar": "ننصح بعدم المتابعة مع هذا الاستثمار",
+        "message_en": "We advise against proceeding with this investment"
+    }),
+    ("market_risk", 0.6, {
+        "type": "diversification",
+        "title_ar": "تنويع المحفظة",
+        "title_en": "Portfolio Diversification",
+        "message_ar": "قم بتنويع استثماراتك عبر قطاعات مختلفة",
+        "message_en": "Diversify your investments across different sectors"
+    }),
+    ("credit_risk", 0.6, {
+        "type": "credit_check",
+        "title_ar": "فحص ائتماني إضافي",
+        "title_en": "Additional Credit Check",
+        "message_ar": "يُنصح بإجراء فحص ائتماني شامل",
+        "message_en": "Comprehensive credit check recommended"
+    }),
+    ("liquidity_risk", 0.6, {
+        "type": "liquidity",
+        "title_ar": "احتفظ بسيولة كافية",
+        "title_en": "Maintain Sufficient Liquidity",
+        "message_ar": "احتفظ بنسبة 20% من المحفظة سائلة",
+        "message_en": "Keep 20% of portfolio liquid"
+    }),
+    ("sharia_risk", 0.5, {
+        "type": "sharia_review",
+        "title_ar": "مراجعة شرعية",
+        "title_en": "Sharia Review",
+        "message_ar": "يُنصح بمراجعة عالم شرعي قبل الاستثمار",
+        "message_en": "Consult a Sharia scholar before investing"
+    })
+]
+
+RISK_LEVELS = np.array(["low", "medium", "high", "very_high"])
+RISK_LEVEL_BOUNDARIES = np.array([0.3, 0.5, 0.7])
+
 
 class RiskAssessor:
     """
@@ -88,25 +144,152 @@ class RiskAssessor:
             "recommendations": recommendations,
             "assessed_at": datetime.now().isoformat()
         }
-    
+
+    async def assess_batch(
+        self,
+        investments: List[Dict]
+    ) -> List[Dict]:
+        """
+        تقييم مخاطر مجموعة استثمارات
+        Assess a batch of investments in vectorized form
+
+        Produces the same report per item as assess_investment_risk.
+
+        Args:
+            investments: List of investment details
+
+        Returns:
+            List of risk assessment reports, in input order
+        """
+        if not investments:
+            return []
+
+        scores = self.score_batch(investments)
+        levels = RISK_LEVELS[
+            np.searchsorted(RISK_LEVEL_BOUNDARIES, scores["overall_risk"], side="right")
+        ]
+        flags = [
+            (scores[score_key] > threshold, recommendation)
+            for score_key, threshold, recommendation in RISK_RECOMMENDATIONS
+        ]
+        assessed_at = datetime.now().isoformat()
+
+        columns = {key: values.tolist() for key, values in scores.items()}
+        results = []
+        for i in range(len(investments)):
+            results.append({
+                "overall_risk_score": round(columns["overall_risk"][i], 2),
+                "risk_level": str(levels[i]),
+                "risk_breakdown": {
+                    "market_risk": round(columns["market_risk"][i], 2),
+                    "credit_risk": round(columns["credit_risk"][i], 2),
+                    "liquidity_risk": round(columns["liquidity_risk"][i], 2),
+                    "operational_risk": round(columns["operational_risk"][i], 2),
+                    "sharia_compliance_risk": round(columns["sharia_risk"][i], 2)
+                },
+                "recommendations": [
+                    dict(recommendation) for mask, recommendation in flags if mask[i]
+                ],
+                "assessed_at": assessed_at
+            })
+
+        return results
+
+    def score_batch(self, investments: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        حساب المخاطر دفعة واحدة
+        Compute all risk scores as arrays
+
+        Args:
+            investments: List of investment details
+
+        Returns:
+            market_risk, credit_risk, liquidity_risk, operational_risk,
+            sharia_risk and overall_risk, one float per investment
+        """
+        sectors = [item.get("business_sector", "").lower() for item in investments]
+
+        # Market risk
+        market_risk = np.array([SECTOR_RISKS.get(sector, 0.5) for sector in sectors])
+        has_history = np.array([
+            bool(item.get("historical_performance", {})) for item in investments
+        ])
+        volatility = np.array([
+            (item.get("historical_performance") or {}).get("volatility", 0.5)
+            for item in investments
+        ], dtype=float)
+        market_risk = np.where(has_history, (market_risk + volatility) / 2, market_risk)
+        market_risk = np.minimum(market_risk, 1.0)
+
+        # Credit risk
+        credit_score = np.array([
+            item.get("credit_score", 500) for item in investments
+        ], dtype=float)
+        debt_to_income = np.array(
+            [item.get("debt_to_income_ratio", 0.5) for item in investments], dtype=float
+        )
+        credit_risk = np.minimum(((850 - credit_score) / 550 + debt_to_income) / 2, 1.0)
+
+        # Liquidity risk
+        duration_months = np.array(
+            [item.get("duration_months", 12) for item in investments], dtype=float
+        )
+        amount = np.array([item.get("amount", 0) for item in investments], dtype=float)
+        liquidity_risk = (
+            np.minimum(duration_months / 60, 1.0) + np.minimum(amount / 1000000, 1.0)
+        ) / 2
+
+        # Operational risk
+        company_age_years = np.array(
+            [item.get("company_age_years", 0) for item in investments], dtype=float
+        )
+        employee_count = np.array(
+            [item.get("employee_count", 0) for item in investments], dtype=float
+        )
+        has_insurance = np.array([bool(item.get("has_insurance", False)) for item in investments])
+        age_risk = np.maximum(0, 1 - (company_age_years / 10))
+        size_risk = np.maximum(0, 1 - (employee_count / 100))
+        insurance_risk = np.where(has_insurance, 0.0, 0.3)
+        operational_risk = np.minimum((age_risk + size_risk + insurance_risk) / 3, 1.0)
+
+        # Sharia compliance risk
+        certified = np.array([bool(item.get("sharia_certified", False)) for item in investments])
+        has_board = np.array([bool(item.get("has_sharia_board", False)) for item in investments])
+        prohibited = np.array([
+            any(sector in business_sector for sector in PROHIBITED_SECTORS)
+            for business_sector in sectors
+        ])
+        sharia_risk = np.select(
+            [prohibited, certified & has_board, certified, has_board],
+            [1.0, 0.1, 0.3, 0.4],
+            default=0.6
+        )
+
+        # Weighted overall risk
+        overall_risk = (
+            market_risk * self.risk_factors["market_volatility"] +
+            credit_risk * self.risk_factors["credit_risk"] +
+            liquidity_risk * self.risk_factors["liquidity_risk"] +
+            operational_risk * self.risk_factors["operational_risk"] +
+            sharia_risk * self.risk_factors["sharia_compliance_risk"]
+        )
+
+        return {
+            "overall_risk": overall_risk,
+            "market_risk": market_risk,
+            "credit_risk": credit_risk,
+            "liquidity_risk": liquidity_risk,
+            "operational_risk": operational_risk,
+            "sharia_risk": sharia_risk
+        }
+
     def _calculate_market_risk(
         self,
         sector: str,
         historical_performance: Dict
     ) -> float:
         """حساب مخاطر السوق - Calculate market risk"""
-        # Sector risk mapping
-        sector_risks = {
-            "technology": 0.6,
-            "healthcare": 0.4,
-            "finance": 0.7,
-            "real_estate": 0.5,
-            "manufacturing": 0.5,
-            "retail": 0.6,
-            "energy": 0.7
-        }
-        
-        base_risk = sector_risks.get(sector.lower(), 0.5)
+        base_risk = SECTOR_RISKS.get(sector.lower(), 0.5)
         
         # Adjust based on historical volatility
         if historical_performance:
@@ -169,9 +352,7 @@ class RiskAssessor:
         has_sharia_board = investment_data.get("has_sharia_board", False)
         business_sector = investment_data.get("business_sector", "").lower()
         
-        # Prohibited sectors
-        prohibited_sectors = ["alcohol", "gambling", "pork", "weapons"]
-        is_prohibited = any(sector in business_sector for sector in prohibited_sectors)
+        is_prohibited = any(sector in business_sector for sector in PROHIBITED_SECTORS)
         
         if is_prohibited:
             return 1.0  # Maximum risk
@@ -207,52 +388,19 @@ class RiskAssessor:
         sharia_risk: float
     ) -> List[Dict]:
         """توليد توصيات - Generate recommendations"""
+        scores = {
+            "overall_risk": overall_risk,
+            "market_risk": market_risk,
+            "credit_risk": credit_risk,
+            "liquidity_risk": liquidity_risk,
+            "operational_risk": operational_risk,
+            "sharia_risk": sharia_risk
+        }
         recommendations = []
         
-        if overall_risk > 0.7:
-            recommendations.append({
-                "type": "warning",
-                "title_ar": "مخاطر عالية جداً",
-                "title_en": "Very High Risk",
-                "message_ar": "ننصح بعدم المتابعة مع هذا الاستثمار",
-                "message_en": "We advise against proceeding with this investment"
-            })
-        
-        if market_risk > 0.6:
-            recommendations.append({
-                "type": "diversification",
-                "title_ar": "تنويع المحفظة",
-                "title_en": "Portfolio Diversification",
-                "message_ar": "قم بتنويع استثماراتك عبر قطاعات مختلفة",
-                "message_en": "Diversify your investments across different sectors"
-            })
-        
-        if credit_risk > 0.6:
-            recommendations.append({
-                "type": "credit_check",
-                "title_ar": "فحص ائتماني إضافي",
-                "title_en": "Additional Credit Check",
-                "message_ar": "يُنصح بإجراء فحص ائتماني شامل",
-                "message_en": "Comprehensive credit check recommended"
-            })
-        
-        if liquidity_risk > 0.6:
-            recommendations.append({
-                "type": "liquidity",
-                "title_ar": "احتفظ بسيولة كافية",
-                "title_en": "Maintain Sufficient Liquidity",
-                "message_ar": "احتفظ بنسبة 20% من المحفظة سائلة",
-                "message_en": "Keep 20% of portfolio liquid"
-            })
-        
-        if sharia_risk > 0.5:
-            recommendations.append({
-                "type": "sharia_review",
-                "title_ar": "مراجعة شرعية",
-                "title_en": "Sharia Review",
-                "message_ar": "يُنصح بمراجعة عالم شرعي قبل الاستثمار",
-                "message_en": "Consult a Sharia scholar before investing"
-            })
+        for score_key, threshold, recommendation in RISK_RECOMMENDATIONS:
+            if scores[score_key] > threshold:
+                recommendations.append(dict(recommendation))
         
         return recommendations
 
@@ -0,0 +1,182 @@
+"""
+Bulk Balance Reader
+قارئ الأرصدة المجمّع
+
+Reads token balances for many addresses at once by packing the balanceOf
+calls into Multicall3 `aggregate3` calls, so hundreds of balances cost one
+eth_call instead of one round trip each. Addresses are deduplicated and
+results are cached per block number, since a balance cannot change within
+a block.
+
+If the multicall contract is not deployed on the network, the reader falls
+back to concurrent balanceOf calls pinned to the same block.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from web3 import AsyncWeb3
+from web3.exceptions import BadFunctionCallOutput
+
+logger = logging.getLogger(__name__)
+
+BALANCE_OF_SELECTOR = AsyncWeb3.keccak(text="balanceOf(address)")[:4]
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"},
+                ],
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    }
+]
+
+BALANCE_OF_ABI = [
+    {
+        "inputs": [{"name": "account", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
+
+
+def _balance_of_calldata(address: str) -> bytes:
+    return BALANCE_OF_SELECTOR + bytes(12) + bytes.fromhex(address[2:])
+
+
+class BalanceReader:
+    """
+    قارئ الأرصدة
+    Batched, per-block cached balanceOf reads for one token on one network
+    """
+
+    def __init__(
+        self,
+        w3,
+        token_address: str,
+        network: str,
+        multicall_address: Optional[str] = None,
+        batch_size: int = 500,
+        cached_blocks: int = 4,
+    ):
+        self.w3 = w3
+        self.token_address = AsyncWeb3.to_checksum_address(token_address)
+        self.network = network
+        self.batch_size = batch_size
+        self.cached_blocks = cached_blocks
+
+        self._token = w3.eth.contract(address=self.token_address, abi=BALANCE_OF_ABI)
+        self._multicall = (
+            w3.eth.contract(
+                address=AsyncWeb3.to_checksum_address(multicall_address), abi=MULTICALL3_ABI
+            )
+            if multicall_address
+            else None
+        )
+        self._cache: "OrderedDict[int, Dict[str, int]]" = OrderedDict()
+        self.metrics = {"requests": 0, "cache_hits": 0, "multicalls": 0, "single_calls": 0}
+
+    async def get_balances(
+        self, addresses: Iterable[str], block_number: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Balances in wei, keyed by checksummed address.
+
+        Args:
+            addresses: Wallet addresses, duplicates allowed
+            block_number: Block to read at (defaults to the latest block)
+        """
+        unique = list(dict.fromkeys(AsyncWeb3.to_checksum_address(a) for a in addresses))
+        if block_number is None:
+            block_number = await self.w3.eth.block_number
+
+        cache = self._cache.get(block_number)
+        if cache is None:
+            cache = self._cache[block_number] = {}
+            while len(self._cache) > self.cached_blocks:
+                self._cache.popitem(last=False)
+
+        self.metrics["requests"] += 1
+        missing = [a for a in unique if a not in cache]
+        self.metrics["cache_hits"] += len(unique) - len(missing)
+
+        if missing:
+            chunks = [
+                missing[i : i + self.batch_size] for i in range(0, len(missing), self.batch_size)
+            ]
+            for fetched in await asyncio.gather(
+                *(self._fetch(chunk, block_number) for chunk in chunks)
+            ):
+                cache.update(fetched)
+
+        return {a: cache[a] for a in unique if a in cache}
+
+    async def _fetch(self, addresses: List[str], block_number: int) -> Dict[str, int]:
+        if self._multicall is not None:
+            try:
+                return await self._fetch_multicall(addresses, block_number)
+            except BadFunctionCallOutput:
+                # Empty return data: no multicall contract at this address
+                logger.warning(
+                    f"Multicall contract not found on {self.network}, "
+                    "falling back to single balanceOf calls"
+                )
+                self._multicall = None
+        return await self._fetch_single(addresses, block_number)
+
+    async def _fetch_multicall(self, addresses: List[str], block_number: int) -> Dict[str, int]:
+        calls = [(self.token_address, True, _balance_of_calldata(a)) for a in addresses]
+        results = await self._multicall.functions.aggregate3(calls).call(
+            block_identifier=block_number
+        )
+        self.metrics["multicalls"] += 1
+
+        balances = {}
+        for address, (success, data) in zip(addresses, results):
+            if success and len(data) == 32:
+                balances[address] = int.from_bytes(data, "big")
+            else:
+                logger.warning(f"balanceOf failed for {address} on {self.network}")
+        return balances
+
+    async def _fetch_single(self, addresses: List[str], block_number: int) -> Dict[str, int]:
+        results = await asyncio.gather(
+            *(
+                self._token.functions.balanceOf(a).call(block_identifier=block_number)
+                for a in addresses
+            ),
+            return_exceptions=True,
+        )
+        self.metrics["single_calls"] += len(addresses)
+
+        balances = {}
+        for address, result in zip(addresses, results):
+            if isinstance(result, Exception):
+                logger.warning(f"balanceOf failed for {address} on {self.network}: {result}")
+            else:
+                balances[address] = result
+        return balances
@@ -1,19 +1,49 @@
 """
 Blockchain Integration Service
 Web3 integration for ERC-3643 Security Tokens
+
+Runs on AsyncWeb3 so RPC calls never block the event loop. Each network
+keeps one pooled HTTP session, and contract instances and checksummed
+addresses are cached. Receipts are awaited by polling in the background.
 """
 
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from web3.exceptions import TransactionNotFound
+from web3.middleware import async_geth_poa_middleware
 from eth_account import Account
-from typing import Dict, Optional, Tuple
-import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import aiohttp
+import asyncio
 import logging
 
 from backend.core.config import settings
+from backend.ledger.balance_reader import BalanceReader
+from backend.ledger.event_indexer import TokenEventIndexer
+from backend.ledger.transaction_pipeline import TransactionPipeline
 
 logger = logging.getLogger(__name__)
 
+NETWORK_RPC_URLS = {
+    "eth": settings.ETH_RPC_URL,
+    "polygon": settings.POLYGON_RPC_URL
+}
+
+# Block each network's token was deployed at; event indexing starts there
+INDEX_START_BLOCKS = {
+    "eth": settings.LEDGER_INDEX_START_BLOCK_ETH,
+    "polygon": settings.LEDGER_INDEX_START_BLOCK_POLYGON
+}
+
+# Networks that need the PoA extraData middleware
+POA_NETWORKS = {"polygon"}
+
+
+@lru_cache(maxsize=4096)
+def to_checksum(address: str) -> str:
+    """Cached checksum conversion - checksumming hashes the address every call"""
+    return AsyncWeb3.to_checksum_address(address)
+
 
 class BlockchainService:
     """
@@ -21,13 +51,20 @@ class BlockchainService:
     Blockchain Integration Service for HaderOS Platform
     """
     
-    def __init__(self):
-        # Initialize Web3 connections
-        self.w3_eth = Web3(Web3.HTTPProvider(settings.ETH_RPC_URL))
-        self.w3_polygon = Web3(Web3.HTTPProvider(settings.POLYGON_RPC_URL))
-        
-        # Add PoA middleware for Polygon
-        self.w3_polygon.middleware_onion.inject(geth_poa_middleware, layer=0)
+    def __init__(self, providers: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            providers: Optional async providers per network. Defaults to an
+                AsyncHTTPProvider per entry of NETWORK_RPC_URLS.
+        """
+        self._providers = providers
+        self._web3: Dict[str, AsyncWeb3] = {}
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._contracts: Dict[str, Any] = {}
+        self._pipelines: Dict[str, TransactionPipeline] = {}
+        self._indexers: Dict[str, TokenEventIndexer] = {}
+        self._balance_readers: Dict[str, BalanceReader] = {}
+        self._connect_lock: Optional[asyncio.Lock] = None
         
         # Load contract owner account
         if settings.CONTRACT_OWNER_PRIVATE_KEY:
@@ -39,9 +76,16 @@ class BlockchainService:
         # Contract ABIs (simplified for example)
         self.token_abi = self._load_token_abi()
         
-        # Contract addresses
-        self.token_address_eth = None  # Set after deployment
-        self.token_address_polygon = None  # Set after deployment
+        # Contract addresses - set after deployment
+        self.token_addresses: Dict[str, Optional[str]] = {
+            network: None for network in (providers or NETWORK_RPC_URLS)
+        }
+        if providers is None:
+            for network, address in (
+                ("eth", settings.TOKEN_ADDRESS_ETH),
+                ("polygon", settings.TOKEN_ADDRESS_POLYGON)
+            ):
+                self.token_addresses[network] = to_checksum(address) if address else None
         
     def _load_token_abi(self) -> list:
         """Load contract ABI"""
@@ -88,9 +132,223 @@ class BlockchainService:
                 "outputs": [{"name": "", "type": "bool"}],
                 "stateMutability": "view",
                 "type": "function"
+            },
+            {
+                "anonymous": False,
+                "inputs": [
+                    {"indexed": True, "name": "from", "type": "address"},
+                    {"indexed": True, "name": "to", "type": "address"},
+                    {"indexed": False, "name": "value", "type": "uint256"}
+                ],
+                "name": "Transfer",
+                "type": "event"
+            },
+            {
+                "anonymous": False,
+                "inputs": [
+                    {"indexed": True, "name": "investor", "type": "address"},
+                    {"indexed": False, "name": "kycVerified", "type": "bool"},
+                    {"indexed": False, "name": "accredited", "type": "bool"}
+                ],
+                "name": "InvestorVerified",
+                "type": "event"
             }
         ]
     
+    def set_token_address(self, network: str, address: Optional[str]):
+        """Set the deployed token address for a network"""
+        self.token_addresses[network] = to_checksum(address) if address else None
+        self._contracts.pop(network, None)
+        self._balance_readers.pop(network, None)
+    
+    async def get_web3(self, network: str = "polygon") -> AsyncWeb3:
+        """
+        Return the AsyncWeb3 client for a network.
+        
+        The first call per network opens a pooled keep-alive HTTP session
+        that every later request reuses.
+        """
+        w3 = self._web3.get(network)
+        if w3 is not None:
+            return w3
+        
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            w3 = self._web3.get(network)
+            if w3 is not None:
+                return w3
+            
+            if self._providers is not None:
+                if network not in self._providers:
+                    raise ValueError(f"Unknown network: {network}")
+                provider = self._providers[network]
+            else:
+                if network not in NETWORK_RPC_URLS:
+                    raise ValueError(f"Unknown network: {network}")
+                provider = AsyncHTTPProvider(
+                    NETWORK_RPC_URLS[network],
+                    request_kwargs={"timeout": aiohttp.ClientTimeout(
+                        total=settings.BLOCKCHAIN_REQUEST_TIMEOUT
+                    )}
+                )
+            
+            if isinstance(provider, AsyncHTTPProvider):
+                session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(
+                        limit=settings.BLOCKCHAIN_POOL_SIZE,
+                        keepalive_timeout=60
+                    )
+                )
+                await provider.cache_async_session(session)
+                self._sessions[network] = session
+            
+            w3 = AsyncWeb3(provider)
+            if network in POA_NETWORKS:
+                # Add PoA middleware for Polygon
+                w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
+            
+            self._web3[network] = w3
+            return w3
+    
+    async def get_contract(self, network: str = "polygon"):
+        """Return the cached token contract for a network (None if not deployed)"""
+        contract = self._contracts.get(network)
+        if contract is not None:
+            return contract
+        
+        token_address = self.token_addresses.get(network)
+        if not token_address:
+            return None
+        
+        w3 = await self.get_web3(network)
+        contract = w3.eth.contract(address=token_address, abi=self.token_abi)
+        self._contracts[network] = contract
+        return contract
+    
+    async def start_indexers(self) -> List[str]:
+        """Start the event indexer on every network with a deployed token"""
+        started = []
+        for network, token_address in self.token_addresses.items():
+            if token_address:
+                await self.start_indexer(network)
+                started.append(network)
+        return started
+    
+    async def start_indexer(
+        self,
+        network: str = "polygon",
+        db_path: Optional[str] = None,
+        **options
+    ) -> TokenEventIndexer:
+        """
+        تشغيل مفهرس الأحداث
+        Start following token events into the local index
+        
+        Once the index is synced, balance and transaction status reads are
+        answered locally and the RPC node is only used as a fallback.
+        """
+        indexer = self._indexers.get(network)
+        if indexer is not None:
+            return indexer
+        
+        token_address = self.token_addresses.get(network)
+        if not token_address:
+            raise ValueError(f"Token contract not deployed on {network}")
+        
+        options.setdefault("confirmations", settings.LEDGER_INDEX_CONFIRMATIONS)
+        options.setdefault("poll_interval", settings.LEDGER_INDEX_POLL_INTERVAL)
+        options.setdefault("start_block", INDEX_START_BLOCKS.get(network, 0))
+        indexer = TokenEventIndexer(
+            await self.get_web3(network),
+            token_address,
+            network,
+            db_path or settings.LEDGER_INDEX_DB_PATH,
+            **options
+        )
+        indexer.start()
+        self._indexers[network] = indexer
+        return indexer
+    
+    def get_indexer(self, network: str = "polygon") -> Optional[TokenEventIndexer]:
+        """Return the network's indexer if it is running and synced"""
+        indexer = self._indexers.get(network)
+        return indexer if indexer is not None and indexer.is_synced() else None
+    
+    async def wait_for_receipt(
+        self,
+        tx_hash,
+        network: str = "polygon",
+        timeout: Optional[float] = None,
+        poll_interval: Optional[float] = None
+    ) -> Dict:
+        """
+        انتظار إيصال المعاملة
+        Await a transaction receipt by polling, without blocking the event loop
+        
+        Raises:
+            asyncio.TimeoutError: If no receipt arrives within timeout
+        """
+        w3 = await self.get_web3(network)
+        timeout = timeout if timeout is not None else settings.BLOCKCHAIN_RECEIPT_TIMEOUT
+        poll_interval = (
+            poll_interval if poll_interval is not None
+            else settings.BLOCKCHAIN_RECEIPT_POLL_INTERVAL
+        )
+        
+        async def poll():
+            while True:
+                try:
+                    return await w3.eth.get_transaction_receipt(tx_hash)
+                except TransactionNotFound:
+                    await asyncio.sleep(poll_interval)
+        
+        return await asyncio.wait_for(poll(), timeout)
+    
+    async def get_pipeline(self, network: str = "polygon") -> TransactionPipeline:
+        """Return the owner-account submission pipeline for a network"""
+        pipeline = self._pipelines.get(network)
+        if pipeline is None:
+            if self.owner_account is None:
+                raise RuntimeError("Contract owner private key not set")
+            pipeline = TransactionPipeline(
+                await self.get_web3(network),
+                self.owner_account,
+                network,
+                poll_interval=settings.BLOCKCHAIN_RECEIPT_POLL_INTERVAL,
+                receipt_timeout=settings.BLOCKCHAIN_RECEIPT_TIMEOUT
+            )
+            self._pipelines[network] = pipeline
+        return pipeline
+    
+    async def _send_transaction(self, network: str, build_tx) -> Tuple[bool, str]:
+        """Submit through the pipeline and await the tracked receipt"""
+        pipeline = await self.get_pipeline(network)
+        tracked = await pipeline.submit(build_tx)
+        await pipeline.wait(tracked.tx_hash)
+        return tracked.status == "success", tracked.tx_hash
+    
+    def _register_investor_builder(self, contract, investor: Dict) -> Any:
+        """Return a build_tx(nonce, gas_price) coroutine function for registerInvestor"""
+        call = contract.functions.registerInvestor(
+            to_checksum(investor["investor_address"]),
+            investor["kyc_verified"],
+            investor["accredited"],
+            AsyncWeb3.to_wei(investor["max_investment"], 'ether'),
+            investor["country"],
+            investor["sharia_compliant"]
+        )
+        
+        async def build_tx(nonce: int, gas_price: int) -> Dict:
+            return await call.build_transaction({
+                'from': self.owner_account.address,
+                'nonce': nonce,
+                'gas': 200000,
+                'gasPrice': gas_price
+            })
+        
+        return build_tx
+    
     async def register_investor(
         self,
         investor_address: str,
@@ -118,58 +376,78 @@ class BlockchainService:
             Tuple of (success, transaction_hash)
         """
         try:
-            # Select network
-            w3 = self.w3_polygon if network == "polygon" else self.w3_eth
-            token_address = self.token_address_polygon if network == "polygon" else self.token_address_eth
-            
-            if not token_address:
+            contract = await self.get_contract(network)
+            if contract is None:
                 logger.error(f"Token contract not deployed on {network}")
                 return False, None
             
-            # Create contract instance
-            contract = w3.eth.contract(
-                address=Web3.to_checksum_address(token_address),
-                abi=self.token_abi
-            )
-            
-            # Convert max_investment to Wei
-            max_investment_wei = w3.to_wei(max_investment, 'ether')
-            
-            # Build transaction
-            tx = contract.functions.registerInvestor(
-                Web3.to_checksum_address(investor_address),
-                kyc_verified,
-                accredited,
-                max_investment_wei,
-                country,
-                sharia_compliant
-            ).build_transaction({
-                'from': self.owner_account.address,
-                'nonce': w3.eth.get_transaction_count(self.owner_account.address),
-                'gas': 200000,
-                'gasPrice': w3.eth.gas_price
+            w3 = await self.get_web3(network)
+            build_tx = self._register_investor_builder(contract, {
+                "investor_address": investor_address,
+                "kyc_verified": kyc_verified,
+                "accredited": accredited,
+                "max_investment": max_investment,
+                "country": country,
+                "sharia_compliant": sharia_compliant
             })
+            gas_price = await w3.eth.gas_price
             
-            # Sign transaction
-            signed_tx = w3.eth.account.sign_transaction(tx, self.owner_account.key)
-            
-            # Send transaction
-            tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-            
-            # Wait for receipt
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            success, tx_hash = await self._send_transaction(
+                network, lambda nonce: build_tx(nonce, gas_price)
+            )
             
-            if receipt['status'] == 1:
-                logger.info(f"Investor registered: {investor_address}, tx: {tx_hash.hex()}")
-                return True, tx_hash.hex()
+            if success:
+                logger.info(f"Investor registered: {investor_address}, tx: {tx_hash}")
             else:
-                logger.error(f"Transaction failed: {tx_hash.hex()}")
-                return False, tx_hash.hex()
+                logger.error(f"Transaction failed: {tx_hash}")
+            return success, tx_hash
                 
         except Exception as e:
             logger.error(f"Error registering investor: {str(e)}")
             return False, None
     
+    async def register_investors(
+        self,
+        investors: List[Dict],
+        network: str = "polygon"
+    ) -> Dict:
+        """
+        تسجيل مجموعة مستثمرين
+        Register many investors back-to-back without waiting for receipts
+        
+        Args:
+            investors: Dicts with the register_investor arguments
+            network: Blockchain network
+            
+        Returns:
+            Batch summary with a batch_id and per-investor transaction hash.
+            Use get_batch_status to follow confirmations.
+        """
+        contract = await self.get_contract(network)
+        if contract is None:
+            raise ValueError(f"Token contract not deployed on {network}")
+        
+        pipeline = await self.get_pipeline(network)
+        batch = await pipeline.submit_many([
+            (investor["investor_address"], self._register_investor_builder(contract, investor))
+            for investor in investors
+        ])
+        logger.info(
+            f"Submitted {len(batch['items'])} investor registrations on {network}, "
+            f"batch: {batch['batch_id']}"
+        )
+        return batch
+    
+    def get_submission_status(self, tx_hash: str, network: str = "polygon") -> Optional[Dict]:
+        """Status of a transaction submitted through the pipeline"""
+        pipeline = self._pipelines.get(network)
+        return pipeline.get_status(tx_hash) if pipeline else None
+    
+    def get_batch_status(self, batch_id: str, network: str = "polygon") -> Optional[Dict]:
+        """Status of a batch submitted through register_investors"""
+        pipeline = self._pipelines.get(network)
+        return pipeline.get_batch_status(batch_id) if pipeline else None
+    
     async def transfer_tokens(
         self,
         from_address: str,
@@ -191,27 +469,28 @@ class BlockchainService:
             Tuple of (success, transaction_hash)
         """
         try:
-            # Select network
-            w3 = self.w3_polygon if network == "polygon" else self.w3_eth
-            token_address = self.token_address_polygon if network == "polygon" else self.token_address_eth
-            
-            if not token_address:
+            contract = await self.get_contract(network)
+            if contract is None:
                 logger.error(f"Token contract not deployed on {network}")
                 return False, None
             
-            # Create contract instance
-            contract = w3.eth.contract(
-                address=Web3.to_checksum_address(token_address),
-                abi=self.token_abi
-            )
+            w3 = await self.get_web3(network)
+            from_checksum = to_checksum(from_address)
+            to_checksum_address = to_checksum(to_address)
+            
+            # The pipeline signs with the owner key and owns the owner nonce;
+            # any other sender must sign its own transfer
+            if self.owner_account is None or from_checksum != self.owner_account.address:
+                logger.error(f"Transfer from {from_address} must be signed by the sender")
+                return False, None
             
             # Convert amount to Wei
             amount_wei = w3.to_wei(amount, 'ether')
             
             # Check compliance first
-            is_compliant = contract.functions.checkTransferCompliance(
-                Web3.to_checksum_address(from_address),
-                Web3.to_checksum_address(to_address),
+            is_compliant = await contract.functions.checkTransferCompliance(
+                from_checksum,
+                to_checksum_address,
                 amount_wei
             ).call()
             
@@ -219,33 +498,24 @@ class BlockchainService:
                 logger.warning(f"Transfer not compliant: {from_address} -> {to_address}")
                 return False, None
             
-            # Build transaction
-            tx = contract.functions.transfer(
-                Web3.to_checksum_address(to_address),
-                amount_wei
-            ).build_transaction({
-                'from': Web3.to_checksum_address(from_address),
-                'nonce': w3.eth.get_transaction_count(from_address),
-                'gas': 150000,
-                'gasPrice': w3.eth.gas_price
-            })
+            gas_price = await w3.eth.gas_price
+            transfer_call = contract.functions.transfer(to_checksum_address, amount_wei)
             
-            # Note: In production, user should sign this transaction
-            # For now, we'll use owner account as example
-            signed_tx = w3.eth.account.sign_transaction(tx, self.owner_account.key)
+            async def build_tx(nonce: int) -> Dict:
+                return await transfer_call.build_transaction({
+                    'from': from_checksum,
+                    'nonce': nonce,
+                    'gas': 150000,
+                    'gasPrice': gas_price
+                })
             
-            # Send transaction
-            tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            success, tx_hash = await self._send_transaction(network, build_tx)
             
-            # Wait for receipt
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            if receipt['status'] == 1:
-                logger.info(f"Transfer successful: {amount} tokens, tx: {tx_hash.hex()}")
-                return True, tx_hash.hex()
+            if success:
+                logger.info(f"Transfer successful: {amount} tokens, tx: {tx_hash}")
             else:
-                logger.error(f"Transfer failed: {tx_hash.hex()}")
-                return False, tx_hash.hex()
+                logger.error(f"Transfer failed: {tx_hash}")
+            return success, tx_hash
                 
         except Exception as e:
             logger.error(f"Error transferring tokens: {str(e)}")
@@ -267,35 +537,87 @@ class BlockchainService:
         Returns:
             Balance in tokens (or None if error)
         """
+        indexer = self.get_indexer(network)
+        if indexer is not None:
+            return float(AsyncWeb3.from_wei(indexer.get_balance(address), 'ether'))
+        
         try:
-            # Select network
-            w3 = self.w3_polygon if network == "polygon" else self.w3_eth
-            token_address = self.token_address_polygon if network == "polygon" else self.token_address_eth
-            
-            if not token_address:
+            contract = await self.get_contract(network)
+            if contract is None:
                 logger.error(f"Token contract not deployed on {network}")
                 return None
             
-            # Create contract instance
-            contract = w3.eth.contract(
-                address=Web3.to_checksum_address(token_address),
-                abi=self.token_abi
-            )
-            
             # Get balance
-            balance_wei = contract.functions.balanceOf(
-                Web3.to_checksum_address(address)
-            ).call()
+            balance_wei = await contract.functions.balanceOf(to_checksum(address)).call()
             
             # Convert to tokens
-            balance = w3.from_wei(balance_wei, 'ether')
-            
-            return float(balance)
+            return float(AsyncWeb3.from_wei(balance_wei, 'ether'))
             
         except Exception as e:
             logger.error(f"Error getting balance: {str(e)}")
             return None
     
+    async def get_balance_reader(self, network: str = "polygon") -> Optional[BalanceReader]:
+        """Return the bulk balance reader for a network (None if not deployed)"""
+        reader = self._balance_readers.get(network)
+        if reader is not None:
+            return reader
+        
+        token_address = self.token_addresses.get(network)
+        if not token_address:
+            return None
+        
+        reader = BalanceReader(
+            await self.get_web3(network),
+            token_address,
+            network,
+            multicall_address=settings.MULTICALL_ADDRESS or None,
+            batch_size=settings.BALANCE_BATCH_SIZE
+        )
+        self._balance_readers[network] = reader
+        return reader
+    
+    async def get_balances(
+        self,
+        addresses: List[str],
+        network: str = "polygon"
+    ) -> Optional[Dict[str, float]]:
+        """
+        الحصول على أرصدة عدة محافظ
+        Get balances of many wallets in one or two round trips
+        
+        Args:
+            addresses: Wallet addresses (duplicates are read once)
+            network: Blockchain network
+            
+        Returns:
+            Balance in tokens per checksummed address (or None if error)
+        """
+        indexer = self.get_indexer(network)
+        if indexer is not None:
+            return {
+                to_checksum(address): float(
+                    AsyncWeb3.from_wei(indexer.get_balance(address), 'ether')
+                )
+                for address in addresses
+            }
+        
+        try:
+            reader = await self.get_balance_reader(network)
+            if reader is None:
+                logger.error(f"Token contract not deployed on {network}")
+                return None
+            
+            balances_wei = await reader.get_balances(addresses)
+            return {
+                address: float(AsyncWeb3.from_wei(balance_wei, 'ether'))
+                for address, balance_wei in balances_wei.items()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error getting balances: {str(e)}")
+            return None
+    
     async def get_transaction_status(
         self,
         tx_hash: str,
@@ -312,12 +634,17 @@ class BlockchainService:
         Returns:
             Transaction receipt dictionary
         """
+        indexer = self.get_indexer(network)
+        if indexer is not None:
+            indexed = indexer.get_transaction(tx_hash)
+            if indexed is not None:
+                return indexed
+        
         try:
-            # Select network
-            w3 = self.w3_polygon if network == "polygon" else self.w3_eth
+            w3 = await self.get_web3(network)
             
             # Get receipt
-            receipt = w3.eth.get_transaction_receipt(tx_hash)
+            receipt = await w3.eth.get_transaction_receipt(tx_hash)
             
             return {
                 "transaction_hash": tx_hash,
@@ -332,10 +659,44 @@ class BlockchainService:
             logger.error(f"Error getting transaction status: {str(e)}")
             return None
     
-    def is_connected(self, network: str = "polygon") -> bool:
+    def get_transfer_history(
+        self,
+        address: str,
+        network: str = "polygon",
+        limit: int = 50
+    ) -> Optional[List[Dict]]:
+        """
+        سجل التحويلات
+        Transfer history of an address from the local index (None if not indexed)
+        """
+        indexer = self._indexers.get(network)
+        if indexer is None:
+            return None
+        return indexer.get_transfers(address, limit)
+    
+    async def is_connected(self, network: str = "polygon") -> bool:
         """Check if connected to blockchain"""
-        w3 = self.w3_polygon if network == "polygon" else self.w3_eth
-        return w3.is_connected()
+        try:
+            w3 = await self.get_web3(network)
+            return await w3.is_connected()
+        except Exception:
+            return False
+    
+    async def close(self):
+        """Stop background tasks and close pooled HTTP sessions"""
+        for indexer in self._indexers.values():
+            await indexer.stop()
+            indexer.close()
+        self._indexers.clear()
+        for pipeline in self._pipelines.values():
+            await pipeline.close()
+        self._pipelines.clear()
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+        self._web3.clear()
+        self._contracts.clear()
+        self._balance_readers.clear()
 
 
 # Global instance
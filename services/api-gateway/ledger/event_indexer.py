@@ -0,0 +1,450 @@
+"""
+Token Event Indexer
+فهرس أحداث الرمز
+
+Follows Transfer and InvestorVerified events of the security token from a
+block cursor and keeps balances and transfer history in a local SQLite
+table. Balances are also held in memory so reads do not touch the RPC node.
+
+Only blocks at least `confirmations` deep are indexed. If the chain still
+reorganises below that depth, the indexer rewinds to the last checkpoint
+whose block hash matches and replays from there.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from web3 import AsyncWeb3
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_TOPIC = AsyncWeb3.keccak(text="Transfer(address,address,uint256)").hex()
+INVESTOR_VERIFIED_TOPIC = AsyncWeb3.keccak(text="InvestorVerified(address,bool,bool)").hex()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursors (
+    network TEXT PRIMARY KEY,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    network TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    block_hash TEXT NOT NULL,
+    PRIMARY KEY (network, block_number)
+);
+CREATE TABLE IF NOT EXISTS transfers (
+    network TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    block_number INTEGER NOT NULL,
+    from_address TEXT NOT NULL,
+    to_address TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (network, tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS ix_transfers_from ON transfers (network, from_address, block_number);
+CREATE INDEX IF NOT EXISTS ix_transfers_to ON transfers (network, to_address, block_number);
+CREATE INDEX IF NOT EXISTS ix_transfers_block ON transfers (network, block_number);
+CREATE TABLE IF NOT EXISTS registrations (
+    network TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    block_number INTEGER NOT NULL,
+    investor TEXT NOT NULL,
+    kyc_verified INTEGER NOT NULL,
+    accredited INTEGER NOT NULL,
+    PRIMARY KEY (network, tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS ix_registrations_investor ON registrations (network, investor);
+CREATE INDEX IF NOT EXISTS ix_registrations_block ON registrations (network, block_number);
+CREATE TABLE IF NOT EXISTS balances (
+    network TEXT NOT NULL,
+    address TEXT NOT NULL,
+    balance TEXT NOT NULL,
+    PRIMARY KEY (network, address)
+);
+"""
+
+# Checkpoints kept for reorg recovery
+MAX_CHECKPOINTS = 256
+
+
+def _topic_address(topic) -> str:
+    return AsyncWeb3.to_checksum_address("0x" + bytes(topic)[-20:].hex())
+
+
+class TokenEventIndexer:
+    """
+    مفهرس الأحداث
+    Local index of token transfers, balances and investor registrations
+    """
+
+    def __init__(
+        self,
+        w3,
+        token_address: str,
+        network: str,
+        db_path: str,
+        confirmations: int = 12,
+        batch_blocks: int = 2000,
+        start_block: int = 0,
+        poll_interval: float = 5.0,
+        max_lag: int = 50,
+    ):
+        self.w3 = w3
+        self.token_address = AsyncWeb3.to_checksum_address(token_address)
+        self.network = network
+        self.confirmations = confirmations
+        self.batch_blocks = batch_blocks
+        self.start_block = start_block
+        self.poll_interval = poll_interval
+        self.max_lag = max_lag
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        if db_path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db_lock = threading.Lock()
+
+        self._balances: Dict[str, int] = {}
+        self._cursor: Optional[int] = None
+        self._cursor_hash: Optional[str] = None
+        self._safe_head: Optional[int] = None
+        self._last_sync: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Reads - served from memory / local table
+    # ------------------------------------------------------------------
+
+    @property
+    def indexed_block(self) -> Optional[int]:
+        return self._cursor
+
+    def is_synced(self) -> bool:
+        """True when the index is within max_lag blocks of the confirmed head"""
+        if self._cursor is None or self._safe_head is None:
+            return False
+        return self._safe_head - self._cursor <= self.max_lag
+
+    def get_balance(self, address: str) -> int:
+        """Indexed balance in wei (0 for addresses never seen)"""
+        return self._balances.get(AsyncWeb3.to_checksum_address(address), 0)
+
+    def get_transfers(self, address: str, limit: int = 50) -> List[Dict]:
+        """Most recent transfers from or to an address"""
+        address = AsyncWeb3.to_checksum_address(address)
+        with self._db_lock:
+            rows = self._db.execute(
+                """
+                SELECT tx_hash, log_index, block_number, from_address, to_address, value
+                FROM transfers WHERE network = ? AND from_address = ?
+                UNION ALL
+                SELECT tx_hash, log_index, block_number, from_address, to_address, value
+                FROM transfers WHERE network = ? AND to_address = ? AND from_address != ?
+                ORDER BY block_number DESC, log_index DESC LIMIT ?
+                """,
+                (self.network, address, self.network, address, address, limit),
+            ).fetchall()
+        return [self._transfer_row(row) for row in rows]
+
+    def get_transaction(self, tx_hash: str) -> Optional[Dict]:
+        """Indexed events of a transaction, or None if it is not indexed"""
+        tx_hash = tx_hash if tx_hash.startswith("0x") else "0x" + tx_hash
+        with self._db_lock:
+            transfers = self._db.execute(
+                "SELECT tx_hash, log_index, block_number, from_address, to_address, value "
+                "FROM transfers WHERE network = ? AND tx_hash = ? ORDER BY log_index",
+                (self.network, tx_hash.lower()),
+            ).fetchall()
+            registrations = self._db.execute(
+                "SELECT block_number, investor, kyc_verified, accredited "
+                "FROM registrations WHERE network = ? AND tx_hash = ? ORDER BY log_index",
+                (self.network, tx_hash.lower()),
+            ).fetchall()
+
+        if not transfers and not registrations:
+            return None
+
+        block_number = (transfers or registrations)[0][2 if transfers else 0]
+        return {
+            "transaction_hash": tx_hash,
+            "status": "success",  # Only successful transactions emit events
+            "block_number": block_number,
+            "confirmations": (
+                self._safe_head + self.confirmations - block_number + 1
+                if self._safe_head is not None
+                else None
+            ),
+            "transfers": [self._transfer_row(row) for row in transfers],
+            "registrations": [
+                {"investor": row[1], "kyc_verified": bool(row[2]), "accredited": bool(row[3])}
+                for row in registrations
+            ],
+            "source": "index",
+        }
+
+    def get_status(self) -> Dict:
+        return {
+            "network": self.network,
+            "token_address": self.token_address,
+            "indexed_block": self._cursor,
+            "confirmed_head": self._safe_head,
+            "confirmations": self.confirmations,
+            "synced": self.is_synced(),
+            "holders": len(self._balances),
+            "last_sync": self._last_sync,
+        }
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    async def sync_once(self) -> int:
+        """
+        Index all newly confirmed blocks.
+
+        Returns:
+            Number of events indexed
+        """
+        head = await self.w3.eth.block_number
+        self._safe_head = head - self.confirmations
+
+        if self._cursor is not None and self._cursor_hash is not None:
+            # A reorg can leave the chain shorter than the cursor
+            if self._cursor > head:
+                await self._rewind(head)
+            else:
+                block = await self.w3.eth.get_block(self._cursor)
+                if block["hash"].hex() != self._cursor_hash:
+                    await self._rewind(head)
+
+        indexed = 0
+        from_block = self.start_block if self._cursor is None else self._cursor + 1
+        while from_block <= self._safe_head:
+            to_block = min(from_block + self.batch_blocks - 1, self._safe_head)
+            logs, block = await asyncio.gather(
+                self.w3.eth.get_logs(
+                    {
+                        "fromBlock": from_block,
+                        "toBlock": to_block,
+                        "address": self.token_address,
+                        "topics": [[TRANSFER_TOPIC, INVESTOR_VERIFIED_TOPIC]],
+                    }
+                ),
+                self.w3.eth.get_block(to_block),
+            )
+            await asyncio.to_thread(self._apply, logs, to_block, block["hash"].hex())
+            indexed += len(logs)
+            from_block = to_block + 1
+
+        self._last_sync = time.time()
+        return indexed
+
+    async def run(self):
+        """Follow the chain until cancelled"""
+        while True:
+            try:
+                indexed = await self.sync_once()
+                if indexed:
+                    logger.info(f"Indexed {indexed} events on {self.network} up to {self._cursor}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event indexer error on {self.network}: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def close(self):
+        with self._db_lock:
+            self._db.close()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        row = self._db.execute(
+            "SELECT block_number, block_hash FROM cursors WHERE network = ?", (self.network,)
+        ).fetchone()
+        if row:
+            self._cursor, self._cursor_hash = row
+        self._balances = {
+            address: int(balance)
+            for address, balance in self._db.execute(
+                "SELECT address, balance FROM balances WHERE network = ?", (self.network,)
+            )
+        }
+
+    def _apply(self, logs: List, to_block: int, block_hash: str):
+        """Write one block range in a single transaction"""
+        deltas: Dict[str, int] = {}
+        transfers = []
+        registrations = []
+
+        for log in logs:
+            topics = log["topics"]
+            topic0 = topics[0].hex()
+            tx_hash = log["transactionHash"].hex().lower()
+            data = bytes(log["data"])
+
+            if topic0 == TRANSFER_TOPIC:
+                sender = _topic_address(topics[1])
+                receiver = _topic_address(topics[2])
+                value = int.from_bytes(data[:32], "big")
+                transfers.append(
+                    (
+                        self.network,
+                        tx_hash,
+                        log["logIndex"],
+                        log["blockNumber"],
+                        sender,
+                        receiver,
+                        str(value),
+                    )
+                )
+                # Mints come from and burns go to the zero address
+                if int(sender, 16) != 0:
+                    deltas[sender] = deltas.get(sender, 0) - value
+                if int(receiver, 16) != 0:
+                    deltas[receiver] = deltas.get(receiver, 0) + value
+            elif topic0 == INVESTOR_VERIFIED_TOPIC:
+                registrations.append(
+                    (
+                        self.network,
+                        tx_hash,
+                        log["logIndex"],
+                        log["blockNumber"],
+                        _topic_address(topics[1]),
+                        int.from_bytes(data[:32], "big"),
+                        int.from_bytes(data[32:64], "big"),
+                    )
+                )
+
+        balances = {
+            address: self._balances.get(address, 0) + delta for address, delta in deltas.items()
+        }
+
+        with self._db_lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?)", transfers
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO registrations VALUES (?, ?, ?, ?, ?, ?, ?)", registrations
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO balances VALUES (?, ?, ?)",
+                [(self.network, address, str(balance)) for address, balance in balances.items()],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO cursors VALUES (?, ?, ?)",
+                (self.network, to_block, block_hash),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+                (self.network, to_block, block_hash),
+            )
+            self._db.execute(
+                "DELETE FROM checkpoints WHERE network = ? AND block_number NOT IN ("
+                "SELECT block_number FROM checkpoints WHERE network = ? "
+                "ORDER BY block_number DESC LIMIT ?)",
+                (self.network, self.network, MAX_CHECKPOINTS),
+            )
+
+        self._balances.update(balances)
+        self._cursor = to_block
+        self._cursor_hash = block_hash
+
+    async def _rewind(self, head: int):
+        """Roll back to the newest checkpoint that is still on the canonical chain"""
+        with self._db_lock:
+            # Checkpoints above the current head no longer exist
+            checkpoints = self._db.execute(
+                "SELECT block_number, block_hash FROM checkpoints "
+                "WHERE network = ? AND block_number <= ? ORDER BY block_number DESC",
+                (self.network, head),
+            ).fetchall()
+
+        keep_block, keep_hash = None, None
+        for block_number, block_hash in checkpoints:
+            block = await self.w3.eth.get_block(block_number)
+            if block["hash"].hex() == block_hash:
+                keep_block, keep_hash = block_number, block_hash
+                break
+
+        logger.warning(
+            f"Reorg detected on {self.network} at block {self._cursor}, "
+            f"rewinding to {keep_block}"
+        )
+        await asyncio.to_thread(self._truncate, keep_block, keep_hash)
+
+    def _truncate(self, keep_block: Optional[int], keep_hash: Optional[str]):
+        """Delete everything above keep_block and rebuild balances"""
+        above = -1 if keep_block is None else keep_block
+        with self._db_lock, self._db:
+            for table in ("transfers", "registrations", "checkpoints"):
+                self._db.execute(
+                    f"DELETE FROM {table} WHERE network = ? AND block_number > ?",
+                    (self.network, above),
+                )
+            if keep_block is None:
+                self._db.execute("DELETE FROM cursors WHERE network = ?", (self.network,))
+            else:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cursors VALUES (?, ?, ?)",
+                    (self.network, keep_block, keep_hash),
+                )
+
+            balances: Dict[str, int] = {}
+            for sender, receiver, value in self._db.execute(
+                "SELECT from_address, to_address, value FROM transfers WHERE network = ?",
+                (self.network,),
+            ):
+                value = int(value)
+                if int(sender, 16) != 0:
+                    balances[sender] = balances.get(sender, 0) - value
+                if int(receiver, 16) != 0:
+                    balances[receiver] = balances.get(receiver, 0) + value
+
+            self._db.execute("DELETE FROM balances WHERE network = ?", (self.network,))
+            self._db.executemany(
+                "INSERT INTO balances VALUES (?, ?, ?)",
+                [(self.network, address, str(balance)) for address, balance in balances.items()],
+            )
+
+        self._balances = balances
+        self._cursor = keep_block
+        self._cursor_hash = keep_hash
+
+    @staticmethod
+    def _transfer_row(row) -> Dict:
+        tx_hash, log_index, block_number, sender, receiver, value = row
+        return {
+            "transaction_hash": tx_hash,
+            "log_index": log_index,
+            "block_number": block_number,
+            "from": sender,
+            "to": receiver,
+            "value": int(value),
+        }
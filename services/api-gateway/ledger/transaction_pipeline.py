@@ -0,0 +1,281 @@
+"""
+Transaction Submission Pipeline
+خط إرسال المعاملات
+
+Signs and broadcasts owner-account transactions back-to-back using a local
+nonce counter instead of asking the node for a nonce and waiting for each
+receipt. Receipts are tracked by one background poller per network.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from web3.exceptions import TransactionNotFound
+
+logger = logging.getLogger(__name__)
+
+
+class NonceManager:
+    """
+    مدير الأرقام التسلسلية
+    Local nonce counter for one account, resynced from the node on error
+    """
+
+    def __init__(self, w3, address: str):
+        self.w3 = w3
+        self.address = address
+        self.lock = asyncio.Lock()
+        self._next: Optional[int] = None
+
+    async def reserve(self) -> int:
+        """Return the next nonce. Callers must hold self.lock until broadcast."""
+        if self._next is None:
+            await self.resync()
+        nonce = self._next
+        self._next += 1
+        return nonce
+
+    async def resync(self):
+        """Reload the counter from the node's pending transaction count"""
+        self._next = await self.w3.eth.get_transaction_count(self.address, "pending")
+        logger.info(f"Nonce for {self.address} resynced to {self._next}")
+
+    def invalidate(self):
+        """Force a resync before the next reservation"""
+        self._next = None
+
+
+@dataclass
+class TrackedTransaction:
+    """A broadcast transaction whose receipt is being tracked"""
+
+    tx_hash: str
+    nonce: int
+    network: str
+    batch_id: Optional[str] = None
+    label: Optional[str] = None
+    status: str = "pending"  # pending | success | failed | timeout
+    block_number: Optional[int] = None
+    gas_used: Optional[int] = None
+    submitted_at: float = field(default_factory=time.time)
+    confirmed_at: Optional[float] = None
+    receipt: Optional[asyncio.Future] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "transaction_hash": self.tx_hash,
+            "nonce": self.nonce,
+            "network": self.network,
+            "batch_id": self.batch_id,
+            "label": self.label,
+            "status": self.status,
+            "block_number": self.block_number,
+            "gas_used": self.gas_used,
+            "submitted_at": self.submitted_at,
+            "confirmed_at": self.confirmed_at,
+        }
+
+
+class TransactionPipeline:
+    """
+    خط إرسال المعاملات
+    Pipelined submission and asynchronous receipt tracking for one network
+    """
+
+    def __init__(
+        self,
+        w3,
+        account,
+        network: str,
+        poll_interval: float = 1.0,
+        receipt_timeout: float = 120.0,
+        max_tracked: int = 10000,
+    ):
+        self.w3 = w3
+        self.account = account
+        self.network = network
+        self.poll_interval = poll_interval
+        self.receipt_timeout = receipt_timeout
+        self.max_tracked = max_tracked
+        self.nonces = NonceManager(w3, account.address)
+
+        self._tracked: "OrderedDict[str, TrackedTransaction]" = OrderedDict()
+        self._batches: Dict[str, List[str]] = {}
+        self._pending: Dict[str, TrackedTransaction] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    async def submit(
+        self,
+        build_tx: Callable[[int], Awaitable[Dict]],
+        batch_id: Optional[str] = None,
+        label: Optional[str] = None,
+    ) -> TrackedTransaction:
+        """
+        Sign and broadcast one transaction without waiting for its receipt.
+
+        Args:
+            build_tx: Coroutine function building the transaction for a nonce
+            batch_id: Optional batch the transaction belongs to
+            label: Optional caller reference (e.g. investor address)
+        """
+        async with self.nonces.lock:
+            for attempt in range(2):
+                nonce = await self.nonces.reserve()
+                try:
+                    tx = await build_tx(nonce)
+                    signed_tx = self.account.sign_transaction(tx)
+                    tx_hash = await self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+                    break
+                except Exception as e:
+                    # The reserved nonce was not used - resync before the next send
+                    self.nonces.invalidate()
+                    if attempt or "nonce" not in str(e).lower():
+                        raise
+                    logger.warning(f"Nonce {nonce} rejected on {self.network}, resyncing: {e}")
+
+        tracked = TrackedTransaction(
+            tx_hash=tx_hash.hex(),
+            nonce=nonce,
+            network=self.network,
+            batch_id=batch_id,
+            label=label,
+            receipt=asyncio.get_running_loop().create_future(),
+        )
+        self._track(tracked)
+        return tracked
+
+    async def submit_many(self, builders: List[tuple]) -> Dict:
+        """
+        Broadcast several transactions back-to-back as one batch.
+
+        Args:
+            builders: (label, build_tx) pairs
+
+        Returns:
+            Batch summary with per-item transaction hash or error
+        """
+        batch_id = uuid.uuid4().hex
+        gas_price = await self.w3.eth.gas_price
+        items = []
+        for label, build_tx in builders:
+            try:
+                tracked = await self.submit(
+                    lambda nonce, build_tx=build_tx: build_tx(nonce, gas_price),
+                    batch_id=batch_id,
+                    label=label,
+                )
+                items.append({"label": label, "transaction_hash": tracked.tx_hash})
+            except Exception as e:
+                logger.error(f"Submission failed for {label}: {str(e)}")
+                items.append({"label": label, "transaction_hash": None, "error": str(e)})
+
+        self._batches[batch_id] = items
+        if len(self._batches) > self.max_tracked:
+            self._batches.pop(next(iter(self._batches)))
+        return {"batch_id": batch_id, "network": self.network, "items": items}
+
+    async def wait(self, tx_hash: str) -> TrackedTransaction:
+        """Await the final status of a tracked transaction"""
+        tracked = self._tracked[tx_hash]
+        if tracked.receipt is not None and not tracked.receipt.done():
+            await asyncio.shield(tracked.receipt)
+        return tracked
+
+    def get_status(self, tx_hash: str) -> Optional[Dict]:
+        tracked = self._tracked.get(tx_hash)
+        return tracked.to_dict() if tracked else None
+
+    def get_batch_status(self, batch_id: str) -> Optional[Dict]:
+        submissions = self._batches.get(batch_id)
+        if submissions is None:
+            return None
+
+        items = []
+        for submission in submissions:
+            tracked = self._tracked.get(submission["transaction_hash"])
+            if tracked is not None:
+                items.append(tracked.to_dict())
+            elif submission["transaction_hash"] is None:
+                items.append({**submission, "status": "submit_failed"})
+        counts: Dict[str, int] = {}
+        for item in items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return {
+            "batch_id": batch_id,
+            "network": self.network,
+            "total": len(submissions),
+            "counts": counts,
+            "items": items,
+        }
+
+    async def close(self):
+        """Stop receipt polling; callers still waiting on a receipt get an error"""
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+        for tracked in self._pending.values():
+            if tracked.receipt is not None and not tracked.receipt.done():
+                tracked.receipt.set_exception(
+                    RuntimeError(
+                        f"Pipeline for {self.network} closed before {tracked.tx_hash} was confirmed"
+                    )
+                )
+        self._pending.clear()
+
+    def _track(self, tracked: TrackedTransaction):
+        self._tracked[tracked.tx_hash] = tracked
+        self._pending[tracked.tx_hash] = tracked
+
+        # Bound memory: forget the oldest finished transactions
+        while len(self._tracked) > self.max_tracked:
+            oldest = next(iter(self._tracked.values()))
+            if oldest.status == "pending":
+                break
+            self._tracked.popitem(last=False)
+
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_receipts())
+
+    async def _poll_receipts(self):
+        """Poll receipts of all pending transactions until none remain"""
+        while self._pending:
+            pending = list(self._pending.values())
+            results = await asyncio.gather(
+                *(self.w3.eth.get_transaction_receipt(t.tx_hash) for t in pending),
+                return_exceptions=True,
+            )
+
+            now = time.time()
+            for tracked, result in zip(pending, results):
+                if isinstance(result, TransactionNotFound):
+                    if now - tracked.submitted_at > self.receipt_timeout:
+                        self._finish(tracked, "timeout")
+                        # A dropped transaction leaves a nonce gap
+                        self.nonces.invalidate()
+                    continue
+                if isinstance(result, Exception):
+                    logger.warning(f"Receipt lookup failed for {tracked.tx_hash}: {result}")
+                    continue
+
+                tracked.block_number = result["blockNumber"]
+                tracked.gas_used = result["gasUsed"]
+                self._finish(tracked, "success" if result["status"] == 1 else "failed")
+
+            if self._pending:
+                await asyncio.sleep(self.poll_interval)
+
+    def _finish(self, tracked: TrackedTransaction, status: str):
+        tracked.status = status
+        tracked.confirmed_at = time.time()
+        self._pending.pop(tracked.tx_hash, None)
+        if tracked.receipt is not None and not tracked.receipt.done():
+            tracked.receipt.set_result(status)
@@ -7,6 +7,7 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from prometheus_client import make_asgi_app
+import asyncio
 import time
 import logging
 
@@ -14,6 +15,7 @@ from backend.api.v1.router import api_router
 from backend.core.config import settings
 from backend.core.database import engine, Base, SessionLocal
 from backend.core.seeder import seed_all
+from backend.ledger.blockchain_service import blockchain_service
 
 # Configure logging
 logging.basicConfig(
@@ -100,6 +102,44 @@ async def startup_event():
     finally:
         db.close()
     
+    if settings.LEDGER_INDEX_ENABLED:
+        networks = await blockchain_service.start_indexers()
+        logger.info(f"⛓️ Ledger event indexer following: {', '.join(networks) or 'none'}")
+    
+    if settings.ECOMMERCE_SYNC_ENABLED:
+        # Same import path as the other integrations, so one rate limiter per store
+        from integrations.ecommerce.sync import create_delta_sync_service
+        app.state.delta_sync = create_delta_sync_service()
+        app.state.delta_sync.start()
+        logger.info(f"🔄 E-commerce delta sync every {settings.ECOMMERCE_SYNC_INTERVAL:.0f}s")
+    
+    # Same import path as the integrations endpoints, so both see one service
+    from integrations.ecommerce.inventory_push import get_inventory_push_service
+    if get_inventory_push_service().manager.adapters:
+        get_inventory_push_service().start()
+        logger.info("🏷️ Inventory push worker started")
+    
+    if settings.SHOPIFY_WEBHOOK_SECRET:
+        # Same import path as the integrations endpoints, so both see one pipeline
+        from integrations.shopify.webhooks import get_webhook_pipeline
+        get_webhook_pipeline().start()
+        logger.info("📥 Shopify webhook workers started")
+    
+    # Shipping rate cache: hot lanes refreshed in the background, zone table pre-warmed
+    from integrations.shipping.rate_shopping import get_rate_shopper
+    rate_shopper = get_rate_shopper()
+    rate_shopper.cache.start()
+    if settings.SHIPPING_ORIGIN_CITY and rate_shopper.carriers:
+        app.state.rate_prewarm = asyncio.create_task(
+            rate_shopper.prewarm(settings.SHIPPING_ORIGIN_COUNTRY, settings.SHIPPING_ORIGIN_CITY)
+        )
+        logger.info(f"🚚 Pre-warming shipping rates from {settings.SHIPPING_ORIGIN_CITY}")
+    
+    from integrations.shipping.tracking import get_tracking_service
+    if get_tracking_service().carriers:
+        get_tracking_service().start()
+        logger.info("📦 Shipment tracking poller started")
+    
     logger.info("✅ HaderOS Platform started successfully")
 
 # Shutdown event
@@ -107,6 +147,23 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("🛑 Shutting down HaderOS Platform...")
+    await blockchain_service.close()
+    if getattr(app.state, "delta_sync", None) is not None:
+        await app.state.delta_sync.stop()
+    from integrations.ecommerce.inventory_push import get_inventory_push_service
+    await get_inventory_push_service().stop()  # Pushes what is still queued
+    if settings.SHOPIFY_WEBHOOK_SECRET:
+        from integrations.shopify.webhooks import get_webhook_pipeline
+        await get_webhook_pipeline().stop()
+    if getattr(app.state, "rate_prewarm", None) is not None:
+        app.state.rate_prewarm.cancel()
+    from integrations.shipping.rate_cache import get_rate_cache
+    await get_rate_cache().stop()
+    from integrations.shipping.tracking import get_tracking_service
+    await get_tracking_service().stop()
+    # Pooled integration connections
+    from integrations.http_pool import get_http_pool
+    await get_http_pool().aclose()
     logger.info("✅ Shutdown complete")
 
 # Exception handler
@@ -0,0 +1,46 @@
+"""
+
+Create the orders table for platform orders synced from e-commerce adapters
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("orders"):
+        return  # Already created by Base.metadata.create_all at startup
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("platform", sa.String(50), nullable=False),
+        sa.Column("external_id", sa.String(100), nullable=False),
+        sa.Column("order_number", sa.String(50)),
+        sa.Column("customer_email", sa.String(255)),
+        sa.Column("customer_name", sa.String(255)),
+        sa.Column("total_amount", sa.DECIMAL(12, 2), nullable=False),
+        sa.Column("currency", sa.String(3)),
+        sa.Column("status", sa.String(50)),
+        sa.Column("items", sa.Text()),
+        sa.Column("shipping_address", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("synced_at", sa.DateTime()),
+        sa.UniqueConstraint("platform", "external_id", name="uq_orders_platform_external_id"),
+    )
+    for column in ("id", "platform", "customer_email", "status", "updated_at"):
+        op.create_index(f"ix_orders_{column}", "orders", [column])
+
+
+def downgrade() -> None:
+    op.drop_table("orders")
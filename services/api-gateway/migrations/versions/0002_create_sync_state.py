@@ -0,0 +1,52 @@
+"""
+
+Create the sync_states and sync_records tables used by the e-commerce delta sync
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    # Either table may already exist from Base.metadata.create_all at startup
+    if not inspector.has_table("sync_states"):
+        op.create_table(
+            "sync_states",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("platform", sa.String(50), nullable=False),
+            sa.Column("resource", sa.String(50), nullable=False),
+            sa.Column("watermark", sa.String(40)),
+            sa.Column("last_run_at", sa.DateTime()),
+            sa.Column("last_fetched", sa.Integer()),
+            sa.Column("last_changed", sa.Integer()),
+            sa.UniqueConstraint("platform", "resource", name="uq_sync_states_platform_resource"),
+        )
+        op.create_index("ix_sync_states_id", "sync_states", ["id"])
+    if not inspector.has_table("sync_records"):
+        op.create_table(
+            "sync_records",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("platform", sa.String(50), nullable=False),
+            sa.Column("resource", sa.String(50), nullable=False),
+            sa.Column("external_id", sa.String(100), nullable=False),
+            sa.Column("content_hash", sa.String(32), nullable=False),
+            sa.Column("synced_at", sa.DateTime()),
+            sa.UniqueConstraint("platform", "resource", "external_id", name="uq_sync_records_key"),
+        )
+        op.create_index("ix_sync_records_id", "sync_records", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("sync_records")
+    op.drop_table("sync_states")
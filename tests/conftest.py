@@ -0,0 +1,210 @@
+"""
+
+Shared test fixtures
+
+"""
+
+from dataclasses import dataclass
+
+import pytest
+
+# Bytecode of a minimal stand-in for contracts/HaderosSecurityToken.sol,
+# compiled with vyper 0.4.3 (--evm-version paris) from:
+#
+#   # pragma version ^0.4.0
+#   # Minimal stand-in for HaderosSecurityToken used by the ledger tests
+#
+#   event Transfer:
+#       sender: indexed(address)
+#       receiver: indexed(address)
+#       value: uint256
+#
+#   event InvestorVerified:
+#       investor: indexed(address)
+#       kycVerified: bool
+#       accredited: bool
+#
+#   owner: public(address)
+#   balanceOf: public(HashMap[address, uint256])
+#   verified: public(HashMap[address, bool])
+#   totalSupply: public(uint256)
+#
+#
+#   @deploy
+#   def __init__():
+#       self.owner = msg.sender
+#
+#
+#   @external
+#   def registerInvestor(
+#       _investor: address,
+#       _kycVerified: bool,
+#       _accredited: bool,
+#       _maxInvestment: uint256,
+#       _country: String[64],
+#       _shariaCompliant: bool,
+#   ):
+#       assert msg.sender == self.owner
+#       self.verified[_investor] = _kycVerified
+#       log InvestorVerified(investor=_investor, kycVerified=_kycVerified, accredited=_accredited)
+#
+#
+#   @view
+#   @external
+#   def checkTransferCompliance(_from: address, _to: address, _amount: uint256) -> bool:
+#       return self.verified[_from] and self.verified[_to]
+#
+#
+#   @external
+#   def transfer(_to: address, _amount: uint256) -> bool:
+#       assert self.verified[msg.sender] and self.verified[_to]
+#       self.balanceOf[msg.sender] -= _amount
+#       self.balanceOf[_to] += _amount
+#       log Transfer(sender=msg.sender, receiver=_to, value=_amount)
+#       return True
+#
+#
+#   @external
+#   def mint(_to: address, _amount: uint256):
+#       assert msg.sender == self.owner
+#       assert self.verified[_to]
+#       self.totalSupply += _amount
+#       self.balanceOf[_to] += _amount
+#       log Transfer(sender=empty(address), receiver=_to, value=_amount)
+TOKEN_BYTECODE = "0x" + (
+    "3461001a573360015561039561001f61000039610395610000f35b600080fd60003560e01c60026007820660"
+    "011b61038701601e39600051565b6340fcfd73811861037c5760c436103417610382576004358060a01c6103"
+    "82576040526024358060011c610382576060526044358060011c610382576080526084356004018035604081"
+    "11610382575060608160a0375060a4358060011c610382576101005260015433186103825760605160036040"
+    "516020526000526040600020556040517fcb870d6249aef4866734d34d6607c1c181a2aa20ae8a92e08d675a"
+    "5aed8a6bc760605161012052608051610140526040610120a2005b6355252389811861013f57606436103417"
+    "610382576004358060a01c610382576040526024358060a01c61038257606052600360405160205260005260"
+    "4060002054610124576000610136565b60036060516020526000526040600020545b60805260206080f35b63"
+    "8da5cb5b811861037c57346103825760015460405260206040f35b63a9059cbb811861023457604436103417"
+    "610382576004358060a01c610382576040526003336020526000526040600020546101985760006101aa565b"
+    "60036040516020526000526040600020545b1561038257600233602052600052604060002080546024358082"
+    "0382811161038257905090508155506002604051602052600052604060002080546024358082018281106103"
+    "825790509050815550604051337fddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523"
+    "b3ef60243560605260206060a3600160605260206060f35b6340c10f19811861037c57604436103417610382"
+    "576004358060a01c610382576040526001543318610382576003604051602052600052604060002054156103"
+    "8257600454602435808201828110610382579050905060045560026040516020526000526040600020805460"
+    "2435808201828110610382579050905081555060405160007fddf252ad1be2c89b69c2b068fc378daa952ba7"
+    "f163c4a11628f55a4df523b3ef60243560605260206060a3005b6370a08231811861037c5760243610341761"
+    "0382576004358060a01c61038257604052600260405160205260005260406000205460605260206060f35b63"
+    "0db065f4811861036057602436103417610382576004358060a01c6103825760405260036040516020526000"
+    "5260406000205460605260206060f35b6318160ddd811861037c57346103825760045460405260206040f35b"
+    "60006000fd5b600080fd02e6001a00d7015b037c0323037c855820783b62ec6d9b357cd5a7cca5237feac0f0"
+    "678f7b9775d44d2322f90cad52727d190395810e00a1657679706572830004030036"
+)
+
+
+# Bytecode of a Multicall3 stand-in exposing aggregate3 with the same ABI,
+# compiled with vyper 0.4.3 (--evm-version paris) from:
+#
+#   # pragma version ^0.4.0
+#
+#   struct Call3:
+#       target: address
+#       allowFailure: bool
+#       callData: Bytes[100]
+#
+#   struct Result:
+#       success: bool
+#       returnData: Bytes[32]
+#
+#   @external
+#   @view
+#   def aggregate3(calls: DynArray[Call3, 1024]) -> DynArray[Result, 1024]:
+#       results: DynArray[Result, 1024] = []
+#       for c: Call3 in calls:
+#           success: bool = False
+#           data: Bytes[32] = b""
+#           success, data = raw_call(
+#               c.target, c.callData, max_outsize=32, is_static_call=True, revert_on_failure=False
+#           )
+#           assert success or c.allowFailure
+#           results.append(Result(success=success, returnData=data))
+#       return results
+MULTICALL_BYTECODE = "0x" + (
+    "61029b6100116100003961029b610000f360003560e01c6382ad56cb81186102905760243610341761029657"
+    "60043560040161040081351161029657803560008161040081116102965780156100a357905b8060051b6020"
+    "85010135602085010160e0820260600181358060a01c61029657815260208201358060011c61029657602082"
+    "0152604082013582018035606481116102965750602081350160408301818382375050505050600101818118"
+    "610040575b505080604052505060006203806052600060405161040081116102965780156101d257905b60e0"
+    "8102606001805162050080526020810151620500a05260408101602081510180620500c0828460045afa1561"
+    "029657505050604036620501603762050080515a620500c06020620501e08251602084018686fa9050905090"
+    "5062050200523d602081183d6020100218620501c052620501c0805162050220526020810151620502405250"
+    "62050200516205016052620502205162050180526205024051620501a052620501605161017f57620500a051"
+    "610182565b60015b156102965762038060516103ff8111610296576060810262038080016205016051815262"
+    "050180516020820152620501a051602060208301015250600181016203806052506001018181186100c8575b"
+    "50506020806205008052806205008001600062038060518083528060051b6000826104008111610296578015"
+    "61027a57905b828160051b602088010152606081026203808001836020880101604082518252806020830152"
+    "6020830181830181518152602082015160208201528051806020830101601f82600003163682375050601f19"
+    "601f8251602001011690509050810190509050905083019250600101818118610204575b5050820160200191"
+    "505090508101905062050080f35b60006000fd5b600080fd8558204133770311824fc7a1b831aa5cc3d0b1f6"
+    "7352820be04a01910a35e18d90ef0c19029b8000a1657679706572830004030035"
+)
+
+# Stand-in functions not in BlockchainService's ABI, used for test setup
+TOKEN_TEST_ABI = [
+    {
+        "inputs": [{"name": "_to", "type": "address"}, {"name": "_amount", "type": "uint256"}],
+        "name": "mint",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
+    {
+        "inputs": [{"name": "arg0", "type": "address"}],
+        "name": "verified",
+        "outputs": [{"name": "", "type": "bool"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
+
+# eth-tester default account #0
+OWNER_PRIVATE_KEY = "0x" + "00" * 31 + "01"
+
+
+@dataclass
+class DevChain:
+    """In-process eth-tester chain with the stand-in token deployed"""
+
+    provider: object  # AsyncEthereumTesterProvider
+    w3: object  # Sync Web3 on the same chain, for setup and assertions
+    token: object  # Sync contract handle
+    owner: str
+    multicall: str  # Address of the Multicall3 stand-in
+
+
+@pytest.fixture
+def dev_chain():
+    """Fresh in-process chain with the token and multicall deployed by account #0"""
+    pytest.importorskip("eth_tester")
+    from web3 import Web3
+    from web3.providers.eth_tester import AsyncEthereumTesterProvider, EthereumTesterProvider
+
+    from services.api_gateway.ledger.blockchain_service import BlockchainService
+
+    provider = AsyncEthereumTesterProvider()
+    w3 = Web3(EthereumTesterProvider(ethereum_tester=provider.ethereum_tester))
+    owner = w3.eth.accounts[0]
+    abi = BlockchainService()._load_token_abi() + TOKEN_TEST_ABI
+
+    deployer = w3.eth.contract(abi=abi, bytecode=TOKEN_BYTECODE)
+    tx_hash = deployer.constructor().transact({"from": owner})
+    token_address = w3.eth.get_transaction_receipt(tx_hash)["contractAddress"]
+
+    tx_hash = (
+        w3.eth.contract(abi=[], bytecode=MULTICALL_BYTECODE).constructor().transact({"from": owner})
+    )
+    multicall_address = w3.eth.get_transaction_receipt(tx_hash)["contractAddress"]
+
+    return DevChain(
+        provider=provider,
+        w3=w3,
+        token=w3.eth.contract(address=token_address, abi=abi),
+        owner=owner,
+        multicall=multicall_address,
+    )
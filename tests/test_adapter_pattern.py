@@ -9,6 +9,8 @@ including the base adapter, Shopify adapter, mock adapter, and adapter manager.
 
 import pytest
 import asyncio
+import time
+import httpx
 from datetime import datetime
 from unittest.mock import AsyncMock, patch
 
@@ -19,9 +21,11 @@ from services.api_gateway.integrations.ecommerce.adapters import (
     ProductData,
     FulfillmentData,
     ShopifyAdapter,
-    MockAdapter
+    MockAdapter,
+    parse_datetime
 )
 from services.api_gateway.integrations.ecommerce.adapter_manager import AdapterManager
+from services.api_gateway.integrations.http_pool import HTTPClientPool
 
 
 class TestBaseAdapter:
@@ -141,6 +145,119 @@ class TestMockAdapter:
         assert 'orders_count' in status
 
 
+class TestMockLoadMode:
+    """Test the seeded, lazily generated load-testing mode of the mock adapter"""
+
+    @pytest.mark.asyncio
+    async def test_millions_of_records_without_allocation(self):
+        adapter = MockAdapter({'load': {'orders': 10_000_000, 'products': 1_000_000, 'seed': 7}})
+
+        order = await adapter.get_order('mock_order_9999999')
+        assert order.order_id == 'mock_order_9999999'
+        assert await adapter.get_order('mock_order_10000001') is None
+        assert adapter.mock_data['orders'] == {}
+        assert adapter.get_status()['orders_count'] == 10_000_000
+
+    @pytest.mark.asyncio
+    async def test_generation_is_deterministic(self):
+        first = MockAdapter({'load': {'seed': 3}})
+        second = MockAdapter({'load': {'seed': 3}})
+        other = MockAdapter({'load': {'seed': 4}})
+
+        assert await first.get_order('mock_order_42') == await second.get_order('mock_order_42')
+        product = await first.get_product('mock_product_5')
+        assert product == await second.get_product('mock_product_5')
+        assert await first.get_order('mock_order_42') != await other.get_order('mock_order_42')
+
+    @pytest.mark.asyncio
+    async def test_pages_and_watermark(self):
+        adapter = MockAdapter({'load': {'orders': 1000, 'page_size': 100}})
+
+        assert len(await adapter.get_orders()) == 100
+        assert len([o async for o in adapter.iter_orders(page_size=64)]) == 1000
+        assert adapter.metrics['pages'] == 1 + 16
+
+        await adapter.update_order('mock_order_10', {'status': 'refunded'})
+        since = (await adapter.get_order('mock_order_901')).updated_at
+        recent = [o.order_id async for o in adapter.iter_orders(updated_at_min=since.isoformat())]
+        assert recent[0] == 'mock_order_901'
+        assert len(recent) == 101
+        assert recent[-1] == 'mock_order_10'  # Written after the watermark
+
+    @pytest.mark.asyncio
+    async def test_injected_rate_limits_and_errors(self):
+        adapter = MockAdapter(
+            {'load': {'rate_limit_rate': 0.3, 'error_rate': 0.2, 'retry_after': 2}}
+        )
+        statuses = []
+        for _ in range(200):
+            try:
+                await adapter.get_product('mock_product_1')
+            except httpx.HTTPStatusError as e:
+                statuses.append(e.response.status_code)
+                if e.response.status_code == 429:
+                    assert e.response.headers['Retry-After'] == '2'
+
+        assert statuses.count(429) == adapter.metrics['rate_limited'] > 30
+        assert statuses.count(503) == adapter.metrics['errors'] > 20
+
+    @pytest.mark.asyncio
+    async def test_injected_errors_open_circuit_breaker(self):
+        manager = AdapterManager({'ecommerce': {'mock': {'load': {'error_rate': 1.0}}}})
+        for _ in range(10):
+            with pytest.raises(Exception):
+                await manager.get_orders('mock')
+        assert manager.circuit_breakers['mock'].state.name == 'OPEN'
+
+    @pytest.mark.asyncio
+    async def test_latency_distribution(self):
+        adapter = MockAdapter({'load': {'latency': 'constant', 'latency_ms': 20}})
+        started = time.perf_counter()
+        await adapter.get_orders(limit=5)
+        assert time.perf_counter() - started >= 0.018
+        assert adapter.get_status()['avg_latency_ms'] == 20.0
+
+        with pytest.raises(ValueError, match="Unknown latency distribution"):
+            MockAdapter({'load': {'latency': 'bimodal'}})
+
+
+class TestTransforms:
+    """Test batch transforms and timestamp parsing"""
+
+    def test_parse_datetime_formats(self):
+        assert parse_datetime('2023-01-01T10:00:00Z').utcoffset().total_seconds() == 0
+        assert parse_datetime('2023-01-01T10:00:00.250-05:00').microsecond == 250000
+        assert parse_datetime('2023-01-01 10:00:00') == datetime(2023, 1, 1, 10)
+
+    def test_parse_datetime_rejects_garbage(self):
+        with pytest.raises(ValueError, match="Invalid ISO-8601"):
+            parse_datetime('yesterday')
+        with pytest.raises(ValueError):
+            parse_datetime(None)
+
+    def test_transform_orders_skips_malformed_records(self):
+        adapter = ShopifyAdapter(
+            {'api_key': 'k', 'password': 'p', 'store_url': 'https://test-shop.myshopify.com'}
+        )
+        failures = []
+        orders = adapter.transform_orders([
+            {'id': 1, 'total_price': '10.00', 'customer': None, 'financial_status': None,
+             'created_at': '2023-01-01T00:00:00Z', 'updated_at': None},
+            {'id': 2, 'total_price': '5.00', 'created_at': 'not a date'},
+            {'id': 3},
+        ], failures)
+
+        assert [o.order_id for o in orders] == ['1']
+        assert [(f['kind'], f['id']) for f in failures] == [('order', 2), ('order', 3)]
+        assert orders[0].customer_name == ''
+        assert orders[0].status == 'pending'
+        assert orders[0].updated_at is None
+
+    def test_records_are_slotted(self):
+        assert not hasattr(OrderData('1', '', '', 0.0, 'USD', 'paid', []), '__dict__')
+        assert not hasattr(ProductData('1', 'n', '', 0.0, 'USD', 0, [], [], 'active'), '__dict__')
+
+
 class TestShopifyAdapter:
     """Test Shopify adapter functionality"""
 
@@ -204,6 +321,67 @@ class TestShopifyAdapter:
             # Should call _make_request once
             assert mock_make_request.call_count == 1
 
+    @staticmethod
+    def _paginated(adapter, pages, key='orders'):
+        """Serve `pages` through a Link-header cursor; returns the request log"""
+        requests = []
+
+        def handler(request):
+            requests.append(dict(request.url.params))
+            index = int(request.url.params.get('page_info', 'p0')[1:])
+            headers = {}
+            if index + 1 < len(pages):
+                next_url = f"{adapter.base_url}/{key}.json?limit=2&page_info=p{index + 1}"
+                headers['Link'] = f'<{next_url}>; rel="next"'
+            return httpx.Response(200, json={key: pages[index]}, headers=headers)
+
+        adapter.http = HTTPClientPool(transport=httpx.MockTransport(handler))
+        return requests
+
+    @staticmethod
+    def _order(order_id):
+        return {'id': order_id, 'email': f'{order_id}@example.com', 'total_price': '1.00'}
+
+    @pytest.mark.asyncio
+    async def test_iter_orders_follows_cursor(self, shopify_adapter):
+        pages = [
+            [self._order(1), self._order(2)], [self._order(3), self._order(4)], [self._order(5)]
+        ]
+        requests = self._paginated(shopify_adapter, pages)
+
+        orders = shopify_adapter.iter_orders(page_size=2, status='any')
+        ids = [order.order_id async for order in orders]
+
+        assert ids == ['1', '2', '3', '4', '5']
+        assert requests == [
+            {'status': 'any', 'limit': '2'},
+            {'limit': '2', 'page_info': 'p1'},
+            {'limit': '2', 'page_info': 'p2'}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_iter_prefetches_one_page_ahead(self, shopify_adapter):
+        pages = [[self._order(i)] for i in range(5)]
+        requests = self._paginated(shopify_adapter, pages)
+
+        orders = shopify_adapter.iter_orders(page_size=1)
+        await orders.__anext__()
+        await asyncio.sleep(0.05)  # Let the prefetch run
+        assert len(requests) == 2
+
+        await orders.aclose()
+        await asyncio.sleep(0.05)
+        assert len(requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_iter_products(self, shopify_adapter):
+        pages = [[{'id': 1, 'title': 'a'}], [{'id': 2, 'title': 'b'}]]
+        self._paginated(shopify_adapter, pages, key='products')
+
+        titles = [product.title async for product in shopify_adapter.iter_products()]
+
+        assert titles == ['a', 'b']
+
     def test_transform_order(self, shopify_adapter):
         """Test order transformation"""
         shopify_order = {
@@ -295,5 +473,192 @@ class TestAdapterManager:
         assert 'failure_count' in status
 
 
+class TestFanOut:
+    """Test concurrent multi-platform calls"""
+
+    @pytest.fixture
+    def adapter_manager(self):
+        return AdapterManager({
+            'ecommerce': {
+                'mock': {'name': 'test_mock', 'max_concurrency': 2},
+                'shopify': {
+                    'api_key': 'test_key',
+                    'password': 'test_pass',
+                    'store_url': 'https://test-shop.myshopify.com'
+                }
+            },
+            'fan_out': {'deadline': 1.0}
+        })
+
+    @staticmethod
+    def _slow(delay, result=None, error=None):
+        async def call(**filters):
+            await asyncio.sleep(delay)
+            if error:
+                raise error
+            return result if result is not None else ['ok']
+        return call
+
+    @pytest.mark.asyncio
+    async def test_latency_is_slowest_platform_not_sum(self, adapter_manager):
+        adapter_manager.adapters['mock'].get_orders = self._slow(0.2)
+        adapter_manager.adapters['shopify'].get_orders = self._slow(0.2)
+
+        started = asyncio.get_event_loop().time()
+        results = await adapter_manager.get_all_orders()
+
+        assert asyncio.get_event_loop().time() - started < 0.35
+        assert results == {'mock': ['ok'], 'shopify': ['ok']}
+        assert results.complete
+        assert set(results.latencies_ms) == {'mock', 'shopify'}
+
+    @pytest.mark.asyncio
+    async def test_failure_returns_partial_results(self, adapter_manager):
+        adapter_manager.adapters['shopify'].get_products = self._slow(0, error=RuntimeError("boom"))
+
+        results = await adapter_manager.get_all_products()
+
+        assert len(results['mock']) > 0
+        assert results['shopify'] == []
+        assert results.errors == {'shopify': 'RuntimeError: boom'}
+
+    @pytest.mark.asyncio
+    async def test_deadline_cancels_stragglers(self, adapter_manager):
+        cancelled = []
+
+        async def hangs(**filters):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        adapter_manager.adapters['shopify'].get_orders = hangs
+
+        results = await adapter_manager.get_all_orders(deadline=0.1)
+
+        assert len(results['mock']) > 0
+        assert results['shopify'] == []
+        assert 'Timed out' in results.errors['shopify']
+        assert cancelled == [True]
+
+    @pytest.mark.asyncio
+    async def test_per_platform_concurrency_cap(self, adapter_manager):
+        in_flight = peak = 0
+
+        async def tracked(**filters):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return []
+
+        adapter_manager.adapters['mock'].get_orders = tracked
+
+        await asyncio.gather(*(adapter_manager.get_all_orders(['mock']) for _ in range(6)))
+
+        assert peak == 2
+
+
+class TestReadCache:
+    """Test cached single-record reads"""
+
+    @pytest.fixture
+    def adapter_manager(self):
+        return AdapterManager({
+            'ecommerce': {
+                'mock': {
+                    'name': 'test_mock',
+                    'read_cache': {'ttl': 0.05, 'stale_while_revalidate': 0.2, 'stale_if_error': 60}
+                }
+            }
+        })
+
+    @staticmethod
+    def _counting(adapter, delay=0.0):
+        calls = []
+        original = adapter.get_product
+
+        async def get_product(product_id):
+            calls.append(product_id)
+            await asyncio.sleep(delay)
+            return await original(product_id)
+
+        adapter.get_product = get_product
+        return calls
+
+    @pytest.mark.asyncio
+    async def test_fresh_reads_hit_cache(self, adapter_manager):
+        calls = self._counting(adapter_manager.adapters['mock'])
+
+        first = await adapter_manager.read_product('mock', 'mock_product_1')
+        second = await adapter_manager.read_product('mock', 'mock_product_1')
+
+        assert calls == ['mock_product_1']
+        assert (first.source, second.source) == ('upstream', 'cache')
+        assert second.value is first.value and not second.stale
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_call(self, adapter_manager):
+        calls = self._counting(adapter_manager.adapters['mock'], delay=0.05)
+
+        products = await asyncio.gather(
+            *(adapter_manager.get_product('mock', 'mock_product_1') for _ in range(100))
+        )
+
+        assert len(calls) == 1
+        assert all(p is products[0] for p in products)
+        assert adapter_manager.read_caches['mock'].metrics['coalesced'] == 99
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_served_while_revalidating(self, adapter_manager):
+        calls = self._counting(adapter_manager.adapters['mock'])
+        await adapter_manager.get_product('mock', 'mock_product_1')
+        await asyncio.sleep(0.06)
+
+        stale = await adapter_manager.read_product('mock', 'mock_product_1')
+        assert stale.stale and stale.source == 'cache'
+        await asyncio.sleep(0.01)  # Background refresh
+
+        fresh = await adapter_manager.read_product('mock', 'mock_product_1')
+        assert len(calls) == 2
+        assert not fresh.stale
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_serves_stale_with_flag(self, adapter_manager):
+        await adapter_manager.get_order('mock', 'mock_order_1')
+        await asyncio.sleep(0.3)  # Past the stale-while-revalidate window
+
+        breaker = adapter_manager.circuit_breakers['mock']
+        breaker.state = breaker.state.OPEN
+        breaker.last_failure_time = time.time()
+
+        result = await adapter_manager.read_order('mock', 'mock_order_1')
+        assert result.stale and result.value.order_id == 'mock_order_1'
+        assert adapter_manager.get_status()['read_caches']['mock']['stale_on_error'] == 1
+
+        with pytest.raises(Exception, match="OPEN"):
+            await adapter_manager.read_order('mock', 'mock_order_2')  # Never cached
+
+    @pytest.mark.asyncio
+    async def test_writes_invalidate(self, adapter_manager):
+        calls = self._counting(adapter_manager.adapters['mock'])
+        await adapter_manager.get_product('mock', 'mock_product_1')
+
+        await adapter_manager.update_inventory('mock', 'mock_product_1', 7)
+        product = await adapter_manager.get_product('mock', 'mock_product_1')
+
+        assert len(calls) == 2
+        assert product.inventory_quantity == 7
+
+    @pytest.mark.asyncio
+    async def test_unknown_platform_raises_value_error(self, adapter_manager):
+        with pytest.raises(ValueError, match="not found"):
+            await adapter_manager.read_order('woocommerce', 'order_1')
+        with pytest.raises(ValueError, match="not found"):
+            await adapter_manager.read_product('woocommerce', 'product_1')
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+
+Test BioModuleFactory CLI Startup
+
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("click")
+pytest.importorskip("rich")
+
+from click.testing import CliRunner
+
+from services.api_gateway.bio_module_factory.cli import main as cli_main
+from services.api_gateway.bio_module_factory.cli.startup_benchmark import (
+    DEFAULT_FORBIDDEN,
+    check_startup,
+)
+from services.api_gateway.bio_module_factory.core import factory as factory_module
+
+
+class TestCliStartup:
+    """Guard against startup regressions"""
+
+    def test_help_imports_only_click(self):
+        assert check_startup(["--help"], forbidden=DEFAULT_FORBIDDEN + ("rich",), runs=1) == []
+
+    def test_list_skips_models_and_factory(self):
+        assert check_startup(["list"], runs=1) == []
+
+
+class TestStatusCommand:
+    """status opens the state store read-only"""
+
+    def _init_module(self, storage):
+        factory = factory_module.BioModuleFactory(str(storage))
+        module = SimpleNamespace(id="mycelium", name="Mycelium Module", estimated_duration_weeks=4)
+        step = SimpleNamespace(
+            deliverables=[
+                factory_module.Deliverable(
+                    id="bio_study_report", name="Report", description="-", required=True
+                )
+            ]
+        )
+        asyncio.run(factory.initialize_module(module, [step]))
+        factory.close()
+
+    def test_status_does_not_write(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self._init_module(tmp_path / "modules")
+        journal = tmp_path / "modules" / "journal.log"
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write('{"seq":2,"op":"adv')  # Torn tail a writer would truncate
+        before = journal.read_bytes()
+
+        result = CliRunner().invoke(cli_main.cli, ["status", "mycelium"])
+
+        assert result.exit_code == 0, result.output
+        assert "biological_study" in result.output
+        assert "bio_study_report" in result.output
+        assert journal.read_bytes() == before
+
+    def test_status_of_missing_store(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+        result = CliRunner().invoke(cli_main.cli, ["status", "mycelium"])
+
+        assert "Module not found" in result.output
+        assert not (tmp_path / "modules").exists()
+
+    def test_read_only_factory_rejects_mutations(self, tmp_path):
+        self._init_module(tmp_path)
+        factory = factory_module.BioModuleFactory(str(tmp_path), read_only=True)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(factory.advance_step("mycelium"))
@@ -0,0 +1,191 @@
+"""
+
+Test BioModuleFactory State Journal
+
+"""
+
+import json
+import threading
+
+import pytest
+
+from services.api_gateway.bio_module_factory.core import journal as journal_module
+from services.api_gateway.bio_module_factory.core.factory import BioModuleFactory
+from services.api_gateway.bio_module_factory.models.types import (
+    BioModule,
+    Deliverable,
+    DeliverableStatus,
+    ModulePhase,
+    ModuleStep,
+    Organism,
+    StepConfig,
+)
+
+
+@pytest.fixture
+def make_factory(tmp_path):
+    """Factory constructor bound to a temporary storage directory"""
+
+    def make(**options):
+        return BioModuleFactory(str(tmp_path / "store"), **options)
+
+    return make
+
+
+def _module(module_id: str) -> BioModule:
+    return BioModule(
+        id=module_id,
+        name=f"{module_id} module",
+        organism=Organism.MYCELIUM,
+        problem_ar="-",
+        problem_en="-",
+        solution_ar="-",
+        solution_en="-",
+        phase=ModulePhase.ECOMMERCE,
+        tech_stack=["python"],
+        estimated_duration_weeks=4,
+        priority=1,
+        biological_principles=[],
+    )
+
+
+STEPS = [
+    StepConfig(
+        step=ModuleStep.BIOLOGICAL_STUDY,
+        name="Biological Study",
+        duration_weeks="1",
+        deliverables=[
+            Deliverable(id="bio_study_report", name="Report", description="-", required=True)
+        ],
+        quality_gates=[],
+    )
+]
+
+
+class TestStateJournal:
+    """Test append-only persistence"""
+
+    @pytest.mark.asyncio
+    async def test_mutations_append_one_record_each(self, make_factory, tmp_path):
+        factory = make_factory()
+        for i in range(3):
+            await factory.initialize_module(_module(f"m{i}"), STEPS)
+        await factory.submit_deliverable(
+            "m1", ModuleStep.BIOLOGICAL_STUDY, "bio_study_report", "docs/a.md"
+        )
+        await factory.advance_step("m1")
+        factory.close()
+
+        lines = (tmp_path / "store" / "journal.log").read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["op"] for line in lines] == [
+            "initialize",
+            "initialize",
+            "initialize",
+            "submit_deliverable",
+            "advance_step",
+        ]
+        assert [json.loads(line)["seq"] for line in lines] == [1, 2, 3, 4, 5]
+        assert not (tmp_path / "store" / "states.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_restart_replays_snapshot_and_tail(self, make_factory):
+        factory = make_factory(compact_every=4)
+        for i in range(3):
+            await factory.initialize_module(_module(f"m{i}"), STEPS)
+        await factory.submit_deliverable(
+            "m0", ModuleStep.BIOLOGICAL_STUDY, "bio_study_report", "docs/a.md"
+        )
+        assert factory.journal.snapshot_seq == 4  # Compacted after 4 records
+        await factory.advance_step("m0")
+        await factory.advance_step("m2")
+        factory.close()
+
+        reloaded = make_factory(compact_every=4)
+        m0 = await reloaded.get_module_state("m0")
+        assert m0.current_step == ModuleStep.ARCHITECTURE_DESIGN
+        assert m0.completed_steps == [ModuleStep.BIOLOGICAL_STUDY]
+        assert m0.deliverables[0].status == DeliverableStatus.SUBMITTED
+        assert m0.deliverables[0].file_path == "docs/a.md"
+        assert (await reloaded.get_module_state("m1")).current_step == ModuleStep.BIOLOGICAL_STUDY
+        assert (
+            await reloaded.get_module_state("m2")
+        ).current_step == ModuleStep.ARCHITECTURE_DESIGN
+        assert reloaded.journal.seq == 6
+
+    @pytest.mark.asyncio
+    async def test_torn_last_record_is_dropped(self, make_factory, tmp_path):
+        factory = make_factory()
+        await factory.initialize_module(_module("m0"), STEPS)
+        await factory.advance_step("m0")
+        factory.close()
+
+        journal = tmp_path / "store" / "journal.log"
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write('{"seq":3,"op":"advance_st')  # Crash mid-append
+
+        reloaded = make_factory()
+        assert (
+            await reloaded.get_module_state("m0")
+        ).current_step == ModuleStep.ARCHITECTURE_DESIGN
+        await reloaded.advance_step("m0")
+        reloaded.close()
+
+        records = [json.loads(line) for line in journal.read_text(encoding="utf-8").splitlines()]
+        assert [r["seq"] for r in records] == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_legacy_states_file_is_migrated(self, make_factory, tmp_path):
+        factory = make_factory()
+        await factory.initialize_module(_module("m0"), STEPS)
+        legacy = {"m0": factory.states["m0"].model_dump(mode="json")}
+        store = tmp_path / "store"
+        factory.close()
+        (store / "journal.log").unlink()
+        (store / "states.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        migrated = make_factory()
+        assert (await migrated.get_module_state("m0")).module_name == "m0 module"
+        assert (store / "snapshot.json").exists()
+
+    @pytest.mark.asyncio
+    async def test_unterminated_last_line_is_truncated(self, make_factory, tmp_path):
+        factory = make_factory()
+        await factory.initialize_module(_module("m0"), STEPS)
+        factory.close()
+
+        journal = tmp_path / "store" / "journal.log"
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write(
+                '{"seq":2,"op":"advance_step","module_id":"m0",'
+                '"step":"architecture_design","at":"2026-01-01T00:00:00"}'
+            )
+
+        reloaded = make_factory()
+        assert (await reloaded.get_module_state("m0")).current_step == ModuleStep.BIOLOGICAL_STUDY
+        assert journal.read_text(encoding="utf-8").endswith("\n")
+
+    @pytest.mark.asyncio
+    async def test_idle_journal_is_synced_by_timer(self, make_factory, monkeypatch):
+        synced = threading.Event()
+        monkeypatch.setattr(journal_module.os, "fsync", lambda fd: synced.set())
+        factory = make_factory(fsync_every=100, fsync_interval=0.05)
+        await factory.initialize_module(_module("m0"), STEPS)
+
+        assert synced.wait(2)
+        assert factory.journal._unsynced == 0
+        factory.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_journal_write_leaves_state_unchanged(self, make_factory):
+        factory = make_factory()
+        await factory.initialize_module(_module("m0"), STEPS)
+
+        def fail(record):
+            raise OSError("disk full")
+
+        factory.journal.append = fail
+        with pytest.raises(OSError, match="disk full"):
+            await factory.advance_step("m0")
+        assert factory.states["m0"].current_step == ModuleStep.BIOLOGICAL_STUDY
+        assert factory.states["m0"].completed_steps == []
+        factory.close()
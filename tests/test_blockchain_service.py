@@ -0,0 +1,258 @@
+"""
+
+Test Async Blockchain Service
+
+Runs BlockchainService against an in-process eth-tester chain.
+
+"""
+
+import asyncio
+
+import pytest
+from conftest import OWNER_PRIVATE_KEY
+from eth_account import Account
+from web3.exceptions import TransactionNotFound
+
+from services.api_gateway.ledger.blockchain_service import BlockchainService
+
+
+@pytest.fixture
+def service(dev_chain):
+    service = BlockchainService(providers={"polygon": dev_chain.provider})
+    service.owner_account = Account.from_key(OWNER_PRIVATE_KEY)
+    service.set_token_address("polygon", dev_chain.token.address)
+    return service
+
+
+class TestBlockchainService:
+    """Test the AsyncWeb3 ledger service"""
+
+    @pytest.mark.asyncio
+    async def test_register_transfer_and_balance(self, service, dev_chain):
+        investor = dev_chain.w3.eth.accounts[1]
+
+        for address in (dev_chain.owner, investor):
+            success, tx_hash = await service.register_investor(
+                address, True, True, 1000, "EG", True
+            )
+            assert success and tx_hash
+
+        dev_chain.token.functions.mint(dev_chain.owner, 10 * 10**18).transact(
+            {"from": dev_chain.owner}
+        )
+
+        success, tx_hash = await service.transfer_tokens(dev_chain.owner, investor, 2.5)
+        assert success
+
+        assert await service.get_balance(investor) == 2.5
+        assert await service.get_balance(dev_chain.owner) == 7.5
+
+        status = await service.get_transaction_status(tx_hash)
+        assert status["status"] == "success"
+        assert status["to"] == dev_chain.token.address
+
+    @pytest.mark.asyncio
+    async def test_non_compliant_transfer_is_rejected(self, service, dev_chain):
+        success, tx_hash = await service.transfer_tokens(
+            dev_chain.owner, dev_chain.w3.eth.accounts[2], 1
+        )
+        assert (success, tx_hash) == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_transfer_from_other_sender_leaves_owner_nonce_alone(self, service, dev_chain):
+        investor = dev_chain.w3.eth.accounts[1]
+        assert (await service.register_investor(investor, True, True, 1000, "EG", True))[0]
+        pipeline = await service.get_pipeline("polygon")
+        next_nonce = pipeline.nonces._next
+
+        assert await service.transfer_tokens(investor, dev_chain.owner, 1) == (False, None)
+        assert pipeline.nonces._next == next_nonce
+
+    @pytest.mark.asyncio
+    async def test_contract_instance_is_cached(self, service):
+        contract = await service.get_contract("polygon")
+        assert await service.get_contract("polygon") is contract
+        assert await service.is_connected("polygon")
+
+    @pytest.mark.asyncio
+    async def test_undeployed_network(self, service):
+        assert await service.get_balance("0x" + "11" * 20, network="eth") is None
+
+    @pytest.mark.asyncio
+    async def test_http_session_is_pooled_per_network(self):
+        service = BlockchainService()
+
+        w3 = await service.get_web3("polygon")
+        assert await service.get_web3("polygon") is w3
+        assert set(service._sessions) == {"polygon"}
+
+        await service.get_web3("eth")
+        assert service._sessions["eth"] is not service._sessions["polygon"]
+        await service.close()
+
+
+def _investor(address: str) -> dict:
+    return {
+        "investor_address": address,
+        "kyc_verified": True,
+        "accredited": False,
+        "max_investment": 5000,
+        "country": "EG",
+        "sharia_compliant": True,
+    }
+
+
+class TestTransactionPipeline:
+    """Test nonce management and pipelined submission"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_registration_is_pipelined(self, service, dev_chain):
+        investors = [_investor(Account.create().address) for _ in range(20)]
+
+        batch = await service.register_investors(investors)
+
+        hashes = [item["transaction_hash"] for item in batch["items"]]
+        assert all(hashes) and len(set(hashes)) == 20
+        nonces = [service.get_submission_status(h)["nonce"] for h in hashes]
+        assert nonces == list(range(nonces[0], nonces[0] + 20))
+
+        pipeline = await service.get_pipeline("polygon")
+        await asyncio.gather(*(pipeline.wait(h) for h in hashes))
+
+        status = service.get_batch_status(batch["batch_id"])
+        assert status["counts"] == {"success": 20}
+        for investor in investors:
+            assert dev_chain.token.functions.verified(investor["investor_address"]).call() is True
+
+    @pytest.mark.asyncio
+    async def test_batch_total_counts_failed_submissions(self, service):
+        pipeline = await service.get_pipeline("polygon")
+
+        async def broken(nonce, gas_price):
+            raise ValueError("bad investor")
+
+        batch = await pipeline.submit_many([("bad", broken)])
+        status = pipeline.get_batch_status(batch["batch_id"])
+
+        assert status["total"] == 1
+        assert status["counts"] == {"submit_failed": 1}
+
+    @pytest.mark.asyncio
+    async def test_close_fails_outstanding_waits(self, service):
+        pipeline = await service.get_pipeline("polygon")
+        build = service._register_investor_builder(
+            await service.get_contract("polygon"), _investor(Account.create().address)
+        )
+        gas_price = await pipeline.w3.eth.gas_price
+
+        async def never_found(tx_hash):
+            raise TransactionNotFound("not mined")
+
+        pipeline.w3.eth.get_transaction_receipt = never_found  # Receipt never arrives
+        tracked = await pipeline.submit(lambda nonce: build(nonce, gas_price))
+        waiter = asyncio.ensure_future(pipeline.wait(tracked.tx_hash))
+        await asyncio.sleep(0)
+
+        await pipeline.close()
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(waiter, 1)
+
+    @pytest.mark.asyncio
+    async def test_nonce_resyncs_after_external_transaction(self, service, dev_chain):
+        assert (await service.register_investor(**_investor(dev_chain.w3.eth.accounts[1])))[0]
+
+        # Another process uses the owner account - the local counter is now stale
+        dev_chain.w3.eth.send_transaction(
+            {"from": dev_chain.owner, "to": dev_chain.w3.eth.accounts[2], "value": 1}
+        )
+        expected_nonce = dev_chain.w3.eth.get_transaction_count(dev_chain.owner)
+
+        success, tx_hash = await service.register_investor(
+            **_investor(dev_chain.w3.eth.accounts[2])
+        )
+
+        assert success
+        assert service.get_submission_status(tx_hash)["nonce"] == expected_nonce
+
+
+def _count_requests(provider) -> list:
+    """Record the RPC method of every request sent through the provider"""
+    methods = []
+    make_request = provider.make_request
+
+    async def counting(method, params):
+        methods.append(method)
+        return await make_request(method, params)
+
+    provider.make_request = counting
+    provider._request_func_cache = (None, None)  # Drop the cached middleware chain
+    return methods
+
+
+class TestBulkBalances:
+    """Test multicall balance reads"""
+
+    @pytest.fixture
+    def holders(self, service, dev_chain):
+        """Owner registered and minted 1..5 tokens to five registered holders"""
+        holders = dev_chain.w3.eth.accounts[1:6]
+        for address in [dev_chain.owner] + holders:
+            dev_chain.token.functions.registerInvestor(address, True, True, 0, "EG", True).transact(
+                {"from": dev_chain.owner}
+            )
+        for i, address in enumerate(holders, start=1):
+            dev_chain.token.functions.mint(address, i * 10**18).transact(
+                {"from": dev_chain.owner}
+            )
+        return holders
+
+    @pytest.mark.asyncio
+    async def test_500_balances_in_two_round_trips(self, service, dev_chain, holders, monkeypatch):
+        monkeypatch.setattr(
+            "services.api_gateway.ledger.blockchain_service.settings.MULTICALL_ADDRESS",
+            dev_chain.multicall,
+        )
+        strangers = [Account.create().address for _ in range(495)]
+        await service.get_web3("polygon")
+        methods = _count_requests(dev_chain.provider)
+
+        balances = await service.get_balances(holders + strangers + holders)
+
+        # One block number lookup plus one aggregate call; the remaining
+        # requests are eth-tester's default-field bookkeeping
+        assert methods.count("eth_blockNumber") == 1
+        assert methods.count("eth_call") == 1
+        assert len(balances) == 500
+        assert [balances[h] for h in holders] == [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert all(balances[s] == 0.0 for s in strangers)
+
+    @pytest.mark.asyncio
+    async def test_balances_are_cached_per_block(self, service, dev_chain, holders, monkeypatch):
+        monkeypatch.setattr(
+            "services.api_gateway.ledger.blockchain_service.settings.MULTICALL_ADDRESS",
+            dev_chain.multicall,
+        )
+        await service.get_balances(holders)
+        reader = await service.get_balance_reader("polygon")
+        methods = _count_requests(dev_chain.provider)
+
+        await service.get_balances(holders[:2])
+        assert methods == ["eth_blockNumber"]
+        assert reader.metrics["cache_hits"] == 2
+
+        dev_chain.token.functions.transfer(holders[1], 10**18).transact({"from": holders[0]})
+        balances = await service.get_balances(holders[:2])
+        assert list(balances.values()) == [0.0, 3.0]
+        assert reader.metrics["multicalls"] == 2
+
+    @pytest.mark.asyncio
+    async def test_falls_back_without_multicall(self, service, holders, monkeypatch):
+        monkeypatch.setattr(
+            "services.api_gateway.ledger.blockchain_service.settings.MULTICALL_ADDRESS",
+            "0x" + "22" * 20,
+        )
+        balances = await service.get_balances(holders)
+
+        assert list(balances.values()) == [1.0, 2.0, 3.0, 4.0, 5.0]
+        reader = await service.get_balance_reader("polygon")
+        assert reader.metrics["single_calls"] == 5
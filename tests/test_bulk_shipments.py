@@ -0,0 +1,176 @@
+"""
+
+Test Bulk Shipment Booking
+
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from services.api_gateway.integrations.http_pool import HTTPClientPool
+from services.api_gateway.integrations.shipping.aramex import AramexClient
+from services.api_gateway.integrations.shipping.bulk import book_in_chunks, summarize
+from services.api_gateway.integrations.shipping.circuit_breaker import (
+    AramexCircuitBreaker,
+    ResilientAramexClient,
+)
+from services.api_gateway.integrations.shipping.smsa import SMSAClient
+
+
+def _aramex_pool(requests, reject=(), reply=lambda processed: processed):
+    """Fake CreateShipments: rejects shipments whose Reference1 is in `reject`"""
+
+    def handler(request):
+        shipments = json.loads(request.content)["Shipments"]
+        requests.append(len(shipments))
+        processed = [
+            {
+                "ID": "",
+                "Reference1": s["Reference1"],
+                "HasErrors": True,
+                "Notifications": [{"Message": "Invalid consignee"}],
+            }
+            if s["Reference1"] in reject
+            else {
+                "ID": f"AWB-{s['Reference1']}",
+                "Reference1": s["Reference1"],
+                "HasErrors": False,
+                "Notifications": [],
+                "ShipmentLabel": {"LabelURL": f"https://labels.test/{s['Reference1']}"},
+            }
+            for s in shipments
+        ]
+        return httpx.Response(
+            200,
+            json={"HasErrors": bool(reject), "Notifications": [], "Shipments": reply(processed)},
+        )
+
+    return HTTPClientPool(transport=httpx.MockTransport(handler))
+
+
+def _batch(count):
+    return [{"reference1": f"ORD-{i}", "weight": 1.0} for i in range(count)]
+
+
+class TestBulkShipments:
+    """Test chunking, concurrency limits and per-shipment results"""
+
+    @pytest.mark.asyncio
+    async def test_chunks_run_concurrently_within_limit(self):
+        in_flight = peak = 0
+
+        async def book_chunk(chunk):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return [{"success": True, "tracking_number": s["id"]} for s in chunk]
+
+        results = await book_in_chunks(
+            [{"id": i} for i in range(25)], book_chunk, chunk_size=5, concurrency=2
+        )
+
+        assert peak == 2
+        assert [r["index"] for r in results] == list(range(25))
+        assert [r["tracking_number"] for r in results] == list(range(25))
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_only_fails_its_shipments(self):
+        async def book_chunk(chunk):
+            if chunk[0]["id"] == 3:
+                raise ConnectionError("carrier down")
+            return [{"success": True} for _ in chunk]
+
+        summary = summarize(
+            "test", await book_in_chunks([{"id": i} for i in range(6)], book_chunk, 3, 2)
+        )
+
+        assert summary["created"] == 3 and summary["failed"] == 3
+        assert summary["results"][4] == {"index": 4, "success": False, "error": "carrier down"}
+
+    def test_aramex_packs_shipments_per_request(self):
+        requests = []
+        client = AramexClient(
+            "u", "p", "1", "pin", "RUH", "SA", http_pool=_aramex_pool(requests, reject={"ORD-7"})
+        )
+        client.base_url = "https://aramex.test"
+
+        results = asyncio.run(client.create_shipments(_batch(120)))
+
+        assert sorted(requests) == [20, 50, 50]
+        assert results[0]["tracking_number"] == "AWB-ORD-0"
+        assert results[0]["label_url"] == "https://labels.test/ORD-0"
+        # A rejected shipment does not sink the other 49 booked in the same request
+        assert results[7]["success"] is False and results[7]["error"] == "Invalid consignee"
+        assert sum(r["success"] for r in results) == 119
+
+    def test_aramex_matches_results_by_reference(self):
+        client = AramexClient(
+            "u",
+            "p",
+            "1",
+            "pin",
+            "RUH",
+            "SA",
+            http_pool=_aramex_pool([], reply=lambda processed: processed[::-1]),
+        )
+        client.base_url = "https://aramex.test"
+
+        results = asyncio.run(client.create_shipments(_batch(3)))
+
+        assert [r["tracking_number"] for r in results] == ["AWB-ORD-0", "AWB-ORD-1", "AWB-ORD-2"]
+
+    def test_aramex_incomplete_reply_fails_the_chunk(self):
+        client = AramexClient(
+            "u",
+            "p",
+            "1",
+            "pin",
+            "RUH",
+            "SA",
+            http_pool=_aramex_pool([], reply=lambda processed: processed[1:]),
+        )
+        client.base_url = "https://aramex.test"
+
+        results = asyncio.run(client.create_shipments(_batch(3)))
+
+        assert not any(r["success"] for r in results)
+        assert "check the carrier by reference" in results[0]["error"]
+
+    def test_aramex_bulk_requires_unique_references(self):
+        client = AramexClient("u", "p", "1", "pin", "RUH", "SA", http_pool=_aramex_pool([]))
+        with pytest.raises(ValueError):
+            asyncio.run(client.create_shipments([{"reference1": "A"}, {"reference1": "A"}]))
+
+    def test_resilient_aramex_chunks_go_through_breaker(self):
+        requests = []
+        client = AramexClient("u", "p", "1", "pin", "RUH", "SA", http_pool=_aramex_pool(requests))
+        client.base_url = "https://aramex.test"
+        resilient = ResilientAramexClient(client)
+        resilient.circuit_breaker = AramexCircuitBreaker()
+
+        results = asyncio.run(resilient.create_shipments(_batch(60)))
+
+        assert all(r["success"] for r in results)
+        assert resilient.get_circuit_status()["success_count"] == 2
+
+    def test_smsa_books_shipments_concurrently(self):
+        def handler(request):
+            ref = request.content.decode().split("<refNo>")[1].split("</refNo>")[0]
+            if ref == "bad":
+                return httpx.Response(200, text="<r><error>Invalid city</error></r>")
+            return httpx.Response(200, text=f"<r><awbNo>AWB-{ref}</awbNo></r>")
+
+        client = SMSAClient(
+            "u", "p", "1", "key", http_pool=HTTPClientPool(transport=httpx.MockTransport(handler))
+        )
+        results = asyncio.run(
+            client.create_shipments([{"reference": "a"}, {"reference": "bad"}, {"reference": "c"}])
+        )
+
+        assert [r.get("tracking_number") for r in results] == ["AWB-a", None, "AWB-c"]
+        assert results[1]["success"] is False and "Invalid city" in results[1]["error"]
@@ -0,0 +1,141 @@
+"""
+
+Test E-commerce Delta Sync
+
+"""
+
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from backend.core.database import Base
+from backend.core.models import Order, Product
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.api_gateway.integrations.ecommerce.adapter_manager import AdapterManager
+from services.api_gateway.integrations.ecommerce.sync import DeltaSyncService, EcommerceStore
+
+
+@pytest.fixture
+def store():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return EcommerceStore(sessionmaker(bind=engine))
+
+
+@pytest.fixture
+def service(store):
+    return DeltaSyncService(AdapterManager({"ecommerce": {"mock": {}}}), store, batch_size=4)
+
+
+class TestDeltaSync:
+    """Test watermark + content-hash incremental sync"""
+
+    def test_first_run_loads_everything(self, service, store):
+        results = asyncio.run(service.run_once())
+
+        assert results["mock"]["products"]["changed"] == 5
+        assert results["mock"]["orders"]["changed"] == 10
+        session = store.session_factory()
+        assert session.query(Product).count() == 5
+        assert session.query(Order).count() == 10
+        assert store.get_watermark("mock", "products") is not None
+
+    def test_unchanged_records_are_skipped(self, service, store):
+        asyncio.run(service.run_once())
+        products = service.manager.adapters["mock"].mock_data["products"]
+        products["mock_product_2"] = replace(
+            products["mock_product_2"], price=1.0, updated_at=datetime.utcnow() + timedelta(hours=1)
+        )
+
+        results = asyncio.run(service.run_once())
+
+        products_result = results["mock"]["products"]
+        assert (
+            products_result["fetched"],
+            products_result["changed"],
+            products_result["unchanged"],
+        ) == (5, 1, 4)
+        assert results["mock"]["orders"]["changed"] == 0
+        session = store.session_factory()
+        assert (
+            float(session.query(Product).filter(Product.name == "Mock Product 2").one().base_price)
+            == 1.0
+        )
+        assert store.get_watermark("mock", "products").startswith(
+            products["mock_product_2"].updated_at.isoformat()[:16]
+        )
+
+    def test_watermark_limits_the_fetch(self, service, store):
+        calls = []
+        adapter = service.manager.adapters["mock"]
+        original = adapter.iter_products
+
+        def iter_products(failures=None, **filters):
+            calls.append(filters)
+            return original(failures=failures, **filters)
+
+        adapter.iter_products = iter_products
+        asyncio.run(service.sync("mock", "products"))
+        asyncio.run(service.sync("mock", "products"))
+
+        assert calls[0] == {}
+        watermark = datetime.fromisoformat(store.get_watermark("mock", "products"))
+        since = datetime.fromisoformat(calls[1]["updated_at_min"])
+        assert since == watermark - timedelta(seconds=60)
+        assert since.tzinfo == timezone.utc
+
+    def test_failed_run_keeps_watermark(self, service, store):
+        asyncio.run(service.sync("mock", "orders"))
+        watermark = store.get_watermark("mock", "orders")
+
+        async def broken(failures=None, **filters):
+            raise RuntimeError("platform down")
+            yield
+
+        service.manager.adapters["mock"].iter_orders = broken
+        result = asyncio.run(service.sync("mock", "orders"))
+
+        assert result == {"error": "RuntimeError: platform down"}
+        assert store.get_watermark("mock", "orders") == watermark
+        assert service.manager.circuit_breakers["mock"].failure_count == 1
+
+    def test_malformed_records_hold_the_watermark(self, service, store):
+        asyncio.run(service.sync("mock", "orders"))
+        watermark = store.get_watermark("mock", "orders")
+        adapter = service.manager.adapters["mock"]
+        orders = adapter.mock_data["orders"]
+        held = datetime.now(timezone.utc) + timedelta(hours=1)
+        orders["mock_order_1"] = replace(
+            orders["mock_order_1"], total_amount=1.0, updated_at=held + timedelta(hours=1)
+        )
+        original = adapter.iter_orders
+
+        async def iter_orders(failures=None, **filters):
+            failures.append(
+                {
+                    "kind": "order",
+                    "id": "broken",
+                    "updated_at": held.isoformat(),
+                    "error": "KeyError",
+                }
+            )
+            async for order in original(**filters):
+                yield order
+
+        adapter.iter_orders = iter_orders
+        result = asyncio.run(service.sync("mock", "orders"))
+
+        assert result["failed"] == 1 and result["changed"] == 1
+        assert datetime.fromisoformat(store.get_watermark("mock", "orders")) == held
+        assert datetime.fromisoformat(
+            store.get_watermark("mock", "orders")
+        ) > datetime.fromisoformat(watermark)
@@ -0,0 +1,175 @@
+"""
+
+Test Token Event Indexer
+
+Indexes events from an in-process eth-tester chain into a local table.
+
+"""
+
+import pytest
+from conftest import OWNER_PRIVATE_KEY
+from eth_account import Account
+from web3 import AsyncWeb3
+
+from services.api_gateway.ledger.blockchain_service import BlockchainService
+from services.api_gateway.ledger.event_indexer import TokenEventIndexer
+
+TOKEN = 10**18
+
+
+def _register(dev_chain, address):
+    dev_chain.token.functions.registerInvestor(address, True, True, 0, "EG", True).transact(
+        {"from": dev_chain.owner}
+    )
+
+
+def _transfer(dev_chain, sender, receiver, amount):
+    return dev_chain.token.functions.transfer(receiver, amount).transact({"from": sender})
+
+
+@pytest.fixture
+def funded_chain(dev_chain):
+    """Owner and two investors registered, owner minted 100 tokens"""
+    owner, alice, bob = dev_chain.w3.eth.accounts[:3]
+    for address in (owner, alice, bob):
+        _register(dev_chain, address)
+    dev_chain.token.functions.mint(owner, 100 * TOKEN).transact({"from": owner})
+    return dev_chain
+
+
+def _indexer(dev_chain, tmp_path, **options) -> TokenEventIndexer:
+    options.setdefault("confirmations", 0)
+    return TokenEventIndexer(
+        AsyncWeb3(dev_chain.provider),
+        dev_chain.token.address,
+        "polygon",
+        str(tmp_path / "index.sqlite3"),
+        **options,
+    )
+
+
+class TestTokenEventIndexer:
+    """Test event indexing"""
+
+    @pytest.mark.asyncio
+    async def test_balances_and_history(self, funded_chain, tmp_path):
+        owner, alice, bob = funded_chain.w3.eth.accounts[:3]
+        _transfer(funded_chain, owner, alice, 30 * TOKEN)
+        tx_hash = _transfer(funded_chain, alice, bob, 5 * TOKEN)
+
+        indexer = _indexer(funded_chain, tmp_path)
+        assert await indexer.sync_once() == 6  # 3 registrations, mint, 2 transfers
+
+        assert indexer.is_synced()
+        assert indexer.get_balance(owner) == 70 * TOKEN
+        assert indexer.get_balance(alice) == 25 * TOKEN
+        assert indexer.get_balance(bob) == 5 * TOKEN
+        assert indexer.get_balance(Account.create().address) == 0
+
+        history = indexer.get_transfers(alice)
+        assert [(t["from"], t["to"], t["value"]) for t in history] == [
+            (alice, bob, 5 * TOKEN),
+            (owner, alice, 30 * TOKEN),
+        ]
+
+        indexed = indexer.get_transaction(tx_hash.hex())
+        assert indexed["status"] == "success"
+        assert indexed["transfers"][0]["to"] == bob
+
+    @pytest.mark.asyncio
+    async def test_index_survives_restart(self, funded_chain, tmp_path):
+        owner, alice = funded_chain.w3.eth.accounts[:2]
+        _transfer(funded_chain, owner, alice, 10 * TOKEN)
+        indexer = _indexer(funded_chain, tmp_path)
+        await indexer.sync_once()
+        cursor = indexer.indexed_block
+        indexer.close()
+
+        reopened = _indexer(funded_chain, tmp_path)
+        assert reopened.indexed_block == cursor
+        assert reopened.get_balance(alice) == 10 * TOKEN
+        assert await reopened.sync_once() == 0
+
+    @pytest.mark.asyncio
+    async def test_confirmation_depth(self, funded_chain, tmp_path):
+        owner, alice = funded_chain.w3.eth.accounts[:2]
+        indexer = _indexer(funded_chain, tmp_path, confirmations=2)
+        await indexer.sync_once()
+
+        _transfer(funded_chain, owner, alice, 1 * TOKEN)
+        await indexer.sync_once()
+        assert indexer.get_balance(alice) == 0  # Not yet 2 blocks deep
+
+        funded_chain.w3.provider.ethereum_tester.mine_blocks(2)
+        await indexer.sync_once()
+        assert indexer.get_balance(alice) == 1 * TOKEN
+
+    @pytest.mark.asyncio
+    async def test_reorg_rewinds_and_replays(self, funded_chain, tmp_path):
+        owner, alice, bob = funded_chain.w3.eth.accounts[:3]
+        tester = funded_chain.w3.provider.ethereum_tester
+        indexer = _indexer(funded_chain, tmp_path)
+        await indexer.sync_once()
+
+        snapshot = tester.take_snapshot()
+        _transfer(funded_chain, owner, alice, 40 * TOKEN)
+        await indexer.sync_once()
+        assert indexer.get_balance(alice) == 40 * TOKEN
+
+        # The transfer to alice is orphaned; a transfer to bob replaces it
+        tester.revert_to_snapshot(snapshot)
+        _transfer(funded_chain, owner, bob, 15 * TOKEN)
+        tester.mine_blocks(1)
+        await indexer.sync_once()
+
+        assert indexer.get_balance(alice) == 0
+        assert indexer.get_balance(bob) == 15 * TOKEN
+        assert indexer.get_balance(owner) == 85 * TOKEN
+
+    @pytest.mark.asyncio
+    async def test_reorg_to_shorter_chain(self, funded_chain, tmp_path):
+        owner, alice = funded_chain.w3.eth.accounts[:2]
+        tester = funded_chain.w3.provider.ethereum_tester
+        indexer = _indexer(funded_chain, tmp_path)
+        await indexer.sync_once()
+
+        snapshot = tester.take_snapshot()
+        _transfer(funded_chain, owner, alice, 40 * TOKEN)
+        tester.mine_blocks(3)
+        await indexer.sync_once()
+
+        # The new canonical chain ends below the indexed cursor
+        tester.revert_to_snapshot(snapshot)
+        await indexer.sync_once()
+
+        assert indexer.indexed_block <= funded_chain.w3.eth.block_number
+        assert indexer.get_balance(alice) == 0
+        assert indexer.get_balance(owner) == 100 * TOKEN
+
+
+class TestServiceReadsFromIndex:
+    """Balance and status endpoints answer from the index"""
+
+    @pytest.mark.asyncio
+    async def test_balance_and_status_skip_rpc(self, funded_chain, tmp_path):
+        owner, alice = funded_chain.w3.eth.accounts[:2]
+        tx_hash = _transfer(funded_chain, owner, alice, 12 * TOKEN)
+
+        service = BlockchainService(providers={"polygon": funded_chain.provider})
+        service.owner_account = Account.from_key(OWNER_PRIVATE_KEY)
+        service.set_token_address("polygon", funded_chain.token.address)
+        indexer = await service.start_indexer(
+            "polygon", str(tmp_path / "index.sqlite3"), confirmations=0
+        )
+        await indexer.sync_once()
+
+        async def no_rpc(*args, **kwargs):
+            raise AssertionError("RPC used")
+
+        service.get_contract = no_rpc
+        service.get_web3 = no_rpc
+
+        assert await service.get_balance(alice) == 12.0
+        assert (await service.get_transaction_status(tx_hash.hex()))["source"] == "index"
+        assert service.get_transfer_history(alice)[0]["value"] == 12 * TOKEN
+        await service.close()
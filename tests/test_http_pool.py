@@ -0,0 +1,219 @@
+"""
+
+Test Shared HTTP Client Pool
+
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from services.api_gateway.integrations.http_pool import HTTPClientPool, ProviderConfig
+from services.api_gateway.integrations.notifications.sms import SMSService
+from services.api_gateway.integrations.shipping.aramex import AramexClient
+from services.api_gateway.integrations.shipping.circuit_breaker import AramexCircuitBreaker
+from services.api_gateway.integrations.shipping.smsa import SMSAClient
+
+
+class KeepAliveServer:
+    """HTTP/1.1 server that records the client port of every request"""
+
+    def __init__(self):
+        self.ports = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                server.ports.append(self.client_address[1])
+                body = json.dumps(
+                    {
+                        "HasErrors": False,
+                        "RateDetails": [
+                            {
+                                "ServiceType": "Express",
+                                "TotalAmount": "42.5",
+                                "CurrencyCode": "SAR",
+                                "DeliveryTime": 1,
+                            }
+                        ],
+                    }
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _aramex(pool, base_url="https://aramex.test"):
+    client = AramexClient("u", "p", "1", "pin", "RUH", "SA", http_pool=pool)
+    client.base_url = base_url
+    return client
+
+
+class TestHTTPClientPool:
+    """Test pooling, timeouts and metrics"""
+
+    def test_connections_are_reused(self):
+        server = KeepAliveServer()
+        pool = HTTPClientPool()
+        client = _aramex(pool, server.url)
+
+        async def run():
+            try:
+                for _ in range(10):
+                    rates = await client.get_rates("SA", "Riyadh", "SA", "Jeddah", 1.0)
+                return rates
+            finally:
+                await pool.aclose()
+
+        try:
+            rates = asyncio.run(run())
+        finally:
+            server.close()
+
+        assert rates[0]["cost"] == 42.5
+        assert len(server.ports) == 10
+        assert len(set(server.ports)) == 1  # One TCP connection for every call
+
+    def test_per_provider_timeouts(self):
+        pool = HTTPClientPool({"sms_gateway": ProviderConfig(timeout=5.0, connect_timeout=1.0)})
+
+        async def run():
+            try:
+                return pool.client("sms_gateway").timeout, pool.client("shopify_files").timeout
+            finally:
+                await pool.aclose()
+
+        sms_timeout, files_timeout = asyncio.run(run())
+        assert sms_timeout.connect == 1.0 and sms_timeout.read == 5.0
+        assert files_timeout.read == 300.0
+        assert files_timeout.connect == 5.0
+
+    def test_one_client_per_provider(self):
+        pool = HTTPClientPool()
+
+        async def run():
+            try:
+                return pool.client("aramex"), pool.client("aramex"), pool.client("smsa")
+            finally:
+                await pool.aclose()
+
+        first, again, other = asyncio.run(run())
+        assert first is again
+        assert first is not other
+
+    def test_saturation_metrics(self):
+        async def handler(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={})
+
+        pool = HTTPClientPool(
+            {"slow": ProviderConfig(max_connections=2)}, transport=httpx.MockTransport(handler)
+        )
+
+        async def run():
+            await asyncio.gather(
+                *(pool.request("slow", "GET", "https://slow.test/") for _ in range(5))
+            )
+
+        asyncio.run(run())
+        metrics = pool.get_metrics()["providers"]["slow"]
+
+        assert metrics["requests"] == 5
+        assert metrics["in_flight"] == 0
+        assert metrics["peak_in_flight"] == 5
+        assert metrics["saturated"] == 3  # Arrived with both connections busy
+        assert metrics["max_connections"] == 2
+        assert metrics["avg_ms"] > 0
+
+    def test_errors_are_counted(self):
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        pool = HTTPClientPool(transport=httpx.MockTransport(handler))
+
+        with pytest.raises(Exception, match="Aramex API request failed"):
+            asyncio.run(_aramex(pool).get_rates("SA", "Riyadh", "SA", "Jeddah", 1.0))
+        assert pool.get_metrics()["providers"]["aramex"]["errors"] == 1
+
+
+class TestPortedClients:
+    """Integration clients are async and go through the pool"""
+
+    def test_smsa_shipment(self):
+        sent = []
+
+        def handler(request):
+            sent.append(request)
+            return httpx.Response(
+                200,
+                text=(
+                    '<?xml version="1.0"?>'
+                    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+                    "<soap:Body><addShipmentResponse><awbNo>290019315</awbNo>"
+                    "</addShipmentResponse></soap:Body>"
+                    "</soap:Envelope>"
+                ),
+            )
+
+        pool = HTTPClientPool(transport=httpx.MockTransport(handler))
+        client = SMSAClient("u", "p", "1", "key", http_pool=pool)
+
+        result = asyncio.run(client.create_shipment({"reference": "ORD-1", "weight": 2}))
+
+        assert result == {"tracking_number": "290019315", "status": "created", "provider": "smsa"}
+        assert sent[0].headers["SOAPAction"].endswith("/addShipment")
+        assert b"<refNo>ORD-1</refNo>" in sent[0].content
+
+    def test_unifonic_sms(self, monkeypatch):
+        monkeypatch.setenv("UNIFONIC_APP_SID", "sid")
+        monkeypatch.setenv("UNIFONIC_AUTH_TOKEN", "token")
+
+        def handler(request):
+            assert request.headers["Authorization"] == "Bearer token"
+            return httpx.Response(
+                200, json={"success": True, "MessageID": "m1", "Status": "Queued"}
+            )
+
+        service = SMSService(
+            "unifonic", http_pool=HTTPClientPool(transport=httpx.MockTransport(handler))
+        )
+        result = asyncio.run(service.send_sms("+966500000001", "مرحبا"))
+
+        assert result == {
+            "success": True,
+            "message_id": "m1",
+            "status": "Queued",
+            "provider": "unifonic",
+        }
+
+    def test_circuit_breaker_awaits_async_client(self):
+        def handler(request):
+            return httpx.Response(200, json={"HasErrors": False, "RateDetails": []})
+
+        breaker = AramexCircuitBreaker()
+        client = _aramex(HTTPClientPool(transport=httpx.MockTransport(handler)))
+
+        rates = asyncio.run(breaker.get_rates(client, "SA", "Riyadh", "SA", "Jeddah", 1.0))
+
+        assert rates == []
+        assert breaker.get_status()["state"] == "closed"
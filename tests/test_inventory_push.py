@@ -0,0 +1,208 @@
+"""
+
+Test Coalescing Inventory Push
+
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from services.api_gateway.integrations.ecommerce.adapter_manager import AdapterManager
+from services.api_gateway.integrations.ecommerce.adapters import ShopifyAdapter
+from services.api_gateway.integrations.ecommerce.inventory_push import InventoryPushService
+from services.api_gateway.integrations.ecommerce.rate_limiter import ShopifyRateLimiter
+from services.api_gateway.integrations.http_pool import HTTPClientPool
+
+
+def _manager():
+    return AdapterManager({"ecommerce": {"mock": {"name": "test_mock"}}})
+
+
+def _record_bulk(manager, fail_times=0):
+    """Replace the mock adapter's bulk write with one that logs each call"""
+    adapter = manager.adapters["mock"]
+    calls = []
+
+    async def update_inventory_bulk(updates):
+        calls.append(dict(updates))
+        if len(calls) <= fail_times:
+            raise ConnectionError("platform unreachable")
+        return {product_id: True for product_id in updates}
+
+    adapter.update_inventory_bulk = update_inventory_bulk
+    return calls
+
+
+class TestInventoryPush:
+    """Test coalescing, batching and retries"""
+
+    @pytest.mark.asyncio
+    async def test_updates_coalesce_per_sku(self):
+        manager = _manager()
+        calls = _record_bulk(manager)
+        service = InventoryPushService(manager)
+
+        waiters = [service.submit("mock", "mock_product_1", q) for q in range(50)]
+        waiters += [service.submit("mock", "mock_product_2", q) for q in range(30)]
+        assert await service.flush() == 2
+
+        assert calls == [{"mock_product_1": 49, "mock_product_2": 29}]
+        assert all(w.result() is True for w in waiters)
+        status = service.get_status()
+        assert status["coalescing_ratio"] == 40.0
+        assert status["pending"] == 0
+        assert status["avg_lag_ms"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_batches_follow_platform_limit(self):
+        manager = _manager()
+        manager.adapters["mock"].max_inventory_batch = 2
+        calls = _record_bulk(manager)
+        service = InventoryPushService(manager)
+
+        for i in range(1, 6):
+            service.submit("mock", f"mock_product_{i}", i)
+        await service.flush()
+
+        assert [len(c) for c in calls] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_failed_push_is_retried_with_latest_quantity(self):
+        manager = _manager()
+        calls = _record_bulk(manager, fail_times=1)
+        service = InventoryPushService(manager, backoff=0.0)
+
+        first = service.submit("mock", "mock_product_1", 5)
+        await service.flush()
+        assert not first.done()
+
+        second = service.submit("mock", "mock_product_1", 3)  # Newer value arrives before the retry
+        await service.flush()
+
+        assert calls[-1] == {"mock_product_1": 3}
+        assert first.result() is True and second.result() is True
+        assert service.get_status()["failed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_backs_off_before_retrying(self):
+        manager = _manager()
+        calls = _record_bulk(manager, fail_times=2)
+        service = InventoryPushService(manager, backoff=0.2)
+
+        waiter = service.submit("mock", "mock_product_1", 5)
+        await service.flush()
+        assert await service.flush() == 0  # Still backing off
+        assert len(calls) == 1 and service.get_status()["backing_off"] == 1
+
+        await asyncio.sleep(0.25)
+        await service.flush()  # Fails again; the next delay doubles
+        await asyncio.sleep(0.25)
+        assert await service.flush() == 0
+        await asyncio.sleep(0.2)
+        assert await service.flush() == 1
+        assert len(calls) == 3 and waiter.result() is True
+
+    @pytest.mark.asyncio
+    async def test_worker_retries_when_backoff_expires(self):
+        manager = _manager()
+        calls = _record_bulk(manager, fail_times=1)
+        service = InventoryPushService(manager, window=0.01, backoff=0.05)
+        service.start()
+        try:
+            waiter = service.submit("mock", "mock_product_1", 7)
+            assert await asyncio.wait_for(waiter, 1.0) is True
+        finally:
+            await service.stop()
+
+        assert calls == [{"mock_product_1": 7}, {"mock_product_1": 7}]
+
+    @pytest.mark.asyncio
+    async def test_worker_flushes_after_window(self):
+        manager = _manager()
+        calls = _record_bulk(manager)
+        service = InventoryPushService(manager, window=0.02)
+        service.start()
+        try:
+            waiters = [service.submit("mock", "mock_product_1", q) for q in (1, 2, 3)]
+            assert await asyncio.wait_for(asyncio.gather(*waiters), 1.0) == [True, True, True]
+        finally:
+            await service.stop()
+
+        assert calls == [{"mock_product_1": 3}]
+
+    @pytest.mark.asyncio
+    async def test_bulk_write_invalidates_read_cache(self):
+        manager = _manager()
+        await manager.get_product("mock", "mock_product_1")
+        service = InventoryPushService(manager)
+
+        service.submit("mock", "mock_product_1", 11)
+        await service.flush()
+
+        assert (await manager.read_product("mock", "mock_product_1")).source == "upstream"
+        assert (await manager.get_product("mock", "mock_product_1")).inventory_quantity == 11
+
+
+def _product_node(product_id):
+    """Product with one variant stocked at one location, as the nodes query returns it"""
+    item_id = f"gid://shopify/InventoryItem/{product_id.rsplit('/', 1)[-1]}"
+    level = {"node": {"location": {"id": "gid://shopify/Location/1"}}}
+    item = {"id": item_id, "inventoryLevels": {"edges": [level]}}
+    return {"id": product_id, "variants": {"edges": [{"node": {"inventoryItem": item}}]}}
+
+
+class TestShopifyBulkInventory:
+    """Shopify writes a whole batch with one mutation through the shared limiter"""
+
+    def test_one_mutation_per_batch(self):
+        requests = []
+
+        def handler(request):
+            query = json.loads(request.content)
+            requests.append(query)
+            if "nodes" in query["query"]:
+                nodes = [_product_node(product_id) for product_id in query["variables"]["ids"]]
+                return httpx.Response(200, json={"data": {"nodes": nodes}})
+            return httpx.Response(
+                200,
+                json={
+                    "data": {
+                        "inventorySetOnHandQuantities": {
+                            "userErrors": [
+                                {
+                                    "field": ["input", "setQuantities", "1", "quantity"],
+                                    "message": "invalid",
+                                }
+                            ]
+                        }
+                    }
+                },
+            )
+
+        limiter = ShopifyRateLimiter()
+        adapter = ShopifyAdapter(
+            {
+                "api_key": "k",
+                "password": "p",
+                "store_url": "https://inventory-test.myshopify.com",
+                "rate_limiter": limiter,
+            }
+        )
+        adapter.http = HTTPClientPool(transport=httpx.MockTransport(handler))
+
+        async def run():
+            first = await adapter.update_inventory_bulk({"1": 4, "2": -1, "3": 9})
+            again = await adapter.update_inventory_bulk({"1": 5})  # Targets already resolved
+            return first, again
+
+        first, again = asyncio.run(run())
+
+        assert first == {"1": True, "2": False, "3": True}
+        assert again == {"1": True}
+        mutation = requests[1]["variables"]["input"]["setQuantities"]
+        assert [q["quantity"] for q in mutation] == [4, -1, 9]
+        assert len(requests) == 3
+        assert limiter.metrics["acquired"] == 3
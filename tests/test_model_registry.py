@@ -0,0 +1,135 @@
+"""
+
+Test Model Registry and Micro-Batched Inference
+
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from services.api_gateway.kinetic.ml_models.micro_batcher import InferenceService
+from services.api_gateway.kinetic.ml_models.model_registry import (
+    ModelNotFoundError,
+    ModelRegistry,
+    save_model,
+)
+
+FEATURES = ["expected_return", "risk_level"]
+
+
+def _save_logistic(root, version, weights, bias=0.0):
+    save_model(
+        str(root),
+        "recommender",
+        version,
+        "logistic",
+        FEATURES,
+        {"weights": np.array(weights)},
+        bias=bias,
+    )
+
+
+@pytest.fixture
+def registry(tmp_path):
+    _save_logistic(tmp_path, "v1", [0.5, -1.0], bias=0.1)
+    _save_logistic(tmp_path, "v2", [-0.5, 1.0])
+    return ModelRegistry(str(tmp_path))
+
+
+class TestModelRegistry:
+    """Test versioned model loading"""
+
+    def test_latest_version_is_served_by_default(self, registry):
+        assert registry.versions("recommender") == ["v1", "v2"]
+        assert registry.get("recommender").version == "v2"
+
+    def test_weights_are_memory_mapped_and_loaded_once(self, registry):
+        model = registry.load("recommender", "v1")
+
+        assert isinstance(model.weights, np.memmap)
+        assert registry.load("recommender", "v1") is model
+
+    def test_logistic_prediction(self, registry):
+        model = registry.load("recommender", "v1")
+        X = model.to_matrix([{"expected_return": 2.0, "risk_level": 1.0}])
+
+        expected = 1 / (1 + np.exp(-(0.5 * 2.0 - 1.0 + 0.1)))
+        assert model.predict(X)[0] == pytest.approx(expected)
+
+    def test_tree_ensemble_prediction(self, tmp_path):
+        # One stump: risk_level <= 0.5 -> +1.0 else -1.0
+        save_model(
+            str(tmp_path),
+            "trees",
+            "1",
+            "gbm",
+            FEATURES,
+            {
+                "feature": np.array([[1, -1, -1]]),
+                "threshold": np.array([[0.5, 0.0, 0.0]]),
+                "left": np.array([[1, -1, -1]]),
+                "right": np.array([[2, -1, -1]]),
+                "value": np.array([[0.0, 1.0, -1.0]]),
+            },
+            objective="regression",
+            base_score=0.5,
+            max_depth=1,
+        )
+        model = ModelRegistry(str(tmp_path)).get("trees")
+        X = model.to_matrix([{"risk_level": 0}, {"risk_level": 2}])
+
+        assert model.predict(X).tolist() == [1.5, -0.5]
+
+    def test_missing_model(self, registry):
+        assert not registry.has_model("unknown")
+        with pytest.raises(ModelNotFoundError):
+            registry.get("unknown")
+
+    @pytest.mark.parametrize(
+        "name, version",
+        [
+            ("recommender", "../../etc"),
+            ("..", "v1"),
+            ("recommender", "v1/../v2"),
+            ("../recommender", None),
+        ],
+    )
+    def test_path_traversal_is_rejected(self, registry, name, version):
+        with pytest.raises(ValueError):
+            registry.activate(name, version)
+
+
+class TestMicroBatching:
+    """Test request coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_batches(self, registry):
+        service = InferenceService(registry, max_batch_size=32, max_wait_ms=20)
+        rows = [{"expected_return": i / 10, "risk_level": i % 3} for i in range(100)]
+
+        results = await asyncio.gather(*(service.predict("recommender", row) for row in rows))
+
+        model = registry.get("recommender")
+        expected = model.predict(model.to_matrix(rows))
+        assert [r["score"] for r in results] == pytest.approx(expected.tolist())
+
+        metrics = service.get_metrics()["recommender"]
+        assert metrics["requests_served"] == 100
+        assert metrics["batches_run"] <= 5
+        assert metrics["largest_batch"] == 32
+        await service.close()
+
+    @pytest.mark.asyncio
+    async def test_hot_swap_applies_to_next_batch(self, registry):
+        service = InferenceService(registry, max_wait_ms=1)
+        row = {"expected_return": 1.0, "risk_level": 0.0}
+
+        before = await service.predict("recommender", row)
+        registry.activate("recommender", "v1")
+        after = await service.predict("recommender", row)
+
+        assert (before["version"], after["version"]) == ("v2", "v1")
+        assert before["score"] != after["score"]
+        await service.close()
@@ -0,0 +1,113 @@
+"""
+
+Test Monte Carlo Portfolio Simulation
+
+"""
+
+import pytest
+
+from services.api_gateway.kinetic.ml_models.portfolio_simulator import (
+    PortfolioSimulator,
+    SimulationConfig,
+)
+
+PORTFOLIO = [
+    {
+        "amount": 250000,
+        "duration_months": 24,
+        "business_sector": "technology",
+        "credit_score": 620,
+        "debt_to_income_ratio": 0.4,
+    },
+    {
+        "amount": 100000,
+        "duration_months": 12,
+        "business_sector": "healthcare",
+        "credit_score": 780,
+        "debt_to_income_ratio": 0.2,
+    },
+    {
+        "amount": 400000,
+        "duration_months": 48,
+        "business_sector": "real_estate",
+        "credit_score": 700,
+        "debt_to_income_ratio": 0.3,
+    },
+    {
+        "amount": 150000,
+        "duration_months": 36,
+        "business_sector": "technology",
+        "credit_score": 540,
+        "debt_to_income_ratio": 0.6,
+    },
+]
+
+
+class TestPortfolioSimulator:
+    """Test portfolio simulation engine"""
+
+    def test_fixed_seed_is_reproducible(self):
+        """The same seed gives the same report"""
+        simulator = PortfolioSimulator()
+        config = SimulationConfig(n_paths=20_000, chunk_size=5_000, seed=7, max_workers=1)
+
+        first = simulator.simulate(PORTFOLIO, config)
+        second = simulator.simulate(PORTFOLIO, config)
+
+        for key in ("expected_loss", "var", "cvar", "max_loss", "sector_contributions"):
+            assert first[key] == second[key]
+
+    def test_result_independent_of_worker_count(self):
+        """Chunk seeding makes the process pool deterministic"""
+        simulator = PortfolioSimulator()
+        in_process = simulator.simulate(
+            PORTFOLIO, SimulationConfig(n_paths=20_000, chunk_size=5_000, seed=7, max_workers=1)
+        )
+        pooled = simulator.simulate(
+            PORTFOLIO, SimulationConfig(n_paths=20_000, chunk_size=5_000, seed=7, max_workers=2)
+        )
+
+        assert pooled["workers"] == 2
+        assert pooled["var"] == in_process["var"]
+        assert pooled["cvar"] == in_process["cvar"]
+        assert pooled["sector_contributions"] == in_process["sector_contributions"]
+
+    def test_tail_metrics_are_consistent(self):
+        """CVaR >= VaR >= expected loss and sector contributions add up to CVaR"""
+        report = PortfolioSimulator().simulate(
+            PORTFOLIO, SimulationConfig(n_paths=50_000, seed=1, max_workers=1)
+        )
+
+        assert report["cvar"] >= report["var"] >= report["expected_loss"]
+        assert report["max_loss"] >= report["cvar"]
+        assert set(report["sector_contributions"]) == {"technology", "healthcare", "real_estate"}
+        total = sum(s["cvar_contribution"] for s in report["sector_contributions"].values())
+        assert total == pytest.approx(report["cvar"], abs=0.05)
+        assert report["paths_per_second_per_core"] > 0
+
+    def test_higher_default_probability_raises_tail_risk(self):
+        """Explicit default probabilities override the derived ones"""
+        simulator = PortfolioSimulator()
+        config = SimulationConfig(n_paths=20_000, seed=3, max_workers=1)
+        risky = [dict(item, default_probability=0.3) for item in PORTFOLIO]
+
+        assert (
+            simulator.simulate(risky, config)["cvar"]
+            > simulator.simulate(PORTFOLIO, config)["cvar"]
+        )
+
+    def test_empty_portfolio_rejected(self):
+        with pytest.raises(ValueError):
+            PortfolioSimulator().simulate([])
+
+    @pytest.mark.parametrize("options", [{"n_paths": 0}, {"chunk_size": 0}, {"chunk_size": -5}])
+    def test_invalid_path_counts_rejected(self, options):
+        with pytest.raises(ValueError):
+            PortfolioSimulator().simulate(PORTFOLIO, SimulationConfig(max_workers=1, **options))
+
+    @pytest.mark.parametrize("correlation", [1.5, -1.01])
+    def test_invalid_default_correlation_rejected(self, correlation):
+        with pytest.raises(ValueError, match="default_correlation"):
+            PortfolioSimulator().simulate(
+                PORTFOLIO, SimulationConfig(max_workers=1, default_correlation=correlation)
+            )
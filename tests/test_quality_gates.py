@@ -0,0 +1,141 @@
+"""
+
+Test Quality Gate Executor
+
+"""
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# Models are taken from the factory's namespace so isinstance checks match
+from services.api_gateway.bio_module_factory.core import factory as factory_module
+
+
+@pytest.fixture
+def gates_module():
+    """The gates module, with checks registered by the test removed afterwards"""
+    module = sys.modules[factory_module.QualityGateExecutor.__module__]
+    registered = dict(module.CHECKS)
+    yield module
+    module.CHECKS.clear()
+    module.CHECKS.update(registered)
+
+
+@pytest.fixture
+def factory(tmp_path):
+    """Factory with module m0 expecting one required source deliverable"""
+    factory = factory_module.BioModuleFactory(
+        str(tmp_path / "store"), gate_timeout=0.5, gate_workers=2
+    )
+    module = factory_module.BioModule(
+        id="m0",
+        name="m0 module",
+        organism="ant",
+        problem_ar="-",
+        problem_en="-",
+        solution_ar="-",
+        solution_en="-",
+        phase="ecommerce",
+        tech_stack=["python"],
+        estimated_duration_weeks=2,
+        priority=1,
+        biological_principles=[],
+    )
+    step = SimpleNamespace(
+        deliverables=[
+            factory_module.Deliverable(id="source", name="Source", description="-", required=True)
+        ]
+    )
+    asyncio.run(factory.initialize_module(module, [step]))
+    yield factory
+    factory.close()
+
+
+def _gate(check: str, blocking: bool = True):
+    return factory_module.QualityGate(
+        id=check,
+        name=check,
+        description="-",
+        gate_type=(
+            factory_module.QualityGateType.BLOCKING
+            if blocking
+            else factory_module.QualityGateType.WARNING
+        ),
+        check_function=check,
+        error_message="-",
+    )
+
+
+async def _submit(factory, tmp_path, source: str):
+    (tmp_path / "store" / "m0" / "src" / "main.py").write_text(source)
+    await factory.submit_deliverable("m0", "development", "source", "src/main.py")
+
+
+class TestQualityGateExecutor:
+    """Test concurrent gate execution"""
+
+    @pytest.mark.asyncio
+    async def test_gates_run_concurrently(self, factory, gates_module):
+        for name in ("slow_a", "slow_b", "slow_c"):
+            gates_module.register_check(f"test_{name}", kind="io")(
+                lambda context: time.sleep(0.2) or True
+            )
+
+        started = time.perf_counter()
+        result = await factory.validate_step(
+            "m0", [_gate(f"test_{n}") for n in ("slow_a", "slow_b", "slow_c")]
+        )
+
+        assert result.passed and result.score == 100.0
+        assert time.perf_counter() - started < 0.45
+
+    @pytest.mark.asyncio
+    async def test_timed_out_gate_fails(self, factory, gates_module):
+        gates_module.register_check("test_hangs", kind="io")(lambda context: time.sleep(2) or True)
+
+        result = await factory.validate_step(
+            "m0", [_gate("test_hangs"), _gate("check_file_exists")]
+        )
+
+        assert not result.passed
+        assert [g.id for g in result.blocking_failures] == ["test_hangs"]
+        assert "Timed out" in result.blocking_failures[0].details["error"]
+        assert factory.gate_executor.metrics["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cpu_gate_runs_in_process_pool(self, factory, tmp_path):
+        await _submit(factory, tmp_path, "def broken(:\n")
+
+        result = await factory.validate_step("m0", [_gate("check_python_syntax")])
+
+        assert not result.passed
+        assert "main.py:1" in result.blocking_failures[0].details["errors"][0]
+        assert factory.gate_executor._pool is not None
+
+    @pytest.mark.asyncio
+    async def test_results_are_cached_until_deliverables_change(self, factory, tmp_path):
+        gates = lambda: [
+            _gate("check_deliverable_exists"),
+            _gate("check_file_exists"),
+            _gate("check_python_syntax"),
+        ]
+        executor = factory.gate_executor
+
+        assert not (await factory.validate_step("m0", gates())).passed  # Nothing submitted
+        await _submit(factory, tmp_path, "x = 1\n")
+        assert (await factory.validate_step("m0", gates())).passed
+        assert executor.metrics == {"executed": 6, "cache_hits": 0, "timeouts": 0}
+
+        assert (await factory.validate_step("m0", gates())).passed
+        assert executor.metrics["executed"] == 6
+        assert executor.metrics["cache_hits"] == 3
+
+        # Same path, new content: the fingerprint changes
+        await _submit(factory, tmp_path, "x = (\n")
+        result = await factory.validate_step("m0", gates())
+        assert [g.id for g in result.blocking_failures] == ["check_python_syntax"]
+        assert executor.metrics["executed"] == 9
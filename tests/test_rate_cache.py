@@ -0,0 +1,143 @@
+"""
+
+Test Shipping Rate Quote Cache
+
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.api_gateway.integrations.shipping.circuit_breaker import (
+    AramexCircuitBreaker,
+    CircuitBreakerOpenException,
+    CircuitBreakerState,
+    ResilientAramexClient,
+)
+from services.api_gateway.integrations.shipping.rate_cache import (
+    RateCacheConfig,
+    RateQuoteCache,
+    destination_zone,
+    weight_bucket,
+)
+from services.api_gateway.integrations.shipping.rate_shopping import RateShopper, RateShoppingConfig
+
+
+class CountingCarrier:
+    """Carrier that prices by weight and records every upstream call"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+        self.error = None
+
+    async def get_rates(
+        self, origin_country, origin_city, destination_country, destination_city, weight
+    ):
+        self.calls.append((destination_city, weight))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [
+            {
+                "provider": "aramex",
+                "service": "Standard",
+                "cost": weight * 10,
+                "currency": "SAR",
+                "estimated_days": 2,
+            }
+        ]
+
+
+def _shopper(carrier, **cache_config):
+    return RateShopper({"aramex": carrier}, cache=RateQuoteCache(RateCacheConfig(**cache_config)))
+
+
+class TestRateCache:
+    """Test lane bucketing, stale serving, hot lanes and pre-warming"""
+
+    def test_zones_and_weight_buckets(self):
+        assert (
+            destination_zone("sa", " Jeddah ") == destination_zone("SA", "makkah") == "SA:western"
+        )
+        assert destination_zone("SA", "Unlisted Town") == "SA:unlisted town"
+        assert weight_bucket(1.2, 0.5) == 1.5
+        assert weight_bucket(1.5, 0.5) == 1.5
+        assert weight_bucket(0.0, 0.5) == 0.5
+
+    @pytest.mark.asyncio
+    async def test_same_zone_and_bucket_share_one_quote(self):
+        carrier = CountingCarrier()
+        shopper = _shopper(carrier)
+
+        first = await shopper.quote("SA", "Riyadh", "SA", "Jeddah", 1.2)
+        second = await shopper.quote("SA", "Riyadh", "SA", "Makkah", 1.4)
+
+        assert carrier.calls == [("Jeddah", 1.5)]  # Quoted for the bucket's upper bound
+        assert first["rates"][0]["cached"] is False
+        assert second["rates"][0]["cached"] is True
+        assert second["rates"][0]["cost"] == 15.0
+
+    @pytest.mark.asyncio
+    async def test_stale_quote_served_while_breaker_open(self):
+        carrier = CountingCarrier()
+        shopper = _shopper(carrier, ttl=0.0, stale_while_revalidate=0.0)
+        await shopper.quote("SA", "Riyadh", "SA", "Dammam", 2.0)
+
+        carrier.error = CircuitBreakerOpenException("open")
+        quote = await shopper.quote("SA", "Riyadh", "SA", "Dammam", 2.0)
+
+        assert quote["rates"][0]["stale"] is True
+        assert shopper.cache.get_status()["stale_on_error"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resilient_aramex_keeps_breaker_exception(self):
+        client = ResilientAramexClient(CountingCarrier())
+        client.circuit_breaker = AramexCircuitBreaker()
+        client.circuit_breaker.circuit_breaker.state = CircuitBreakerState.OPEN
+        client.circuit_breaker.circuit_breaker.last_failure_time = time.time()
+
+        with pytest.raises(CircuitBreakerOpenException):
+            await client.get_rates("SA", "Riyadh", "SA", "Jeddah", 1.0)
+
+    @pytest.mark.asyncio
+    async def test_hot_lanes_are_refreshed_near_expiry(self):
+        carrier = CountingCarrier()
+        shopper = _shopper(carrier, hot_lane_hits=3, ttl=0.3, refresh_ahead=0.1)
+        for _ in range(3):
+            await shopper.quote("SA", "Riyadh", "SA", "Jeddah", 1.0)
+        await shopper.quote("SA", "Riyadh", "SA", "Tabuk", 1.0)
+
+        assert await shopper.cache.refresh_hot_lanes() == 0  # Still far from expiry
+        await asyncio.sleep(0.22)
+        assert await shopper.cache.refresh_hot_lanes() == 1
+        assert carrier.calls == [("Jeddah", 1.0), ("Tabuk", 1.0), ("Jeddah", 1.0)]
+        assert shopper.cache.get_status()["tracked_lanes"] == 0  # Counts restart per entry
+
+    @pytest.mark.asyncio
+    async def test_prewarm_from_zone_table(self):
+        carrier = CountingCarrier()
+        shopper = _shopper(carrier)
+
+        assert await shopper.prewarm("SA", "Riyadh", weights=(1.0,), countries=["SA"]) == 5
+        quote = await shopper.quote("SA", "Riyadh", "SA", "Khobar", 0.8)
+
+        assert len(carrier.calls) == 5
+        assert quote["rates"][0]["cached"] is True
+
+    @pytest.mark.asyncio
+    async def test_miss_cut_by_deadline_still_fills_cache(self):
+        carrier = CountingCarrier(delay=0.1)
+        shopper = RateShopper(
+            {"aramex": carrier}, RateShoppingConfig(deadline=0.02), cache=RateQuoteCache()
+        )
+
+        assert (await shopper.quote("SA", "Riyadh", "SA", "Abha", 1.0))["carriers"]["aramex"] == {
+            "status": "timeout"
+        }
+        await asyncio.sleep(0.15)
+        quote = await shopper.quote("SA", "Riyadh", "SA", "Abha", 1.0)
+
+        assert quote["rates"][0]["cached"] is True
+        assert len(carrier.calls) == 1
@@ -0,0 +1,135 @@
+"""
+
+Test Multi-Carrier Rate Shopping
+
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.api_gateway.integrations.shipping.rate_shopping import (
+    RateShopper,
+    RateShoppingConfig,
+    rank_rates,
+)
+
+ROUTE = ("SA", "Riyadh", "SA", "Jeddah", 2.0)
+
+
+class FakeCarrier:
+    """Carrier whose n-th get_rates call takes delays[n] seconds"""
+
+    def __init__(self, name, cost, days, delays=(0.0,), error=None):
+        self.name = name
+        self.cost = cost
+        self.days = days
+        self.delays = list(delays)
+        self.error = error
+        self.calls = 0
+
+    async def get_rates(
+        self, origin_country, origin_city, destination_country, destination_city, weight
+    ):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        if self.error:
+            raise self.error
+        return [
+            {
+                "provider": self.name,
+                "service": "Standard",
+                "cost": self.cost,
+                "currency": "SAR",
+                "estimated_days": self.days,
+            }
+        ]
+
+
+class TestRateShopper:
+    """Test concurrency, deadline, ranking and hedging"""
+
+    @pytest.mark.asyncio
+    async def test_carriers_are_queried_concurrently(self):
+        shopper = RateShopper(
+            {
+                "aramex": FakeCarrier("aramex", 40, 3, delays=[0.15]),
+                "smsa": FakeCarrier("smsa", 30, 2, delays=[0.15]),
+            }
+        )
+        started = time.perf_counter()
+        quote = await shopper.quote(*ROUTE)
+
+        assert time.perf_counter() - started < 0.28
+        assert [r["provider"] for r in quote["rates"]] == ["smsa", "aramex"]
+        assert {c["status"] for c in quote["carriers"].values()} == {"ok"}
+
+    @pytest.mark.asyncio
+    async def test_deadline_returns_what_arrived(self):
+        shopper = RateShopper(
+            {
+                "aramex": FakeCarrier("aramex", 40, 3, delays=[5.0]),
+                "smsa": FakeCarrier("smsa", 30, 2, delays=[0.01]),
+            },
+            RateShoppingConfig(deadline=0.1),
+        )
+        started = time.perf_counter()
+        quote = await shopper.quote(*ROUTE)
+
+        assert time.perf_counter() - started < 0.5
+        assert [r["provider"] for r in quote["rates"]] == ["smsa"]
+        assert quote["carriers"]["aramex"] == {"status": "timeout"}
+        assert shopper.get_status()["carriers"]["aramex"]["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_carrier_does_not_block_others(self):
+        shopper = RateShopper(
+            {
+                "aramex": FakeCarrier("aramex", 40, 3, error=Exception("circuit open")),
+                "smsa": FakeCarrier("smsa", 30, 2),
+            }
+        )
+        quote = await shopper.quote(*ROUTE)
+
+        assert len(quote["rates"]) == 1
+        assert quote["carriers"]["aramex"]["status"] == "error"
+        assert "circuit open" in quote["carriers"]["aramex"]["error"]
+
+    def test_rank_by_eta(self):
+        rates = [
+            {"cost": 10, "estimated_days": 5},
+            {"cost": 30, "estimated_days": 1},
+            {"cost": 20, "estimated_days": 1},
+        ]
+        assert [r["cost"] for r in rank_rates(rates)] == [10, 20, 30]
+        assert [r["cost"] for r in rank_rates(rates, "eta")] == [20, 30, 10]
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged_after_p95(self):
+        carrier = FakeCarrier("aramex", 40, 3, delays=[2.0, 0.01])
+        shopper = RateShopper(
+            {"aramex": carrier}, RateShoppingConfig(hedge_min_samples=5, min_hedge_delay=0.02)
+        )
+        for _ in range(5):
+            shopper.latency["aramex"].record(0.03)
+
+        started = time.perf_counter()
+        quote = await shopper.quote(*ROUTE)
+
+        assert time.perf_counter() - started < 0.5
+        assert len(quote["rates"]) == 1
+        assert carrier.calls == 2
+        status = shopper.get_status()["carriers"]["aramex"]
+        assert status["hedges"] == 1 and status["hedge_wins"] == 1
+        assert status["hedge_delay_ms"] == 30.0
+
+    @pytest.mark.asyncio
+    async def test_no_hedging_without_history(self):
+        carrier = FakeCarrier("aramex", 40, 3, delays=[0.1, 0.01])
+        shopper = RateShopper({"aramex": carrier})
+        await shopper.quote(*ROUTE)
+
+        assert carrier.calls == 1
+        assert shopper.get_status()["carriers"]["aramex"]["hedges"] == 0
@@ -0,0 +1,87 @@
+"""
+
+Test Vectorized Batch Risk Scoring
+
+Checks that RiskAssessor.assess_batch produces the same report per item as
+the scalar assess_investment_risk path.
+
+"""
+
+import random
+
+import pytest
+
+from services.api_gateway.kinetic.ml_models.risk_assessor import RiskAssessor
+
+SECTORS = [
+    "technology",
+    "Healthcare",
+    "finance",
+    "real_estate",
+    "manufacturing",
+    "retail",
+    "energy",
+    "alcohol",
+    "online_gambling",
+    "utilities",
+    "",
+]
+
+
+def _random_investment(rng: random.Random) -> dict:
+    investment = {
+        "amount": rng.choice([0, 5000, 250000.5, 1000000, 3000000]),
+        "duration_months": rng.randint(1, 120),
+        "business_sector": rng.choice(SECTORS),
+        "credit_score": rng.randint(300, 850),
+        "debt_to_income_ratio": round(rng.random(), 3),
+        "company_age_years": rng.randint(0, 30),
+        "employee_count": rng.randint(0, 500),
+        "has_insurance": rng.random() < 0.5,
+        "sharia_certified": rng.random() < 0.5,
+        "has_sharia_board": rng.random() < 0.5,
+    }
+    if rng.random() < 0.5:
+        investment["historical_performance"] = {"volatility": round(rng.random(), 3)}
+    return investment
+
+
+def _without_timestamp(result: dict) -> dict:
+    return {key: value for key, value in result.items() if key != "assessed_at"}
+
+
+class TestAssessBatch:
+    """Test batch risk assessment"""
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_scalar_path(self):
+        """Every batch item is identical to the scalar assessment"""
+        assessor = RiskAssessor()
+        rng = random.Random(26)
+        investments = [_random_investment(rng) for _ in range(500)]
+        investments.append({})  # all defaults
+
+        batch = await assessor.assess_batch(investments)
+
+        assert len(batch) == len(investments)
+        for investment, result in zip(investments, batch):
+            expected = await assessor.assess_investment_risk(investment)
+            assert _without_timestamp(result) == _without_timestamp(expected)
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_current_weights(self):
+        """Weight changes apply to the batch path as well"""
+        assessor = RiskAssessor()
+        assessor.risk_factors["sharia_compliance_risk"] = 0.5
+        investment = {"amount": 10000, "duration_months": 12, "business_sector": "alcohol"}
+
+        [result] = await assessor.assess_batch([investment])
+        expected = await assessor.assess_investment_risk(investment)
+
+        assert result["overall_risk_score"] == expected["overall_risk_score"]
+        assert result["risk_level"] == expected["risk_level"]
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self):
+        """An empty batch returns no results"""
+        assert await RiskAssessor().assess_batch([]) == []
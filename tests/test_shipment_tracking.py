@@ -0,0 +1,244 @@
+"""
+
+Test Shipment Tracking Service
+
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from services.api_gateway.integrations.http_pool import HTTPClientPool
+from services.api_gateway.integrations.shipping.aramex import AramexClient
+from services.api_gateway.integrations.shipping.smsa import SMSAClient
+from services.api_gateway.integrations.shipping.tracking import (
+    TrackingScheduleConfig,
+    TrackingService,
+    TrackingStore,
+    normalize_status,
+)
+
+
+class FakeCarrier:
+    """Carrier whose statuses are set per waybill; records each batched call"""
+
+    def __init__(self):
+        self.statuses = {}
+        self.calls = []
+        self.error = None
+
+    async def track_shipments(self, numbers):
+        self.calls.append(list(numbers))
+        if self.error:
+            raise self.error
+        return [
+            {
+                "success": True,
+                "tracking_number": n,
+                "status": self.statuses.get(n, "Record created"),
+                "location": "Riyadh",
+                "timestamp": "2026-10-19T10:00:00",
+            }
+            for n in numbers
+        ]
+
+
+def _service(**carriers):
+    service = TrackingService(carriers, TrackingStore(":memory:"))
+    changes = []
+
+    async def collect(batch):
+        changes.append(batch)
+
+    service.add_listener(collect)
+    return service, changes
+
+
+class TestShipmentTracking:
+    """Test status mapping, adaptive schedule, batched polls and change events"""
+
+    def test_normalize_status(self):
+        assert normalize_status("Shipment Record Created") == "created"
+        assert normalize_status("Departed Facility in Riyadh") == "in_transit"
+        assert normalize_status("Out for Delivery") == "out_for_delivery"
+        assert normalize_status("Delivered") == "delivered"
+        assert normalize_status("Not Delivered - Consignee not available") == "exception"
+        assert normalize_status("Returned to Shipper") == "returned"
+        assert normalize_status("Unknown") == "created"
+
+    def test_schedule_tightens_near_delivery(self):
+        service = TrackingService({}, TrackingStore(":memory:"))
+        config = TrackingScheduleConfig()
+        now = time.time()
+        far, near = now + 3 * 86400, now + 3600
+
+        assert service.next_poll_delay("in_transit", far, now) == config.in_transit
+        assert service.next_poll_delay("in_transit", near, now) == config.near_delivery
+        assert service.next_poll_delay("out_for_delivery", far, now) == config.out_for_delivery
+        assert service.next_poll_delay("delivered", near, now) is None
+
+    @pytest.mark.asyncio
+    async def test_due_waybills_polled_in_one_call_per_carrier(self):
+        aramex, smsa = FakeCarrier(), FakeCarrier()
+        service, _ = _service(aramex=aramex, smsa=smsa)
+        for i in range(5):
+            await service.track(f"A{i}", "aramex")
+        await service.track("S0", "smsa")
+
+        assert await service.poll_due() == 6
+        assert aramex.calls == [["A0", "A1", "A2", "A3", "A4"]]
+        assert smsa.calls == [["S0"]]
+        assert await service.poll_due() == 0  # Next polls are hours away
+
+    @pytest.mark.asyncio
+    async def test_status_changes_are_emitted_and_stored(self):
+        carrier = FakeCarrier()
+        service, changes = _service(aramex=carrier)
+        await service.track("A1", "aramex", reference="ORD-1")
+        await service.poll_due()
+        assert changes == []  # Still 'created'
+
+        carrier.statuses["A1"] = "Out for Delivery"
+        service.store._db.execute("UPDATE shipments SET next_poll_at = 0")
+        await service.poll_due()
+
+        assert [(c.old_status, c.new_status) for c in changes[0]] == [
+            ("created", "out_for_delivery")
+        ]
+        state = await service.get("A1")
+        assert state["status"] == "out_for_delivery" and state["reference"] == "ORD-1"
+        assert state["next_poll_at"] - state["last_polled_at"] == pytest.approx(900, abs=1)
+        assert state["history"][0]["description"] == "Out for Delivery"
+
+    @pytest.mark.asyncio
+    async def test_delivered_waybill_leaves_active_set(self):
+        carrier = FakeCarrier()
+        carrier.statuses["A1"] = "Delivered"
+        service, _ = _service(aramex=carrier)
+        await service.track("A1", "aramex")
+        await service.poll_due()
+
+        assert (await service.get("A1"))["active"] is False
+        assert service.get_status()["active"] == 0
+        assert service.store.next_due_at() is None
+
+    @pytest.mark.asyncio
+    async def test_failed_poll_keeps_state_and_retries_later(self):
+        carrier = FakeCarrier()
+        carrier.statuses["A1"] = "Departed Facility"
+        service, _ = _service(aramex=carrier)
+        await service.track("A1", "aramex")
+        await service.poll_due()
+
+        carrier.error = ConnectionError("carrier down")
+        service.store._db.execute("UPDATE shipments SET next_poll_at = 0")
+        await service.poll_due()
+
+        state = await service.get("A1")
+        assert state["status"] == "in_transit" and state["description"] == "Departed Facility"
+        assert state["last_error"] == "carrier down"
+        assert state["next_poll_at"] - state["last_polled_at"] == pytest.approx(1800, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_unparseable_smsa_reply_is_a_failed_poll(self):
+        def handler(request):
+            return httpx.Response(200, text="<soap:Envelope><truncated")
+
+        smsa = SMSAClient(
+            "u", "p", "1", "key", http_pool=HTTPClientPool(transport=httpx.MockTransport(handler))
+        )
+        service, changes = _service(smsa=smsa)
+        await service.track("S1", "smsa")
+        await service.poll_due()
+
+        state = await service.get("S1")
+        assert state["status"] == "created" and state["active"] is True
+        assert state["last_error"] == "SMSA tracking response could not be parsed"
+        assert changes == []
+        with pytest.raises(RuntimeError):
+            await service.lookup("S2", "smsa")
+        assert await service.get("S2") is None
+
+    @pytest.mark.asyncio
+    async def test_lookup_only_tracks_waybills_the_carrier_knows(self):
+        carrier = FakeCarrier()
+        carrier.statuses.update({"BOGUS": "Not found", "A1": "Departed Facility"})
+        service, _ = _service(aramex=carrier)
+
+        assert await service.lookup("BOGUS", "aramex") is None
+        assert await service.get("BOGUS") is None
+
+        state = await service.lookup("A1", "aramex")
+        assert state["status"] == "in_transit" and state["active"] is True
+        assert carrier.calls == [["BOGUS"], ["A1"]]
+        assert await service.poll_due() == 0  # Only the looked-up number was polled
+
+    @pytest.mark.asyncio
+    async def test_waybill_never_found_is_dropped_after_grace(self):
+        carrier = FakeCarrier()
+        carrier.statuses["A1"] = "Not found"
+        service, _ = _service(aramex=carrier)
+        await service.track("A1", "aramex")
+        await service.poll_due()
+
+        state = await service.get("A1")
+        assert (
+            state["active"] is True
+            and state["status"] == "created"
+            and state["last_error"] == "Not found"
+        )
+
+        service.store._db.execute(
+            "UPDATE shipments SET next_poll_at = 0, registered_at = registered_at - 3 * 86400"
+        )
+        await service.poll_due()
+        assert (await service.get("A1"))["active"] is False
+
+    @pytest.mark.asyncio
+    async def test_unknown_carrier_rejected(self):
+        service, _ = _service(aramex=FakeCarrier())
+        with pytest.raises(ValueError):
+            await service.track("X1", "dhl")
+
+    def test_aramex_packs_waybills_per_request(self):
+        requests = []
+
+        def handler(request):
+            numbers = json.loads(request.content)["Shipments"]
+            requests.append(len(numbers))
+            results = [
+                {
+                    "Key": n,
+                    "Value": [
+                        {
+                            "WaybillNumber": n,
+                            "UpdateDescription": "Delivered",
+                            "UpdateLocation": "Jeddah",
+                            "UpdateDateTime": "2026-10-19",
+                        }
+                    ],
+                }
+                for n in numbers
+                if n != "W3"
+            ]
+            return httpx.Response(
+                200, json={"HasErrors": False, "Notifications": [], "TrackingResults": results}
+            )
+
+        client = AramexClient(
+            "u",
+            "p",
+            "1",
+            "pin",
+            "RUH",
+            "SA",
+            http_pool=HTTPClientPool(transport=httpx.MockTransport(handler)),
+        )
+        results = asyncio.run(client.track_shipments([f"W{i}" for i in range(120)]))
+
+        assert sorted(requests) == [20, 50, 50]
+        assert results[0]["status"] == "Delivered" and results[0]["location"] == "Jeddah"
+        assert results[3]["success"] is True and results[3]["status"] == "Not found"
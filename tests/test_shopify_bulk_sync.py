@@ -0,0 +1,205 @@
+"""
+
+Test Shopify Bulk Export Sync
+
+Runs against a local stand-in for the Shopify GraphQL bulk API.
+
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from backend.core.database import Base
+from backend.core.models import Order, Product
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.api_gateway.integrations.ecommerce.adapters import ProductData, ShopifyAdapter
+from services.api_gateway.integrations.ecommerce.adapters.shopify_adapter import BulkOperationError
+from services.api_gateway.integrations.ecommerce.sync import EcommerceStore, bulk_sync
+
+
+def _product_lines(count):
+    for i in range(1, count + 1):
+        gid = f"gid://shopify/Product/{i}"
+        yield {
+            "id": gid,
+            "title": f"Shoe {i}",
+            "descriptionHtml": "-",
+            "status": "ACTIVE",
+            "createdAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-02-01T00:00:00Z",
+        }
+        yield {"url": f"https://cdn.example.com/{i}.jpg", "__parentId": gid}
+        for size in (41, 42):
+            yield {
+                "id": f"gid://shopify/ProductVariant/{i}{size}",
+                "sku": f"SKU-{i}-{size}",
+                "price": "99.50",
+                "inventoryQuantity": 3,
+                "inventoryItem": {"id": f"gid://shopify/InventoryItem/{i}{size}"},
+                "__parentId": gid,
+            }
+
+
+def _order_lines(count):
+    for i in range(1, count + 1):
+        gid = f"gid://shopify/Order/{i}"
+        yield {
+            "id": gid,
+            "name": f"#{1000 + i}",
+            "email": f"c{i}@example.com",
+            "displayFinancialStatus": "PAID",
+            "tags": [],
+            "note": None,
+            "createdAt": "2024-01-01T00:00:00Z",
+            "updatedAt": "2024-01-02T00:00:00Z",
+            "totalPriceSet": {"shopMoney": {"amount": "150.00", "currencyCode": "EGP"}},
+            "customer": {"firstName": "Amal", "lastName": "Hassan"},
+            "shippingAddress": {"city": "Cairo"},
+        }
+        yield {
+            "id": f"gid://shopify/LineItem/{i}",
+            "title": "Shoe",
+            "sku": "SKU-1-41",
+            "quantity": 1,
+            "__parentId": gid,
+        }
+
+
+class StandInShopify:
+    """Minimal bulk operation API: runs one operation, reports RUNNING once, then COMPLETED"""
+
+    def __init__(self, lines, fail=False):
+        self.body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        self.fail = fail
+        self.polls = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, payload, content_type="application/json"):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                self._reply({"data": stand_in.graphql(request["query"])})
+
+            def do_GET(self):
+                self._reply(stand_in.body, "application/jsonl")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def graphql(self, query):
+        if "bulkOperationRunQuery" in query:
+            return {
+                "bulkOperationRunQuery": {
+                    "bulkOperation": {"id": "gid://shopify/BulkOperation/1", "status": "CREATED"},
+                    "userErrors": [],
+                }
+            }
+        self.polls += 1
+        status = "RUNNING" if self.polls == 1 else ("FAILED" if self.fail else "COMPLETED")
+        return {
+            "currentBulkOperation": {
+                "id": "gid://shopify/BulkOperation/1",
+                "status": status,
+                "errorCode": "INTERNAL_SERVER_ERROR" if self.fail else None,
+                "objectCount": "0",
+                "url": f"{self.url}/result.jsonl",
+                "partialDataUrl": None,
+            }
+        }
+
+    def adapter(self):
+        return ShopifyAdapter({"api_key": "k", "password": "p", "store_url": self.url})
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def store():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return EcommerceStore(sessionmaker(bind=engine))
+
+
+class TestBulkSync:
+    """Test bulk export streaming into the DB"""
+
+    def test_products_are_streamed_into_product_table(self, store):
+        shop = StandInShopify(_product_lines(25))
+        try:
+            stats = asyncio.run(
+                bulk_sync(shop.adapter(), "products", store, batch_size=10, poll_interval=0.01)
+            )
+        finally:
+            shop.close()
+
+        assert stats["records"] == 25
+        assert stats["batches"] == 3
+        assert stats["records_per_second"] > 0
+
+        session = store.session_factory()
+        assert session.query(Product).count() == 25
+        product = session.query(Product).filter(Product.model_code == "shopify-7").one()
+        assert product.name == "Shoe 7"
+        assert product.quantity == 6  # Both variants
+        assert product.images == "https://cdn.example.com/7.jpg"
+
+    def test_products_sharing_a_sku_are_kept_apart(self, store):
+        variants = [{"sku": "SHARED-SKU", "price": "10.00", "inventory_quantity": 1}]
+        store.upsert_products(
+            [
+                ProductData(str(i), f"Shoe {i}", "", 10.0, "USD", 1, variants, [], "active")
+                for i in (1, 2)
+            ]
+        )
+
+        session = store.session_factory()
+        assert sorted(p.model_code for p in session.query(Product)) == ["shopify-1", "shopify-2"]
+
+    def test_orders_are_upserted(self, store):
+        shop = StandInShopify(_order_lines(5))
+        try:
+            asyncio.run(bulk_sync(shop.adapter(), "orders", store, poll_interval=0.01))
+            asyncio.run(bulk_sync(shop.adapter(), "orders", store, poll_interval=0.01))  # Resync
+        finally:
+            shop.close()
+
+        session = store.session_factory()
+        assert session.query(Order).count() == 5
+        order = session.query(Order).filter(Order.external_id == "3").one()
+        assert order.customer_name == "Amal Hassan"
+        assert order.currency == "EGP"
+        assert order.status == "paid"
+        assert order.order_number == "#1003"
+        assert json.loads(order.items)[0]["sku"] == "SKU-1-41"
+
+    def test_failed_operation_raises(self, store):
+        shop = StandInShopify([], fail=True)
+        try:
+            with pytest.raises(BulkOperationError):
+                asyncio.run(bulk_sync(shop.adapter(), "products", store, poll_interval=0.01))
+        finally:
+            shop.close()
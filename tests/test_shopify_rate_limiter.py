@@ -0,0 +1,170 @@
+"""
+
+Test Shopify Rate Limiter
+
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from services.api_gateway.integrations.ecommerce.adapters import ShopifyAdapter
+from services.api_gateway.integrations.ecommerce.rate_limiter import (
+    RateLimitConfig,
+    ShopifyRateLimiter,
+    get_rate_limiter,
+    parse_call_limit,
+)
+from services.api_gateway.integrations.http_pool import HTTPClientPool
+
+# Small, fast bucket: 10 slots leaking 20 per second (one every 50 ms)
+FAST = dict(bucket_size=10, leak_rate=20.0, headroom=0)
+
+
+def _adapter(limiter, responses):
+    """Adapter whose requests are answered from `responses` (status, headers) in order"""
+    sent = []
+
+    def handler(request):
+        sent.append(time.monotonic())
+        status, headers = responses[min(len(sent), len(responses)) - 1]
+        return httpx.Response(status, json={"orders": []}, headers=headers)
+
+    adapter = ShopifyAdapter(
+        {
+            "api_key": "k",
+            "password": "p",
+            "store_url": "https://limiter-test.myshopify.com",
+            "rate_limiter": limiter,
+        }
+    )
+    adapter.http = HTTPClientPool(transport=httpx.MockTransport(handler))
+    return adapter, sent
+
+
+class TestRateLimiter:
+    """Test the adaptive leaky bucket"""
+
+    def test_parse_call_limit(self):
+        assert parse_call_limit("32/40") == (32, 40)
+        assert parse_call_limit("garbage") is None
+        assert parse_call_limit(None) is None
+
+    def test_limiter_is_shared_per_store(self):
+        config = {"api_key": "k", "password": "p", "store_url": "https://shared.myshopify.com/"}
+        assert ShopifyAdapter(config).rate_limiter is ShopifyAdapter(config).rate_limiter
+        assert (
+            get_rate_limiter("https://shared.myshopify.com") is ShopifyAdapter(config).rate_limiter
+        )
+
+    def test_shared_limiter_rejects_a_different_config(self):
+        limiter = get_rate_limiter("https://configured.myshopify.com", RateLimitConfig(**FAST))
+
+        assert (
+            get_rate_limiter("https://configured.myshopify.com", RateLimitConfig(**FAST)) is limiter
+        )
+        with pytest.raises(ValueError, match="different config"):
+            get_rate_limiter("https://configured.myshopify.com", RateLimitConfig(bucket_size=80))
+
+    def test_burst_is_not_delayed(self):
+        limiter = ShopifyRateLimiter(RateLimitConfig(bucket_size=40, leak_rate=2.0))
+
+        async def burst():
+            started = time.monotonic()
+            await asyncio.gather(*(limiter.acquire() for _ in range(30)))
+            return time.monotonic() - started
+
+        assert asyncio.run(burst()) < 0.1
+        assert limiter.metrics["waited"] == 0
+
+    def test_header_fills_bucket(self):
+        limiter = ShopifyRateLimiter(RateLimitConfig(**FAST))
+        adapter, sent = _adapter(limiter, [(200, {"X-Shopify-Shop-Api-Call-Limit": "10/10"})])
+
+        async def run():
+            await adapter.get_orders()
+            await adapter.get_orders()  # Bucket reported full: waits for one slot to leak
+
+        asyncio.run(run())
+        assert sent[1] - sent[0] >= 0.04
+        assert limiter.metrics["waited"] == 1
+
+    def test_bigger_bucket_raises_leak_rate(self):
+        limiter = ShopifyRateLimiter(RateLimitConfig())
+
+        asyncio.run(limiter.update({"X-Shopify-Shop-Api-Call-Limit": "1/80"}))
+
+        assert limiter.bucket.capacity == 80
+        assert limiter.bucket.leak_rate == pytest.approx(4.0)
+
+    def test_429_backs_off_and_retries(self):
+        limiter = ShopifyRateLimiter(RateLimitConfig(**FAST))
+        adapter, sent = _adapter(
+            limiter,
+            [(429, {"Retry-After": "0.1"}), (200, {"X-Shopify-Shop-Api-Call-Limit": "1/10"})],
+        )
+
+        asyncio.run(adapter.get_orders())
+
+        assert len(sent) == 2
+        assert sent[1] - sent[0] >= 0.09
+        assert limiter.metrics["throttled"] == 1
+        assert limiter.bucket.leak_rate < 20.0
+
+    def test_429_retries_are_capped(self):
+        limiter = ShopifyRateLimiter(RateLimitConfig(max_retries=2, min_leak_rate=100.0, **FAST))
+        adapter, sent = _adapter(limiter, [(429, {"Retry-After": "0"})])
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(adapter.get_orders())
+        assert len(sent) == 3
+
+    def test_waiting_callers_are_served_in_order(self):
+        limiter = ShopifyRateLimiter(RateLimitConfig(bucket_size=2, leak_rate=20.0, headroom=0))
+        served = []
+
+        async def caller(i):
+            await limiter.acquire()
+            served.append(i)
+
+        async def run():
+            await limiter.acquire()
+            await limiter.acquire()  # Bucket now full
+            tasks = []
+            for i in range(6):
+                tasks.append(asyncio.create_task(caller(i)))
+                await asyncio.sleep(0)  # Arrive in order
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        assert served == list(range(6))
+        assert limiter.metrics["queued"] == 0
+
+    def test_redis_bucket_is_shared_across_limiters(self):
+        pytest.importorskip("lupa")
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        config = RateLimitConfig(bucket_size=2, leak_rate=2.0, headroom=0)
+
+        async def run():
+            # Two limiters on one key stand in for two worker processes
+            first = ShopifyRateLimiter(
+                config, "shared", fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+            )
+            second = ShopifyRateLimiter(
+                config, "shared", fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+            )
+            assert await first.bucket.reserve() == 0
+            assert await second.bucket.reserve() == 0
+            wait = await first.bucket.reserve()  # Both slots taken between them
+
+            await second.update({"X-Shopify-Shop-Api-Call-Limit": "1/4"})
+            return wait, await first.get_status()
+
+        wait, status = asyncio.run(run())
+        assert wait == pytest.approx(0.5, abs=0.05)
+        assert status["backend"] == "redis"
+        assert status["capacity"] == 4
+        assert status["leak_rate"] == pytest.approx(4.0, abs=0.1)
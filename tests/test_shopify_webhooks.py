@@ -0,0 +1,247 @@
+"""
+
+Test Shopify Webhook Ingestion Pipeline
+
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import sqlite3
+import time
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from backend.core.database import Base
+from backend.core.models import Order
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from services.api_gateway.integrations.ecommerce.adapters import transform_shopify_order
+from services.api_gateway.integrations.ecommerce.sync import EcommerceStore
+from services.api_gateway.integrations.shopify.webhooks import (
+    TTLDedupeSet,
+    WebhookPipeline,
+    WebhookQueue,
+    notify_new_orders,
+)
+
+SECRET = "shpss_test"
+
+
+def _order(order_id, email):
+    return {
+        "id": order_id,
+        "email": email,
+        "total_price": "10.00",
+        "financial_status": "paid",
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+    }
+
+
+def _delivery(webhook_id, payload, topic="orders/create", secret=SECRET):
+    body = json.dumps(payload).encode()
+    signature = base64.b64encode(hmac.new(secret.encode(), body, hashlib.sha256).digest()).decode()
+    return body, {
+        "X-Shopify-Hmac-Sha256": signature,
+        "X-Shopify-Webhook-Id": webhook_id,
+        "X-Shopify-Topic": topic,
+        "X-Shopify-Shop-Domain": "test-shop.myshopify.com",
+    }
+
+
+@pytest.fixture
+def store():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    return EcommerceStore(sessionmaker(bind=engine))
+
+
+@pytest.fixture
+def notified():
+    return []
+
+
+@pytest.fixture
+def pipeline(tmp_path, store, notified):
+    async def notify(orders):
+        notified.append(sorted(o.order_id for o in orders))
+
+    pipeline = WebhookPipeline(
+        secret=SECRET,
+        queue=WebhookQueue(str(tmp_path / "webhooks.sqlite3"), max_attempts=2),
+        transform_order=transform_shopify_order,
+        store=store,
+        notify=notify,
+    )
+    yield pipeline
+    pipeline.queue.close()
+
+
+class TestIngest:
+    """Request-path behaviour"""
+
+    def test_valid_delivery_is_queued(self, pipeline):
+        assert pipeline.ingest(*_delivery("w1", _order(1, "a@x.com"))) == (200, "queued")
+        assert pipeline.get_status()["queue_depth"] == 1
+
+    def test_bad_signature_is_rejected(self, pipeline):
+        body, headers = _delivery("w1", _order(1, "a@x.com"), secret="wrong")
+        assert pipeline.ingest(body, headers)[0] == 401
+        assert pipeline.get_status()["queue_depth"] == 0
+
+    def test_redelivery_is_deduplicated(self, pipeline):
+        delivery = _delivery("w1", _order(1, "a@x.com"))
+        pipeline.ingest(*delivery)
+        pipeline.dedupe = TTLDedupeSet()  # Restarted process: memory is gone, queue is not
+
+        assert pipeline.ingest(*delivery) == (200, "duplicate")
+        assert pipeline.ingest(*delivery) == (200, "duplicate")
+        assert pipeline.get_status()["queue_depth"] == 1
+        assert pipeline.metrics["duplicates"] == 2
+
+    def test_failed_append_does_not_swallow_retry(self, pipeline, monkeypatch):
+        delivery = _delivery("w1", _order(1, "a@x.com"))
+        real_append = pipeline.queue.append
+
+        def broken_append(*args):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(pipeline.queue, "append", broken_append)
+        with pytest.raises(sqlite3.OperationalError):
+            pipeline.ingest(*delivery)
+
+        monkeypatch.setattr(pipeline.queue, "append", real_append)
+        assert pipeline.ingest(*delivery) == (200, "queued")
+
+    def test_redelivery_after_processing_is_deduplicated(self, pipeline, notified):
+        delivery = _delivery("w1", _order(1, "a@x.com"))
+        pipeline.ingest(*delivery)
+        asyncio.run(pipeline.process_batch())
+        pipeline.dedupe = TTLDedupeSet()  # Restarted process
+
+        assert pipeline.ingest(*delivery) == (200, "duplicate")
+        assert asyncio.run(pipeline.process_batch()) == 0
+        assert notified == [["1"]]
+
+    def test_queue_survives_restart(self, pipeline, tmp_path):
+        pipeline.ingest(*_delivery("w1", _order(1, "a@x.com")))
+        pipeline.queue.close()
+
+        reopened = WebhookQueue(str(tmp_path / "webhooks.sqlite3"))
+        assert [e["webhook_id"] for e in reopened.claim(10)] == ["w1"]
+        pipeline.queue = reopened
+
+
+class TestProcessing:
+    """Batch consumers"""
+
+    def test_batch_upserts_orders_and_groups_notifications(self, pipeline, store, notified):
+        pipeline.ingest(*_delivery("w1", _order(1, "a@x.com")))
+        pipeline.ingest(*_delivery("w2", _order(2, "a@x.com")))
+        pipeline.ingest(*_delivery("w3", _order(3, "b@x.com")))
+        pipeline.ingest(
+            *_delivery(
+                "w4", {**_order(1, "a@x.com"), "total_price": "12.00"}, topic="orders/updated"
+            )
+        )
+
+        assert asyncio.run(pipeline.process_batch()) == 4
+
+        session = store.session_factory()
+        assert session.query(Order).count() == 3
+        assert (
+            float(session.query(Order).filter(Order.external_id == "1").one().total_amount) == 12.0
+        )
+        assert notified == [["1", "2", "3"]]
+        assert pipeline.get_status()["queue_depth"] == 0
+        assert pipeline.metrics["batches"] == 1
+
+    def test_orders_without_email_are_notified_one_by_one(self, monkeypatch):
+        from services.api_gateway.integrations.notifications import email, sms
+
+        texts, emails = [], []
+
+        async def fake_sms(order_id, message):
+            texts.append(message)
+
+        async def fake_email(to, subject, message):
+            emails.append(to)
+
+        monkeypatch.setattr(sms, "send_order_sms", fake_sms)
+        monkeypatch.setattr(email, "send_order_email", fake_email)
+        emails_by_id = {1: None, 2: "a@x.com", 3: "", 4: "a@x.com"}
+        orders = [transform_shopify_order(_order(i, e)) for i, e in emails_by_id.items()]
+        asyncio.run(notify_new_orders(orders))
+
+        numbers = sorted(text.split(": ")[1] for text in texts)
+        assert numbers == ["1", "2، 4", "3"]
+        assert emails == ["a@x.com"]
+
+    def test_out_of_order_update_does_not_overwrite_newer_state(self, pipeline, store):
+        newer = {
+            **_order(1, "a@x.com"),
+            "total_price": "15.00",
+            "updated_at": "2024-01-03T00:00:00Z",
+        }
+        older = {
+            **_order(1, "a@x.com"),
+            "total_price": "11.00",
+            "updated_at": "2024-01-02T00:00:00Z",
+        }
+        pipeline.ingest(*_delivery("w1", newer, topic="orders/updated"))
+        pipeline.ingest(*_delivery("w2", older, topic="orders/updated"))
+        asyncio.run(pipeline.process_batch())
+
+        pipeline.ingest(*_delivery("w3", {**older, "total_price": "12.00"}, topic="orders/updated"))
+        asyncio.run(pipeline.process_batch())
+
+        row = store.session_factory().query(Order).filter(Order.external_id == "1").one()
+        assert float(row.total_amount) == 15.0
+
+    def test_poison_event_does_not_block_batch(self, pipeline, store):
+        pipeline.ingest(*_delivery("w1", _order(1, "a@x.com")))
+        pipeline.ingest(*_delivery("w2", {"email": "no-id@x.com"}))
+        pipeline.ingest(*_delivery("w3", _order(3, "b@x.com")))
+
+        asyncio.run(pipeline.process_batch())
+        assert store.session_factory().query(Order).count() == 2
+        assert pipeline.get_status()["queue_depth"] == 1
+
+        asyncio.run(pipeline.process_batch())  # Second failure: max_attempts reached
+        status = pipeline.get_status()
+        assert (status["queue_depth"], status["dead_letters"], status["failed"]) == (0, 1, 2)
+
+    def test_worker_drains_queue(self, pipeline, store):
+        async def run():
+            pipeline.flush_interval = 0.01
+            pipeline.start()
+            for i in range(5):
+                pipeline.ingest(*_delivery(f"w{i}", _order(i, "a@x.com")))
+            for _ in range(100):
+                if pipeline.metrics["processed"] == 5:
+                    break
+                await asyncio.sleep(0.01)
+            await pipeline.stop()
+
+        asyncio.run(run())
+        assert store.session_factory().query(Order).count() == 5
+
+
+class TestTTLDedupeSet:
+    def test_expiry_and_bound(self):
+        seen = TTLDedupeSet(max_size=2, ttl=0.05)
+        assert seen.add("a") and not seen.add("a")
+        seen.add("b")
+        seen.add("c")  # Evicts "a"
+        assert len(seen) == 2 and seen.add("a")
+        time.sleep(0.06)
+        assert seen.add("b")